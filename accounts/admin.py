@@ -1,7 +1,9 @@
 from django.contrib import admin
 from django.contrib.auth.admin import UserAdmin
+from django.shortcuts import redirect
+from django.template.response import TemplateResponse
 from django.utils import timezone
-from .models import User, Department, FieldLock, NPUApiLog, ReceiptTemplate, Receipt, ReceiptItem, ReceiptChangeLog, UserActivityLog
+from .models import User, Department, FieldLock, NPUApiLog, ReceiptTemplate, Receipt, ReceiptItem, ReceiptChangeLog, UserActivityLog, FiscalYearRollup
 
 
 @admin.register(User)
@@ -52,7 +54,12 @@ class CustomUserAdmin(UserAdmin):
     
     readonly_fields = ('date_joined', 'last_login', 'last_npu_sync', 'npu_last_login')
     
-    actions = ['approve_users', 'reject_users', 'suspend_users', 'reactivate_users']
+    actions = ['approve_users', 'reject_users', 'suspend_users', 'reactivate_users', 'resync_from_npu']
+
+    # จำกัดจำนวนต่อครั้ง — action รันใน request เดียวและยิง NPU ได้ไม่เกิน NPU_RESYNC_ACTION_RATE ครั้งต่อวินาที
+    # 25 คน ≈ 5 วินาที ไม่ชน timeout ของ worker ถ้าเยอะกว่านี้ให้ใช้ manage.py npu_resync_all (ทำต่อได้ด้วย --resume)
+    NPU_RESYNC_ACTION_LIMIT = 25
+    NPU_RESYNC_ACTION_RATE = 5
     
     def approve_users(self, request, queryset):
         """Bulk approve users"""
@@ -89,6 +96,40 @@ class CustomUserAdmin(UserAdmin):
             count += 1
         self.message_user(request, f'เปิดใช้งานผู้ใช้ {count} คน เรียบร้อยแล้ว')
     reactivate_users.short_description = 'เปิดใช้งานผู้ใช้ที่เลือก'
+    
+    def resync_from_npu(self, request, queryset):
+        """Bulk re-sync users from NPU API"""
+        from django.contrib import messages
+        from .npu_resync import resync_users
+
+        users = queryset.filter(source='npu_api').order_by('id')
+        total = users.count()
+        if total > self.NPU_RESYNC_ACTION_LIMIT:
+            self.message_user(
+                request,
+                f'เลือกไว้ {total} คน เกินกำหนด {self.NPU_RESYNC_ACTION_LIMIT} คนต่อครั้ง '
+                f'กรุณาใช้คำสั่ง python manage.py npu_resync_all แทน (ถ้าหลุดกลางทาง สั่งซ้ำด้วย --resume เพื่อทำต่อ)',
+                level=messages.WARNING,
+            )
+            return
+
+        result = resync_users(
+            users,
+            performed_by_label=request.user.username,
+            rate_per_second=self.NPU_RESYNC_ACTION_RATE,
+            ip_address=UserActivityLog._get_client_ip(request),
+            user_agent=request.META.get('HTTP_USER_AGENT', ''),
+        )
+        self.message_user(
+            request,
+            f'ดึงข้อมูลจาก NPU {result.processed} คน: เปลี่ยนแปลง {result.changed} คน, '
+            f'ไม่เปลี่ยน {result.unchanged} คน, ข้าม {len(result.skipped)} คน, ล้มเหลว {len(result.failed)} คน',
+        )
+        for user, message in result.failed[:10]:
+            self.message_user(request, f'{user.username}: {message}', level=messages.ERROR)
+        for user, message in result.warnings:
+            self.message_user(request, f'{user.username}: {message}', level=messages.WARNING)
+    resync_from_npu.short_description = 'ดึงข้อมูลจาก NPU ใหม่ (เฉพาะผู้ใช้จาก NPU API)'
 
 
 @admin.register(Department)
@@ -330,6 +371,48 @@ class UserActivityLogAdmin(admin.ModelAdmin):
         return request.user.is_superuser
 
 
+@admin.register(FiscalYearRollup)
+class FiscalYearRollupAdmin(admin.ModelAdmin):
+    """ยอดสรุปปีงบประมาณที่ปิดแล้ว (สร้างโดยคำสั่ง close_fiscal_year) — ดูได้อย่างเดียว"""
+
+    list_display = ('fiscal_year', 'department', 'receipt_count', 'completed_count',
+                    'cancelled_count', 'draft_count', 'total_amount', 'created_at')
+    list_filter = ('fiscal_year',)
+    search_fields = ('department__name', 'department__code')
+    ordering = ('-fiscal_year', 'department__name')
+
+    def has_add_permission(self, request):
+        return False
+
+    def has_change_permission(self, request, obj=None):
+        return False
+
+    def has_delete_permission(self, request, obj=None):
+        return False
+
+
+def cache_stats_view(request):
+    """หน้าแสดงตัวนับ hit/miss ของ cache แยกตาม namespace (ดู utils/cache.py)"""
+    from django.conf import settings
+    from utils.cache import get_cache_stats, invalidate_namespace, reset_cache_stats
+
+    if request.method == 'POST' and request.user.is_superuser:
+        if 'reset' in request.POST:
+            reset_cache_stats()
+        elif request.POST.get('invalidate'):
+            invalidate_namespace(request.POST['invalidate'])
+        return redirect('admin_cache_stats')
+
+    context = {
+        **admin.site.each_context(request),
+        'title': 'สถิติ Cache',
+        'stats': get_cache_stats(),
+        'shared_backend': settings.CACHES['default']['BACKEND'].rsplit('.', 1)[-1],
+        'local_backend': settings.CACHES['local']['BACKEND'].rsplit('.', 1)[-1],
+    }
+    return TemplateResponse(request, 'admin/cache_stats.html', context)
+
+
 # Customize admin site
 admin.site.site_header = 'ระบบออกใบสำคัญรับเงิน - มหาวิทยาลัยนครพนม'
 admin.site.site_title = 'Receipt System Admin - NPU'
@@ -4,4 +4,7 @@ from django.apps import AppConfig
 class AccountsConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'accounts'
-    verbose_name = 'การจัดการผู้ใช้ระบบใบสำคัญรับเงิน'
\ No newline at end of file
+    verbose_name = 'การจัดการผู้ใช้ระบบใบสำคัญรับเงิน'
+
+    def ready(self):
+        from . import signals  # noqa: F401
@@ -0,0 +1,147 @@
+"""
+ปิดปีงบประมาณ — ขั้นตอนที่ทำครั้งเดียวหลังขึ้นปีงบประมาณใหม่ (คำสั่ง close_fiscal_year)
+
+    close_volumes      ปิดเล่มที่ยังใช้งานอยู่ของปีนั้นทั้งหมดด้วย UPDATE เดียว + บันทึก DocumentVolumeLog
+    write_rollups      ยอดสรุปรายหน่วยงานของปี (FiscalYearRollup) จาก GROUP BY query เดียว — เขียนครั้งเดียว แก้ไม่ได้
+    store_final_pdfs   สร้าง PDF ใบสำคัญที่เสร็จสิ้นของปีเก็บไว้ใน storage (FISCAL_YEAR_CLOSE_PDF_DIR)
+
+PDF ที่เก็บไว้ใช้แทนการสร้างใหม่ใน generate_receipt_pdf (accounts/pdf_generator.py) ผ่าน open_final_pdf
+ชื่อไฟล์มี updated_at ของใบสำคัญ — ใบที่ถูกแก้หลังปิดปีจะหาไฟล์ไม่เจอและสร้าง PDF ใหม่ตามปกติ
+"""
+from django.conf import settings
+from django.core.files import File
+from django.core.files.storage import default_storage
+from django.db import transaction
+from django.db.models import Count, Q, Sum
+from django.utils import timezone
+
+from utils.cache import invalidate_namespace
+from utils.fiscal_year import get_current_fiscal_year, get_fiscal_year_dates, get_fiscal_year_from_date
+from utils.fiscal_year_info import FISCAL_YEAR_CACHE_NAMESPACE
+
+from .models import DocumentVolume, DocumentVolumeLog, FiscalYearRollup, Receipt
+
+
+def fiscal_year_receipts(fiscal_year):
+    """ใบสำคัญทุกสถานะที่ receipt_date อยู่ในปีงบประมาณ (ร่างที่ยังไม่มีวันที่ไม่นับ)"""
+    fiscal_start, fiscal_end = get_fiscal_year_dates(fiscal_year)
+    return Receipt.objects.filter(receipt_date__gte=fiscal_start, receipt_date__lte=fiscal_end)
+
+
+def close_volumes(fiscal_year, user=None):
+    """
+    ปิดเล่มที่ยังใช้งานอยู่ของปีงบประมาณ
+
+    Returns:
+        int: จำนวนเล่มที่ปิด
+    """
+    now = timezone.now()
+    with transaction.atomic():
+        volumes = DocumentVolume.objects.select_for_update().filter(fiscal_year=fiscal_year, status='active')
+        volume_ids = list(volumes.values_list('id', flat=True))
+        if not volume_ids:
+            return 0
+        DocumentVolume.objects.filter(id__in=volume_ids).update(
+            status='closed', closed_at=now, closed_by=user, updated_at=now,
+        )
+        DocumentVolumeLog.objects.bulk_create([
+            DocumentVolumeLog(volume_id=volume_id, action='closed', user=user,
+                              notes=f'ปิดปีงบประมาณ {fiscal_year}')
+            for volume_id in volume_ids
+        ], batch_size=500)
+    # update() ไม่ส่ง signal — ล้าง cache สรุปเล่มเอง
+    invalidate_namespace(FISCAL_YEAR_CACHE_NAMESPACE)
+    return len(volume_ids)
+
+
+def write_rollups(fiscal_year, user=None):
+    """
+    บันทึกยอดสรุปรายหน่วยงานของปีงบประมาณ — ปีที่มียอดสรุปแล้วไม่เขียนซ้ำ
+
+    Returns:
+        list ของ FiscalYearRollup ที่สร้าง (ว่าง = มีอยู่แล้วหรือไม่มีใบสำคัญ)
+    """
+    if FiscalYearRollup.objects.filter(fiscal_year=fiscal_year).exists():
+        return []
+
+    rows = fiscal_year_receipts(fiscal_year).values('department').annotate(
+        count=Count('id'),
+        completed_count=Count('id', filter=Q(status='completed')),
+        cancelled_count=Count('id', filter=Q(status='cancelled')),
+        draft_count=Count('id', filter=Q(status='draft')),
+        amount=Sum('total_amount', filter=Q(status='completed')),
+    ).order_by()
+
+    rollups = [
+        FiscalYearRollup(
+            fiscal_year=fiscal_year,
+            department_id=row['department'],
+            receipt_count=row['count'],
+            completed_count=row['completed_count'],
+            cancelled_count=row['cancelled_count'],
+            draft_count=row['draft_count'],
+            total_amount=row['amount'] or 0,
+            created_by=user,
+        )
+        for row in rows
+    ]
+    # bulk_create ไม่ผ่าน save() จึงไม่ติดเงื่อนไขแก้ไขไม่ได้ของโมเดล
+    return FiscalYearRollup.objects.bulk_create(rollups, batch_size=500)
+
+
+def final_pdf_path(receipt, fiscal_year=None):
+    """path ใน storage ของ PDF ที่เก็บตอนปิดปีงบประมาณ"""
+    if fiscal_year is None:
+        fiscal_year = get_fiscal_year_from_date(receipt.receipt_date)
+    directory = getattr(settings, 'FISCAL_YEAR_CLOSE_PDF_DIR', 'fiscal_year_close')
+    stamp = int(receipt.updated_at.timestamp())
+    return f'{directory}/{fiscal_year}/{receipt.id}-{stamp}.pdf'
+
+
+def store_final_pdfs(fiscal_year, progress=None):
+    """
+    สร้าง PDF ของใบสำคัญที่เสร็จสิ้นในปีงบประมาณเก็บลง storage — ใบที่มีไฟล์อยู่แล้วข้าม (รันซ้ำต่อจากที่ค้างได้)
+
+    Args:
+        progress: callable(done, total) เรียกทุก 100 ใบ (optional)
+
+    Returns:
+        tuple: (จำนวนที่สร้าง, จำนวนที่มีอยู่แล้ว)
+    """
+    from utils.file_response import spooled_file
+    from .pdf_generator import get_receipt_pdf_generator
+
+    receipts = fiscal_year_receipts(fiscal_year).filter(status='completed').select_related(
+        'department', 'created_by',
+    ).order_by('id')
+    total = receipts.count()
+    created = existing = 0
+    for done, receipt in enumerate(receipts.iterator(chunk_size=200), start=1):
+        path = final_pdf_path(receipt, fiscal_year)
+        if default_storage.exists(path):
+            existing += 1
+        else:
+            output = spooled_file()
+            get_receipt_pdf_generator().generate_receipt_pdf(receipt, response=output)
+            output.seek(0)
+            default_storage.save(path, File(output))
+            output.close()
+            created += 1
+        if progress and done % 100 == 0:
+            progress(done, total)
+    return created, existing
+
+
+def open_final_pdf(receipt):
+    """
+    ไฟล์ PDF ที่เก็บไว้ตอนปิดปีงบประมาณ — None ถ้าไม่มี (ปียังไม่ปิด, ไม่ใช่ใบที่เสร็จสิ้น หรือแก้ไขหลังปิดปี)
+    """
+    if receipt.status != 'completed' or not receipt.receipt_date:
+        return None
+    fiscal_year = get_fiscal_year_from_date(receipt.receipt_date)
+    if fiscal_year >= get_current_fiscal_year():
+        return None
+    try:
+        return default_storage.open(final_pdf_path(receipt, fiscal_year), 'rb')
+    except OSError:
+        return None
@@ -0,0 +1,158 @@
+"""
+ตรวจเวลาและหน่วยความจำตอน worker เริ่ม: django.setup() + โหลด URLconf
+
+รันใน process ใหม่ด้วย python -X importtime (process นี้ import ทุกอย่างไปแล้ว วัดเองไม่ได้)
+    - เวลา django.setup() / โหลด URLconf และ RSS สูงสุดของ process (ค่า median จาก --runs รอบ)
+    - โมดูลที่ใช้เวลา import สะสมมากที่สุด (เฉพาะชั้นบนสุด — ตัวที่ถูกนับเวลาจริง)
+    - เวลา import รวมแยกตาม package
+    - ไลบรารีหนักที่ควร import ตอนใช้ (HEAVY_MODULES) แต่ถูกโหลดตั้งแต่เริ่ม พร้อมสายการ import
+
+    python manage.py audit_startup_imports
+    python manage.py audit_startup_imports --top 40 --runs 5
+    python manage.py audit_startup_imports --fail-on-heavy --ignore PIL
+"""
+import json
+import os
+import re
+import statistics
+import subprocess
+import sys
+from collections import defaultdict
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+
+# ไลบรารีหนักที่ใช้เฉพาะบางหน้า — ไม่ควรถูกโหลดตอน worker เริ่ม
+HEAVY_MODULES = {
+    'reportlab': 'PDF (pdf_generator.py, pdf_styles.py, pdf_overlay.py, pdf_tables.py, exports.py)',
+    'openpyxl': 'ส่งออก Excel (exports.py)',
+    'qrcode': 'QR code (utils/qr_generator.py)',
+    'PIL': 'รูปภาพ QR / ฟิลด์รูปของ django-summernote',
+    'bs4': 'แปลง HTML ใน PDF (pdf_generator.py)',
+    'pythainlp': 'ไม่ได้ใช้แล้ว',
+    'requests': 'NPU API (npu_api.py, npu_student_api.py)',
+}
+
+# โค้ดที่รันใน process ลูก — พิมพ์ผลเป็น JSON บรรทัดสุดท้ายของ stdout ส่วน importtime ออกทาง stderr
+PROBE = '''
+import json, resource, sys, time
+started = time.perf_counter()
+import django
+django.setup()
+setup_done = time.perf_counter()
+from django.urls import get_resolver
+get_resolver().url_patterns
+urls_done = time.perf_counter()
+maxrss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+print(json.dumps({
+    'setup_ms': (setup_done - started) * 1000,
+    'urlconf_ms': (urls_done - setup_done) * 1000,
+    'maxrss_kb': maxrss // 1024 if sys.platform == 'darwin' else maxrss,
+    'modules': sorted(sys.modules),
+}))
+'''
+
+IMPORTTIME_LINE = re.compile(r'^import time:\s+(\d+) \|\s+(\d+) \|( *)(\S+)$')
+
+
+def parse_importtime(stderr):
+    """
+    แปลงผล -X importtime เป็น list ของ (ชื่อโมดูล, self us, cumulative us, สายการ import)
+
+    importtime พิมพ์โมดูลลูกก่อนโมดูลแม่ (แม่คือบรรทัดถัดไปที่ย่อหน้าน้อยกว่า 1 ระดับ)
+    จึงไล่จากท้ายขึ้นมาเพื่อรู้สายการ import ของแต่ละบรรทัด
+    """
+    rows = []
+    for line in stderr.splitlines():
+        match = IMPORTTIME_LINE.match(line)
+        if match:
+            self_us, cumulative_us, indent, name = match.groups()
+            rows.append((name, int(self_us), int(cumulative_us), len(indent) // 2))
+
+    entries = []
+    path = []
+    for name, self_us, cumulative_us, depth in reversed(rows):
+        path = path[:depth] + [name]
+        entries.append((name, self_us, cumulative_us, tuple(path)))
+    entries.reverse()
+    return entries
+
+
+class Command(BaseCommand):
+    help = 'Audit import time and memory of django.setup() plus URLconf loading'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--top', type=int, default=20, help='จำนวนแถวในแต่ละตาราง (default 20)')
+        parser.add_argument('--runs', type=int, default=3,
+                            help='จำนวนรอบที่รัน (รอบแรกอาจ compile .pyc ด้วย จึงใช้ median, default 3)')
+        parser.add_argument('--fail-on-heavy', action='store_true',
+                            help='จบด้วย error ถ้ามีไลบรารีใน HEAVY_MODULES ถูกโหลดตอนเริ่ม')
+        parser.add_argument('--ignore', action='append', default=[], choices=sorted(HEAVY_MODULES),
+                            help='ไม่นับไลบรารีนี้ตอนใช้ --fail-on-heavy (ระบุซ้ำได้)')
+
+    def handle(self, *args, **options):
+        runs = [self._probe() for _ in range(max(options['runs'], 1))]
+        result, entries = runs[-1]
+
+        setup_ms = statistics.median(r['setup_ms'] for r, _ in runs)
+        urlconf_ms = statistics.median(r['urlconf_ms'] for r, _ in runs)
+        maxrss_mb = statistics.median(r['maxrss_kb'] for r, _ in runs) / 1024
+        self.stdout.write(f"settings: {os.environ.get('DJANGO_SETTINGS_MODULE')}  ({len(runs)} รอบ, ค่า median)")
+        self.stdout.write(f'  django.setup()   {setup_ms:8.1f} ms')
+        self.stdout.write(f'  โหลด URLconf     {urlconf_ms:8.1f} ms')
+        self.stdout.write(f'  RSS สูงสุด        {maxrss_mb:8.1f} MB')
+        self.stdout.write(f"  โมดูลที่โหลด      {len(result['modules']):8d}")
+
+        top = options['top']
+        self.stdout.write('')
+        self.stdout.write(f'โมดูลชั้นบนสุดที่ใช้เวลาสะสมมากที่สุด ({top} อันดับ)')
+        roots = sorted((e for e in entries if len(e[3]) == 1), key=lambda e: e[2], reverse=True)
+        for name, self_us, cumulative_us, _ in roots[:top]:
+            self.stdout.write(f'  {cumulative_us / 1000:8.1f} ms  (self {self_us / 1000:6.1f})  {name}')
+
+        by_package = defaultdict(int)
+        for name, self_us, _, _ in entries:
+            by_package[name.split('.')[0]] += self_us
+        self.stdout.write('')
+        self.stdout.write(f'เวลา import รวมแยกตาม package ({top} อันดับ)')
+        for package, self_us in sorted(by_package.items(), key=lambda item: item[1], reverse=True)[:top]:
+            self.stdout.write(f'  {self_us / 1000:8.1f} ms  {package}')
+
+        loaded = set(result['modules'])
+        first_chain = {}
+        for name, _, _, chain in entries:
+            package = name.split('.')[0]
+            if package in HEAVY_MODULES and package not in first_chain:
+                first_chain[package] = chain
+        heavy = [package for package in HEAVY_MODULES if package in loaded]
+
+        self.stdout.write('')
+        if not heavy:
+            self.stdout.write(self.style.SUCCESS('ไม่มีไลบรารีหนักถูกโหลดตอนเริ่ม'))
+            return
+
+        self.stdout.write('ไลบรารีหนักที่ถูกโหลดตอนเริ่ม')
+        for package in heavy:
+            chain = first_chain.get(package, (package,))
+            # ตัดสายให้เหลือถึงโมดูลแรกของ package นั้น
+            cut = next(i for i, name in enumerate(chain) if name.split('.')[0] == package) + 1
+            ignored = ' (ignored)' if package in options['ignore'] else ''
+            self.stdout.write(self.style.WARNING(f'  {package}{ignored} — ใช้กับ: {HEAVY_MODULES[package]}'))
+            self.stdout.write(f"      {' → '.join(chain[:cut])}")
+
+        failing = [package for package in heavy if package not in options['ignore']]
+        if options['fail_on_heavy'] and failing:
+            raise CommandError(f"ไลบรารีหนักถูกโหลดตอนเริ่ม: {', '.join(failing)}")
+
+    def _probe(self):
+        env = dict(os.environ)
+        env.setdefault('DJANGO_SETTINGS_MODULE', settings.SETTINGS_MODULE)
+        completed = subprocess.run(
+            [sys.executable, '-X', 'importtime', '-c', PROBE],
+            cwd=str(settings.BASE_DIR), env=env, capture_output=True, text=True,
+        )
+        if completed.returncode != 0:
+            raise CommandError(f'process ลูกล้มเหลว:\n{completed.stderr[-2000:]}')
+        result = json.loads(completed.stdout.strip().splitlines()[-1])
+        return result, parse_importtime(completed.stderr)
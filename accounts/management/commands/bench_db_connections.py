@@ -0,0 +1,81 @@
+"""
+วัดต้นทุน connection ต่อ request ก่อน/หลังเปิด persistent connection
+
+จำลองวงจร request ด้วย signal request_started / request_finished แบบเดียวกับที่ Django
+ทำจริง (close_old_connections ทำงานตอนจบ request) แล้วรัน query เบา ๆ 1 ครั้งต่อ request
+เทียบหลายโหมด: CONN_MAX_AGE=0 (แบบเดิม), persistent ตามค่าใน settings, และ pool (ถ้า backend รองรับ)
+
+    python manage.py bench_db_connections --requests 500
+"""
+import time
+
+from django.core.management.base import BaseCommand
+from django.core.signals import request_finished, request_started
+from django.db import connection
+
+
+class Command(BaseCommand):
+    help = 'Benchmark DB connection cost per request (CONN_MAX_AGE / pool modes)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--requests', type=int, default=200, help='จำนวน request ที่จำลองต่อโหมด')
+        parser.add_argument('--max-age', type=int, default=None,
+                            help='CONN_MAX_AGE สำหรับโหมด persistent (default: ค่าใน settings หรือ 60)')
+        parser.add_argument('--pool-size', type=int, default=4, help='ขนาด pool สำหรับโหมด pool')
+
+    def handle(self, *args, **options):
+        from accounts.models import Department
+
+        try:
+            from edoc_system.db_backends.instrument import get_connection_stats, reset_connection_stats
+        except ImportError:
+            get_connection_stats = reset_connection_stats = None
+
+        if not hasattr(connection, 'supports_pooling'):
+            self.stdout.write(self.style.WARNING(
+                'ENGINE ไม่ใช่ backend ของระบบ (edoc_system.db_backends.*) — จะไม่มีตัวนับ connect'
+            ))
+
+        original = dict(connection.settings_dict)
+        max_age = options['max_age']
+        if max_age is None:
+            max_age = original.get('CONN_MAX_AGE') or 60
+
+        modes = [
+            ('no persistence (CONN_MAX_AGE=0)', {'CONN_MAX_AGE': 0, 'POOL_SIZE': 0}),
+            (f'persistent (CONN_MAX_AGE={max_age})', {'CONN_MAX_AGE': max_age, 'POOL_SIZE': 0}),
+        ]
+        if getattr(connection, 'supports_pooling', False):
+            modes.append((f"pool (POOL_SIZE={options['pool_size']})",
+                          {'CONN_MAX_AGE': 0, 'POOL_SIZE': options['pool_size']}))
+
+        n = options['requests']
+        self.stdout.write(f'DB vendor: {connection.vendor}, requests ต่อโหมด: {n}\n')
+
+        try:
+            for label, overrides in modes:
+                connection.close()
+                connection.settings_dict.update(overrides)
+                if reset_connection_stats:
+                    reset_connection_stats()
+
+                t0 = time.perf_counter()
+                for _ in range(n):
+                    request_started.send(sender=self.__class__)
+                    Department.objects.exists()
+                    request_finished.send(sender=self.__class__)
+                elapsed_ms = (time.perf_counter() - t0) * 1000
+
+                self.stdout.write(self.style.MIGRATE_HEADING(label))
+                self.stdout.write(f'  เฉลี่ยต่อ request : {elapsed_ms / n:.3f} ms')
+                if get_connection_stats:
+                    stats = get_connection_stats()
+                    per_connect = stats['connect_ms'] / stats['connects'] if stats['connects'] else 0
+                    self.stdout.write(f"  connects         : {stats['connects']} "
+                                      f"(เฉลี่ย {per_connect:.2f} ms/ครั้ง)")
+                    self.stdout.write(f"  reconnects       : {stats['reconnects']}")
+                    self.stdout.write(f"  pool hits        : {stats['pool_hits']}")
+        finally:
+            connection.close()
+            connection.settings_dict.clear()
+            connection.settings_dict.update(original)
@@ -0,0 +1,71 @@
+"""
+วัดเวลาสร้าง PDF ใบสำคัญรับเงินต่อใบ เทียบ 2 โหมดบนใบสำคัญชุดเดียวกัน
+
+    - flow     ReceiptPDFGenerator.generate_receipt_pdf แบบเดิม (จัดหัวเอกสาร + อ่าน logo ใหม่ทุกใบ)
+    - overlay  OverlayReceiptPDFGenerator (หัวเอกสารจาก page template ที่เตรียมไว้ครั้งเดียว — accounts/pdf_overlay.py)
+
+ไม่เขียนอะไรลงฐานข้อมูล รอบแรกของแต่ละโหมดเป็นรอบอุ่นเครื่อง (ลงทะเบียนฟอนต์/สร้าง template) ไม่นับเวลา
+
+    python manage.py bench_receipt_pdf
+    python manage.py bench_receipt_pdf --limit 50 --runs 10
+    python manage.py bench_receipt_pdf --receipt 12 --receipt 15
+"""
+import statistics
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from accounts.models import Receipt
+
+
+class Command(BaseCommand):
+    help = 'Benchmark per-receipt PDF generation time: flow layout vs pre-built page template (overlay)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--receipt', type=int, action='append', default=[],
+                            help='id ใบสำคัญที่ใช้วัด (ระบุซ้ำได้) — ถ้าไม่ระบุใช้ใบล่าสุดตาม --limit')
+        parser.add_argument('--limit', type=int, default=10, help='จำนวนใบสำคัญล่าสุดที่ใช้วัด (default 10)')
+        parser.add_argument('--runs', type=int, default=5, help='จำนวนรอบต่อโหมด (default 5)')
+
+    def handle(self, *args, **options):
+        from accounts.pdf_generator import ReceiptPDFGenerator
+        from accounts.pdf_overlay import OverlayReceiptPDFGenerator
+
+        receipts = Receipt.objects.select_related('department')
+        if options['receipt']:
+            receipts = list(receipts.filter(pk__in=options['receipt']))
+        else:
+            receipts = list(receipts.order_by('-id')[:max(options['limit'], 1)])
+        if not receipts:
+            raise CommandError('ไม่พบใบสำคัญสำหรับวัด')
+
+        self.stdout.write(f"สร้าง PDF ใบสำคัญ {len(receipts)} ใบ รอบละ {options['runs']} ครั้ง")
+        results = {}
+        for name, generator_class in (('flow', ReceiptPDFGenerator), ('overlay', OverlayReceiptPDFGenerator)):
+            self._run_once(generator_class, receipts)
+            timings = []
+            for _ in range(max(options['runs'], 1)):
+                elapsed, size = self._run_once(generator_class, receipts)
+                timings.append(elapsed / len(receipts))
+            results[name] = statistics.median(timings)
+            self.stdout.write(
+                f'  {name:<8} median={statistics.median(timings) * 1000:.1f}ms/ใบ  '
+                f'min={min(timings) * 1000:.1f}ms  max={max(timings) * 1000:.1f}ms  '
+                f'ขนาดเฉลี่ย={size / len(receipts) / 1024:.1f}KB'
+            )
+
+        flow_time, overlay_time = results['flow'], results['overlay']
+        self.stdout.write('')
+        self.stdout.write(self.style.SUCCESS(
+            f'เวลาต่อใบ: {flow_time * 1000:.1f}ms → {overlay_time * 1000:.1f}ms '
+            f'(ลดลง {(1 - overlay_time / flow_time) * 100:.0f}%)'
+        ))
+
+    def _run_once(self, generator_class, receipts):
+        size = 0
+        started = time.perf_counter()
+        for receipt in receipts:
+            response = generator_class().generate_receipt_pdf(receipt)
+            size += sum(len(chunk) for chunk in response)
+            response.close()
+        return time.perf_counter() - started, size
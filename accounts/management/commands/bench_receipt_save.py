@@ -0,0 +1,156 @@
+"""
+วัดจำนวน SQL query และเวลาของการบันทึกใบสำคัญรับเงินหลายรายการ (receipt_save_ajax)
+
+เทียบ 2 แบบบนข้อมูลชุดเดียวกัน:
+    - legacy   แบบเดิม: create ใบสำคัญ → create ทีละรายการ → save ใบสำคัญซ้ำเพื่ออัปเดตยอดรวม
+    - current  เรียก receipt_save_ajax จริง (ตรวยอดในหน่วยความจำ, bulk_create, save ครั้งเดียว)
+
+ทุกรอบทำใน transaction แล้ว rollback ทิ้ง — ไม่มีใบสำคัญ/เลขที่/ยอดเล่มค้างในฐานข้อมูล
+
+    python manage.py bench_receipt_save --username manager01
+    python manage.py bench_receipt_save --username manager01 --items 50 --runs 20 --status draft
+"""
+import json
+import statistics
+import time
+from decimal import Decimal
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+from django.test import RequestFactory
+from django.test.utils import CaptureQueriesContext
+
+from accounts.models import Department, Receipt, ReceiptChangeLog, ReceiptItem, User
+
+
+class _Rollback(Exception):
+    """ใช้ออกจาก transaction.atomic() เพื่อ rollback ทุกอย่างที่รอบนั้นเขียน"""
+    pass
+
+
+def _build_payload(item_count, status):
+    items = [
+        {'description': f'รายการทดสอบ {i}', 'amount': f'{i * 10}.25', 'template_id': None}
+        for i in range(1, item_count + 1)
+    ]
+    total = sum(Decimal(item['amount']) for item in items)
+    return {
+        'recipient_name': 'ผู้รับเงินทดสอบ',
+        'recipient_address': 'ที่อยู่ทดสอบ',
+        'recipient_postal_code': '48000',
+        'recipient_id_card': '1234567890123',
+        'total_amount': str(total),
+        'status': status,
+        'items': items,
+    }
+
+
+def _legacy_save(user, department, payload):
+    """ลำดับการเขียนของ receipt_save_ajax ก่อนปรับ (เก็บไว้เป็นเส้นฐานในการเทียบเท่านั้น)"""
+    from datetime import datetime
+
+    receipt = Receipt.objects.create(
+        department=department,
+        created_by=user,
+        recipient_name=payload['recipient_name'],
+        recipient_address=payload['recipient_address'],
+        recipient_postal_code=payload['recipient_postal_code'],
+        recipient_id_card=payload['recipient_id_card'],
+        is_loan=False,
+        total_amount=float(payload['total_amount']),
+        status=payload['status'],
+        receipt_date=datetime.now().date() if payload['status'] == 'completed' else None,
+    )
+    calculated_total = 0
+    for idx, item_data in enumerate(payload['items'], 1):
+        amount = float(item_data['amount'])
+        calculated_total += amount
+        ReceiptItem.objects.create(
+            receipt=receipt,
+            template_id=None,
+            description=item_data['description'],
+            amount=amount,
+            order=idx,
+        )
+    receipt.total_amount = calculated_total
+    receipt.save()
+    ReceiptChangeLog.log_change(receipt=receipt, action='created', user=user, notes='bench')
+
+
+class Command(BaseCommand):
+    help = 'Benchmark query count and latency of saving a multi-item receipt (rolled back)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--username', required=True, help='ผู้ใช้ที่มีสิทธิ์ receipt_create และมีหน่วยงาน')
+        parser.add_argument('--items', type=int, default=20, help='จำนวนรายการต่อใบ (default 20)')
+        parser.add_argument('--runs', type=int, default=10, help='จำนวนรอบต่อแบบ (default 10)')
+        parser.add_argument('--status', choices=['completed', 'draft'], default='completed',
+                            help='สถานะที่บันทึก — completed จะออกเลขที่และนับยอดเล่มด้วย (default completed)')
+
+    def handle(self, *args, **options):
+        try:
+            user = User.objects.get(username=options['username'])
+        except User.DoesNotExist:
+            raise CommandError(f"ไม่พบผู้ใช้ {options['username']}")
+        if not user.has_permission('receipt_create'):
+            raise CommandError(f'{user.username} ไม่มีสิทธิ์ receipt_create')
+        department = Department.objects.filter(pk=user.get_department_id()).first()
+        if department is None:
+            raise CommandError(f'{user.username} ไม่มีหน่วยงานในตาราง Department')
+
+        from accounts.views.receipts import receipt_save_ajax
+
+        payload = _build_payload(options['items'], options['status'])
+        body = json.dumps(payload)
+        factory = RequestFactory()
+
+        def legacy():
+            _legacy_save(user, department, payload)
+
+        def current():
+            request = factory.post('/receipt/save/', body, content_type='application/json')
+            request.user = User.objects.get(pk=user.pk)
+            response = receipt_save_ajax(request)
+            result = json.loads(response.content)
+            if not result.get('success'):
+                raise CommandError(f"receipt_save_ajax ล้มเหลว: {result.get('message')}")
+
+        self.stdout.write(
+            f"บันทึกใบสำคัญ {options['items']} รายการ สถานะ {options['status']} "
+            f"ในนาม {user.username} รอบละ {options['runs']} ครั้ง"
+        )
+        results = {}
+        for name, func in (('legacy', legacy), ('current', current)):
+            # รอบอุ่นเครื่อง (ไม่นับ) — ให้ cache สิทธิ์/หน่วยงานเต็มก่อน
+            self._run_once(func)
+            timings, query_counts = [], []
+            for _ in range(options['runs']):
+                elapsed, queries = self._run_once(func)
+                timings.append(elapsed)
+                query_counts.append(queries)
+            results[name] = (statistics.median(timings), max(query_counts))
+            self.stdout.write(
+                f'  {name:<8} queries={max(query_counts):<4} '
+                f'median={statistics.median(timings) * 1000:.1f}ms  '
+                f'min={min(timings) * 1000:.1f}ms  max={max(timings) * 1000:.1f}ms'
+            )
+
+        legacy_time, legacy_queries = results['legacy']
+        current_time, current_queries = results['current']
+        self.stdout.write('')
+        self.stdout.write(self.style.SUCCESS(
+            f'query: {legacy_queries} → {current_queries}  '
+            f'เวลา: {legacy_time * 1000:.1f}ms → {current_time * 1000:.1f}ms'
+        ))
+
+    def _run_once(self, func):
+        try:
+            with transaction.atomic():
+                with CaptureQueriesContext(connection) as queries:
+                    started = time.perf_counter()
+                    func()
+                    elapsed = time.perf_counter() - started
+                raise _Rollback()
+        except _Rollback:
+            pass
+        return elapsed, len(queries)
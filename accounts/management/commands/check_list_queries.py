@@ -0,0 +1,112 @@
+"""
+นับจำนวน SQL query ของหน้ารายการ เพื่อยืนยันว่าไม่โตตามจำนวนแถว (ไม่มี N+1)
+
+เรียก view ตรง ๆ ด้วย RequestFactory ในนามผู้ใช้ที่ระบุ (อ่านอย่างเดียว ไม่เขียนอะไร)
+    - ทุกหน้า/ตัวกรองต้องใช้ query ไม่เกิน --max-queries
+    - หน้าแรก (มีข้อมูลเต็มหน้า) ต้องใช้ query มากกว่าหน้าที่ค้นหาแล้วไม่พบอะไรเลย
+      ไม่เกิน --max-row-overhead ครั้ง — ถ้ามี query ต่อแถว ส่วนต่างนี้จะโตตามจำนวนแถว
+
+    python manage.py check_list_queries --username manager01
+    python manage.py check_list_queries --username manager01 --max-queries 12
+"""
+from django.contrib.messages.storage.fallback import FallbackStorage
+from django.contrib.sessions.backends.base import SessionBase
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.test import RequestFactory
+from django.test.utils import CaptureQueriesContext
+
+from accounts.models import User
+
+
+# ค่าค้นหาที่ไม่มีทางตรงกับข้อมูลจริง — ใช้วัด query พื้นฐานของหน้าที่ไม่มีแถว
+EMPTY_SEARCH = {'q': '__no_such_row__'}
+
+# หน้าที่ตรวจ: ชื่อ → (import path ของ view, รายการ GET parameters ที่จะลอง)
+LIST_VIEWS = {
+    'cancel_requests': ('accounts.views.cancel_requests.cancel_request_list_view', [
+        {},
+        {'page': 2},
+        {'status': 'pending'},
+        {'status': 'applied'},
+        EMPTY_SEARCH,
+    ]),
+    'edit_requests': ('accounts.views.edit_requests.edit_request_list_view', [
+        {},
+        {'status': 'pending'},
+        EMPTY_SEARCH,
+    ]),
+}
+
+
+def _load_view(path):
+    from django.utils.module_loading import import_string
+    return import_string(path)
+
+
+class Command(BaseCommand):
+    help = 'Assert list views run a bounded, row-independent number of SQL queries'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--username', required=True, help='ผู้ใช้ที่ใช้เปิดหน้า (ผลขึ้นกับสิทธิ์ของผู้ใช้)')
+        parser.add_argument('--view', choices=sorted(LIST_VIEWS), action='append',
+                            help='เฉพาะหน้านี้ (ระบุซ้ำได้, default: ทุกหน้า)')
+        parser.add_argument('--max-queries', type=int, default=12, help='จำนวน query สูงสุดต่อหน้า (default 12)')
+        parser.add_argument('--max-row-overhead', type=int, default=2,
+                            help='query ที่หน้ามีข้อมูลใช้เพิ่มจากหน้าว่างได้ไม่เกินนี้ (default 2)')
+
+    def handle(self, *args, **options):
+        try:
+            user = User.objects.get(username=options['username'])
+        except User.DoesNotExist:
+            raise CommandError(f"ไม่พบผู้ใช้ {options['username']}")
+
+        factory = RequestFactory()
+        failures = []
+
+        for name in options['view'] or sorted(LIST_VIEWS):
+            view_path, param_sets = LIST_VIEWS[name]
+            view = _load_view(view_path)
+            self.stdout.write(f'{name} ({view_path}) ในนาม {user.username}')
+
+            def run(params):
+                request = factory.get('/', params)
+                # ผู้ใช้ใหม่ทุกรอบ — ไม่ให้ cache บน instance จากรอบก่อนทำให้ตัวเลขต่ำกว่าความจริง
+                request.user = User.objects.get(pk=user.pk)
+                request.session = SessionBase()
+                request._messages = FallbackStorage(request)
+                with CaptureQueriesContext(connection) as queries:
+                    response = view(request)
+                return response, len(queries)
+
+            # รอบอุ่นเครื่อง (ไม่นับ) — ให้ cache ที่เติมครั้งเดียวต่อ process เช่น map หน่วยงาน เต็มก่อน
+            run(param_sets[0])
+
+            counts = {}
+            for params in param_sets:
+                response, count = run(params)
+                counts[tuple(sorted(params.items()))] = count
+
+                label = ', '.join(f'{k}={v}' for k, v in params.items()) or '(ไม่มีตัวกรอง)'
+                line = f'  {label:<28} status={response.status_code}  queries={count}'
+                if count > options['max_queries']:
+                    failures.append(f'{name} [{label}]: {count} queries > {options["max_queries"]}')
+                    self.stdout.write(self.style.ERROR(line))
+                else:
+                    self.stdout.write(line)
+
+            first_page = counts.get(())
+            empty_page = counts.get(tuple(sorted(EMPTY_SEARCH.items())))
+            if first_page is not None and empty_page is not None:
+                overhead = first_page - empty_page
+                self.stdout.write(f'  query ที่เพิ่มเมื่อมีแถว: {overhead}')
+                if overhead > options['max_row_overhead']:
+                    failures.append(f'{name}: หน้าแรกใช้ query มากกว่าหน้าว่าง {overhead} ครั้ง '
+                                    f'(> {options["max_row_overhead"]}) — น่าจะมี query ต่อแถว')
+
+        self.stdout.write('')
+        if failures:
+            for failure in failures:
+                self.stdout.write(self.style.ERROR(f'  {failure}'))
+            raise CommandError(f'{len(failures)} รายการเกินงบ query')
+        self.stdout.write(self.style.SUCCESS(f'ทุกหน้าใช้ query ไม่เกิน {options["max_queries"]} ครั้ง'))
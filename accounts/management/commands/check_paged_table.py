@@ -0,0 +1,68 @@
+"""
+ตรวจว่า PagedTable (accounts/pdf_tables.py) จัดหน้าได้เมื่อมีแถวเดียวที่สูงเกินทั้งหน้า
+
+สร้าง PDF จากตารางที่มีแถว "สูง" (รายการหลายร้อยบรรทัด) อยู่ต้นตาราง กลางหน้า และแถวสุดท้าย
+แต่ละแบบต้อง build ได้ (ไม่ LayoutError) และทุกแถว/ทุกบรรทัดของแถวสูงต้องอยู่ใน PDF ตามลำดับ
+
+    python manage.py check_paged_table
+    python manage.py check_paged_table --lines 1000
+"""
+import re
+from io import BytesIO
+
+from django.core.management.base import BaseCommand, CommandError
+from reportlab.lib.pagesizes import A4
+from reportlab.lib.styles import getSampleStyleSheet
+from reportlab.lib.units import inch
+from reportlab.platypus import Paragraph, SimpleDocTemplate, Spacer, TableStyle
+
+from accounts.pdf_tables import PagedTable
+
+
+TEXT_OPERATOR = re.compile(rb'\((row \d+|line \d+)\) Tj')
+
+
+class Command(BaseCommand):
+    help = 'Check that PagedTable lays out rows taller than a whole page without a LayoutError'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--lines', type=int, default=200, help='จำนวนบรรทัดของแถวสูง (default 200)')
+        parser.add_argument('--rows', type=int, default=40, help='จำนวนแถวปกติ (default 40)')
+
+    def handle(self, *args, **options):
+        lines = max(options['lines'], 1)
+        count = max(options['rows'], 1)
+        cases = {
+            'แถวสูงเป็นแถวแรก': 0,
+            'แถวสูงกลางหน้า': count // 2,
+            'แถวสูงเป็นแถวสุดท้าย': count,
+        }
+        for label, position in cases.items():
+            pages, texts = self._build(lines, count, position)
+            expected = [f'row {i}' for i in range(position)]
+            expected += [f'line {i}' for i in range(lines)]
+            expected += [f'row {i}' for i in range(position, count)]
+            if texts != expected:
+                missing = sorted(set(expected) - set(texts))[:5]
+                raise CommandError(f'{label}: ข้อความใน PDF ไม่ครบหรือผิดลำดับ (ตัวอย่างที่หาย {missing})')
+            self.stdout.write(f'  {label}: {pages} หน้า ครบ {count} แถว + {lines} บรรทัด')
+        self.stdout.write(self.style.SUCCESS('PagedTable จัดแถวที่สูงเกินหน้าได้'))
+
+    def _build(self, lines, count, position):
+        """สร้าง PDF (ไม่บีบอัด) — คืน (จำนวนหน้า, ข้อความ row/line ตามลำดับที่วาด)"""
+        style = getSampleStyleSheet()['Normal']
+        rows = [[str(i), Paragraph(f'row {i}', style)] for i in range(count)]
+        tall = Paragraph('<br/>'.join(f'line {i}' for i in range(lines)), style)
+        rows.insert(position, ['tall', tall])
+        table = PagedTable(
+            ['#', 'item'], rows, [1 * inch, 4 * inch],
+            TableStyle([('GRID', (0, 0), (-1, -1), 0.5, 'black')]),
+            footer=['total', ''],
+        )
+
+        output = BytesIO()
+        doc = SimpleDocTemplate(output, pagesize=A4, pageCompression=0)
+        # เริ่มกลางหน้า — แถวสูงที่อยู่ต้นตารางต้องย้ายไปหน้าใหม่ก่อนแล้วค่อยตัดกลางแถว
+        doc.build([Paragraph('report', style), Spacer(1, 300), table])
+        pdf = output.getvalue()
+        return pdf.count(b'/Type /Page\n'), [match.decode() for match in TEXT_OPERATOR.findall(pdf)]
@@ -0,0 +1,173 @@
+"""
+ตรวจว่า utils.thai_baht.baht_text ให้ผลตรงกับการแปลงจำนวนเงินเป็นตัวหนังสือแบบเดิมทุกตัวอักษร
+
+เทียบกับสำเนาของ Receipt.convert_amount_to_thai_text ก่อนย้ายไปใช้ตาราง (legacy_thai_text ด้านล่าง)
+    - จำนวนเต็มทุกค่า 0..--max-integer (เป็นบาทถ้วน)
+    - สตางค์ทุกค่า 0..99 บนจำนวนเต็มตัวอย่าง (ขอบหลักหน่วย/สิบ/ร้อย/.../ร้อยล้าน)
+    - จำนวนสุ่ม --random ค่า ทั้งแบบ Decimal และ float ไม่เกิน 999,999,999.99
+    - baht_text_many ต้องได้ผลเท่ากับเรียกทีละค่า
+
+    python manage.py check_thai_baht_text
+    python manage.py check_thai_baht_text --max-integer 10000000 --random 500000
+"""
+import random
+import time
+from decimal import Decimal
+
+from django.core.management.base import BaseCommand, CommandError
+
+from utils.thai_baht import baht_text, baht_text_many
+
+
+# ของเดิมใช้ไม่ได้ตั้งแต่ 1,000 ล้าน (IndexError) จึงเทียบแค่ต่ำกว่านี้
+LEGACY_LIMIT = 1000000000
+
+
+def legacy_thai_text(amount):
+    """สำเนาของ Receipt.convert_amount_to_thai_text เดิม (ห้ามแก้ — ใช้เป็นค่าอ้างอิง)"""
+    if amount == 0:
+        return 'ศูนย์บาทถ้วน'
+
+    def number_to_thai(num):
+        if num == 0:
+            return ''
+
+        ones = ['', 'หนึ่ง', 'สอง', 'สาม', 'สี่', 'ห้า', 'หก', 'เจ็ด', 'แปด', 'เก้า']
+
+        def convert_group(n):
+            if n == 0:
+                return ''
+            elif n < 10:
+                return ones[n]
+            elif n < 20:
+                if n == 10:
+                    return 'สิบ'
+                else:
+                    return 'สิบ' + ones[n - 10]
+            elif n < 100:
+                tens = n // 10
+                units = n % 10
+                if tens == 2:
+                    return 'ยี่สิบ' + ones[units]
+                else:
+                    return ones[tens] + 'สิบ' + ones[units]
+            else:
+                hundreds = n // 100
+                remainder = n % 100
+                return ones[hundreds] + 'ร้อย' + convert_group(remainder)
+
+        def convert_full_number(num):
+            if num == 0:
+                return ''
+
+            result = ''
+
+            if num >= 1000000:
+                millions = num // 1000000
+                result += convert_group(millions) + 'ล้าน'
+                num %= 1000000
+
+            if num >= 100000:
+                hundred_thousands = num // 100000
+                result += convert_group(hundred_thousands) + 'แสน'
+                num %= 100000
+
+            if num >= 10000:
+                ten_thousands = num // 10000
+                result += convert_group(ten_thousands) + 'หมื่น'
+                num %= 10000
+
+            if num >= 1000:
+                thousands = num // 1000
+                if thousands == 1:
+                    result += 'หนึ่งพัน'
+                else:
+                    result += convert_group(thousands) + 'พัน'
+                num %= 1000
+
+            if num > 0:
+                result += convert_group(num)
+
+            return result
+
+        return convert_full_number(int(num))
+
+    integer_part = int(amount)
+    decimal_part = round((amount - integer_part) * 100)
+
+    result = number_to_thai(integer_part) + 'บาท'
+
+    if decimal_part > 0:
+        result += number_to_thai(decimal_part) + 'สตางค์'
+    else:
+        result += 'ถ้วน'
+
+    return result
+
+
+def _boundary_integers():
+    values = set()
+    for power in range(9):
+        base = 10 ** power
+        for multiplier in range(1, 10):
+            for offset in (-1, 0, 1, 11, 21):
+                value = base * multiplier + offset
+                if 0 <= value < LEGACY_LIMIT:
+                    values.add(value)
+    values.add(LEGACY_LIMIT - 1)
+    return sorted(values)
+
+
+class Command(BaseCommand):
+    help = 'Check utils.thai_baht against the legacy Thai baht text conversion'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--max-integer', type=int, default=1000000,
+                            help='เทียบจำนวนเต็มทุกค่าตั้งแต่ 0 ถึงค่านี้ (default 1,000,000)')
+        parser.add_argument('--random', type=int, default=200000, help='จำนวนค่าสุ่ม (default 200,000)')
+        parser.add_argument('--seed', type=int, default=2568)
+
+    def handle(self, *args, **options):
+        max_integer = min(options['max_integer'], LEGACY_LIMIT - 1)
+        rng = random.Random(options['seed'])
+        mismatches = []
+        checked = 0
+
+        def compare(amount):
+            nonlocal checked
+            checked += 1
+            expected = legacy_thai_text(amount)
+            actual = baht_text(amount)
+            if actual != expected and len(mismatches) < 20:
+                mismatches.append((amount, expected, actual))
+
+        started = time.monotonic()
+        for value in range(max_integer + 1):
+            compare(value)
+        self.stdout.write(f'  จำนวนเต็ม 0..{max_integer:,}: เสร็จ')
+
+        for value in _boundary_integers():
+            for satang in range(100):
+                compare(Decimal(value) + Decimal(satang) / 100)
+        self.stdout.write('  สตางค์ 0..99 บนจำนวนเต็มขอบหลัก: เสร็จ')
+
+        samples = []
+        for _ in range(options['random']):
+            cents = rng.randrange(LEGACY_LIMIT * 100)
+            samples.append(Decimal(cents) / 100)
+            samples.append(cents / 100)
+        for amount in samples:
+            compare(amount)
+        self.stdout.write(f'  สุ่ม {len(samples):,} ค่า (Decimal + float): เสร็จ')
+
+        if baht_text_many(samples) != [baht_text(amount) for amount in samples]:
+            raise CommandError('baht_text_many ให้ผลไม่ตรงกับ baht_text')
+
+        elapsed = time.monotonic() - started
+        self.stdout.write('')
+        if mismatches:
+            for amount, expected, actual in mismatches:
+                self.stdout.write(self.style.ERROR(f'  {amount!r}: เดิม {expected} / ใหม่ {actual}'))
+            raise CommandError(f'ผลไม่ตรงกัน (แสดง {len(mismatches)} รายการแรก)')
+
+        self.stdout.write(self.style.SUCCESS(f'ตรงกันทั้งหมด {checked:,} ค่า ({elapsed:.1f} วินาที)'))
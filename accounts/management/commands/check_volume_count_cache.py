@@ -0,0 +1,76 @@
+"""
+ตรวจว่าการแจ้งเตือนเล่มใกล้เต็ม (cache ใน namespace fiscal_year) เปลี่ยนทันทีเมื่อใบสำคัญเสร็จสิ้น/ถูกยกเลิก
+
+Receipt._adjust_volume_count ปรับ last_document_number ด้วย update() ซึ่งไม่ส่ง signal จึงต้องล้าง cache เอง
+คำสั่งนี้สร้างหน่วยงานชั่วคราวที่มีเล่มจุได้ 1 ใบ อ่านการแจ้งเตือน (เก็บลง cache) แล้วบันทึกใบสำคัญเสร็จสิ้นจริง
+การแจ้งเตือนรอบถัดไปต้องมี "เล่มเกือบเต็ม" ของเล่มนั้น และหายไปเมื่อยกเลิกใบสำคัญ จากนั้นลบหน่วยงานชั่วคราวทิ้ง
+(ใบสำคัญและเล่มถูกลบตาม) — ต้อง commit จริง เพราะ cache ถูกล้างหลัง commit (transaction.on_commit)
+
+    python manage.py check_volume_count_cache --username manager01
+"""
+from datetime import date
+from decimal import Decimal
+
+from django.core.management.base import BaseCommand, CommandError
+
+
+CHECK_DEPARTMENT_NAME = 'ทดสอบ cache จำนวนเล่ม'
+CHECK_DEPARTMENT_CODE = 'ZY99'
+
+
+class Command(BaseCommand):
+    help = 'Check that volume-usage notifications are invalidated when a receipt is completed or cancelled'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--username', required=True, help='ผู้สร้างใบสำคัญทดสอบ')
+
+    def handle(self, *args, **options):
+        from accounts.models import Department, DocumentVolume, Receipt, User
+        from utils.fiscal_year import get_current_fiscal_year
+
+        try:
+            user = User.objects.get(username=options['username'])
+        except User.DoesNotExist:
+            raise CommandError(f'ไม่พบผู้ใช้ {options["username"]}')
+
+        department = Department.objects.create(name=CHECK_DEPARTMENT_NAME, code=CHECK_DEPARTMENT_CODE)
+        try:
+            volume, _created = DocumentVolume.get_or_create_volume_for_department(
+                department, get_current_fiscal_year(), user,
+            )
+            volume.max_documents = 1
+            volume.save()
+
+            if self._critical(volume):
+                raise CommandError(f'เล่ม {volume.volume_code} ยังไม่มีใบสำคัญ แต่มีการแจ้งเตือนเล่มเกือบเต็ม')
+
+            receipt = Receipt(
+                department=department, created_by=user, status='completed', receipt_date=date.today(),
+                recipient_name='ตรวจ cache', recipient_address='-', recipient_id_card='-',
+                total_amount=Decimal('1.00'),
+            )
+            receipt.save()
+            if not self._critical(volume):
+                raise CommandError('ใบสำคัญเสร็จสิ้นแล้วแต่การแจ้งเตือนยังมาจาก cache เดิม (ไม่เห็นเล่มเกือบเต็ม)')
+            self.stdout.write(f'  เสร็จสิ้น 1 ใบ → แจ้งเตือนเล่ม {volume.volume_code} เกือบเต็ม')
+
+            receipt.status = 'cancelled'
+            receipt.save()
+            if self._critical(volume):
+                raise CommandError('ยกเลิกใบสำคัญแล้วแต่การแจ้งเตือนยังมาจาก cache เดิม (ยังเห็นเล่มเกือบเต็ม)')
+            self.stdout.write('  ยกเลิกใบสำคัญ → การแจ้งเตือนหายไป')
+        finally:
+            # ใบสำคัญและเล่มของหน่วยงานชั่วคราวถูกลบตาม (CASCADE)
+            department.delete()
+
+        self.stdout.write(self.style.SUCCESS('cache การแจ้งเตือนเล่มถูกล้างเมื่อจำนวนเอกสารเปลี่ยน'))
+
+    def _critical(self, volume):
+        """มีการแจ้งเตือน "เล่มเกือบเต็ม" ของเล่มนี้ในผลที่อ่านผ่าน cache หรือไม่"""
+        from utils.notifications import FiscalYearNotificationManager
+
+        notifications = FiscalYearNotificationManager().get_all_notifications()
+        return any(
+            warning.get('details', {}).get('volume_code') == volume.volume_code
+            for warning in notifications['warnings']['danger']
+        )
@@ -0,0 +1,72 @@
+"""
+ปิดปีงบประมาณที่ผ่านมาแล้ว (รันหลังขึ้นปีใหม่ — ช่วงที่ FiscalYearNotificationManager แจ้งเตือน fiscal_year_start)
+
+    1. ปิดเล่มเอกสารที่ยังใช้งานอยู่ของปีนั้นทั้งหมด
+    2. บันทึกยอดสรุปรายหน่วยงาน (FiscalYearRollup) — ปีที่บันทึกแล้วไม่เขียนซ้ำ
+    3. สร้าง PDF ใบสำคัญที่เสร็จสิ้นเก็บไว้ (FISCAL_YEAR_CLOSE_PDF_DIR) — ใบที่มีไฟล์แล้วข้าม รันซ้ำต่อได้
+
+    python manage.py close_fiscal_year                       # ปีงบประมาณที่แล้ว
+    python manage.py close_fiscal_year --fiscal-year 2568
+    python manage.py close_fiscal_year --skip-pdfs
+    python manage.py close_fiscal_year --dry-run             # รายงานอย่างเดียว
+"""
+from django.core.management.base import BaseCommand, CommandError
+
+from accounts.fiscal_year_close import (
+    close_volumes, fiscal_year_receipts, store_final_pdfs, write_rollups,
+)
+from accounts.models import DocumentVolume, FiscalYearRollup, User
+from utils.fiscal_year import get_current_fiscal_year
+
+
+class Command(BaseCommand):
+    help = 'Close a past fiscal year: close its document volumes, write per-department rollups, store final PDFs'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--fiscal-year', type=int, help='ปีงบประมาณ (พ.ศ.) ที่จะปิด — default ปีที่แล้ว')
+        parser.add_argument('--user', help='username ผู้ปิดปี (บันทึกใน log เล่มและยอดสรุป)')
+        parser.add_argument('--skip-pdfs', action='store_true', help='ไม่สร้าง PDF เก็บไว้')
+        parser.add_argument('--dry-run', action='store_true', help='รายงานสิ่งที่จะทำโดยไม่แก้ไข')
+
+    def handle(self, *args, **options):
+        current = get_current_fiscal_year()
+        fiscal_year = options['fiscal_year'] or current - 1
+        if fiscal_year >= current:
+            raise CommandError(f'ปิดได้เฉพาะปีงบประมาณที่ผ่านมาแล้ว (ปีปัจจุบัน {current})')
+
+        user = None
+        if options['user']:
+            try:
+                user = User.objects.get(username=options['user'])
+            except User.DoesNotExist:
+                raise CommandError(f'ไม่พบผู้ใช้ {options["user"]}')
+
+        active = DocumentVolume.objects.filter(fiscal_year=fiscal_year, status='active').count()
+        has_rollups = FiscalYearRollup.objects.filter(fiscal_year=fiscal_year).exists()
+        completed = fiscal_year_receipts(fiscal_year).filter(status='completed').count()
+
+        self.stdout.write(f'ปิดปีงบประมาณ {fiscal_year}')
+        if options['dry_run']:
+            self.stdout.write(f'  เล่มที่ยังใช้งานอยู่: {active}')
+            self.stdout.write(f'  ยอดสรุป: {"บันทึกแล้ว" if has_rollups else "ยังไม่บันทึก"}')
+            self.stdout.write(f'  ใบสำคัญที่เสร็จสิ้น (PDF): {completed}')
+            self.stdout.write(self.style.WARNING('--dry-run: ยังไม่ได้แก้ไขข้อมูล'))
+            return
+
+        closed = close_volumes(fiscal_year, user=user)
+        self.stdout.write(f'  ปิดเล่ม {closed} เล่ม')
+
+        rollups = write_rollups(fiscal_year, user=user)
+        if has_rollups:
+            self.stdout.write('  ยอดสรุปบันทึกไว้แล้ว — ไม่เขียนซ้ำ')
+        else:
+            self.stdout.write(f'  บันทึกยอดสรุป {len(rollups)} หน่วยงาน')
+
+        if not options['skip_pdfs']:
+            def progress(done, total):
+                self.stdout.write(f'    PDF {done}/{total}')
+
+            created, existing = store_final_pdfs(fiscal_year, progress=progress)
+            self.stdout.write(f'  สร้าง PDF {created} ใบ (มีอยู่แล้ว {existing} ใบ)')
+
+        self.stdout.write(self.style.SUCCESS(f'ปิดปีงบประมาณ {fiscal_year} เรียบร้อย'))
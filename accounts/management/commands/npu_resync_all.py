@@ -0,0 +1,112 @@
+"""
+ดึงข้อมูลจาก NPU มาอัปเดตผู้ใช้ทุกคนที่ source='npu_api' (แทนการกดทีละคนในหน้าจัดการผู้ใช้)
+
+ยิง lookup พร้อมกันหลาย thread แต่จำกัดจำนวนต่อวินาที แล้วเขียนเป็นชุด (bulk_update)
+บันทึก checkpoint ทุกชุด ถ้าหลุดกลางทางสั่ง --resume เพื่อทำต่อจากคนล่าสุดได้
+
+    python manage.py npu_resync_all --dry-run                 # ดูว่าจะเปลี่ยนกี่คน ไม่เขียนอะไร
+    python manage.py npu_resync_all --workers 4 --rate 5
+    python manage.py npu_resync_all --resume                  # ทำต่อจาก checkpoint
+    python manage.py npu_resync_all --user-type student --limit 500
+"""
+import os
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from accounts.models import User
+from accounts.npu_resync import load_checkpoint, resync_users, save_checkpoint
+
+
+DEFAULT_CHECKPOINT = os.path.join(settings.BASE_DIR, 'logs', 'npu_resync_checkpoint.json')
+
+
+class Command(BaseCommand):
+    help = 'Re-sync all NPU API users from NPU (bounded concurrency, rate limited, resumable)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--workers', type=int, default=4, help='จำนวน thread ที่ยิง NPU API พร้อมกัน (default 4)')
+        parser.add_argument('--rate', type=float, default=5, help='request ต่อวินาทีสูงสุด รวมทุก thread (default 5, 0 = ไม่จำกัด)')
+        parser.add_argument('--batch-size', type=int, default=100, help='จำนวนผู้ใช้ต่อรอบการเขียนฐานข้อมูล (default 100)')
+        parser.add_argument('--user-type', choices=['staff', 'student'], help='เฉพาะผู้ใช้ประเภทนี้')
+        parser.add_argument('--limit', type=int, help='ทำไม่เกินจำนวนนี้')
+        parser.add_argument('--dry-run', action='store_true', help='คำนวณว่าจะเปลี่ยนอะไร โดยไม่เขียนฐานข้อมูล')
+        parser.add_argument('--checkpoint', default=DEFAULT_CHECKPOINT, help='ไฟล์ checkpoint')
+        parser.add_argument('--resume', action='store_true', help='ทำต่อจากผู้ใช้คนล่าสุดใน checkpoint')
+
+    def handle(self, *args, **options):
+        checkpoint_path = options['checkpoint']
+        dry_run = options['dry_run']
+
+        users = User.objects.filter(source='npu_api').order_by('id')
+        if options['user_type'] == 'student':
+            users = users.filter(user_type='student')
+        elif options['user_type'] == 'staff':
+            users = users.exclude(user_type='student')
+
+        if options['resume']:
+            checkpoint = load_checkpoint(checkpoint_path)
+            if checkpoint and checkpoint.get('last_user_id'):
+                users = users.filter(id__gt=checkpoint['last_user_id'])
+                self.stdout.write(f"ทำต่อจากผู้ใช้ id > {checkpoint['last_user_id']} "
+                                  f"(บันทึกเมื่อ {checkpoint.get('saved_at', '-')})")
+            else:
+                self.stdout.write(self.style.WARNING('ไม่พบ checkpoint — เริ่มตั้งแต่ต้น'))
+
+        if options['limit']:
+            users = users[:options['limit']]
+
+        total = users.count()
+        self.stdout.write(f'ผู้ใช้ที่จะ re-sync: {total} คน '
+                          f'(workers={options["workers"]}, rate={options["rate"]}/วินาที)')
+        if not total:
+            return
+
+        started = time.monotonic()
+
+        def on_batch(result):
+            elapsed = time.monotonic() - started
+            self.stdout.write(
+                f'  {result.processed}/{total} — เปลี่ยน {result.changed}, '
+                f'ล้มเหลว {len(result.failed)} ({elapsed:.1f}s)'
+            )
+            # dry-run ไม่ได้เขียนอะไร จึงไม่บันทึก checkpoint (ไม่งั้น --resume จะข้ามคนที่ยังไม่ได้ทำจริง)
+            if not dry_run and checkpoint_path:
+                os.makedirs(os.path.dirname(checkpoint_path) or '.', exist_ok=True)
+                save_checkpoint(checkpoint_path, {
+                    'last_user_id': result.last_user_id,
+                    'processed': result.processed,
+                    'saved_at': time.strftime('%Y-%m-%d %H:%M:%S'),
+                })
+
+        result = resync_users(
+            users.iterator(chunk_size=options['batch_size']),
+            performed_by_label='manage.py npu_resync_all',
+            workers=options['workers'],
+            rate_per_second=options['rate'],
+            batch_size=options['batch_size'],
+            dry_run=dry_run,
+            on_batch=on_batch,
+        )
+
+        for user, message in result.skipped:
+            self.stdout.write(f'  ข้าม {user.username}: {message}')
+        for user, message in result.failed:
+            self.stdout.write(self.style.ERROR(f'  ล้มเหลว {user.username}: {message}'))
+        for user, message in result.warnings:
+            self.stdout.write(self.style.WARNING(f'  {user.username}: {message}'))
+
+        elapsed = time.monotonic() - started
+        self.stdout.write('')
+        self.stdout.write(
+            f'ทำแล้ว {result.processed} คน ใน {elapsed:.1f} วินาที — เปลี่ยนแปลง {result.changed}, '
+            f'ไม่เปลี่ยน {result.unchanged}, ข้าม {len(result.skipped)}, ล้มเหลว {len(result.failed)}'
+        )
+        if dry_run:
+            self.stdout.write(self.style.WARNING('--dry-run: ยังไม่ได้เขียนข้อมูล'))
+        else:
+            # ทำครบแล้ว ไม่ต้องทำต่อ — ลบ checkpoint ทิ้ง
+            if checkpoint_path and os.path.exists(checkpoint_path):
+                os.remove(checkpoint_path)
+            self.stdout.write(self.style.SUCCESS('เสร็จสิ้น'))
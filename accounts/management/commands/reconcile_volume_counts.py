@@ -0,0 +1,107 @@
+"""
+ตรวจ/แก้ DocumentVolume.last_document_number ให้ตรงกับจำนวนใบสำคัญที่เสร็จสิ้นจริง
+
+นับด้วย GROUP BY query เดียว (รหัสหน่วยงาน × ปีงบประมาณของ receipt_date) แล้ว bulk_update
+เฉพาะเล่มที่ค่าไม่ตรง — แทนการ COUNT ทีละเล่มแบบ tools/update_volume_counts.py เดิม
+
+    python manage.py reconcile_volume_counts --dry-run       # รายงานอย่างเดียว
+    python manage.py reconcile_volume_counts                 # แก้ทุกเล่ม
+    python manage.py reconcile_volume_counts --fiscal-year 2569
+"""
+from collections import defaultdict
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.db.models import Case, Count, IntegerField, Value, When
+from django.db.models.functions import ExtractYear
+
+from accounts.models import DocumentVolume, Receipt
+from utils.cache import invalidate_namespace
+from utils.fiscal_year import get_volume_code
+from utils.fiscal_year_info import FISCAL_YEAR_CACHE_NAMESPACE
+
+
+def count_completed_by_volume(fiscal_year=None):
+    """
+    จำนวนใบสำคัญที่เสร็จสิ้นแยกตาม (volume_code, ปีงบประมาณ)
+
+    ปีงบประมาณ (พ.ศ.) = ปี ค.ศ. ของ receipt_date + 543 (+1 ถ้าเป็นเดือน ต.ค.-ธ.ค.)
+    หน่วยงานที่ใช้รหัสเดียวกันนับรวมเข้าเล่มเดียวกัน ตรงกับตอนออกเลขที่
+    """
+    receipts = Receipt.objects.filter(status='completed', receipt_date__isnull=False).annotate(
+        fy=ExtractYear('receipt_date') + 543 + Case(
+            When(receipt_date__month__gte=10, then=Value(1)),
+            default=Value(0),
+            output_field=IntegerField(),
+        )
+    )
+    if fiscal_year:
+        receipts = receipts.filter(fy=fiscal_year)
+
+    counts = defaultdict(int)
+    rows = receipts.values('department__code', 'fy').annotate(n=Count('id')).order_by()
+    for row in rows:
+        counts[(get_volume_code(row['department__code'], row['fy']), row['fy'])] += row['n']
+    return counts
+
+
+class Command(BaseCommand):
+    help = 'Reconcile DocumentVolume.last_document_number with completed receipts (one grouped query)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--fiscal-year', type=int, help='เฉพาะปีงบประมาณนี้ (พ.ศ.) เช่น 2569')
+        parser.add_argument('--dry-run', action='store_true', help='รายงานค่าที่ไม่ตรงโดยไม่แก้ไข')
+
+    def handle(self, *args, **options):
+        fiscal_year = options['fiscal_year']
+        dry_run = options['dry_run']
+
+        counts = count_completed_by_volume(fiscal_year)
+
+        volumes = DocumentVolume.objects.select_related('department').order_by('fiscal_year', 'volume_code')
+        if fiscal_year:
+            volumes = volumes.filter(fiscal_year=fiscal_year)
+
+        drifted = []
+        seen = set()
+        total = 0
+        for volume in volumes:
+            total += 1
+            key = (volume.volume_code, volume.fiscal_year)
+            seen.add(key)
+            actual = counts.get(key, 0)
+            if volume.last_document_number != actual:
+                drifted.append((volume, volume.last_document_number, actual))
+                volume.last_document_number = actual
+
+        for volume, old, new in drifted:
+            diff = new - old
+            self.stdout.write(
+                f'  {volume.volume_code} ({volume.department.name}): {old} → {new} ({diff:+d})'
+            )
+
+        # ใบสำคัญที่ไม่มีเล่มรองรับ (เช่น เปลี่ยนรหัสหน่วยงานหลังออกใบ)
+        orphans = {key: n for key, n in counts.items() if key not in seen}
+        for (volume_code, fy), n in sorted(orphans.items()):
+            self.stdout.write(self.style.WARNING(
+                f'  ไม่พบเล่ม {volume_code} (ปีงบ {fy}) สำหรับใบสำคัญที่เสร็จสิ้น {n} ใบ'
+            ))
+
+        if drifted and not dry_run:
+            with transaction.atomic():
+                DocumentVolume.objects.bulk_update(
+                    [volume for volume, _old, _new in drifted],
+                    ['last_document_number'],
+                    batch_size=500,
+                )
+            # bulk_update ไม่ส่ง signal — ล้าง cache สรุปเล่มเอง
+            invalidate_namespace(FISCAL_YEAR_CACHE_NAMESPACE)
+
+        self.stdout.write('')
+        self.stdout.write(f'ตรวจสอบ {total} เล่ม — ค่าไม่ตรง {len(drifted)} เล่ม, ไม่พบเล่ม {len(orphans)} รายการ')
+        if not drifted:
+            self.stdout.write(self.style.SUCCESS('ทุกเล่มตรงกับจำนวนใบสำคัญจริง'))
+        elif dry_run:
+            self.stdout.write(self.style.WARNING('--dry-run: ยังไม่ได้แก้ไขข้อมูล'))
+        else:
+            self.stdout.write(self.style.SUCCESS(f'แก้ไขแล้ว {len(drifted)} เล่ม'))
@@ -0,0 +1,156 @@
+"""
+ทดสอบออกเลขที่ใบสำคัญพร้อมกันหลาย process (accounts/numbering.py) — วัด throughput ตามจำนวน process
+
+แต่ละรอบสร้างหน่วยงานชั่วคราว 1 หน่วยงานต่อ process (รหัส ZZ01, ZZ02, ... = คนละเล่ม) แล้วทุก process บันทึก
+ใบสำคัญเสร็จสิ้นผ่าน Receipt.save จริงพร้อมกัน จากนั้นตรวจว่าเลขที่ไม่ซ้ำ/ไม่ข้าม และลบหน่วยงานชั่วคราวทิ้ง
+(ใบสำคัญและเล่มถูกลบตาม) — เล่มต่างกันไม่รอล็อกกัน throughput ควรโตเกือบเป็นเส้นตรงตามจำนวน process
+
+--shared ให้ทุก process ใช้รหัสหน่วยงานเดียวกัน (เล่มเดียว) เพื่อดูกรณีที่ต้องรอล็อกกัน
+ใช้กับ MySQL — SQLite ล็อกทั้งไฟล์ตอนเขียน จึงไม่เห็นการโตตามจำนวน process
+
+    python manage.py stress_receipt_numbering --username manager01
+    python manage.py stress_receipt_numbering --username manager01 --processes 1 2 4 8 --receipts 200
+    python manage.py stress_receipt_numbering --username manager01 --shared
+"""
+import multiprocessing
+import queue
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connections
+
+
+STRESS_DEPARTMENT_PREFIX = 'ทดสอบออกเลขที่'
+
+
+def _issue_numbers(department_id, user_id, count, ready, start, results):
+    """process ลูก: บันทึกใบสำคัญเสร็จสิ้น count ใบในหน่วยงานของตัวเอง แล้วส่ง (จำนวนสำเร็จ, error) กลับ"""
+    import django
+    django.setup()
+
+    from datetime import date
+    from decimal import Decimal
+    from accounts.models import Department, Receipt, User
+
+    department = Department.objects.get(pk=department_id)
+    user = User.objects.get(pk=user_id)
+    ready.put(department_id)
+    start.wait()
+
+    issued = 0
+    errors = []
+    for i in range(count):
+        receipt = Receipt(
+            department=department, created_by=user, status='completed', receipt_date=date.today(),
+            recipient_name=f'stress {department_id}-{i}', recipient_address='-', recipient_id_card='-',
+            total_amount=Decimal('1.00'),
+        )
+        try:
+            receipt.save()
+            issued += 1
+        except Exception as e:
+            errors.append(f'{type(e).__name__}: {e}')
+    connections.close_all()
+    results.put((issued, errors[:3]))
+
+
+class Command(BaseCommand):
+    help = 'Stress-test concurrent receipt numbering across processes and report throughput scaling'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--username', required=True, help='ผู้สร้างใบสำคัญทดสอบ')
+        parser.add_argument('--processes', type=int, nargs='+', default=[1, 2, 4, 8],
+                            help='จำนวน process ของแต่ละรอบ (default 1 2 4 8)')
+        parser.add_argument('--receipts', type=int, default=100, help='จำนวนใบสำคัญต่อ process (default 100)')
+        parser.add_argument('--shared', action='store_true', help='ทุก process ใช้รหัสหน่วยงาน (เล่ม) เดียวกัน')
+
+    def handle(self, *args, **options):
+        from accounts.models import User
+
+        try:
+            user = User.objects.get(username=options['username'])
+        except User.DoesNotExist:
+            raise CommandError(f'ไม่พบผู้ใช้ {options["username"]}')
+
+        count = max(options['receipts'], 1)
+        mode = 'เล่มเดียวกัน' if options['shared'] else 'คนละเล่ม'
+        self.stdout.write(f'ออกเลขที่พร้อมกัน ({mode}) process ละ {count} ใบ')
+
+        baseline = None
+        for processes in options['processes']:
+            processes = max(processes, 1)
+            elapsed, issued, errors = self._run_round(processes, count, user, options['shared'])
+            throughput = issued / elapsed if elapsed else 0
+            if baseline is None:
+                baseline = throughput
+            scaling = throughput / baseline if baseline else 0
+            self.stdout.write(
+                f'  {processes:>3} process: {issued} ใบใน {elapsed:.2f}s = {throughput:.1f} ใบ/s '
+                f'(x{scaling:.2f} ของรอบแรก, เส้นตรง x{processes / options["processes"][0]:.2f})'
+            )
+            for error in errors:
+                self.stdout.write(self.style.ERROR(f'      {error}'))
+
+    def _run_round(self, processes, count, user, shared):
+        """รันหนึ่งรอบ — คืน (เวลา, จำนวนใบที่ออกเลขได้, error ตัวอย่าง)"""
+        from accounts.models import Department
+
+        departments = [
+            Department.objects.create(
+                name=f'{STRESS_DEPARTMENT_PREFIX} {processes}-{i + 1}',
+                code='ZZ00' if shared else f'ZZ{i + 1:02d}',
+            )
+            for i in range(processes)
+        ]
+        try:
+            # spawn ใช้ได้ทุกระบบ (รวม Windows) — process ลูกเปิด connection ของตัวเอง
+            context = multiprocessing.get_context('spawn')
+            ready, results = context.Queue(), context.Queue()
+            start = context.Event()
+            workers = [
+                context.Process(target=_issue_numbers, args=(department.pk, user.pk, count, ready, start, results))
+                for department in departments
+            ]
+            connections.close_all()
+            for worker in workers:
+                worker.start()
+            # เริ่มจับเวลาเมื่อทุก process พร้อม (ไม่นับเวลา django.setup ของ process ลูก)
+            try:
+                for _ in workers:
+                    ready.get(timeout=120)
+            except queue.Empty:
+                for worker in workers:
+                    worker.terminate()
+                raise CommandError('process ลูกเริ่มทำงานไม่สำเร็จภายใน 120 วินาที')
+            started = time.perf_counter()
+            start.set()
+            outcomes = [results.get() for _ in workers]
+            elapsed = time.perf_counter() - started
+            for worker in workers:
+                worker.join()
+
+            issued = sum(n for n, _errors in outcomes)
+            errors = [error for _n, worker_errors in outcomes for error in worker_errors]
+            errors.extend(self._check_numbers(departments))
+            return elapsed, issued, errors
+        finally:
+            # ใบสำคัญและเล่มของหน่วยงานชั่วคราวถูกลบตาม (CASCADE)
+            Department.objects.filter(pk__in=[department.pk for department in departments]).delete()
+
+    def _check_numbers(self, departments):
+        """เลขที่ในแต่ละรหัสหน่วยงานต้องไม่ซ้ำและเรียงต่อเนื่อง 1..n ของแต่ละวัน"""
+        from collections import defaultdict
+        from accounts.models import Receipt
+
+        numbers = defaultdict(list)
+        rows = Receipt.objects.filter(department__in=departments).values_list('department__code', 'receipt_number')
+        for code, receipt_number in rows:
+            date_part, running = receipt_number.split('/')
+            numbers[(code, date_part)].append(int(running))
+
+        problems = []
+        for (code, date_part), running in sorted(numbers.items()):
+            if sorted(running) != list(range(1, len(running) + 1)):
+                problems.append(f'เลขที่ {code} {date_part} ซ้ำหรือข้าม ({len(running)} ใบ, '
+                                f'ไม่ซ้ำ {len(set(running))} เลข, สูงสุด {max(running)})')
+        return problems
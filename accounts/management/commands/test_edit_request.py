@@ -170,7 +170,7 @@ class Command(BaseCommand):
         self.stdout.write("\nTEST 6: Checking View Functions")
         self.stdout.write("-" * 40)
         try:
-            from accounts import views
+            from accounts.views import edit_requests as views
             
             view_functions = [
                 'edit_request_create_view',
@@ -0,0 +1,36 @@
+# Generated by Django 4.2.30 on 2026-10-19 13:15
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0024_alter_useractivitylog_action'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='FiscalYearRollup',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('fiscal_year', models.IntegerField(verbose_name='ปีงบประมาณ (พ.ศ.)')),
+                ('receipt_count', models.IntegerField(default=0, verbose_name='จำนวนใบสำคัญ (ทุกสถานะ)')),
+                ('completed_count', models.IntegerField(default=0, verbose_name='จำนวนที่เสร็จสิ้น')),
+                ('cancelled_count', models.IntegerField(default=0, verbose_name='จำนวนที่ยกเลิก')),
+                ('draft_count', models.IntegerField(default=0, verbose_name='จำนวนร่าง')),
+                ('total_amount', models.DecimalField(decimal_places=2, default=0, max_digits=14, verbose_name='ยอดเงินรวม (เฉพาะเสร็จสิ้น)')),
+                ('created_at', models.DateTimeField(auto_now_add=True, verbose_name='วันที่สร้าง')),
+                ('created_by', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, to=settings.AUTH_USER_MODEL, verbose_name='ผู้ปิดปีงบประมาณ')),
+                ('department', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='fiscal_year_rollups', to='accounts.department', verbose_name='หน่วยงาน')),
+            ],
+            options={
+                'verbose_name': 'ยอดสรุปปีงบประมาณ',
+                'verbose_name_plural': 'ยอดสรุปปีงบประมาณ',
+                'ordering': ['-fiscal_year', 'department__name'],
+                'unique_together': {('fiscal_year', 'department')},
+            },
+        ),
+    ]
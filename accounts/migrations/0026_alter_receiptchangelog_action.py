@@ -0,0 +1,18 @@
+# Generated by Django 4.2.30 on 2026-10-19 13:41
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0025_fiscalyearrollup'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='receiptchangelog',
+            name='action',
+            field=models.CharField(choices=[('created', 'สร้างใบสำคัญ'), ('updated', 'แก้ไขใบสำคัญ'), ('cancelled', 'ยกเลิกใบสำคัญ'), ('edit_requested', 'ส่งคำร้องขอแก้ไข'), ('edit_approved', 'อนุมัติการแก้ไข'), ('edit_rejected', 'ปฏิเสธการแก้ไข'), ('edit_applied', 'ดำเนินการแก้ไข'), ('cancel_rejected', 'ปฏิเสธคำขอยกเลิก')], max_length=20, verbose_name='การดำเนินการ'),
+        ),
+    ]
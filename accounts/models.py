@@ -2,6 +2,8 @@ from django.contrib.auth.models import AbstractUser
 from django.db import models
 from django.utils import timezone
 
+from utils.cache import cached
+
 
 class User(AbstractUser):
     """
@@ -319,6 +321,20 @@ class User(AbstractUser):
         else:
             return self.department or 'ไม่ระบุหน่วยงาน'
 
+    def get_department_id(self):
+        """
+        id ของ Department ที่ตรงกับ get_department() (None ถ้ายังไม่มีในตาราง)
+
+        ใช้กรองด้วย department_id (integer join ที่มี index) แทน department__name=...
+        ผลถูกจำไว้บน instance จนกว่าชื่อหน่วยงานของผู้ใช้จะเปลี่ยน
+        """
+        name = self.get_department()
+        cached = getattr(self, '_department_id_cache', None)
+        if cached is None or cached[0] != name:
+            cached = (name, Department.get_id_by_name(name))
+            self._department_id_cache = cached
+        return cached[1]
+
     def get_roles(self):
         """ได้บทบาททั้งหมดของผู้ใช้"""
         return Role.objects.filter(
@@ -338,12 +354,45 @@ class User(AbstractUser):
             return True
             
         # Check role permissions
-        user_roles = self.get_roles()
-        for role in user_roles:
-            if role.has_permission(permission_name):
-                return True
-        return False
+        return permission_name in self.get_permission_names()
+
+    def get_permission_names(self):
+        """
+        ชื่อสิทธิ์ทั้งหมดจากบทบาทที่ใช้งานอยู่ของผู้ใช้ (ไม่รวมสิทธิ์ของ superuser/staff)
+
+        โหลดผ่าน cache (permission_names_for_user) แล้วจำไว้บน instance — หน้าหนึ่งเรียก has_permission
+        หลายสิบครั้ง (view + เมนูใน template) แต่ request.user เป็น instance ใหม่ทุก request
+        """
+        names = getattr(self, '_permission_names_cache', None)
+        if names is None:
+            names = permission_names_for_user(self.pk)
+            self._permission_names_cache = names
+        return names
     
+    @classmethod
+    def ids_with_permission(cls, user_ids, permission_name):
+        """
+        จาก user_ids คืน set ของ id ที่มีสิทธิ์ permission_name — query เดียว
+
+        ให้ผลเดียวกับเรียก has_permission() ทีละคน (superuser/staff มีทุกสิทธิ์)
+        ใช้ตอนต้องเช็คสิทธิ์ของผู้ใช้หลายคนในหน้าเดียว เช่น ผู้ขอในรายการคำขอ
+        """
+        user_ids = set(user_ids)
+        if not user_ids:
+            return set()
+        return set(
+            cls.objects.filter(id__in=user_ids).filter(
+                models.Q(is_superuser=True)
+                | models.Q(is_staff=True)
+                | models.Q(
+                    userrole__is_active=True,
+                    userrole__role__is_active=True,
+                    userrole__role__permissions__name=permission_name,
+                    userrole__role__permissions__is_active=True,
+                )
+            ).values_list('id', flat=True).distinct()
+        )
+
     def assign_role(self, role, assigned_by=None):
         """กำหนดบทบาทให้ผู้ใช้"""
         user_role, created = UserRole.objects.get_or_create(
@@ -358,11 +407,14 @@ class User(AbstractUser):
             user_role.is_active = True
             user_role.assigned_by = assigned_by
             user_role.save()
+        self._permission_names_cache = None
         return user_role
     
     def remove_role(self, role):
         """ลบบทบาทของผู้ใช้"""
         UserRole.objects.filter(user=self, role=role).update(is_active=False)
+        invalidate_permission_names()
+        self._permission_names_cache = None
 
     def __str__(self):
         if self.user_type == 'student':
@@ -375,6 +427,10 @@ class User(AbstractUser):
         verbose_name_plural = "ผู้ใช้"
 
 
+# namespace ของ cache แผนที่ ชื่อหน่วยงาน → id (ล้างเมื่อ Department เปลี่ยน ดู accounts/signals.py)
+DEPARTMENT_CACHE_NAMESPACE = 'department'
+
+
 class Department(models.Model):
     """Department abbreviations for NPU departments from AD"""
     name = models.CharField(
@@ -417,6 +473,29 @@ class Department(models.Model):
     def __str__(self):
         return f"{self.name} ({self.code})"
 
+    @classmethod
+    def get_id_map(cls):
+        """
+        แผนที่ ชื่อหน่วยงาน → id ของทุกหน่วยงาน (รวมที่ปิดใช้งาน)
+
+        ผู้ใช้ผูกกับหน่วยงานด้วยชื่อ (User.department / student_faculty) การแปลงชื่อเป็น id
+        ผ่าน map นี้ทำให้ไม่ต้อง join ด้วยชื่อทุก query
+        """
+        from utils.cache import get_or_set
+
+        return get_or_set(
+            DEPARTMENT_CACHE_NAMESPACE, ('id_map',),
+            lambda: dict(cls.objects.values_list('name', 'id')),
+            timeout=3600, local_timeout=60,
+        )
+
+    @classmethod
+    def get_id_by_name(cls, name):
+        """id ของหน่วยงานตามชื่อ (None ถ้าไม่พบ)"""
+        if not name:
+            return None
+        return cls.get_id_map().get(name)
+
     def get_user_count(self):
         """นับจำนวนผู้ใช้ในหน่วยงานนี้"""
         from django.contrib.auth import get_user_model
@@ -669,6 +748,30 @@ class UserRole(models.Model):
         unique_together = ['user', 'role']
 
 
+# namespace ของ cache ชุดสิทธิ์ของผู้ใช้ (ล้างเมื่อ Permission/Role/UserRole เปลี่ยน ดู accounts/signals.py)
+PERMISSION_CACHE_NAMESPACE = 'permissions'
+
+
+@cached(PERMISSION_CACHE_NAMESPACE, timeout=3600, local_timeout=60)
+def permission_names_for_user(user_id):
+    """ชื่อสิทธิ์จากบทบาทที่ใช้งานอยู่ของผู้ใช้ — query เดียว ใช้ร่วมกันข้าม request/worker"""
+    return frozenset(
+        Permission.objects.filter(
+            is_active=True,
+            role__is_active=True,
+            role__userrole__user_id=user_id,
+            role__userrole__is_active=True,
+        ).values_list('name', flat=True)
+    )
+
+
+def invalidate_permission_names():
+    """ล้าง cache ชุดสิทธิ์ของทุกผู้ใช้หลัง commit — เรียกเองหลัง UserRole ...update() (update ไม่ส่ง signal)"""
+    from django.db import transaction
+
+    transaction.on_commit(permission_names_for_user.invalidate)
+
+
 class DocumentVolume(models.Model):
     """
     เล่มเอกสารสำหรับใบสำคัญรับเงิน
@@ -838,28 +941,46 @@ class DocumentVolume(models.Model):
         from utils.fiscal_year import get_volume_code, get_fiscal_year_dates
 
         volume_code = get_volume_code(department.code, fiscal_year)
-        fiscal_start, fiscal_end = get_fiscal_year_dates(fiscal_year)
 
-        # ลองหา volume จาก volume_code และ fiscal_year ก่อน
-        # เพื่อให้หลายหน่วยงานที่ใช้ department code เดียวกัน สามารถใช้เล่มร่วมกันได้
-        try:
-            volume = cls.objects.get(volume_code=volume_code, fiscal_year=fiscal_year)
-            created = False
-        except cls.DoesNotExist:
-            # ถ้าไม่พบ volume_code นี้ในปีงบประมาณนี้ ให้สร้างใหม่
-            volume, created = cls.objects.get_or_create(
-                department=department,
-                fiscal_year=fiscal_year,
-                defaults={
-                    'volume_code': volume_code,
-                    'fiscal_year_start': fiscal_start,
-                    'fiscal_year_end': fiscal_end,
-                    'created_by': user,
-                    'status': 'active'
-                }
+        def find_volume(volumes):
+            # หาจาก volume_code ก่อน เพื่อให้หลายหน่วยงานที่ใช้ department code เดียวกัน ใช้เล่มร่วมกันได้
+            # ไม่พบค่อยหาเล่มของหน่วยงานนี้เอง (เช่น เปลี่ยนรหัสหน่วยงานกลางปี)
+            # order_by('pk') แทน ordering ของ Meta — ไม่ต้อง JOIN department (และไม่ล็อกแถว department ตอน FOR UPDATE)
+            return (
+                volumes.filter(volume_code=volume_code, fiscal_year=fiscal_year).order_by('pk').first()
+                or volumes.filter(department=department, fiscal_year=fiscal_year).order_by('pk').first()
             )
 
-        return volume, created
+        # อ่านแบบไม่ล็อก — locking read ของแถวที่ยังไม่มีจะได้ gap lock และสอง transaction ที่ถือ gap lock
+        # เดียวกันแล้ว INSERT พร้อมกันจะ deadlock กัน (MySQL 1213)
+        volume = find_volume(cls.objects)
+        if volume is not None:
+            return volume, False
+
+        # INSERT ใน savepoint — อีก process สร้างเล่มเดียวกันพร้อมกันจะได้ IntegrityError แล้วใช้เล่มของ process นั้น
+        # ใช้ create() (ไม่ใช่ INSERT IGNORE) ให้ error อื่นเช่นข้อมูลยาวเกิน/ค่าว่างไม่ถูกกลืน และส่ง post_save
+        # ให้ signal ล้าง cache ปีงบประมาณ (accounts/signals.py)
+        from django.db import IntegrityError, transaction
+        fiscal_start, fiscal_end = get_fiscal_year_dates(fiscal_year)
+        try:
+            with transaction.atomic():
+                volume = cls.objects.create(
+                    department=department,
+                    fiscal_year=fiscal_year,
+                    volume_code=volume_code,
+                    fiscal_year_start=fiscal_start,
+                    fiscal_year_end=fiscal_end,
+                    created_by=user,
+                    status='active',
+                )
+        except IntegrityError:
+            # แถวมีอยู่แล้ว — locking read ให้เห็นแถวที่ transaction อื่นเพิ่ง commit (REPEATABLE READ ของ MySQL)
+            with transaction.atomic():
+                volume = find_volume(cls.objects.select_for_update())
+            if volume is None:
+                raise cls.DoesNotExist(f"สร้างเล่ม {volume_code} ไม่ได้ (รหัสเล่มซ้ำกับปีงบประมาณอื่น)")
+            return volume, False
+        return volume, True
     
     class Meta:
         verbose_name = "เล่มเอกสาร"
@@ -1001,6 +1122,11 @@ class ReceiptTemplate(models.Model):
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
     
+    @classmethod
+    def get_active_templates(cls):
+        """รายการสำเร็จรูปที่เปิดใช้ เรียงตามหมวด/ชื่อ (cache ไว้ ล้างเมื่อรายการสำเร็จรูปเปลี่ยน)"""
+        return active_receipt_templates()
+
     def __str__(self):
         if self.fixed_amount:
             return f"{self.name} ({self.fixed_amount} บาท)"
@@ -1015,6 +1141,16 @@ class ReceiptTemplate(models.Model):
         ordering = ['category', 'name']
 
 
+# namespace ของ cache รายการสำเร็จรูปที่เปิดใช้ (ล้างเมื่อ ReceiptTemplate เปลี่ยน ดู accounts/signals.py)
+RECEIPT_TEMPLATE_CACHE_NAMESPACE = 'receipt_templates'
+
+
+@cached(RECEIPT_TEMPLATE_CACHE_NAMESPACE, timeout=3600, local_timeout=60)
+def active_receipt_templates():
+    """รายการสำเร็จรูปที่เปิดใช้ (list ของ ReceiptTemplate) สำหรับหน้าสร้าง/แก้ไขใบสำคัญ"""
+    return list(ReceiptTemplate.objects.filter(is_active=True).order_by('category', 'name'))
+
+
 class Receipt(models.Model):
     """
     ใบสำคัญรับเงิน
@@ -1133,46 +1269,75 @@ class Receipt(models.Model):
         fiscal_year = get_fiscal_year_from_date(target_date)
         return get_volume_code(self.department.code, fiscal_year)
     
+    # ฟิลด์ที่จำค่าตอนโหลดจากฐานข้อมูล (from_db) เพื่อให้ save รู้ว่าสถานะเปลี่ยนโดยไม่ต้อง query ซ้ำ
+    _TRACKED_FIELDS = ('status',)
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        instance._remember_loaded_values()
+        return instance
+
+    def refresh_from_db(self, using=None, fields=None, **kwargs):
+        super().refresh_from_db(using=using, fields=fields, **kwargs)
+        # refresh บางฟิลด์ — ค่าที่จำไว้ของฟิลด์อื่นยังเป็นของเดิม (ค่าใน instance อาจแก้แล้วแต่ยังไม่ save)
+        if fields is None or set(fields) & set(self._TRACKED_FIELDS):
+            self._remember_loaded_values()
+
+    def _remember_loaded_values(self):
+        # ฟิลด์ที่ถูก defer ไว้ (.only()/.defer()) ไม่มีค่าใน __dict__ — ไม่จำ ให้ save ไปถามฐานข้อมูลแทน
+        self._loaded_values = {
+            name: self.__dict__[name] for name in self._TRACKED_FIELDS if name in self.__dict__
+        }
+
+    def _loaded_status(self):
+        """สถานะล่าสุดที่อยู่ในฐานข้อมูล (None ถ้ายังไม่เคยบันทึก)"""
+        loaded = getattr(self, '_loaded_values', {})
+        if 'status' in loaded:
+            return loaded['status']
+        # instance ที่ไม่ได้โหลดมาจากฐานข้อมูล (เช่น สร้างเองพร้อม pk) — ต้องถามฐานข้อมูล
+        return Receipt.objects.filter(pk=self.pk).values_list('status', flat=True).first()
+
     def save(self, *args, **kwargs):
         # Track if this is a new completion (status changing to completed)
-        is_new_completion = False
-        if self.pk:
-            try:
-                old_receipt = Receipt.objects.get(pk=self.pk)
-                is_new_completion = (old_receipt.status != 'completed' and self.status == 'completed')
-            except Receipt.DoesNotExist:
-                pass
-        else:
-            # New receipt being saved as completed
-            is_new_completion = (self.status == 'completed')
+        previous_status = self._loaded_status() if self.pk else None
+        was_completed = (previous_status == 'completed')
+        is_new_completion = (not was_completed and self.status == 'completed')
 
         # Auto-create DocumentVolume for this department if not exists
         # This ensures every department gets a volume automatically when completing first receipt
-        if self.status == 'completed':
+        # ทำเฉพาะตอนเพิ่งเสร็จสิ้น (หรือยังไม่มีเลขที่) — ใบที่เสร็จสิ้นอยู่แล้วมีเล่มแล้ว ไม่ต้องหาซ้ำทุกครั้งที่แก้ไข
+        # ล็อกแถวเล่มไว้จนบันทึกใบสำคัญเสร็จ ใบอื่นในเล่มเดียวกันจึงได้เลขต่อจากใบนี้ (accounts/numbering.py)
+        needs_number = self.status == 'completed' and not self.receipt_number
+        if is_new_completion or needs_number:
+            from django.db import transaction
             from utils.fiscal_year import get_fiscal_year_from_date
             from datetime import datetime
+            from .numbering import ensure_receipt_number_unused, lock_volume, next_receipt_number
 
             receipt_date = self.receipt_date or datetime.now().date()
             fiscal_year = get_fiscal_year_from_date(receipt_date)
 
-            # Create volume if it doesn't exist
-            volume, created = DocumentVolume.get_or_create_volume_for_department(
-                department=self.department,
-                fiscal_year=fiscal_year,
-                user=self.created_by
-            )
-
-            if created:
-                # Log that a new volume was auto-created
-                import logging
-                logger = logging.getLogger(__name__)
-                logger.info(f"Auto-created DocumentVolume: {volume.volume_code} for {self.department.name}")
-
-        # Auto-generate receipt number ONLY when status is 'completed' and no number yet
-        # Draft receipts don't get a number to avoid gaps in numbering
-        if self.status == 'completed' and not self.receipt_number:
-            self.receipt_number = self.generate_receipt_number()
+            with transaction.atomic():
+                volume, created = lock_volume(self.department, fiscal_year, user=self.created_by)
+                if created:
+                    # Log that a new volume was auto-created
+                    import logging
+                    logger = logging.getLogger(__name__)
+                    logger.info(f"Auto-created DocumentVolume: {volume.volume_code} for {self.department.name}")
+
+                # Auto-generate receipt number ONLY when status is 'completed' and no number yet
+                # Draft receipts don't get a number to avoid gaps in numbering
+                if needs_number:
+                    self.receipt_number = next_receipt_number(self.department, receipt_date)
+                    ensure_receipt_number_unused(self.department, self.receipt_number, self.pk)
+
+                self._save_and_count(is_new_completion, was_completed, *args, **kwargs)
+        else:
+            self._save_and_count(is_new_completion, was_completed, *args, **kwargs)
 
+    def _save_and_count(self, is_new_completion, was_completed, *args, **kwargs):
+        """เติมข้อมูลที่สร้างอัตโนมัติ บันทึก แล้วปรับจำนวนเอกสารของเล่มตามสถานะที่เปลี่ยน"""
         # Auto-generate total_amount_text if not set
         if not self.total_amount_text and self.total_amount:
             self.total_amount_text = self.convert_amount_to_thai_text(self.total_amount)
@@ -1186,191 +1351,56 @@ class Receipt(models.Model):
             self.qr_code_data = self.generate_qr_code_data()
 
         super().save(*args, **kwargs)
+        self._remember_loaded_values()
 
         # Update DocumentVolume.last_document_number after saving receipt
-        # This keeps track of how many receipts have been issued from this volume
-        if is_new_completion and self.status == 'completed':
-            from utils.fiscal_year import get_fiscal_year_from_date
-            from datetime import datetime
-
-            receipt_date = self.receipt_date or datetime.now().date()
-            fiscal_year = get_fiscal_year_from_date(receipt_date)
-
-            # Get the volume for this department and fiscal year
-            try:
-                volume = DocumentVolume.objects.get(
-                    department=self.department,
-                    fiscal_year=fiscal_year
-                )
-
-                # Count total completed receipts for this volume
-                total_receipts = Receipt.objects.filter(
-                    department=self.department,
-                    status='completed',
-                    receipt_date__gte=volume.fiscal_year_start,
-                    receipt_date__lte=volume.fiscal_year_end
-                ).count()
+        # นับเป็นจำนวนใบสำคัญที่เสร็จสิ้นในเล่ม: +1 เมื่อเสร็จสิ้น, -1 เมื่อใบที่เสร็จสิ้นแล้วถูกยกเลิก
+        # ใช้ F() ให้ DB บวกเองแบบ atomic แทนการ COUNT ใบสำคัญทั้งปีงบประมาณทุกครั้ง
+        # ถ้าค่าเพี้ยน (เช่น แก้ข้อมูลตรงใน DB) ใช้ python manage.py reconcile_volume_counts
+        if is_new_completion:
+            self._adjust_volume_count(1)
+        elif was_completed and self.status != 'completed':
+            self._adjust_volume_count(-1)
+
+    def _adjust_volume_count(self, delta):
+        """ปรับ last_document_number ของเล่มที่ใบสำคัญนี้สังกัด (ตาม volume_code ที่ใช้ร่วมกันได้)"""
+        from django.db.models import F
+        from utils.fiscal_year import get_fiscal_year_from_date, get_volume_code
+        from datetime import datetime
 
-                # Update volume's last_document_number
-                volume.last_document_number = total_receipts
-                volume.save(update_fields=['last_document_number'])
+        receipt_date = self.receipt_date or datetime.now().date()
+        fiscal_year = get_fiscal_year_from_date(receipt_date)
 
-            except DocumentVolume.DoesNotExist:
-                pass  # Volume doesn't exist (shouldn't happen, but handle gracefully)
+        volumes = DocumentVolume.objects.filter(
+            volume_code=get_volume_code(self.department.code, fiscal_year),
+            fiscal_year=fiscal_year,
+        )
+        if delta < 0:
+            volumes = volumes.filter(last_document_number__gte=-delta)
+        if volumes.update(last_document_number=F('last_document_number') + delta):
+            # update() ไม่ส่ง signal — ล้าง cache สรุปเล่ม/การแจ้งเตือนเล่มใกล้เต็มเองหลัง commit
+            from django.db import transaction
+            from utils.cache import invalidate_namespace
+            from utils.fiscal_year_info import FISCAL_YEAR_CACHE_NAMESPACE
+            transaction.on_commit(lambda: invalidate_namespace(FISCAL_YEAR_CACHE_NAMESPACE))
     
     def generate_receipt_number(self):
-        """สร้างเลขที่ใบสำคัญรับเงินแบบ ddmmyy/xxxx"""
-        from datetime import datetime
-        from django.db.models import Max
-        from django.db import transaction
-        from utils.fiscal_year import get_fiscal_year_from_date
-
-        today = self.receipt_date or datetime.now().date()
-
-        # Format: ddmmyy
-        date_part = today.strftime("%d%m%y")
-
-        # หาเลข running number สำหรับวันนี้และ volume นี้
-        prefix = f"{date_part}/"
-
-        # หา volume ของ department code นี้ในปีงบประมาณปัจจุบัน
-        # ใช้ volume_code จาก department code เพื่อให้หลาย department ที่ใช้ code เดียวกัน
-        # สามารถหา volume ร่วมกันได้
-        fiscal_year = get_fiscal_year_from_date(today)
-
-        from utils.fiscal_year import get_volume_code as get_vol_code
-        expected_volume_code = get_vol_code(self.department.code, fiscal_year)
+        """
+        สร้างเลขที่ใบสำคัญรับเงินแบบ ddmmyy/xxxx
 
-        try:
-            # หา volume ด้วย volume_code และ fiscal_year (ไม่ใช้ department)
-            volume = DocumentVolume.objects.get(
-                volume_code=expected_volume_code,
-                fiscal_year=fiscal_year
-            )
-            volume_code = volume.volume_code
-        except DocumentVolume.DoesNotExist:
-            # ถ้าไม่มี volume ให้ใช้ department code เป็นตัวกรอง (fallback)
-            volume_code = None
+        เลขที่ได้จะไม่ซ้ำก็ต่อเมื่อบันทึกใบสำคัญใน transaction เดียวกับที่ล็อกเล่มไว้ — save() ทำให้เอง
+        (ดู accounts/numbering.py)
+        """
+        from datetime import datetime
+        from .numbering import next_receipt_number
 
-        # ใช้ transaction เพื่อป้องกัน race condition
-        with transaction.atomic():
-            # Lock rows เพื่อป้องกันการอ่านพร้อมกัน
-            # กรองด้วย volume_code เพื่อให้หลาย department ที่ใช้ volume เดียวกันมีเลขวิ่งต่อเนื่อง
-            if volume_code:
-                # กรองด้วย department ที่ใช้ volume_code เดียวกัน
-                departments_in_volume = Department.objects.filter(code=self.department.code)
-                last_receipt = Receipt.objects.filter(
-                    receipt_number__startswith=prefix,
-                    department__in=departments_in_volume
-                ).select_for_update().aggregate(
-                    max_number=Max('receipt_number')
-                )['max_number']
-            else:
-                # Fallback: กรองด้วย department เฉพาะ
-                last_receipt = Receipt.objects.filter(
-                    receipt_number__startswith=prefix,
-                    department=self.department
-                ).select_for_update().aggregate(
-                    max_number=Max('receipt_number')
-                )['max_number']
-
-            if last_receipt:
-                # ดึงตัวเลขท้ายสุด
-                last_number = int(last_receipt.split('/')[-1])
-                next_number = last_number + 1
-            else:
-                next_number = 1
-
-        # Format: ddmmyy/xxxx
-        return f"{date_part}/{next_number:04d}"
+        return next_receipt_number(self.department, self.receipt_date or datetime.now().date())
     
     @staticmethod
     def convert_amount_to_thai_text(amount):
-        """แปลงจำนวนเงินเป็นตัวหนังสือไทย"""
-        if amount == 0:
-            return 'ศูนย์บาทถ้วน'
-        
-        def number_to_thai(num):
-            if num == 0:
-                return ''
-            
-            ones = ['', 'หนึ่ง', 'สอง', 'สาม', 'สี่', 'ห้า', 'หก', 'เจ็ด', 'แปด', 'เก้า']
-            
-            def convert_group(n):
-                if n == 0:
-                    return ''
-                elif n < 10:
-                    return ones[n]
-                elif n < 20:
-                    if n == 10:
-                        return 'สิบ'
-                    else:
-                        return 'สิบ' + ones[n - 10]
-                elif n < 100:
-                    tens = n // 10
-                    units = n % 10
-                    if tens == 2:
-                        return 'ยี่สิบ' + ones[units]
-                    else:
-                        return ones[tens] + 'สิบ' + ones[units]
-                else:
-                    hundreds = n // 100
-                    remainder = n % 100
-                    return ones[hundreds] + 'ร้อย' + convert_group(remainder)
-            
-            def convert_full_number(num):
-                if num == 0:
-                    return ''
-                
-                result = ''
-                
-                # ล้าน
-                if num >= 1000000:
-                    millions = num // 1000000
-                    result += convert_group(millions) + 'ล้าน'
-                    num %= 1000000
-                
-                # แสน
-                if num >= 100000:
-                    hundred_thousands = num // 100000
-                    result += convert_group(hundred_thousands) + 'แสน'
-                    num %= 100000
-                
-                # หมื่น
-                if num >= 10000:
-                    ten_thousands = num // 10000
-                    result += convert_group(ten_thousands) + 'หมื่น'
-                    num %= 10000
-                
-                # พัน
-                if num >= 1000:
-                    thousands = num // 1000
-                    if thousands == 1:
-                        result += 'หนึ่งพัน'
-                    else:
-                        result += convert_group(thousands) + 'พัน'
-                    num %= 1000
-                
-                # ร้อย สิบ หน่วย
-                if num > 0:
-                    result += convert_group(num)
-                
-                return result
-            
-            return convert_full_number(int(num))
-        
-        # แยกส่วนจำนวนเต็มและทศนิยม
-        integer_part = int(amount)
-        decimal_part = round((amount - integer_part) * 100)
-        
-        result = number_to_thai(integer_part) + 'บาท'
-        
-        if decimal_part > 0:
-            result += number_to_thai(decimal_part) + 'สตางค์'
-        else:
-            result += 'ถ้วน'
-        
-        return result
+        """แปลงจำนวนเงินเป็นตัวหนังสือไทย (ดู utils/thai_baht.py)"""
+        from utils.thai_baht import baht_text
+        return baht_text(amount)
     
     def generate_verification_hash(self):
         """สร้าง hash สำหรับตรวจสอบความถูกต้อง"""
@@ -1445,7 +1475,7 @@ class Receipt(models.Model):
 
         # Senior Manager: ยกเลิกได้ในหน่วยงานตัวเอง
         if user.has_permission('receipt_cancel_approve_manager'):
-            return user.get_department() == self.department.name
+            return user.get_department_id() == self.department_id
 
         # Department Manager และ Basic User: ยกเลิกได้เฉพาะของตัวเอง (ต้องขออนุมัติ)
         if self.created_by == user:
@@ -1575,6 +1605,30 @@ class ReceiptItem(models.Model):
 
 # ===== RECEIPT EDIT REQUEST SYSTEM MODELS =====
 
+def _lock_pending(model, requests):
+    """
+    ล็อกแถวคำร้อง (ต้องเรียกใน transaction) และยืนยันว่ายังรออนุมัติอยู่ทุกรายการ
+    ถ้ามีคนอนุมัติ/ปฏิเสธ/ถอนไปก่อนระหว่างนี้ จะ raise ValueError แทนการดำเนินการซ้ำ
+    """
+    pending_ids = set(
+        model.objects.select_for_update()
+        .filter(pk__in=[r.pk for r in requests], status='pending')
+        .values_list('pk', flat=True)
+    )
+    not_pending = [r.request_number for r in requests if r.pk not in pending_ids]
+    if not_pending:
+        raise ValueError(f"คำร้อง {', '.join(not_pending)} ไม่อยู่ในสถานะรออนุมัติแล้ว")
+
+
+def _summarize_items(items):
+    """สรุปรายการ [(description, amount)] เป็นข้อความสั้น ๆ สำหรับ Change Log"""
+    from decimal import Decimal
+
+    total = sum((amount for _description, amount in items), Decimal('0'))
+    lines = [f'{description} {amount:,.2f}' for description, amount in items]
+    return f"{len(items)} รายการ รวม {total:,.2f} บาท: " + '; '.join(lines)
+
+
 class ReceiptEditRequest(models.Model):
     """
     คำร้องขอแก้ไขใบสำคัญรับเงิน
@@ -1734,95 +1788,220 @@ class ReceiptEditRequest(models.Model):
             self.request_number = self.generate_request_number()
         super().save(*args, **kwargs)
     
-    def can_be_approved_by(self, user):
-        """ตรวจสอบว่าผู้ใช้สามารถอนุมัติคำร้องนี้ได้หรือไม่"""
+    def can_be_approved_by(self, user, requester_is_manager=None, approver_permissions=None):
+        """
+        ตรวจสอบว่าผู้ใช้สามารถอนุมัติคำร้องนี้ได้หรือไม่
+
+        Args:
+            requester_is_manager (bool, optional): ผู้ขอมีสิทธิ์ receipt_edit_approve หรือไม่
+                ถ้าคำนวณไว้แล้ว (เช่น annotate_can_approve) ส่งมาเพื่อไม่ต้อง query ซ้ำ
+            approver_permissions (dict, optional): {ชื่อสิทธิ์: bool} ของผู้อนุมัติที่คำนวณไว้แล้ว
+        """
         # Admin/Aadmin: ดูได้อย่างเดียว ไม่มีสิทธิ์อนุมัติ (ลบออก)
 
         # ต้องอยู่แผนกเดียวกันเท่านั้น
-        if user.get_department() != self.receipt.department.name:
+        if user.get_department_id() != self.receipt.department_id:
             return False
 
+        def approver_has(permission_name):
+            if approver_permissions is not None:
+                return approver_permissions[permission_name]
+            return user.has_permission(permission_name)
+
+        def requester_has_manager_permission():
+            if requester_is_manager is not None:
+                return requester_is_manager
+            return self.requested_by.has_permission('receipt_edit_approve')
+
         # Senior Manager อนุมัติได้สำหรับ Department Manager ในแผนกเดียวกัน
-        if user.has_permission('receipt_edit_approve_manager'):
+        if approver_has('receipt_edit_approve_manager'):
             # ต้องเป็นคำขอจาก Department Manager เท่านั้น
-            requester_has_manager_permission = self.requested_by.has_permission('receipt_edit_approve')
-            return requester_has_manager_permission
+            return requester_has_manager_permission()
 
         # Department Manager อนุมัติได้สำหรับ Basic User ในแผนกเดียวกัน
-        if user.has_permission('receipt_edit_approve'):
+        if approver_has('receipt_edit_approve'):
             # ต้องไม่ใช่คำขอจาก Department Manager (ต้องเป็นคำขอจาก User)
-            requester_has_manager_permission = self.requested_by.has_permission('receipt_edit_approve')
-            return not requester_has_manager_permission
+            return not requester_has_manager_permission()
 
         return False
-    
+
+    @classmethod
+    def annotate_can_approve(cls, edit_requests, user):
+        """
+        ตั้งค่า .can_approve ให้คำร้องทุกรายการ (ใช้กับรายการในหน้าปัจจุบัน/ชุดที่อนุมัติพร้อมกัน)
+
+        สิทธิ์ของผู้อนุมัติเช็คครั้งเดียว และสิทธิ์ของผู้ขอทุกคนโหลดด้วย query เดียว
+        """
+        edit_requests = list(edit_requests)
+        approver_permissions = {
+            name: user.has_permission(name)
+            for name in ('receipt_edit_approve', 'receipt_edit_approve_manager')
+        }
+        pending = [r for r in edit_requests if r.status == 'pending']
+        manager_ids = User.ids_with_permission(
+            {r.requested_by_id for r in pending}, 'receipt_edit_approve'
+        ) if any(approver_permissions.values()) else set()
+
+        for edit_request in edit_requests:
+            edit_request.can_approve = (
+                edit_request.status == 'pending'
+                and any(approver_permissions.values())
+                and edit_request.can_be_approved_by(
+                    user,
+                    requester_is_manager=edit_request.requested_by_id in manager_ids,
+                    approver_permissions=approver_permissions,
+                )
+            )
+        return edit_requests
+
+    # ฟิลด์ในคำร้อง → ฟิลด์ของใบสำคัญที่จะถูกแทนที่ (เฉพาะเมื่อคำร้องระบุค่ามา)
+    RECEIPT_FIELD_MAP = [
+        ('new_recipient_name', 'recipient_name'),
+        ('new_recipient_address', 'recipient_address'),
+        ('new_recipient_postal_code', 'recipient_postal_code'),
+        ('new_recipient_id_card', 'recipient_id_card'),
+        ('new_receipt_date', 'receipt_date'),
+        ('new_total_amount_text', 'total_amount_text'),
+        ('new_total_amount', 'total_amount'),
+    ]
+
+    def parse_new_items(self):
+        """
+        แปลง new_items_data เป็นรายการ (description, amount) ตามลำดับ
+
+        Returns:
+            list | None: None ถ้าคำร้องไม่ได้ขอแก้รายการ (หรือ JSON เสีย)
+        """
+        import json
+        from decimal import Decimal
+
+        if not self.new_items_data:
+            return None
+        try:
+            items_data = json.loads(self.new_items_data)
+        except json.JSONDecodeError:
+            return None
+
+        items = []
+        for item_data in items_data:
+            quantity = Decimal(str(item_data.get('quantity', 1) or 0))
+            unit_price = Decimal(str(item_data.get('unit_price', 0) or 0))
+            items.append((item_data.get('description', ''), quantity * unit_price))
+        return items
+
     def approve(self, approved_by, notes=""):
-        """อนุมัติคำร้อง"""
+        """อนุมัติคำร้องและนำการแก้ไขไปใช้กับใบสำคัญทันที"""
+        self.approve_many([self], approved_by, notes)
+
+    @classmethod
+    def approve_many(cls, edit_requests, approved_by, notes=""):
+        """
+        อนุมัติคำร้องหลายรายการและนำการแก้ไขไปใช้กับใบสำคัญ ภายใน transaction เดียว
+
+        - รายการใหม่ของทุกใบเขียนด้วย bulk_create ครั้งเดียว ยอดรวมคำนวณในหน่วยความจำ
+        - ใบสำคัญแต่ละใบ save ครั้งเดียว คำร้องอัปเดตเป็น 'applied' ด้วย bulk_update ครั้งเดียว
+        - Change Log (อนุมัติ + ค่าเดิม/ค่าใหม่ทีละฟิลด์) เขียนด้วย bulk_create ครั้งเดียว
+
+        ตรวจสิทธิ์ไม่ได้ทำที่นี่ (ผู้เรียกต้องเช็ค can_be_approved_by ก่อน)
+        ถ้าคำร้องใดไม่อยู่ในสถานะรออนุมัติแล้ว จะไม่บันทึกอะไรเลยและ raise ValueError
+
+        Returns:
+            list: คำร้องที่ดำเนินการแล้ว
+        """
+        from decimal import Decimal
+        from django.db import transaction
+        from django.db.models import Prefetch
         from django.utils import timezone
-        import json
-        
-        self.status = 'approved'
-        self.approved_by = approved_by
-        self.approval_notes = notes
-        self.approved_at = timezone.now()
-        self.save()
-        
-        # Apply changes to the original receipt
-        receipt = self.receipt
-        
-        # Update basic information if provided
-        if self.new_recipient_name:
-            receipt.recipient_name = self.new_recipient_name
-        if self.new_recipient_address:
-            receipt.recipient_address = self.new_recipient_address
-        if self.new_recipient_postal_code:
-            receipt.recipient_postal_code = self.new_recipient_postal_code
-        if self.new_recipient_id_card:
-            receipt.recipient_id_card = self.new_recipient_id_card
-        if self.new_receipt_date:
-            receipt.receipt_date = self.new_receipt_date
-        if self.new_total_amount_text:
-            receipt.total_amount_text = self.new_total_amount_text
-        if self.new_total_amount:
-            receipt.total_amount = self.new_total_amount
-        
-        # Update receipt items if provided
-        if self.new_items_data:
-            try:
-                items_data = json.loads(self.new_items_data)
-
-                # Clear existing items
-                receipt.items.all().delete()
-
-                # Create new items
-                for order, item_data in enumerate(items_data, 1):
-                    quantity = item_data.get('quantity', 1)
-                    unit_price = item_data.get('unit_price', 0)
-                    amount = quantity * unit_price
-
-                    ReceiptItem.objects.create(
-                        receipt=receipt,
-                        description=item_data.get('description', ''),
-                        amount=amount,
-                        order=order
-                    )
-
-                # Recalculate total amount
-                total = sum(item.amount for item in receipt.items.all())
-                receipt.total_amount = total
-
-                # Update total amount text (Thai)
-                receipt.total_amount_text = Receipt.convert_amount_to_thai_text(total)
-
-            except json.JSONDecodeError:
-                pass
-        
-        receipt.save()
-        
-        # Mark as applied
-        self.status = 'applied'
-        self.applied_at = timezone.now()
-        self.save()
+
+        edit_requests = list(edit_requests)
+        if not edit_requests:
+            return []
+
+        with transaction.atomic():
+            _lock_pending(cls, edit_requests)
+
+            receipts = {
+                receipt.pk: receipt
+                for receipt in Receipt.objects.filter(
+                    pk__in={r.receipt_id for r in edit_requests}
+                ).prefetch_related(Prefetch('items', queryset=ReceiptItem.objects.order_by('order', 'id')))
+            }
+
+            now = timezone.now()
+            logs = []
+            new_items_by_receipt = {}
+            changed_receipts = {}
+
+            for edit_request in edit_requests:
+                receipt = receipts[edit_request.receipt_id]
+                edit_request.receipt = receipt
+                field_changes = {}  # {field: (ค่าเดิม, ค่าใหม่)} — ฟิลด์ที่ถูกตั้งหลายรอบเก็บค่าเดิมแรกสุด
+
+                def set_field(field_name, new_value):
+                    old_value = getattr(receipt, field_name)
+                    if old_value != new_value:
+                        setattr(receipt, field_name, new_value)
+                        field_changes[field_name] = (field_changes.get(field_name, (old_value,))[0], new_value)
+
+                for request_field, receipt_field in cls.RECEIPT_FIELD_MAP:
+                    new_value = getattr(edit_request, request_field)
+                    if new_value:
+                        set_field(receipt_field, new_value)
+
+                new_items = edit_request.parse_new_items()
+                if new_items is not None:
+                    old_items = new_items_by_receipt.get(receipt.pk) or [
+                        (item.description, item.amount) for item in receipt.items.all()
+                    ]
+                    new_items_by_receipt[receipt.pk] = new_items
+                    field_changes['items'] = (_summarize_items(old_items), _summarize_items(new_items))
+
+                    # ยอดรวมและตัวหนังสือมาจากรายการใหม่เสมอ
+                    total = sum((amount for _description, amount in new_items), Decimal('0'))
+                    set_field('total_amount', total)
+                    set_field('total_amount_text', Receipt.convert_amount_to_thai_text(total))
+
+                if field_changes:
+                    changed_receipts[receipt.pk] = receipt
+
+                logs.append(ReceiptChangeLog(
+                    receipt=receipt, edit_request=edit_request, action='edit_approved',
+                    user=approved_by, notes=notes,
+                ))
+                for field_name, (old_value, new_value) in field_changes.items():
+                    if old_value == new_value:
+                        continue
+                    logs.append(ReceiptChangeLog(
+                        receipt=receipt, edit_request=edit_request, action='edit_applied',
+                        user=approved_by, field_name=field_name,
+                        old_value=str(old_value), new_value=str(new_value),
+                    ))
+
+                edit_request.status = 'applied'
+                edit_request.approved_by = approved_by
+                edit_request.approval_notes = notes
+                edit_request.approved_at = now
+                edit_request.applied_at = now
+                edit_request.updated_at = now  # bulk_update ไม่เติม auto_now ให้
+
+            if new_items_by_receipt:
+                ReceiptItem.objects.filter(receipt_id__in=list(new_items_by_receipt)).delete()
+                ReceiptItem.objects.bulk_create([
+                    ReceiptItem(receipt_id=receipt_id, description=description, amount=amount, order=order)
+                    for receipt_id, items in new_items_by_receipt.items()
+                    for order, (description, amount) in enumerate(items, 1)
+                ])
+
+            for receipt in changed_receipts.values():
+                receipt.save()
+
+            cls.objects.bulk_update(
+                edit_requests,
+                ['status', 'approved_by', 'approval_notes', 'approved_at', 'applied_at', 'updated_at'],
+            )
+            ReceiptChangeLog.objects.bulk_create(logs)
+
+        return edit_requests
     
     def reject(self, rejected_by, notes=""):
         """ปฏิเสธคำร้อง"""
@@ -1830,6 +2009,38 @@ class ReceiptEditRequest(models.Model):
         self.approved_by = rejected_by
         self.approval_notes = notes
         self.save()
+
+    @classmethod
+    def reject_many(cls, edit_requests, rejected_by, notes=""):
+        """
+        ปฏิเสธคำร้องหลายรายการใน transaction เดียว พร้อมบันทึก Change Log 'edit_rejected'
+
+        ตรวจสิทธิ์ไม่ได้ทำที่นี่ ถ้าคำร้องใดไม่อยู่ในสถานะรออนุมัติแล้วจะ raise ValueError
+        """
+        from django.db import transaction
+        from django.utils import timezone
+
+        edit_requests = list(edit_requests)
+        if not edit_requests:
+            return []
+
+        with transaction.atomic():
+            _lock_pending(cls, edit_requests)
+            now = timezone.now()
+            for edit_request in edit_requests:
+                edit_request.status = 'rejected'
+                edit_request.approved_by = rejected_by
+                edit_request.approval_notes = notes
+                edit_request.updated_at = now  # bulk_update ไม่เติม auto_now ให้
+            cls.objects.bulk_update(edit_requests, ['status', 'approved_by', 'approval_notes', 'updated_at'])
+            ReceiptChangeLog.objects.bulk_create([
+                ReceiptChangeLog(
+                    receipt_id=edit_request.receipt_id, edit_request=edit_request, action='edit_rejected',
+                    user=rejected_by, notes=notes,
+                )
+                for edit_request in edit_requests
+            ])
+        return edit_requests
     
     def withdraw(self):
         """ถอนคำร้อง (โดยผู้ส่งคำร้อง)"""
@@ -2023,30 +2234,72 @@ class ReceiptCancelRequest(models.Model):
             
         return f"{prefix}{new_sequence:04d}"
     
-    def can_be_approved_by(self, user):
-        """ตรวจสอบว่าผู้ใช้สามารถอนุมัติคำขอยกเลิกนี้ได้หรือไม่"""
+    def can_be_approved_by(self, user, requester_is_manager=None, approver_permissions=None):
+        """
+        ตรวจสอบว่าผู้ใช้สามารถอนุมัติคำขอยกเลิกนี้ได้หรือไม่
+
+        Args:
+            requester_is_manager (bool, optional): ผู้ขอมีสิทธิ์ receipt_cancel_approve หรือไม่
+                ถ้าคำนวณไว้แล้ว (เช่น annotate_can_approve) ส่งมาเพื่อไม่ต้อง query ซ้ำ
+            approver_permissions (dict, optional): {ชื่อสิทธิ์: bool} ของผู้อนุมัติที่คำนวณไว้แล้ว
+        """
         # Admin/Aadmin: ดูได้อย่างเดียว ไม่มีสิทธิ์อนุมัติ (ลบออก)
 
         # ต้องอยู่ในแผนกเดียวกันเท่านั้น
-        if user.get_department() != self.receipt.department.name:
+        if user.get_department_id() != self.receipt.department_id:
             return False
 
         # เช็คว่า requester เป็น Basic User หรือ Manager
-        requester_is_manager = self.requested_by.has_permission('receipt_cancel_approve')
+        if requester_is_manager is None:
+            requester_is_manager = self.requested_by.has_permission('receipt_cancel_approve')
+
+        def approver_has(permission_name):
+            if approver_permissions is not None:
+                return approver_permissions[permission_name]
+            return user.has_permission(permission_name)
 
         # Department Manager: อนุมัติคำขอของ Basic User เท่านั้น
-        if user.has_permission('receipt_cancel_approve') and not requester_is_manager:
+        if not requester_is_manager and approver_has('receipt_cancel_approve'):
             return True
 
         # Senior Manager: อนุมัติคำขอของ Department Manager เท่านั้น
-        if user.has_permission('receipt_cancel_approve_manager') and requester_is_manager:
+        if requester_is_manager and approver_has('receipt_cancel_approve_manager'):
             return True
 
         return False
+
+    @classmethod
+    def annotate_can_approve(cls, cancel_requests, user):
+        """
+        ตั้งค่า .can_approve ให้คำขอทุกรายการ (ใช้กับรายการในหน้าปัจจุบันเท่านั้น)
+
+        สิทธิ์ของผู้อนุมัติเช็คครั้งเดียว และสิทธิ์ของผู้ขอทุกคนโหลดด้วย query เดียว
+        แทนการเรียก can_be_approved_by ที่ query หลายครั้งต่อแถว
+        """
+        cancel_requests = list(cancel_requests)
+        approver_permissions = {
+            name: user.has_permission(name)
+            for name in ('receipt_cancel_approve', 'receipt_cancel_approve_manager')
+        }
+        pending = [r for r in cancel_requests if r.status == 'pending']
+        manager_ids = User.ids_with_permission(
+            {r.requested_by_id for r in pending}, 'receipt_cancel_approve'
+        ) if any(approver_permissions.values()) else set()
+
+        for cancel_request in cancel_requests:
+            cancel_request.can_approve = (
+                cancel_request.status == 'pending'
+                and any(approver_permissions.values())
+                and cancel_request.can_be_approved_by(
+                    user,
+                    requester_is_manager=cancel_request.requested_by_id in manager_ids,
+                    approver_permissions=approver_permissions,
+                )
+            )
+        return cancel_requests
     
     def approve(self, approved_by, notes=""):
         """อนุมัติคำขอยกเลิก"""
-        from django.utils import timezone
         from django.core.exceptions import PermissionDenied
 
         # ตรวจสอบสิทธิ์
@@ -2056,24 +2309,92 @@ class ReceiptCancelRequest(models.Model):
         if self.status != 'pending':
             raise ValueError("สามารถอนุมัติได้เฉพาะคำขอที่รออนุมัติเท่านั้น")
 
-        # อนุมัติคำขอ
-        self.status = 'approved'
-        self.approved_by = approved_by
-        self.approved_at = timezone.now()
-        self.approval_notes = notes
-        self.save()
+        self.approve_many([self], approved_by, notes)
+
+    @classmethod
+    def approve_many(cls, cancel_requests, approved_by, notes=""):
+        """
+        อนุมัติคำขอยกเลิกหลายรายการและยกเลิกใบสำคัญ ภายใน transaction เดียว
 
-        # ยกเลิกใบสำคัญ (ข้ามการเช็คสิทธิ์เพราะผ่านการอนุมัติแล้ว)
-        self.receipt.cancel(approved_by, self.cancel_reason, skip_permission_check=True)
+        ใบสำคัญแต่ละใบ save ครั้งเดียว (ยอดเล่มลดลงใน Receipt.save) คำขออัปเดตด้วย bulk_update
+        และ Change Log 'cancelled' เขียนด้วย bulk_create ครั้งเดียว
 
-        # เปลี่ยนสถานะเป็นดำเนินการแล้ว
-        self.status = 'applied'
-        self.applied_at = timezone.now()
-        self.save()
+        ตรวจสิทธิ์ไม่ได้ทำที่นี่ (ผู้เรียกต้องเช็ค can_be_approved_by ก่อน)
+        ถ้ามีรายการใดยกเลิกไม่ได้ จะไม่บันทึกอะไรเลยและ raise ValueError
+        """
+        from django.db import transaction
+        from django.utils import timezone
+
+        cancel_requests = list(cancel_requests)
+        if not cancel_requests:
+            return []
+
+        with transaction.atomic():
+            _lock_pending(cls, cancel_requests)
+
+            receipts = Receipt.objects.in_bulk({r.receipt_id for r in cancel_requests})
+            blocked = cls.find_blocked(cancel_requests, receipts)
+            if blocked:
+                raise ValueError('; '.join(
+                    f'{r.request_number}: {blocked[r.pk]}' for r in cancel_requests if r.pk in blocked
+                ))
+
+            now = timezone.now()
+            logs = []
+            for cancel_request in cancel_requests:
+                receipt = receipts[cancel_request.receipt_id]
+                cancel_request.receipt = receipt
+                # เหมือน Receipt.cancel (ข้ามการเช็คสิทธิ์เพราะผ่านการอนุมัติแล้ว)
+                old_status = receipt.status
+                receipt.status = 'cancelled'
+                receipt.save()
+                logs.append(ReceiptChangeLog(
+                    receipt=receipt, action='cancelled', user=approved_by, field_name='status',
+                    old_value=old_status, new_value='cancelled',
+                    notes=cancel_request.cancel_reason or 'ยกเลิกใบสำคัญรับเงิน',
+                ))
+
+                cancel_request.status = 'applied'
+                cancel_request.approved_by = approved_by
+                cancel_request.approved_at = now
+                cancel_request.applied_at = now
+                cancel_request.approval_notes = notes
+
+            cls.objects.bulk_update(
+                cancel_requests, ['status', 'approved_by', 'approved_at', 'applied_at', 'approval_notes']
+            )
+            ReceiptChangeLog.objects.bulk_create(logs)
+
+        return cancel_requests
+
+    @classmethod
+    def find_blocked(cls, cancel_requests, receipts=None):
+        """
+        หาคำขอที่ยกเลิกใบสำคัญไม่ได้ (ใบถูกยกเลิกไปแล้ว หรือมีคำร้องขอแก้ไขรออนุมัติอยู่)
+
+        Returns:
+            dict: {cancel_request.pk: เหตุผล}
+        """
+        if receipts is None:
+            receipts = Receipt.objects.in_bulk({r.receipt_id for r in cancel_requests})
+        receipts_with_pending_edits = set(
+            ReceiptEditRequest.objects.filter(receipt_id__in=list(receipts), status='pending')
+            .values_list('receipt_id', flat=True)
+        )
+
+        blocked = {}
+        seen_receipts = set()
+        for cancel_request in cancel_requests:
+            receipt = receipts.get(cancel_request.receipt_id)
+            if receipt is None or receipt.status == 'cancelled' or receipt.pk in seen_receipts:
+                blocked[cancel_request.pk] = "ใบสำคัญนี้ถูกยกเลิกแล้ว"
+            elif receipt.pk in receipts_with_pending_edits:
+                blocked[cancel_request.pk] = "ไม่สามารถยกเลิกได้ เนื่องจากมีคำขอแก้ไขรออนุมัติอยู่"
+            seen_receipts.add(cancel_request.receipt_id)
+        return blocked
     
     def reject(self, rejected_by, notes=""):
         """ปฏิเสธคำขอยกเลิก"""
-        from django.utils import timezone
         from django.core.exceptions import PermissionDenied
         
         # ตรวจสอบสิทธิ์
@@ -2083,11 +2404,39 @@ class ReceiptCancelRequest(models.Model):
         if self.status != 'pending':
             raise ValueError("สามารถปฏิเสธได้เฉพาะคำขอที่รออนุมัติเท่านั้น")
         
-        self.status = 'rejected'
-        self.approved_by = rejected_by
-        self.approved_at = timezone.now()
-        self.approval_notes = notes
-        self.save()
+        self.reject_many([self], rejected_by, notes)
+
+    @classmethod
+    def reject_many(cls, cancel_requests, rejected_by, notes=""):
+        """
+        ปฏิเสธคำขอยกเลิกหลายรายการใน transaction เดียว พร้อมบันทึก Change Log 'cancel_rejected'
+
+        ตรวจสิทธิ์ไม่ได้ทำที่นี่ ถ้าคำขอใดไม่อยู่ในสถานะรออนุมัติแล้วจะ raise ValueError
+        """
+        from django.db import transaction
+        from django.utils import timezone
+
+        cancel_requests = list(cancel_requests)
+        if not cancel_requests:
+            return []
+
+        with transaction.atomic():
+            _lock_pending(cls, cancel_requests)
+            now = timezone.now()
+            for cancel_request in cancel_requests:
+                cancel_request.status = 'rejected'
+                cancel_request.approved_by = rejected_by
+                cancel_request.approved_at = now
+                cancel_request.approval_notes = notes
+            cls.objects.bulk_update(cancel_requests, ['status', 'approved_by', 'approved_at', 'approval_notes'])
+            ReceiptChangeLog.objects.bulk_create([
+                ReceiptChangeLog(
+                    receipt_id=cancel_request.receipt_id, action='cancel_rejected', user=rejected_by,
+                    notes=notes or f'ปฏิเสธคำขอยกเลิก {cancel_request.request_number}',
+                )
+                for cancel_request in cancel_requests
+            ])
+        return cancel_requests
     
     def withdraw(self):
         """ถอนคำขอ (โดยผู้ส่งคำขอ)"""
@@ -2206,6 +2555,22 @@ class UserActivityLog(models.Model):
             changes (dict): {field_name: (ค่าเดิม, ค่าใหม่)}
             request: HttpRequest
         """
+        log = cls.build_npu_resync_log(
+            user, performed_by.username, changes,
+            ip_address=cls._get_client_ip(request),
+            user_agent=request.META.get('HTTP_USER_AGENT', ''),
+        )
+        log.save()
+        return log
+
+    @classmethod
+    def build_npu_resync_log(cls, user, performed_by_label, changes, ip_address=None, user_agent=''):
+        """
+        สร้าง log การ re-sync (ยังไม่บันทึก) — ใช้ร่วมกับ bulk_create ตอน resync ทีละหลายคน
+
+        Args:
+            performed_by_label (str): ผู้สั่ง เช่น username ของแอดมิน หรือชื่อคำสั่งที่รัน
+        """
         if changes:
             detail = '; '.join(
                 f"{field}: '{old or '-'}' -> '{new or '-'}'"
@@ -2214,13 +2579,13 @@ class UserActivityLog(models.Model):
         else:
             detail = 'ไม่มีข้อมูลใดเปลี่ยนแปลง'
 
-        return cls.objects.create(
+        return cls(
             user=user,
             username_attempted=user.username,
             action='npu_resync',
-            ip_address=cls._get_client_ip(request),
-            user_agent=request.META.get('HTTP_USER_AGENT', '')[:500],
-            notes=f"สั่งโดย {performed_by.username} | {detail}"[:2000]
+            ip_address=ip_address,
+            user_agent=(user_agent or '')[:500],
+            notes=f"สั่งโดย {performed_by_label} | {detail}"[:2000]
         )
 
     @staticmethod
@@ -2259,6 +2624,7 @@ class ReceiptChangeLog(models.Model):
         ('edit_approved', 'อนุมัติการแก้ไข'),
         ('edit_rejected', 'ปฏิเสธการแก้ไข'),
         ('edit_applied', 'ดำเนินการแก้ไข'),
+        ('cancel_rejected', 'ปฏิเสธคำขอยกเลิก'),
     ]
     
     receipt = models.ForeignKey(
@@ -2337,4 +2703,68 @@ class ReceiptChangeLog(models.Model):
             models.Index(fields=['receipt', 'action']),
             models.Index(fields=['edit_request']),
             models.Index(fields=['created_at']),
-        ]
\ No newline at end of file
+        ]
+
+class FiscalYearRollup(models.Model):
+    """
+    ยอดสรุปใบสำคัญรายหน่วยงานของปีงบประมาณที่ปิดแล้ว (ค่าตอนปิดปี — แก้ไขไม่ได้)
+    สร้างโดยคำสั่ง close_fiscal_year (accounts/fiscal_year_close.py)
+    """
+
+    fiscal_year = models.IntegerField(
+        verbose_name="ปีงบประมาณ (พ.ศ.)"
+    )
+    department = models.ForeignKey(
+        Department,
+        on_delete=models.CASCADE,
+        related_name='fiscal_year_rollups',
+        verbose_name="หน่วยงาน"
+    )
+    receipt_count = models.IntegerField(
+        default=0,
+        verbose_name="จำนวนใบสำคัญ (ทุกสถานะ)"
+    )
+    completed_count = models.IntegerField(
+        default=0,
+        verbose_name="จำนวนที่เสร็จสิ้น"
+    )
+    cancelled_count = models.IntegerField(
+        default=0,
+        verbose_name="จำนวนที่ยกเลิก"
+    )
+    draft_count = models.IntegerField(
+        default=0,
+        verbose_name="จำนวนร่าง"
+    )
+    total_amount = models.DecimalField(
+        max_digits=14,
+        decimal_places=2,
+        default=0,
+        verbose_name="ยอดเงินรวม (เฉพาะเสร็จสิ้น)"
+    )
+    created_by = models.ForeignKey(
+        User,
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        verbose_name="ผู้ปิดปีงบประมาณ"
+    )
+    created_at = models.DateTimeField(
+        auto_now_add=True,
+        verbose_name="วันที่สร้าง"
+    )
+
+    def __str__(self):
+        return f"ปีงบ {self.fiscal_year} - {self.department.name} ({self.total_amount} บาท)"
+
+    def save(self, *args, **kwargs):
+        """บันทึกได้ครั้งเดียวตอนสร้าง"""
+        if not self._state.adding:
+            raise ValueError(f"ยอดสรุปปีงบ {self.fiscal_year} ถูกบันทึกแล้ว แก้ไขไม่ได้")
+        super().save(*args, **kwargs)
+
+    class Meta:
+        verbose_name = "ยอดสรุปปีงบประมาณ"
+        verbose_name_plural = "ยอดสรุปปีงบประมาณ"
+        ordering = ['-fiscal_year', 'department__name']
+        unique_together = ['fiscal_year', 'department']
@@ -0,0 +1,282 @@
+"""
+ดึงข้อมูลผู้ใช้จาก NPU มาอัปเดต (re-sync) — ใช้ร่วมกันระหว่าง
+
+    - npu_resync_ajax (views/users.py)  แอดมินกดทีละคน พรีวิวก่อนเขียน
+    - admin action "ดึงข้อมูลจาก NPU ใหม่" ผู้ใช้ที่เลือกในหน้า admin
+    - python manage.py npu_resync_all   ทุกคนที่ source='npu_api' (รันเป็น cron ได้)
+
+ทำไมต้อง re-sync: ข้อมูล NPU ถูกดึงมาแค่ครั้งเดียวตอนสร้างบัญชี ผู้ใช้ที่ย้ายหน่วยงาน
+จึงค้างอยู่หน่วยงานเดิมจนกว่าจะมีคนสังเกตเห็น
+
+แบบหลายคน: ยิง lookup ผ่าน thread pool ขนาดจำกัด และจำกัดจำนวน request ต่อวินาที
+เพื่อไม่ให้ NPU API โดนถล่ม แล้วเขียนผลเป็นชุดด้วย bulk_update + bulk_create log
+"""
+import json
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from django.db import connection, transaction
+from django.utils import timezone
+
+from .models import Department, User, UserActivityLog
+from .npu_api import NPUApiClient, NPULookupError, extract_user_data
+from .npu_student_api import NPUStudentApiClient, extract_student_data
+
+
+# ฟิลด์ที่ NPU เป็นเจ้าของข้อมูล และอนุญาตให้ดึงมาทับได้ตอน re-sync
+#
+# จงใจไม่รวม:
+#   - username / ldap_uid / student_code  = คีย์ระบุตัวตน ถ้าเปลี่ยนผู้ใช้จะ login ไม่ได้
+#   - approval_status / is_active / บทบาท = เรื่องของระบบเรา ไม่ใช่ของ NPU
+#   - npu_last_login                      = endpoint lookup ไม่ได้คืนเวลา login มาด้วย
+#                                           ถ้าเขียนทับข้อมูลเดิมจะหาย
+NPU_RESYNC_FIELDS_STAFF = [
+    'npu_staff_id', 'prefix_name', 'first_name_th', 'last_name_th', 'full_name',
+    'birth_date', 'gender',
+    'department', 'position_title', 'staff_type', 'staff_sub_type', 'employment_status',
+]
+
+NPU_RESYNC_FIELDS_STUDENT = [
+    'prefix_name', 'first_name_th', 'last_name_th', 'full_name',
+    'student_level', 'student_program', 'student_faculty', 'student_degree',
+]
+
+NPU_RESYNC_FIELD_LABELS = {
+    'npu_staff_id': 'รหัสบุคลากร',
+    'prefix_name': 'คำนำหน้า',
+    'first_name_th': 'ชื่อ',
+    'last_name_th': 'นามสกุล',
+    'full_name': 'ชื่อ-นามสกุล',
+    'birth_date': 'วันเกิด',
+    'gender': 'เพศ',
+    'department': 'หน่วยงาน',
+    'position_title': 'ตำแหน่ง',
+    'staff_type': 'ประเภทบุคลากร',
+    'staff_sub_type': 'ประเภทย่อย',
+    'employment_status': 'สถานะการทำงาน',
+    'student_level': 'ระดับการศึกษา',
+    'student_program': 'สาขาวิชา',
+    'student_faculty': 'คณะ',
+    'student_degree': 'ระดับปริญญา',
+}
+
+
+class NPUResyncSkip(Exception):
+    """ผู้ใช้รายนี้ re-sync ไม่ได้ด้วยเหตุที่ไม่ใช่ความผิดของ API (เช่น ไม่มีเลขบัตร/รหัสนักศึกษา)"""
+    pass
+
+
+def fetch_npu_data(user):
+    """
+    ดึงข้อมูลล่าสุดของผู้ใช้จาก NPU lookup endpoint
+
+    Returns:
+        tuple: (fresh_data, allowed_fields, department_field)
+
+    Raises:
+        NPUResyncSkip: ผู้ใช้ไม่มีคีย์สำหรับ lookup
+        NPULookupError: เรียก API ไม่สำเร็จ (ข้อความอ่านเข้าใจได้สำหรับแอดมิน)
+    """
+    if user.user_type == 'student':
+        if not user.student_code:
+            raise NPUResyncSkip('ผู้ใช้รายนี้ไม่มีรหัสนักศึกษา')
+        fresh_data = extract_student_data(NPUStudentApiClient().lookup_student(user.student_code))
+        allowed_fields, department_field = NPU_RESYNC_FIELDS_STUDENT, 'student_faculty'
+    else:
+        if not user.ldap_uid:
+            raise NPUResyncSkip('ผู้ใช้รายนี้ไม่มีเลขบัตรประชาชน')
+        fresh_data = extract_user_data(NPUApiClient().lookup_personnel(user.ldap_uid))
+        allowed_fields, department_field = NPU_RESYNC_FIELDS_STAFF, 'department'
+
+    if not fresh_data:
+        raise NPULookupError('NPU ตอบกลับมาแต่แปลงข้อมูลไม่ได้')
+    return fresh_data, allowed_fields, department_field
+
+
+def diff_npu_fields(user, fresh_data, allowed_fields):
+    """
+    เทียบข้อมูลผู้ใช้กับข้อมูลจาก NPU ทีละฟิลด์
+
+    Returns:
+        dict: {field_name: (ค่าเดิม, ค่าใหม่)} เฉพาะฟิลด์ที่เปลี่ยน
+    """
+    changes = {}
+    for field in allowed_fields:
+        if field not in fresh_data:
+            continue
+        new_value = fresh_data[field]
+        # ค่าว่างจาก NPU แปลว่า "ไม่มีข้อมูล" ไม่ใช่ "ให้ลบของเดิมทิ้ง" จึงข้ามไป
+        if new_value in (None, ''):
+            continue
+        if getattr(user, field) != new_value:
+            changes[field] = (getattr(user, field), new_value)
+    return changes
+
+
+def missing_department_warning(new_department, known_departments=None):
+    """
+    หน่วยงานต้องมีอยู่ในตาราง Department ไม่งั้นผู้ใช้จะออกใบสำคัญไม่ได้
+    เพราะระบบจับคู่หน่วยงานด้วยชื่อตรงเป๊ะ (Department.objects.filter(name=...))
+
+    Args:
+        known_departments (set, optional): ชื่อหน่วยงานที่โหลดไว้แล้ว (ใช้ตอนทำทีละหลายคน)
+    """
+    if known_departments is not None:
+        exists = new_department in known_departments
+    else:
+        exists = Department.objects.filter(name=new_department).exists()
+    if exists:
+        return None
+    return (
+        f"หน่วยงาน '{new_department}' ยังไม่มีในตารางหน่วยงานของระบบ "
+        f"ต้องไปเพิ่มที่หน้า 'จัดการหน่วยงาน' ก่อน ไม่งั้นผู้ใช้รายนี้จะออกใบสำคัญไม่ได้"
+    )
+
+
+class RateLimiter:
+    """จำกัดจำนวนครั้งต่อวินาทีแบบ thread-safe (เว้นระยะเท่า ๆ กันระหว่างแต่ละ request)"""
+
+    def __init__(self, per_second):
+        self.interval = 1.0 / per_second if per_second and per_second > 0 else 0
+        self._lock = threading.Lock()
+        self._next_at = time.monotonic()
+
+    def wait(self):
+        if not self.interval:
+            return
+        with self._lock:
+            now = time.monotonic()
+            wait_for = self._next_at - now
+            self._next_at = max(now, self._next_at) + self.interval
+        if wait_for > 0:
+            time.sleep(wait_for)
+
+
+class BulkResyncResult:
+    """สรุปผลการ re-sync ทีละหลายคน"""
+
+    def __init__(self):
+        self.processed = 0
+        self.changed = 0
+        self.unchanged = 0
+        self.skipped = []      # [(user, เหตุผล)]
+        self.failed = []       # [(user, ข้อความ error)]
+        self.warnings = []     # [(user, ข้อความ)]
+        self.last_user_id = None
+
+
+def resync_users(users, performed_by_label, workers=4, rate_per_second=5, batch_size=100,
+                 dry_run=False, ip_address=None, user_agent='', on_batch=None):
+    """
+    re-sync ผู้ใช้หลายคนพร้อมกัน
+
+    Args:
+        users: queryset/list ของ User (ควรเรียงตาม id เพื่อให้ทำต่อจากจุดเดิมได้)
+        performed_by_label (str): ผู้สั่ง บันทึกลง UserActivityLog
+        workers (int): จำนวน thread ที่ยิง NPU API พร้อมกัน
+        rate_per_second (float): จำนวน request ต่อวินาทีสูงสุด (รวมทุก thread)
+        batch_size (int): จำนวนผู้ใช้ต่อรอบการเขียนฐานข้อมูล
+        dry_run (bool): คำนวณ diff อย่างเดียว ไม่เขียนอะไร
+        on_batch (callable, optional): เรียกหลังเขียนแต่ละชุดเสร็จ on_batch(result)
+                                       ใช้บันทึก checkpoint สำหรับทำต่อ
+
+    Returns:
+        BulkResyncResult
+    """
+    result = BulkResyncResult()
+    limiter = RateLimiter(rate_per_second)
+    known_departments = set(Department.objects.values_list('name', flat=True))
+
+    def lookup(user):
+        limiter.wait()
+        try:
+            return user, fetch_npu_data(user), None
+        except Exception as e:
+            # NPUResyncSkip / NPULookupError / error อื่น — แยกประเภทตอนรวมผลใน _process_batch
+            return user, None, e
+        finally:
+            # thread ของ pool ไม่ผ่านวงจร request ของ Django — ปิด connection ที่ใช้เขียน NPUApiLog เอง
+            connection.close()
+
+    batch = []
+    with ThreadPoolExecutor(max_workers=max(1, workers)) as executor:
+        for user in users:
+            batch.append(user)
+            if len(batch) >= batch_size:
+                _process_batch(executor, lookup, batch, result, known_departments,
+                               performed_by_label, dry_run, ip_address, user_agent)
+                batch = []
+                if on_batch:
+                    on_batch(result)
+        if batch:
+            _process_batch(executor, lookup, batch, result, known_departments,
+                           performed_by_label, dry_run, ip_address, user_agent)
+            if on_batch:
+                on_batch(result)
+
+    return result
+
+
+def _process_batch(executor, lookup, batch, result, known_departments,
+                   performed_by_label, dry_run, ip_address, user_agent):
+    now = timezone.now()
+    to_update = []
+    update_fields = {'last_npu_sync'}
+    logs = []
+
+    for user, fetched, error in executor.map(lookup, batch):
+        result.processed += 1
+        if isinstance(error, NPUResyncSkip):
+            result.skipped.append((user, str(error)))
+            continue
+        if error is not None:
+            result.failed.append((user, str(error)))
+            continue
+
+        fresh_data, allowed_fields, department_field = fetched
+        changes = diff_npu_fields(user, fresh_data, allowed_fields)
+
+        if department_field in changes:
+            warning = missing_department_warning(changes[department_field][1], known_departments)
+            if warning:
+                result.warnings.append((user, warning))
+
+        if changes:
+            result.changed += 1
+            for field, (_old, new_value) in changes.items():
+                setattr(user, field, new_value)
+                update_fields.add(field)
+            # log เฉพาะคนที่มีการเปลี่ยนแปลง — คนที่ข้อมูลตรงอยู่แล้วอัปเดตแค่ last_npu_sync
+            logs.append(UserActivityLog.build_npu_resync_log(
+                user, performed_by_label, changes, ip_address=ip_address, user_agent=user_agent
+            ))
+        else:
+            result.unchanged += 1
+        user.last_npu_sync = now
+        to_update.append(user)
+
+    if not dry_run and to_update:
+        with transaction.atomic():
+            User.objects.bulk_update(to_update, sorted(update_fields))
+            if logs:
+                UserActivityLog.objects.bulk_create(logs)
+
+    result.last_user_id = batch[-1].pk
+
+
+# ========== checkpoint สำหรับทำต่อจากจุดเดิม ==========
+
+def load_checkpoint(path):
+    if not path or not os.path.exists(path):
+        return None
+    with open(path, encoding='utf-8') as f:
+        return json.load(f)
+
+
+def save_checkpoint(path, data):
+    tmp_path = f'{path}.tmp'
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(data, f, ensure_ascii=False)
+    os.replace(tmp_path, path)
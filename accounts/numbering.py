@@ -0,0 +1,79 @@
+"""
+ออกเลขที่ใบสำคัญรับเงิน (ddmmyy/xxxx) — ล็อกทีละเล่มเอกสาร
+
+เดิม generate_receipt_number ล็อกแถวใบสำคัญทุกใบที่ขึ้นต้นด้วย ddmmyy/ ของหน่วยงานรหัสเดียวกันด้วย
+SELECT ... FOR UPDATE แล้วปล่อยล็อกก่อนบันทึกใบสำคัญ (สองคนที่บันทึกพร้อมกันได้เลขเดียวกันได้) และวันที่ยังไม่มีใบ
+ก็ไม่มีแถวให้ล็อก ส่วนการสร้างเล่มเป็น get แล้ว get_or_create ซึ่งชน unique volume_code เมื่อหน่วยงานรหัสเดียวกัน
+สร้างเล่มพร้อมกัน ตอนนี้:
+
+    เล่ม     DocumentVolume.get_or_create_volume_for_department หาแบบไม่ล็อกก่อน ไม่พบค่อย INSERT ใน savepoint
+             ชน unique (อีก process สร้างพร้อมกัน) ก็ใช้เล่มที่มีอยู่ — ไม่มี locking read ของแถวที่ยังไม่มี
+             จึงไม่เกิด gap lock ที่ทำให้ INSERT พร้อมกัน deadlock (MySQL 1213)
+    ล็อก     แถว DocumentVolume ของเล่มเป็น lock row ของการออกเลข (SELECT ... FOR UPDATE) — ล็อกค้างจน transaction
+             ที่บันทึกใบสำคัญ commit เลขจึงไม่ซ้ำ หน่วยงานที่ใช้เล่มเดียวกันรอกัน เล่มอื่นไม่ต้องรอ
+    เลขล่าสุด อ่านแบบ locking read (SELECT ... FOR UPDATE) — REPEATABLE READ ของ MySQL ตรึง snapshot ไว้ตั้งแต่
+             การอ่านแบบปกติครั้งแรก (หาเล่ม) ถ้าอ่านเลขล่าสุดแบบปกติ transaction ที่รอล็อกเล่มอยู่จะไม่เห็นเลขที่
+             อีก transaction เพิ่ง commit และได้เลขซ้ำ ส่วน locking read อ่านค่าล่าสุดที่ commit แล้วเสมอ
+    กันซ้ำ   ensure_receipt_number_unused ตรวจซ้ำอีกชั้นก่อนบันทึก — unique ในฐานข้อมูลเป็น (เลขที่, หน่วยงาน)
+             แต่เลขวิ่งร่วมกันตามรหัสหน่วยงาน จึงกันซ้ำข้ามหน่วยงานรหัสเดียวกันด้วย constraint ไม่ได้
+
+ใช้ภายใน transaction.atomic() เดียวกับที่บันทึกใบสำคัญ (Receipt.save):
+
+    with transaction.atomic():
+        volume, created = lock_volume(department, fiscal_year, user)
+        receipt.receipt_number = next_receipt_number(department, receipt_date)
+        ensure_receipt_number_unused(department, receipt.receipt_number, receipt.pk)
+        ...บันทึกใบสำคัญ...
+"""
+from django.db import IntegrityError
+
+from .models import Department, DocumentVolume, Receipt
+
+
+def lock_volume(department, fiscal_year, user=None):
+    """
+    เล่มของหน่วยงานในปีงบประมาณ (สร้างถ้ายังไม่มี) พร้อมล็อกแถวเล่มไว้จนจบ transaction
+
+    Returns:
+        tuple: (DocumentVolume, created)
+    """
+    # หา/สร้างเล่มก่อนโดยไม่ล็อก แล้วค่อยล็อกแถวที่มีอยู่แน่นอนแล้วด้วย pk (record lock อย่างเดียว ไม่มี gap lock)
+    volume, created = DocumentVolume.get_or_create_volume_for_department(
+        department=department, fiscal_year=fiscal_year, user=user,
+    )
+    return DocumentVolume.objects.select_for_update().get(pk=volume.pk), created
+
+
+def next_receipt_number(department, receipt_date):
+    """
+    เลขที่ถัดไปของวันในเล่มของหน่วยงาน — ต้องถือล็อกเล่ม (lock_volume) อยู่
+
+    หลายหน่วยงานที่ใช้รหัสเดียวกันใช้เล่มเดียวกัน เลขวิ่งต่อเนื่องร่วมกัน
+    """
+    date_part = receipt_date.strftime("%d%m%y")
+    last_number = _same_code_receipts(department).filter(
+        receipt_number__startswith=f"{date_part}/",
+    ).order_by('-receipt_number').values_list('receipt_number', flat=True).first()
+
+    next_number = int(last_number.split('/')[-1]) + 1 if last_number else 1
+    return f"{date_part}/{next_number:04d}"
+
+
+def ensure_receipt_number_unused(department, receipt_number, exclude_pk=None):
+    """ยืนยันว่ายังไม่มีใบสำคัญอื่นในหน่วยงานรหัสเดียวกันใช้เลขที่นี้ — ซ้ำ = IntegrityError (transaction rollback)"""
+    receipts = _same_code_receipts(department).filter(receipt_number=receipt_number)
+    if exclude_pk is not None:
+        receipts = receipts.exclude(pk=exclude_pk)
+    if receipts.exists():
+        raise IntegrityError(f"เลขที่ใบสำคัญ {receipt_number} ของหน่วยงานรหัส {department.code} ถูกใช้แล้ว")
+
+
+def _same_code_receipts(department):
+    """
+    ใบสำคัญของทุกหน่วยงานที่ใช้รหัสเดียวกัน แบบ locking read (เห็นแถวที่ transaction อื่นเพิ่ง commit)
+
+    กรองหน่วยงานด้วย subquery แทน JOIN — FOR UPDATE ของ MySQL ไม่ล็อกแถวใน subquery จึงไม่ล็อกแถว department
+    """
+    return Receipt.objects.select_for_update().filter(
+        department__in=Department.objects.filter(code=department.code).values('pk'),
+    )
@@ -6,25 +6,15 @@ PDF Generator for Receipt System
 
 from reportlab.lib.pagesizes import A4
 from reportlab.lib.units import mm, cm
-from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
-from reportlab.lib.enums import TA_CENTER, TA_LEFT, TA_RIGHT, TA_JUSTIFY
-from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer, Table, TableStyle, Image, Flowable
-from reportlab.lib import colors
-from reportlab.pdfbase import pdfmetrics
-from reportlab.pdfbase.ttfonts import TTFont
-from reportlab.graphics.shapes import Drawing
-from reportlab.graphics.charts.barcharts import HorizontalBarChart
-from reportlab.graphics import renderPDF
+from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer, Table, Image, Flowable
 from reportlab.pdfgen import canvas as pdfgen_canvas
-import qrcode
 from io import BytesIO
+import hashlib
 import os
-from pythainlp import word_tokenize
 from django.conf import settings
-from django.http import HttpResponse
-from bs4 import BeautifulSoup
-import re
+from accounts.pdf_styles import receipt_styles, string_width, thai_fonts
 from accounts.utils import convert_to_thai_date
+from utils.file_response import file_response, spooled_file
 
 
 class WatermarkCanvas(pdfgen_canvas.Canvas):
@@ -76,7 +66,7 @@ class WatermarkCanvas(pdfgen_canvas.Canvas):
             # คำนวณขนาดกรอบ
             font_size = 140  # เพิ่มจาก 120 เป็น 140
             text = "ยกเลิก"
-            text_width = self.stringWidth(text, self.thai_font_bold, font_size)
+            text_width = string_width(text, self.thai_font_bold, font_size)
             rect_padding = 20
 
             # วาดเงาด้านหลัง (offset เล็กน้อย)
@@ -181,59 +171,11 @@ class ReceiptPDFGenerator:
         self.setup_fonts()
         
     def setup_fonts(self):
-        """ตั้งค่าฟอนต์สำหรับภาษาไทย"""
-        try:
-            # ลำดับความสำคัญ: THSarabunNew -> System fonts
-            font_base_path = os.path.join(settings.BASE_DIR, 'static', 'fonts')
-            
-            # THSarabunNew font family
-            thsarabun_fonts = {
-                'THSarabunNew': 'THSarabunNew.ttf',
-                'THSarabunNew-Bold': 'THSarabunNew Bold.ttf',
-                'THSarabunNew-Italic': 'THSarabunNew Italic.ttf',
-                'THSarabunNew-BoldItalic': 'THSarabunNew BoldItalic.ttf'
-            }
-            
-            # ลงทะเบียนฟอนต์ THSarabunNew
-            fonts_registered = 0
-            for font_name, font_file in thsarabun_fonts.items():
-                font_path = os.path.join(font_base_path, font_file)
-                if os.path.exists(font_path):
-                    pdfmetrics.registerFont(TTFont(font_name, font_path))
-                    fonts_registered += 1
-            
-            # ถ้าลงทะเบียนฟอนต์ THSarabunNew ได้
-            if fonts_registered > 0:
-                self.thai_font = 'THSarabunNew'
-                self.thai_font_bold = 'THSarabunNew-Bold' if fonts_registered >= 2 else 'THSarabunNew'
-                self.thai_font_italic = 'THSarabunNew-Italic' if fonts_registered >= 3 else 'THSarabunNew'
-                return
-            
-            # Fallback: ลองหาฟอนต์ไทยในระบบ
-            system_font_paths = [
-                '/System/Library/Fonts/Thonburi.ttc',  # macOS
-                'C:/Windows/Fonts/tahoma.ttf',  # Windows
-                '/usr/share/fonts/truetype/dejavu/DejaVuSans.ttf',  # Linux
-            ]
-            
-            for font_path in system_font_paths:
-                if os.path.exists(font_path):
-                    pdfmetrics.registerFont(TTFont('ThaiFont', font_path))
-                    self.thai_font = 'ThaiFont'
-                    self.thai_font_bold = 'ThaiFont'
-                    self.thai_font_italic = 'ThaiFont'
-                    break
-            else:
-                self.thai_font = 'Helvetica'  # Final fallback
-                self.thai_font_bold = 'Helvetica-Bold'
-                self.thai_font_italic = 'Helvetica-Oblique'
-                
-        except Exception as e:
-            print(f"Font setup error: {e}")
-            self.thai_font = 'Helvetica'  # Final fallback
-            self.thai_font_bold = 'Helvetica-Bold'
-            self.thai_font_italic = 'Helvetica-Oblique'
-    
+        """ตั้งค่าฟอนต์สำหรับภาษาไทย (ลงทะเบียนครั้งเดียวต่อ process ใน pdf_styles.thai_fonts)"""
+        fonts = thai_fonts()
+        self.thai_font, self.thai_font_bold, self.thai_font_italic = fonts
+        self.styles = receipt_styles(fonts)
+
     def prepare_thai_text(self, text):
         """
         ไม่ตัดคำอัตโนมัติ ให้แสดงตามที่ผู้ใช้พิมพ์
@@ -257,6 +199,9 @@ class ReceiptPDFGenerator:
         แปลง HTML จาก WYSIWYG Editor เป็น plain text
         ไม่ตัดคำอัตโนมัติ ให้แสดงตามที่ผู้ใช้พิมพ์
         """
+        # import ตอนใช้ — ข้อความส่วนใหญ่ไม่มี HTML จึงไม่ต้องโหลด bs4 ทุกครั้งที่สร้าง PDF
+        from bs4 import BeautifulSoup
+
         try:
             # Parse HTML และดึง plain text ออกมา
             soup = BeautifulSoup(html_text, 'html.parser')
@@ -292,33 +237,24 @@ class ReceiptPDFGenerator:
             # Fallback: ส่งกลับข้อความตามเดิม
             return html_text
     
-    def generate_receipt_pdf(self, receipt, response=None, inline=True):
+    def generate_receipt_pdf(self, receipt, response=None, inline=True, request=None):
         """
         สร้าง PDF ใบสำคัญรับเงิน
-        
+
         Args:
             receipt: Receipt object จากฐานข้อมูล
-            response: HttpResponse object (optional)
+            response: HttpResponse object (optional) — ถ้าส่งมาจะเขียน PDF ต่อท้าย response นี้
             inline: True = แสดงในเบราว์เซอร์, False = download
-            
+            request: ส่งต่อให้ file_response (optional — PDF ที่สร้างใหม่ไม่รองรับ Range)
+
         Returns:
-            HttpResponse หรือ bytes ของ PDF
+            FileResponse ของ PDF (เขียนลง spooled temp file ไม่คัดลอกเป็น bytes) หรือ response ที่ส่งมา
         """
-        if response is None:
-            response = HttpResponse(content_type='application/pdf')
-            
-            # ตั้งค่าให้แสดงแบบ inline หรือ download
-            filename_number = receipt.receipt_number if receipt.receipt_number else f'draft_{receipt.id}'
-            if inline:
-                response['Content-Disposition'] = f'inline; filename="receipt_{filename_number}.pdf"'
-            else:
-                response['Content-Disposition'] = f'attachment; filename="receipt_{filename_number}.pdf"'
-        
         # สร้าง PDF ด้วย Custom Canvas
-        buffer = BytesIO()
+        output = spooled_file() if response is None else response
 
         doc = SimpleDocTemplate(
-            buffer,
+            output,
             pagesize=A4,
             leftMargin=self.margin_left,
             rightMargin=self.margin_right,
@@ -362,37 +298,29 @@ class ReceiptPDFGenerator:
                 **kwargs  # ส่ง parameters อื่นๆ ต่อไปยัง Canvas
             )
 
+        def first_page(canvas, doc):
+            self._draw_page_template(canvas, receipt)
+
         # สร้าง PDF ด้วย custom canvas (watermark จะถูกวาดโดย WatermarkCanvas.showPage())
-        doc.build(story, canvasmaker=canvas_factory)
-        pdf = buffer.getvalue()
-        buffer.close()
-        
-        response.write(pdf)
-        return response
+        doc.build(story, onFirstPage=first_page, canvasmaker=canvas_factory)
+        if response is not None:
+            return response
+
+        # ตั้งค่าให้แสดงแบบ inline หรือ download
+        filename_number = receipt.receipt_number if receipt.receipt_number else f'draft_{receipt.id}'
+        return file_response(request, output, f'receipt_{filename_number}.pdf', 'application/pdf',
+                             as_attachment=not inline)
     
+    def _draw_page_template(self, canvas, receipt):
+        """
+        วาดส่วนคงที่ของหน้าแรกก่อนเนื้อหา — โหมด flow วาดทุกอย่างผ่าน story จึงไม่มีอะไรต้องวาด
+        (โหมด overlay ใน accounts/pdf_overlay.py วาดหัวเอกสารตรงนี้แทน _create_header)
+        """
+        pass
+
     def _create_header(self, receipt):
         """สร้างหัวเอกสาร พร้อมเล่มที่และเลขที่ในบรรทัดเดียวกับ logo"""
-        styles = getSampleStyleSheet()
-
-        # สร้าง style สำหรับ เล่มที่/เลขที่
-        info_style = ParagraphStyle(
-            'InfoStyle',
-            parent=styles['Normal'],
-            fontName=self.thai_font,
-            fontSize=16,
-            textColor=colors.black,
-            alignment=TA_LEFT
-        )
-
-        right_info_style = ParagraphStyle(
-            'RightInfoStyle',
-            parent=styles['Normal'],
-            fontName=self.thai_font,
-            fontSize=16,
-            textColor=colors.black,
-            alignment=TA_RIGHT
-        )
-
+        styles = self.styles
         content = []
 
         # เตรียมข้อมูลเล่มที่และเลขที่
@@ -412,75 +340,31 @@ class ReceiptPDFGenerator:
                 # สร้างตารางแบบ 3 คอลัมน์: เล่มที่ | Logo | เลขที่
                 header_data = [
                     [
-                        Paragraph(f"เล่มที่: {receipt.volume_code}", info_style),
+                        Paragraph(f"เล่มที่: {receipt.volume_code}", styles.volume),
                         logo_img,
-                        Paragraph(f"เลขที่: {receipt_number_text}", right_info_style)
+                        Paragraph(f"เลขที่: {receipt_number_text}", styles.number)
                     ]
                 ]
 
                 header_table = Table(header_data, colWidths=[6*cm, 5*cm, 6*cm])
-                header_table.setStyle(TableStyle([
-                    ('ALIGN', (0, 0), (0, 0), 'LEFT'),      # เล่มที่ ชิดซ้าย
-                    ('ALIGN', (1, 0), (1, 0), 'CENTER'),    # Logo กึ่งกลาง
-                    ('ALIGN', (2, 0), (2, 0), 'RIGHT'),     # เลขที่ ชิดขวา
-                    ('VALIGN', (0, 0), (-1, 0), 'TOP'),     # ทั้งหมดชิดบน
-                    ('TOPPADDING', (0, 0), (-1, 0), 0),
-                    ('BOTTOMPADDING', (0, 0), (-1, 0), 0),
-                ]))
+                header_table.setStyle(styles.header_table)
 
                 content.append(header_table)
 
                 # ใบสำคัญรับเงินอยู่ใต้โลโก้
-                receipt_title_style = ParagraphStyle(
-                    'ReceiptTitle',
-                    parent=styles['Heading1'],
-                    fontName=self.thai_font_bold,
-                    fontSize=20,
-                    textColor=colors.black,
-                    alignment=TA_CENTER,
-                )
-                content.append(Paragraph("ใบสำคัญรับเงิน", receipt_title_style))
+                content.append(Paragraph("ใบสำคัญรับเงิน", styles.title))
             else:
                 # ไม่มี logo ให้ใช้แบบเดิม
-                receipt_title_style = ParagraphStyle(
-                    'ReceiptTitle',
-                    parent=styles['Heading1'],
-                    fontName=self.thai_font_bold,
-                    fontSize=20,
-                    textColor=colors.black,
-                    alignment=TA_CENTER,
-                    spaceAfter=0.3 * cm
-                )
-                content.append(Paragraph("ใบสำคัญรับเงิน", receipt_title_style))
+                content.append(Paragraph("ใบสำคัญรับเงิน", styles.title_no_logo))
         except Exception as e:
             # มีปัญหา ให้ใช้แบบเดิม
-            receipt_title_style = ParagraphStyle(
-                'ReceiptTitle',
-                parent=styles['Heading1'],
-                fontName=self.thai_font_bold,
-                fontSize=20,
-                textColor=colors.black,
-                alignment=TA_CENTER,
-                spaceAfter=0.3 * cm
-            )
-            content.append(Paragraph("ใบสำคัญรับเงิน", receipt_title_style))
+            content.append(Paragraph("ใบสำคัญรับเงิน", styles.title_no_logo))
 
         return content
     
     def _create_receipt_info(self, receipt):
         """สร้างข้อมูลใบสำคัญ - ชื่อหน่วยงาน + ที่อยู่ + วันที่ (ชิดซ้ายตรงเส้นกั้นกลางหน้ากระดาษ)"""
-        styles = getSampleStyleSheet()
-
-        left_style = ParagraphStyle(
-            'LeftStyle',
-            parent=styles['Normal'],
-            fontName=self.thai_font,
-            fontSize=16,
-            leading=16,
-            textColor=colors.black,
-            alignment=TA_LEFT
-        )
-
+        left_style = self.styles.receipt_info
         content = []
 
         # แปลงวันที่เป็นพุทธศักราช ค.ศ. 2568 (ถ้าร่างจะแสดง xx/xx/xxxx)
@@ -512,12 +396,7 @@ class ReceiptPDFGenerator:
 
         # ใช้ความกว้างคอลัมน์ตาม Template ที่เลือก (ทั้ง 3 บรรทัดใช้ค่าเดียวกัน)
         table = Table(data, colWidths=[left_col_width, right_col_width])
-        table.setStyle(TableStyle([
-            ('ALIGN', (1, 0), (1, -1), 'LEFT'),      # คอลัมน์ขวาชิดซ้าย
-            ('VALIGN', (0, 0), (-1, -1), 'MIDDLE'),
-            ('TOPPADDING', (0, 0), (-1, -1), 0),
-            ('BOTTOMPADDING', (0, 0), (-1, -1), 0),
-        ]))
+        table.setStyle(self.styles.receipt_info_table)
 
         content.append(table)
 
@@ -532,30 +411,9 @@ class ReceiptPDFGenerator:
     
     def _create_recipient_info(self, receipt):
         """สร้างข้อมูลผู้รับเงิน"""
-        styles = getSampleStyleSheet()
-        
-        info_style = ParagraphStyle(
-            'InfoStyle',
-            parent=styles['Normal'],
-            fontName=self.thai_font,
-            fontSize=16,
-            leading=16,
-            textColor=colors.black,
-            alignment=TA_LEFT,
-            leftIndent=6  # ให้ตรงกับ LEFTPADDING ของตารางรายการ
-        )
-
+        info_style = self.styles.recipient
         # Style แยกสำหรับ line1 ที่มีข้อความยาว 2 บรรทัด (จำกัดไว้ 2 บรรทัดเท่านั้น)
-        line1_style = ParagraphStyle(
-            'Line1Style',
-            parent=styles['Normal'],
-            fontName=self.thai_font,
-            fontSize=16,
-            leading=20,  # เพิ่ม leading สำหรับข้อความ 2 บรรทัด
-            textColor=colors.black,
-            alignment=TA_LEFT,
-            leftIndent=6
-        )
+        line1_style = self.styles.recipient_lines
 
         content = []
 
@@ -573,13 +431,7 @@ class ReceiptPDFGenerator:
 
         # ใช้ Table เพื่อกำหนดความสูงคงที่สำหรับ 2 บรรทัด (จำกัดไว้ 2 บรรทัดเท่านั้น)
         line1_table = Table([[Paragraph(full_text, line1_style)]], colWidths=[17*cm], rowHeights=[1.3*cm])
-        line1_table.setStyle(TableStyle([
-            ('VALIGN', (0, 0), (0, 0), 'TOP'),
-            ('LEFTPADDING', (0, 0), (0, 0), 6),  # ให้ตรงกับ LEFTPADDING ของตารางรายการ
-            ('RIGHTPADDING', (0, 0), (0, 0), 0),
-            ('TOPPADDING', (0, 0), (0, 0), 0),
-            ('BOTTOMPADDING', (0, 0), (0, 0), 0),
-        ]))
+        line1_table.setStyle(self.styles.recipient_lines_table)
         content.append(line1_table)
 
         # เส้นจุดประใต้บรรทัด (3 เส้นสำหรับ 3 บรรทัด - รวมบรรทัดว่าง)
@@ -613,23 +465,11 @@ class ReceiptPDFGenerator:
     
     def _create_items_table(self, receipt):
         """สร้างตารางรายการรับเงิน"""
-        styles = getSampleStyleSheet()
+        styles = self.styles
         content = []
         
-        # สร้าง style สำหรับ description (ไม่ justify ให้แสดงตามที่พิมพ์)
-        description_style = ParagraphStyle(
-            'DescriptionStyle',
-            parent=styles['Normal'],
-            fontName=self.thai_font,
-            fontSize=16,
-            leading=18,
-            alignment=TA_LEFT,  # ชิดซ้าย ไม่ justify
-            wordWrap='CJK',  # รองรับภาษาไทยและเอเชีย
-            breakLongWords=0,  # ไม่ตัดคำยาว
-            splitLongWords=0,  # ไม่แยกคำยาว
-            spaceBefore=2,
-            spaceAfter=2
-        )
+        # style สำหรับ description (ไม่ justify ให้แสดงตามที่พิมพ์)
+        description_style = styles.item_description
         
         # หัวตาราง
         data = [['ลำดับ', 'รายการ', 'จำนวนเงิน (บาท)']]
@@ -668,82 +508,27 @@ class ReceiptPDFGenerator:
         ])
         
         # สร้างตาราง (ไม่ระบุ rowHeights เพื่อให้ปรับอัตโนมัติ)
+        # แถวรวม (แถวสุดท้าย) จัดรูปแบบใน styles.items_table ด้วย index -1
         table = Table(data, colWidths=[1.5*cm, 12*cm, 3.5*cm])
-        # คำนวณ row index ของแถวสุดท้าย (แถวรวม)
-        last_row = len(data) - 1
-        
-        table.setStyle(TableStyle([
-            ('FONTNAME', (0, 0), (-1, -1), self.thai_font),
-            ('FONTSIZE', (0, 0), (-1, -1), 16),
-            ('LEADING', (0, 0), (-1, -1), 18),  # เพิ่ม leading ให้มากขึ้น
-            ('ALIGN', (0, 0), (0, -1), 'CENTER'),  # ลำดับ
-            ('ALIGN', (1, 0), (1, -1), 'LEFT'),    # รายการ
-            ('ALIGN', (2, 0), (2, -1), 'RIGHT'),   # จำนวนเงิน
-            # Header จัดกึ่งกลางทุกคอลัมน์
-            ('ALIGN', (0, 0), (-1, 0), 'CENTER'),  # หัวตารางกึ่งกลาง
-            ('VALIGN', (0, 0), (-1, -1), 'TOP'),   # เปลี่ยนจาก MIDDLE เป็น TOP เพื่อให้ดูดีกับข้อความหลายบรรทัด
-            ('GRID', (0, 0), (-1, -1), 0.5, colors.black),  # เส้นบาง
-            ('BACKGROUND', (0, 0), (-1, 0), colors.Color(0.9, 0.9, 0.9)),  # สีเทาอ่อนกว่า
-            ('TEXTCOLOR', (0, 0), (-1, 0), colors.black),  # ข้อความสีดำ
-            
-            # Padding สำหรับ cells เพื่อให้ข้อความไม่ติดขอบ
-            ('LEFTPADDING', (0, 0), (-1, -1), 4),
-            ('RIGHTPADDING', (0, 0), (-1, -1), 4),
-            ('TOPPADDING', (0, 0), (-1, -1), 4),
-            ('BOTTOMPADDING', (0, 0), (-1, -1), 4),
-            
-            # แถวรวมเป็นเงิน
-            ('SPAN', (0, last_row), (1, last_row)),  # merge คอลัมน์ 1-2
-            ('FONTNAME', (0, last_row), (1, last_row), self.thai_font_bold),  # ตัวหนา
-            ('ALIGN', (0, last_row), (1, last_row), 'RIGHT'),  # ชิดขวา
-            ('VALIGN', (0, last_row), (-1, last_row), 'MIDDLE'),  # แถวรวมให้อยู่กึ่งกลาง
-            ('BACKGROUND', (0, last_row), (-1, last_row), colors.Color(0.9, 0.9, 0.9)),  # พื้นหลังเทาอ่อน
-        ]))
+        table.setStyle(styles.items_table)
         
         content.append(table)
         
         # จำนวนเงิน(ตัวอักษร) หลังตารางโดยตรง
-        amount_text_style = ParagraphStyle(
-            'AmountTextStyle',
-            parent=styles['Normal'],
-            fontName=self.thai_font_bold,
-            fontSize=16,
-            leading=16,
-            textColor=colors.black,
-            alignment=TA_LEFT,
-            spaceBefore=0.1 * cm,
-            leftIndent=6
-        )
-        
         amount_text_content = f"จำนวนเงิน(ตัวอักษร): {receipt.total_amount_text}"
-        content.append(Paragraph(amount_text_content, amount_text_style))
+        content.append(Paragraph(amount_text_content, styles.amount_text))
 
         # เพิ่มข้อความรับรองสำหรับ online_other template
         if online_other_data:
-            certification_style = ParagraphStyle(
-                'CertificationStyle',
-                parent=styles['Normal'],
-                fontName=self.thai_font,
-                fontSize=14,
-                leading=18,
-                textColor=colors.black,
-                alignment=TA_LEFT,  # เปลี่ยนเป็น JUSTIFY เพื่อกระจายข้อความเต็มบรรทัด
-                spaceBefore=0.2 * cm,
-                leftIndent=6,
-                firstLineIndent=1 * cm
-            )
-
             # ฝังชื่อเป็น inline bold ภายใน paragraph เดียวกัน
             # เลือก template ตามความกว้างชื่อ (3 แบบ: สั้น/กลาง/ยาว)
             prefix_name = online_other_data['prefix']
             recipient_name = online_other_data['recipient']
 
-            # คำนวณความกว้างจริงของชื่อ
-            from reportlab.pdfbase.pdfmetrics import stringWidth
-
-            prefix_width = stringWidth(prefix_name, self.thai_font_bold, 14)
-            recipient_width = stringWidth(recipient_name, self.thai_font_bold, 14)
-            intro_text_width = stringWidth('ข้าพเจ้า  ขอรับรองว่า  ', self.thai_font, 14)
+            # คำนวณความกว้างจริงของชื่อ (memoize — ผู้รับรอง/กรรมการชุดเดิมพิมพ์ซ้ำบ่อย)
+            prefix_width = string_width(prefix_name, self.thai_font_bold, 14)
+            recipient_width = string_width(recipient_name, self.thai_font_bold, 14)
+            intro_text_width = string_width('ข้าพเจ้า  ขอรับรองว่า  ', self.thai_font, 14)
 
             total_width = prefix_width + recipient_width + intro_text_width
 
@@ -794,7 +579,7 @@ class ReceiptPDFGenerator:
                     f'ตามหลักฐานการโอนเงินที่ได้แนบมาพร้อมนี้'
                 )
 
-            content.append(Paragraph(certification_text, certification_style))
+            content.append(Paragraph(certification_text, styles.certification))
 
         return content, online_other_data
     
@@ -807,17 +592,6 @@ class ReceiptPDFGenerator:
         - จ่ายปกติ (is_loan=False): ผู้รับเงิน=ชื่อผู้รับเงิน, ผู้จ่ายเงิน=ว่าง (จุด)
         - ยืมเงิน (is_loan=True): ผู้รับเงิน=ชื่อผู้รับเงิน, ผู้จ่ายเงิน=ชื่อผู้สร้าง
         """
-        styles = getSampleStyleSheet()
-
-        signature_style = ParagraphStyle(
-            'SignatureStyle',
-            parent=styles['Normal'],
-            fontName=self.thai_font,
-            fontSize=16,
-            textColor=colors.black,
-            alignment=TA_CENTER
-        )
-
         content = []
         content.append(Spacer(1, 1 * cm))
 
@@ -849,19 +623,11 @@ class ReceiptPDFGenerator:
         ]
 
         table = Table(data, colWidths=[10*cm], rowHeights=[0.8*cm]*5)
-        table.setStyle(TableStyle([
-            ('FONTNAME', (0, 0), (-1, -1), self.thai_font),
-            ('FONTSIZE', (0, 0), (-1, -1), 16),
-            ('ALIGN', (0, 0), (0, -1), 'CENTER'),
-            ('VALIGN', (0, 0), (-1, -1), 'MIDDLE'),
-        ]))
+        table.setStyle(self.styles.signature_table)
 
         # จัดตารางให้กึ่งกลาง
         signature_table = Table([["", table, ""]], colWidths=[3.5*cm, 10*cm, 3.5*cm])
-        signature_table.setStyle(TableStyle([
-            ('ALIGN', (1, 0), (1, 0), 'CENTER'),
-            ('VALIGN', (0, 0), (-1, -1), 'MIDDLE'),
-        ]))
+        signature_table.setStyle(self.styles.signature_frame_table)
 
         content.append(signature_table)
 
@@ -990,53 +756,49 @@ class ReceiptPDFGenerator:
                 if not qr_data:
                     qr_data = "https://example.com/receipt/unknown"
 
-            # สร้าง QR Code
-            qr = qrcode.QRCode(
-                version=1,
-                error_correction=qrcode.constants.ERROR_CORRECT_L,
-                box_size=10,
-                border=4,
-            )
-            qr.add_data(qr_data)
-            qr.make(fit=True)
-
-            # สร้างรูปภาพ
-            qr_img = qr.make_image(fill_color="black", back_color="white")
-
-            # แปลงเป็น BytesIO สำหรับ ReportLab
-            img_buffer = BytesIO()
-            qr_img.save(img_buffer, format='PNG')
-            img_buffer.seek(0)
+            from utils.qr_generator import get_qr_matrix, get_qr_png, qr_drawing
 
-            # สร้าง Image object สำหรับ ReportLab
-            img = Image(img_buffer, width=2.4*cm, height=2.4*cm)
+            # vector (default): วาด QR ด้วย ReportLab โดยตรง ไม่ต้อง rasterize/encode PNG
+            if getattr(settings, 'QR_PDF_MODE', 'vector') != 'raster':
+                return qr_drawing(qr_data, 2.4*cm)
 
-            return img
+            # raster: PNG ขนาดเท่า box_size 10 แบบเดิม (cache ไว้ และเก็บลงดิสก์ถ้าใบเสร็จสิ้นแล้ว)
+            pixels = len(get_qr_matrix(qr_data)) * 10
+            png = get_qr_png(qr_data, (pixels, pixels), persist=receipt.status == 'completed')
+            return Image(BytesIO(png), width=2.4*cm, height=2.4*cm)
 
         except Exception as e:
             # ถ้าสร้าง QR Code ไม่ได้ ให้ใช้ข้อความแทน
-            styles = getSampleStyleSheet()
-            style = ParagraphStyle(
-                'QRStyle',
-                parent=styles['Normal'],
-                fontName=self.thai_font,
-                fontSize=10,
-                textColor=colors.black,
-                alignment=TA_CENTER
-            )
-            return Paragraph("QR Code<br/>ไม่สามารถสร้างได้", style)
+            return Paragraph("QR Code<br/>ไม่สามารถสร้างได้", self.styles.qr_fallback)
 
 
-def generate_receipt_pdf(receipt, inline=True):
+def generate_receipt_pdf(receipt, inline=True, request=None):
     """
     Helper function สำหรับสร้าง PDF ใบสำคัญรับเงิน
-    
+
     Args:
         receipt: Receipt object
         inline: True = แสดงในเบราว์เซอร์, False = download
-        
+        request: ใช้รองรับ Range header ของ PDF ที่เก็บไว้ตอนปิดปี (optional)
+
     Returns:
-        HttpResponse ที่มี PDF content
+        FileResponse ของ PDF
     """
-    generator = ReceiptPDFGenerator()
-    return generator.generate_receipt_pdf(receipt, inline=inline)
\ No newline at end of file
+    # ใบของปีงบประมาณที่ปิดแล้วใช้ PDF ที่เก็บไว้ตอนปิดปี (accounts/fiscal_year_close.py)
+    # ไฟล์ที่เก็บไว้ไม่เปลี่ยน (ชื่อไฟล์มี updated_at) — รองรับ Range ด้วย ETag จาก path
+    from accounts.fiscal_year_close import final_pdf_path, open_final_pdf
+    stored = open_final_pdf(receipt)
+    if stored is not None:
+        etag = hashlib.sha256(final_pdf_path(receipt).encode('utf-8')).hexdigest()
+        return file_response(request, stored, f'receipt_{receipt.receipt_number}.pdf', 'application/pdf',
+                             as_attachment=not inline, etag=etag)
+    return get_receipt_pdf_generator().generate_receipt_pdf(receipt, inline=inline, request=request)
+
+
+def get_receipt_pdf_generator():
+    """ตัวสร้าง PDF ใบสำคัญตาม RECEIPT_PDF_MODE"""
+    # RECEIPT_PDF_MODE: 'flow' จัดหน้าทั้งใบทุกครั้ง / 'overlay' ใช้หัวเอกสารที่เตรียมไว้ (accounts/pdf_overlay.py)
+    if getattr(settings, 'RECEIPT_PDF_MODE', 'flow') == 'overlay':
+        from accounts.pdf_overlay import OverlayReceiptPDFGenerator
+        return OverlayReceiptPDFGenerator()
+    return ReceiptPDFGenerator()
\ No newline at end of file
@@ -0,0 +1,167 @@
+"""
+โหมด overlay ของ PDF ใบสำคัญรับเงิน — ส่วนคงที่ของหน้าเตรียมครั้งเดียวต่อ process
+
+โหมดปกติ (flow) สร้างหัวเอกสารใหม่ทุกใบ: อ่าน/ถอดรหัส logo.png แล้ว zlib + ASCII85 ใหม่,
+จัดตาราง เล่มที่ | logo | เลขที่ และตัดบรรทัดชื่อเอกสารด้วย Platypus
+โหมด overlay แยกหน้าออกเป็น 2 ชั้น:
+
+    ชั้นคงที่ (ReceiptPageTemplate)  logo + ชื่อเอกสาร "ใบสำคัญรับเงิน" ที่จัดบรรทัดแล้ว
+                                     ตำแหน่งวัดจากการจัดหน้าแบบ flow จริงครั้งเดียว (ตรงกับโหมด flow เสมอ)
+    ชั้นที่เปลี่ยนทุกใบ              เล่มที่/เลขที่ วาดลงตำแหน่งเดิมของช่องในตาราง ส่วนเนื้อหาที่ความสูงขึ้นกับข้อมูล
+                                     (หน่วยงาน, ผู้รับเงิน, รายการ, ลายเซ็น) ยังไหลผ่าน Platypus เหมือนเดิม
+                                     โดยเริ่มต่อจาก Spacer สูงเท่าหัวเอกสาร
+
+ReportLab ใช้ form XObject ที่มีข้อความไทยข้ามเอกสารไม่ได้ (ฟอนต์ถูก subset แยกรายเอกสาร)
+ชั้นคงที่จึงเก็บเป็น "page template" (ตำแหน่ง + Paragraph ที่จัดบรรทัดแล้ว) แทน PDF สำเร็จรูป
+logo วาดด้วย canvas.drawImage() ตามปกติ (encode ใหม่ทุกเอกสาร) — ใช้เฉพาะ API สาธารณะของ ReportLab
+
+เปิดใช้: RECEIPT_PDF_MODE = 'overlay' ใน settings (default 'flow')
+วัดผล:   python manage.py bench_receipt_pdf
+"""
+import copy
+import functools
+import os
+from collections import namedtuple
+from io import BytesIO
+
+from django.conf import settings
+from reportlab.lib.units import cm
+from reportlab.platypus import Flowable, Image, Paragraph, SimpleDocTemplate, Spacer, Table
+
+from accounts.pdf_generator import ReceiptPDFGenerator
+
+
+LOGO_SIZE = 2.5 * cm
+
+# ตำแหน่งช่องข้อความบนหน้า: x ซ้าย, y ขอบบน, ความกว้างที่ใช้จัดบรรทัด
+Slot = namedtuple('Slot', ['x', 'top', 'width'])
+
+
+def find_logo_path():
+    """logo ของใบสำคัญ (png ก่อน jpg) — None ถ้าไม่มีไฟล์"""
+    for filename in ('logo.png', 'logo.jpg'):
+        path = os.path.join(settings.BASE_DIR, 'static', 'images', filename)
+        if os.path.exists(path):
+            return path
+    return None
+
+
+class _Probe(Flowable):
+    """ห่อ flowable เพื่อจดตำแหน่งจริงบนหน้า (พิกัดสัมบูรณ์) ตอนจัดหน้าแบบ flow"""
+
+    def __init__(self, flowable, positions, key):
+        Flowable.__init__(self)
+        self.flowable = flowable
+        self.positions = positions
+        self.key = key
+        self.hAlign = getattr(flowable, 'hAlign', 'LEFT')
+
+    def wrap(self, availWidth, availHeight):
+        self.avail_width = availWidth
+        self.width, self.height = self.flowable.wrap(availWidth, availHeight)
+        return self.width, self.height
+
+    def getSpaceBefore(self):
+        return self.flowable.getSpaceBefore()
+
+    def getSpaceAfter(self):
+        return self.flowable.getSpaceAfter()
+
+    def draw(self):
+        x, y = self.canv.absolutePosition(0, 0)
+        self.positions[self.key] = Slot(x, y + self.height, self.avail_width)
+        self.flowable.drawOn(self.canv, 0, 0)
+
+
+class ReceiptPageTemplate:
+    """
+    ชั้นคงที่ของหน้าแรกใบสำคัญ — สร้างผ่าน receipt_page_template()
+
+    ตอนสร้างจัดหัวเอกสารแบบ flow (ตาราง + สไตล์เดียวกับ ReceiptPDFGenerator._create_header) ลงเอกสารทิ้ง
+    1 ครั้งแล้วจดตำแหน่ง logo, ชื่อเอกสาร, ช่องเล่มที่/เลขที่ และจุดที่เนื้อหาถัดไปเริ่ม (header_height)
+    """
+
+    def __init__(self, generator, logo_path):
+        styles = generator.styles
+        self.styles = styles
+        self.logo = logo_path
+
+        positions = {}
+        if self.logo:
+            header_table = Table([[
+                _Probe(Paragraph('เล่มที่: x', styles.volume), positions, 'volume'),
+                _Probe(Image(logo_path, width=LOGO_SIZE, height=LOGO_SIZE), positions, 'logo'),
+                _Probe(Paragraph('เลขที่: x', styles.number), positions, 'number'),
+            ]], colWidths=[6*cm, 5*cm, 6*cm])
+            header_table.setStyle(styles.header_table)
+            self.title = Paragraph('ใบสำคัญรับเงิน', styles.title)
+            story = [_Probe(header_table, positions, 'header')]
+        else:
+            # ไม่มี logo: โหมด flow แสดงแค่ชื่อเอกสาร ไม่มีเล่มที่/เลขที่
+            self.title = Paragraph('ใบสำคัญรับเงิน', styles.title_no_logo)
+            story = []
+        story.append(_Probe(self.title, positions, 'title'))
+        story.append(_Probe(Spacer(1, 0), positions, 'content'))
+
+        SimpleDocTemplate(
+            BytesIO(),
+            pagesize=(generator.page_width, generator.page_height),
+            leftMargin=generator.margin_left,
+            rightMargin=generator.margin_right,
+            topMargin=generator.margin_top,
+            bottomMargin=generator.margin_bottom,
+        ).build(story)
+
+        header_top = positions['header' if self.logo else 'title'].top
+        self.header_height = header_top - positions['content'].top
+        self.title_slot = positions['title']
+        self.volume_slot = positions.get('volume')
+        self.logo_slot = positions.get('logo')
+        self.number_slot = positions.get('number')
+
+        # จัดบรรทัดชื่อเอกสารครั้งเดียว แต่ละใบวาดจากสำเนาตื้น (drawOn ตั้ง self.canv ชั่วคราว — กันชนกันข้าม thread)
+        _, self.title_height = self.title.wrap(self.title_slot.width, generator.page_height)
+
+    def draw(self, canvas, receipt):
+        """วาดชั้นคงที่ + เล่มที่/เลขที่ของใบนี้ลงหน้าแรก"""
+        copy.copy(self.title).drawOn(canvas, self.title_slot.x, self.title_slot.top - self.title_height)
+        if not self.logo:
+            return
+
+        slot = self.logo_slot
+        # mask='auto' แบบเดียวกับ platypus Image ของโหมด flow
+        canvas.drawImage(self.logo, slot.x, slot.top - LOGO_SIZE, LOGO_SIZE, LOGO_SIZE, mask='auto')
+
+        receipt_number_text = receipt.receipt_number if receipt.receipt_number else 'xxxxx/xxxx'
+        self._draw_text(canvas, self.volume_slot, f'เล่มที่: {receipt.volume_code}', self.styles.volume)
+        self._draw_text(canvas, self.number_slot, f'เลขที่: {receipt_number_text}', self.styles.number)
+
+    def _draw_text(self, canvas, slot, text, style):
+        paragraph = Paragraph(text, style)
+        _, height = paragraph.wrap(slot.width, slot.top)
+        paragraph.drawOn(canvas, slot.x, slot.top - height)
+
+
+@functools.lru_cache(maxsize=None)
+def receipt_page_template(logo_path):
+    """ReceiptPageTemplate หนึ่งชุดต่อไฟล์ logo — ใช้ร่วมกันทุก request (ฟอนต์/style คงที่ทั้ง process)"""
+    return ReceiptPageTemplate(ReceiptPDFGenerator(), logo_path)
+
+
+class OverlayReceiptPDFGenerator(ReceiptPDFGenerator):
+    """
+    ReceiptPDFGenerator ที่วาดหัวเอกสารจาก ReceiptPageTemplate แทนการจัดหน้าใหม่ทุกใบ
+
+    ผลลัพธ์บนหน้าตรงกับโหมด flow (ตำแหน่งวัดจากการจัดหน้าจริง) — ต่างกันแค่ลำดับคำสั่งใน PDF
+    """
+
+    def __init__(self):
+        super().__init__()
+        self.page_template = receipt_page_template(find_logo_path())
+
+    def _create_header(self, receipt):
+        """เว้นที่ให้หัวเอกสาร — ตัวหัวเอกสารวาดใน _draw_page_template()"""
+        return [Spacer(1, self.page_template.header_height)]
+
+    def _draw_page_template(self, canvas, receipt):
+        self.page_template.draw(canvas, receipt)
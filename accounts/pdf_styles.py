@@ -0,0 +1,437 @@
+"""
+ฟอนต์ไทยและ style ของ PDF (ReportLab) ที่ใช้ร่วมกัน — สร้างครั้งเดียวต่อ process
+
+เดิม ReceiptPDFGenerator และ exporter รายงาน PDF เรียก getSampleStyleSheet(), สร้าง ParagraphStyle/
+TableStyle ใหม่ และอ่านไฟล์ฟอนต์ .ttf ใหม่ (TTFont) ทุก request ตอนนี้:
+
+    fonts = thai_fonts()                 # ลงทะเบียนฟอนต์ครั้งแรกที่เรียก
+    styles = receipt_styles(fonts)       # ใบสำคัญรับเงิน (pdf_generator.py)
+    styles = report_styles(fonts)        # รายงาน PDF (views/exports.py)
+    string_width(text, font, size)       # pdfmetrics.stringWidth แบบ memoize
+
+style ในนี้ใช้ร่วมกันทุก request — ห้ามแก้ค่า (ถ้าต้องการต่างออกไปให้สร้าง ParagraphStyle ใหม่โดยใช้ parent=)
+ตารางที่มีแถวรวมท้ายตารางใช้ index ติดลบ (-1) แทนการคำนวณ last_row จึงใช้ TableStyle เดียวกันได้ทุกขนาด
+"""
+import functools
+import os
+from collections import namedtuple
+
+from django.conf import settings
+from reportlab.lib import colors
+from reportlab.lib.enums import TA_CENTER, TA_LEFT, TA_RIGHT
+from reportlab.lib.styles import ParagraphStyle, getSampleStyleSheet
+from reportlab.lib.units import cm
+from reportlab.pdfbase import pdfmetrics
+from reportlab.pdfbase.ttfonts import TTFont
+from reportlab.platypus import TableStyle
+
+
+STRING_WIDTH_CACHE_SIZE = 4096
+
+ThaiFonts = namedtuple('ThaiFonts', ['regular', 'bold', 'italic'])
+
+THSARABUN_FONTS = {
+    'THSarabunNew': 'THSarabunNew.ttf',
+    'THSarabunNew-Bold': 'THSarabunNew Bold.ttf',
+    'THSarabunNew-Italic': 'THSarabunNew Italic.ttf',
+    'THSarabunNew-BoldItalic': 'THSarabunNew BoldItalic.ttf',
+}
+
+SYSTEM_FONT_PATHS = [
+    '/System/Library/Fonts/Thonburi.ttc',  # macOS
+    'C:/Windows/Fonts/tahoma.ttf',  # Windows
+    '/usr/share/fonts/truetype/dejavu/DejaVuSans.ttf',  # Linux
+]
+
+HELVETICA = ThaiFonts('Helvetica', 'Helvetica-Bold', 'Helvetica-Oblique')
+
+
+@functools.lru_cache(maxsize=None)
+def thai_fonts():
+    """
+    ลงทะเบียนฟอนต์ไทยกับ ReportLab ครั้งเดียวต่อ process
+
+    ลำดับ: THSarabunNew ใน static/fonts -> ฟอนต์ไทยของระบบ -> Helvetica
+
+    Returns:
+        ThaiFonts: ชื่อฟอนต์ (regular, bold, italic) ที่ใช้ใน style/markup ได้ทันที
+    """
+    try:
+        font_base_path = os.path.join(settings.BASE_DIR, 'static', 'fonts')
+
+        fonts_registered = 0
+        for font_name, font_file in THSARABUN_FONTS.items():
+            font_path = os.path.join(font_base_path, font_file)
+            if os.path.exists(font_path):
+                pdfmetrics.registerFont(TTFont(font_name, font_path))
+                fonts_registered += 1
+
+        if fonts_registered > 0:
+            return ThaiFonts(
+                'THSarabunNew',
+                'THSarabunNew-Bold' if fonts_registered >= 2 else 'THSarabunNew',
+                'THSarabunNew-Italic' if fonts_registered >= 3 else 'THSarabunNew',
+            )
+
+        for font_path in SYSTEM_FONT_PATHS:
+            if os.path.exists(font_path):
+                pdfmetrics.registerFont(TTFont('ThaiFont', font_path))
+                return ThaiFonts('ThaiFont', 'ThaiFont', 'ThaiFont')
+
+    except Exception as e:
+        print(f"Font setup error: {e}")
+
+    return HELVETICA
+
+
+@functools.lru_cache(maxsize=STRING_WIDTH_CACHE_SIZE)
+def string_width(text, font_name, font_size):
+    """ความกว้างของข้อความเป็น point (pdfmetrics.stringWidth แบบ memoize ตาม (text, font, size))"""
+    return pdfmetrics.stringWidth(text, font_name, font_size)
+
+
+class ReceiptStyles:
+    """style ของใบสำคัญรับเงิน (ReceiptPDFGenerator) — สร้างผ่าน receipt_styles()"""
+
+    def __init__(self, fonts):
+        sample = getSampleStyleSheet()
+
+        # หัวเอกสาร: เล่มที่ | logo | เลขที่ และชื่อเอกสาร
+        self.volume = ParagraphStyle(
+            'InfoStyle',
+            parent=sample['Normal'],
+            fontName=fonts.regular,
+            fontSize=16,
+            textColor=colors.black,
+            alignment=TA_LEFT
+        )
+        self.number = ParagraphStyle(
+            'RightInfoStyle',
+            parent=sample['Normal'],
+            fontName=fonts.regular,
+            fontSize=16,
+            textColor=colors.black,
+            alignment=TA_RIGHT
+        )
+        self.title = ParagraphStyle(
+            'ReceiptTitle',
+            parent=sample['Heading1'],
+            fontName=fonts.bold,
+            fontSize=20,
+            textColor=colors.black,
+            alignment=TA_CENTER,
+        )
+        # ไม่มี logo: เว้นระยะใต้ชื่อเอกสารแทน
+        self.title_no_logo = ParagraphStyle(
+            'ReceiptTitle',
+            parent=self.title,
+            spaceAfter=0.3 * cm
+        )
+        self.header_table = TableStyle([
+            ('ALIGN', (0, 0), (0, 0), 'LEFT'),      # เล่มที่ ชิดซ้าย
+            ('ALIGN', (1, 0), (1, 0), 'CENTER'),    # Logo กึ่งกลาง
+            ('ALIGN', (2, 0), (2, 0), 'RIGHT'),     # เลขที่ ชิดขวา
+            ('VALIGN', (0, 0), (-1, 0), 'TOP'),     # ทั้งหมดชิดบน
+            ('TOPPADDING', (0, 0), (-1, 0), 0),
+            ('BOTTOMPADDING', (0, 0), (-1, 0), 0),
+        ])
+
+        # ชื่อหน่วยงาน + ที่อยู่ + วันที่
+        self.receipt_info = ParagraphStyle(
+            'LeftStyle',
+            parent=sample['Normal'],
+            fontName=fonts.regular,
+            fontSize=16,
+            leading=16,
+            textColor=colors.black,
+            alignment=TA_LEFT
+        )
+        self.receipt_info_table = TableStyle([
+            ('ALIGN', (1, 0), (1, -1), 'LEFT'),      # คอลัมน์ขวาชิดซ้าย
+            ('VALIGN', (0, 0), (-1, -1), 'MIDDLE'),
+            ('TOPPADDING', (0, 0), (-1, -1), 0),
+            ('BOTTOMPADDING', (0, 0), (-1, -1), 0),
+        ])
+
+        # ข้อมูลผู้รับเงิน
+        self.recipient = ParagraphStyle(
+            'InfoStyle',
+            parent=sample['Normal'],
+            fontName=fonts.regular,
+            fontSize=16,
+            leading=16,
+            textColor=colors.black,
+            alignment=TA_LEFT,
+            leftIndent=6  # ให้ตรงกับ LEFTPADDING ของตารางรายการ
+        )
+        # ชื่อ + ที่อยู่ (จำกัดไว้ 2 บรรทัด)
+        self.recipient_lines = ParagraphStyle(
+            'Line1Style',
+            parent=sample['Normal'],
+            fontName=fonts.regular,
+            fontSize=16,
+            leading=20,  # เพิ่ม leading สำหรับข้อความ 2 บรรทัด
+            textColor=colors.black,
+            alignment=TA_LEFT,
+            leftIndent=6
+        )
+        self.recipient_lines_table = TableStyle([
+            ('VALIGN', (0, 0), (0, 0), 'TOP'),
+            ('LEFTPADDING', (0, 0), (0, 0), 6),  # ให้ตรงกับ LEFTPADDING ของตารางรายการ
+            ('RIGHTPADDING', (0, 0), (0, 0), 0),
+            ('TOPPADDING', (0, 0), (0, 0), 0),
+            ('BOTTOMPADDING', (0, 0), (0, 0), 0),
+        ])
+
+        # ตารางรายการ (ไม่ justify ให้แสดงตามที่พิมพ์)
+        self.item_description = ParagraphStyle(
+            'DescriptionStyle',
+            parent=sample['Normal'],
+            fontName=fonts.regular,
+            fontSize=16,
+            leading=18,
+            alignment=TA_LEFT,  # ชิดซ้าย ไม่ justify
+            wordWrap='CJK',  # รองรับภาษาไทยและเอเชีย
+            breakLongWords=0,  # ไม่ตัดคำยาว
+            splitLongWords=0,  # ไม่แยกคำยาว
+            spaceBefore=2,
+            spaceAfter=2
+        )
+        self.items_table = TableStyle([
+            ('FONTNAME', (0, 0), (-1, -1), fonts.regular),
+            ('FONTSIZE', (0, 0), (-1, -1), 16),
+            ('LEADING', (0, 0), (-1, -1), 18),  # เพิ่ม leading ให้มากขึ้น
+            ('ALIGN', (0, 0), (0, -1), 'CENTER'),  # ลำดับ
+            ('ALIGN', (1, 0), (1, -1), 'LEFT'),    # รายการ
+            ('ALIGN', (2, 0), (2, -1), 'RIGHT'),   # จำนวนเงิน
+            # Header จัดกึ่งกลางทุกคอลัมน์
+            ('ALIGN', (0, 0), (-1, 0), 'CENTER'),  # หัวตารางกึ่งกลาง
+            ('VALIGN', (0, 0), (-1, -1), 'TOP'),   # TOP เพื่อให้ดูดีกับข้อความหลายบรรทัด
+            ('GRID', (0, 0), (-1, -1), 0.5, colors.black),  # เส้นบาง
+            ('BACKGROUND', (0, 0), (-1, 0), colors.Color(0.9, 0.9, 0.9)),  # สีเทาอ่อน
+            ('TEXTCOLOR', (0, 0), (-1, 0), colors.black),  # ข้อความสีดำ
+
+            # Padding สำหรับ cells เพื่อให้ข้อความไม่ติดขอบ
+            ('LEFTPADDING', (0, 0), (-1, -1), 4),
+            ('RIGHTPADDING', (0, 0), (-1, -1), 4),
+            ('TOPPADDING', (0, 0), (-1, -1), 4),
+            ('BOTTOMPADDING', (0, 0), (-1, -1), 4),
+
+            # แถวรวมเป็นเงิน (แถวสุดท้าย)
+            ('SPAN', (0, -1), (1, -1)),  # merge คอลัมน์ 1-2
+            ('FONTNAME', (0, -1), (1, -1), fonts.bold),  # ตัวหนา
+            ('ALIGN', (0, -1), (1, -1), 'RIGHT'),  # ชิดขวา
+            ('VALIGN', (0, -1), (-1, -1), 'MIDDLE'),  # แถวรวมให้อยู่กึ่งกลาง
+            ('BACKGROUND', (0, -1), (-1, -1), colors.Color(0.9, 0.9, 0.9)),  # พื้นหลังเทาอ่อน
+        ])
+        self.amount_text = ParagraphStyle(
+            'AmountTextStyle',
+            parent=sample['Normal'],
+            fontName=fonts.bold,
+            fontSize=16,
+            leading=16,
+            textColor=colors.black,
+            alignment=TA_LEFT,
+            spaceBefore=0.1 * cm,
+            leftIndent=6
+        )
+        # ข้อความรับรองของ template "รับเงินอื่น ๆ Online"
+        self.certification = ParagraphStyle(
+            'CertificationStyle',
+            parent=sample['Normal'],
+            fontName=fonts.regular,
+            fontSize=14,
+            leading=18,
+            textColor=colors.black,
+            alignment=TA_LEFT,
+            spaceBefore=0.2 * cm,
+            leftIndent=6,
+            firstLineIndent=1 * cm
+        )
+
+        # ลายเซ็น: ตารางชื่อ 5 แถว ในตารางกรอบที่จัดให้อยู่กึ่งกลาง
+        self.signature_table = TableStyle([
+            ('FONTNAME', (0, 0), (-1, -1), fonts.regular),
+            ('FONTSIZE', (0, 0), (-1, -1), 16),
+            ('ALIGN', (0, 0), (0, -1), 'CENTER'),
+            ('VALIGN', (0, 0), (-1, -1), 'MIDDLE'),
+        ])
+        self.signature_frame_table = TableStyle([
+            ('ALIGN', (1, 0), (1, 0), 'CENTER'),
+            ('VALIGN', (0, 0), (-1, -1), 'MIDDLE'),
+        ])
+
+        # ข้อความแทน QR Code เมื่อสร้างไม่ได้
+        self.qr_fallback = ParagraphStyle(
+            'QRStyle',
+            parent=sample['Normal'],
+            fontName=fonts.regular,
+            fontSize=10,
+            textColor=colors.black,
+            alignment=TA_CENTER
+        )
+
+
+class ReportStyles:
+    """style ของรายงาน PDF (รายงานใบสำคัญรับเงิน / รายงานสรุปรายรับ) — สร้างผ่าน report_styles()"""
+
+    def __init__(self, fonts):
+        sample = getSampleStyleSheet()
+
+        # หัวรายงานแบบไม่มี logo — รายงานใบสำคัญใช้ title/header, รายงานสรุปใช้ summary_title/summary_header
+        self.title = ParagraphStyle(
+            'TitleStyle',
+            parent=sample['Title'],
+            fontName=fonts.bold,
+            fontSize=18,
+            alignment=1,
+            spaceAfter=4
+        )
+        self.header = ParagraphStyle(
+            'HeaderStyle',
+            parent=sample['Normal'],
+            fontName=fonts.regular,
+            fontSize=12,
+            alignment=1,
+            spaceAfter=4
+        )
+        self.summary_title = ParagraphStyle(
+            'TitleStyle',
+            parent=self.title,
+            fontName=fonts.regular,
+            spaceAfter=20
+        )
+        self.summary_header = ParagraphStyle(
+            'HeaderStyle',
+            parent=self.header,
+            spaceAfter=10
+        )
+
+        # หัวรายงานแบบมี logo: Logo (ซ้าย) | ข้อมูลรายงาน (ขวา)
+        self.header_para = ParagraphStyle(
+            'HeaderPara',
+            parent=sample['Normal'],
+            fontName=fonts.regular,
+            fontSize=12,
+            alignment=1
+        )
+        self.header_table = TableStyle([
+            ('ALIGN', (0, 0), (0, 0), 'LEFT'),
+            ('ALIGN', (1, 0), (1, 0), 'CENTER'),
+            ('VALIGN', (0, 0), (-1, 0), 'TOP'),
+        ])
+
+        self.sub_header = ParagraphStyle(
+            'SubHeader',
+            parent=sample['Heading2'],
+            fontName=fonts.bold,
+            fontSize=14,
+            spaceAfter=4
+        )
+
+        # ตารางข้อมูล: หัวตารางพื้นเทา เส้นกรอบทุกช่อง คอลัมน์แรกชิดซ้าย
+        grid = [
+            ('FONTNAME', (0, 0), (-1, -1), fonts.regular),
+            ('FONTSIZE', (0, 0), (-1, -1), 10),
+            ('BACKGROUND', (0, 0), (-1, 0), colors.lightgrey),
+            ('TEXTCOLOR', (0, 0), (-1, 0), colors.black),
+            ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
+            ('ALIGN', (0, 1), (0, -1), 'LEFT'),
+        ]
+        grid_lines = [
+            ('GRID', (0, 0), (-1, -1), 1, colors.black),
+            ('VALIGN', (0, 0), (-1, -1), 'MIDDLE'),
+        ]
+        # สรุปยอดรวม: รายการ | จำนวน
+        self.summary_table = TableStyle(grid + [
+            ('ALIGN', (1, 1), (1, -1), 'RIGHT'),
+        ] + grid_lines)
+        # สรุปตามหน่วยงาน: ยอดเงินอยู่คอลัมน์ที่ 6
+        self.department_table = TableStyle(grid + [
+            ('ALIGN', (5, 1), (5, -1), 'RIGHT'),  # ยอดเงิน - ชิดขวา
+        ] + grid_lines)
+        # ตารางรายรับตามช่วงเวลา + แถวรวมท้ายตาราง
+        self.period_table = TableStyle(grid + [
+            ('ALIGN', (4, 1), (4, -1), 'RIGHT'),  # ยอดเงิน - ชิดขวา
+        ] + grid_lines + [
+            ('BACKGROUND', (0, -1), (-1, -1), colors.lightgrey),
+            ('FONTSIZE', (0, -1), (-1, -1), 12),
+            ('TEXTCOLOR', (0, -1), (-1, -1), colors.black),
+        ])
+
+        # ตารางรายการใบสำคัญ (ตามฟอร์มที่หน่วยงานกำหนด) + แถวรวมท้ายตาราง
+        self.cell = ParagraphStyle(
+            'CellStyle',
+            parent=sample['Normal'],
+            fontName=fonts.regular,
+            fontSize=10,
+            leading=12,  # ระยะห่างระหว่างบรรทัด
+            alignment=0  # ชิดซ้าย
+        )
+        receipt_rows = [
+            ('FONTNAME', (0, 0), (-1, -1), fonts.regular),
+            ('FONTSIZE', (0, 0), (-1, -1), 10),
+            ('BACKGROUND', (0, 0), (-1, 0), colors.lightgrey),
+            ('TEXTCOLOR', (0, 0), (-1, 0), colors.black),
+            ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
+            ('ALIGN', (4, 1), (4, -1), 'RIGHT'),  # จำนวนเงิน ชิดขวา
+            ('GRID', (0, 0), (-1, -1), 1, colors.black),
+            ('VALIGN', (0, 0), (-1, -1), 'MIDDLE'),
+            ('WORDWRAP', (0, 0), (-1, -1), True),  # ให้ข้อความขึ้นบรรทัดใหม่ได้
+        ]
+        # หน้าที่ยังไม่ถึงแถวรวม (PagedTable ใน accounts/pdf_tables.py)
+        self.receipt_table_body = TableStyle(receipt_rows + [
+            ('ALIGN', (3, 1), (3, -1), 'LEFT'),  # รายการ ชิดซ้าย
+            ('ALIGN', (5, 1), (6, -1), 'LEFT'),  # ผู้รับเงิน / ผู้จ่ายเงิน ชิดซ้าย
+        ])
+        self.receipt_table = TableStyle(receipt_rows + [
+            ('ALIGN', (3, 1), (3, -2), 'LEFT'),  # รายการ ชิดซ้าย
+            ('ALIGN', (5, 1), (5, -2), 'LEFT'),  # ผู้รับเงิน ชิดซ้าย
+            ('ALIGN', (6, 1), (6, -2), 'LEFT'),  # ผู้จ่ายเงิน ชิดซ้าย
+
+            # แถวรวม - merge cells และจัดรูปแบบ
+            ('SPAN', (0, -1), (1, -1)),  # Merge ลำดับ + ใบสำคัญเลขที่
+            ('SPAN', (2, -1), (3, -1)),  # Merge วันที่ขอ + รายการ
+            ('SPAN', (5, -1), (7, -1)),  # Merge ผู้รับเงิน + ผู้จ่ายเงิน + หมายเหตุ
+            ('BACKGROUND', (0, -1), (-1, -1), colors.lightgrey),
+            ('FONTNAME', (0, -1), (-1, -1), fonts.bold),  # ตัวหนา
+            ('FONTSIZE', (0, -1), (-1, -1), 12),
+            ('TEXTCOLOR', (0, -1), (-1, -1), colors.black),
+            ('ALIGN', (5, -1), (5, -1), 'LEFT'),  # หมายเหตุชิดซ้าย
+        ])
+        # พื้นหลังแถวที่ยกเลิก (สีเทาอ่อนกว่าหัวตาราง) — view เพิ่มคำสั่ง BACKGROUND ทีละแถวเอง
+        self.cancelled_row_background = colors.HexColor('#E8E8E8')
+        self.note = ParagraphStyle(
+            'NoteStyle',
+            parent=sample['Normal'],
+            fontName=fonts.regular,
+            fontSize=12,  # เท่ากับแถวรวม
+            alignment=0,  # ชิดซ้าย
+            leftIndent=10
+        )
+
+        # ลายเซ็นท้ายรายงาน (เยื้องขวา)
+        self.signature_table = TableStyle([
+            ('FONTNAME', (0, 0), (-1, -1), fonts.regular),
+            ('FONTSIZE', (0, 0), (-1, -1), 12),
+            ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
+            ('VALIGN', (0, 0), (-1, -1), 'MIDDLE'),
+            ('TOPPADDING', (0, 0), (-1, -1), 5),
+            ('BOTTOMPADDING', (0, 0), (-1, -1), 5),
+        ])
+        self.signature_align_table = TableStyle([
+            ('ALIGN', (1, 0), (1, 0), 'RIGHT'),
+            ('VALIGN', (0, 0), (-1, 0), 'TOP'),
+        ])
+
+
+@functools.lru_cache(maxsize=None)
+def receipt_styles(fonts):
+    """ReceiptStyles ของชุดฟอนต์นี้ (สร้างครั้งเดียว)"""
+    return ReceiptStyles(fonts)
+
+
+@functools.lru_cache(maxsize=None)
+def report_styles(fonts):
+    """ReportStyles ของชุดฟอนต์นี้ (สร้างครั้งเดียว)"""
+    return ReportStyles(fonts)
@@ -0,0 +1,122 @@
+"""
+ตารางยาวใน PDF รายงาน — จัดทีละหน้าแทนการจัดทั้งตารางในครั้งเดียว
+
+Table ของ ReportLab ที่ยาวเกินหน้าถูก split ทีละหน้า และทุกครั้งที่ split จะคำนวณความสูง/ตัดบรรทัด
+แถวที่เหลือทั้งหมดใหม่ เวลาจึงโตเร็วกว่าจำนวนแถว (รายงานทั้งปีงบประมาณหลายพันแถวใช้เวลาหลายวินาที)
+PagedTable เก็บแถวไว้เป็น list แล้วสร้าง Table ทีละก้อน (หัวตาราง + chunk_rows แถว) เท่าที่หน้าปัจจุบันใส่ได้
+แต่ละหน้าจึงคำนวณเฉพาะแถวในก้อนของตัวเอง และมีหัวตารางซ้ำทุกหน้า
+แถวเดียวที่สูงเกินทั้งหน้า (เช่น รายการหลายสิบบรรทัด) ถูกตัดกลางแถวข้ามหน้า (Table splitInRow) แทน LayoutError
+
+    table = PagedTable(headers, rows, col_widths, styles.receipt_table_body,
+                       footer=total_row, footer_style=styles.receipt_table,
+                       row_backgrounds={3: styles.cancelled_row_background})
+"""
+from reportlab.platypus import Flowable, Table
+
+
+class PagedTable(Flowable):
+    """
+    ตารางที่มีหัวตารางซ้ำทุกหน้า จัดหน้าทีละก้อน
+
+    แต่ละหน้า: สร้าง Table ของก้อนถัดไปเพื่อวัดความสูงแถว (ครั้งเดียว) → นับแถวที่ใส่หน้านี้ได้
+    → Table ของหน้านี้ใช้ความสูงที่วัดแล้ว (rowHeights) ไม่ต้องตัดบรรทัดใหม่ ก้อนถัดไปขนาดตามจำนวนแถวที่ได้ในหน้านี้
+
+    Args:
+        header: แถวหัวตาราง
+        rows: แถวข้อมูลทั้งหมด (list)
+        col_widths: ความกว้างคอลัมน์
+        style: TableStyle ของหน้าที่ไม่มีแถวท้ายตาราง (แถว 0 = หัวตาราง)
+        footer: แถวท้ายตาราง (เช่น แถวรวม) ต่อท้ายหน้าสุดท้าย — None = ไม่มี
+        footer_style: TableStyle ของหน้าที่มี footer (แถว -1 = footer)
+        row_backgrounds: {index ของแถวใน rows: สีพื้นหลัง}
+        chunk_rows: จำนวนแถวที่วัดในหน้าแรก — ถ้าหน้ายังไม่เต็มจะวัดเพิ่มเป็น 2 เท่า
+    """
+
+    def __init__(self, header, rows, col_widths, style, footer=None, footer_style=None,
+                 row_backgrounds=None, chunk_rows=50, start=0):
+        Flowable.__init__(self)
+        self.header = header
+        self.rows = rows
+        self.col_widths = col_widths
+        self.style = style
+        self.footer = footer
+        self.footer_style = footer_style or style
+        self.row_backgrounds = row_backgrounds or {}
+        self.chunk_rows = max(chunk_rows, 1)
+        self.start = start
+        self.hAlign = 'CENTER'
+        self._table = None
+        self._heights = None
+        self._deferred = False
+
+    def _build(self, end, with_footer, row_heights=None, split_in_row=False):
+        """Table ของหัวตาราง + แถว start ถึง end (+ footer)"""
+        data = [self.header] + self.rows[self.start:end]
+        if with_footer:
+            data.append(self.footer)
+        table = Table(data, colWidths=self.col_widths, rowHeights=row_heights, repeatRows=1,
+                      splitInRow=1 if split_in_row else 0)
+        table.setStyle(self.footer_style if with_footer else self.style)
+        backgrounds = []
+        for index in range(self.start, end):
+            color = self.row_backgrounds.get(index)
+            if color is not None:
+                row = index - self.start + 1
+                backgrounds.append(('BACKGROUND', (0, row), (-1, row), color))
+        if backgrounds:
+            table.setStyle(backgrounds)
+        return table
+
+    def wrap(self, availWidth, availHeight):
+        count = self.chunk_rows
+        while True:
+            end = min(self.start + count, len(self.rows))
+            last = end >= len(self.rows)
+            table = self._build(end, last and self.footer is not None)
+            width, height = table.wrap(availWidth, availHeight)
+            # ก้อนนี้ยังไม่เต็มหน้าและยังมีแถวเหลือ — วัดเพิ่มจนล้นหน้า (แล้ว split) หรือได้ครบทุกแถว
+            if last or height > availHeight:
+                break
+            count *= 2
+        self._table = table
+        self._heights = table._rowHeights
+        self.width, self.height = width, height
+        return width, height
+
+    def split(self, availWidth, availHeight):
+        if self._heights is None:
+            self.wrap(availWidth, availHeight)
+
+        # นับแถวข้อมูลที่ใส่หน้านี้ได้ (แถวท้ายตารางถ้ามีอยู่ใน _heights ด้วยแต่ไม่นับ — ไปหน้าถัดไป)
+        used = self._heights[0]
+        shown = 0
+        for height in self._heights[1:1 + len(self.rows) - self.start]:
+            if used + height > availHeight:
+                break
+            used += height
+            shown += 1
+        if shown == 0:
+            if not self._deferred:
+                # แถวแรกใส่ในที่ที่เหลือของหน้านี้ไม่ได้ — ย้ายไปเริ่มหน้าใหม่
+                self._deferred = True
+                return []
+            # หน้าใหม่ทั้งหน้ายังใส่แถวแรกไม่ได้ (แถวสูงเกินหน้า) — ตัดแถวนี้กลางแถว (splitInRow) ส่วนแรกลงหน้านี้
+            # ส่วนที่เหลือของแถวเป็น Table ที่ ReportLab split ต่อเองข้ามหน้า แล้วค่อยต่อด้วยแถวถัดไป
+            parts = self._build(self.start + 1, False, split_in_row=True).split(availWidth, availHeight)
+            if not parts:
+                return []
+            shown = 1
+        else:
+            parts = [self._build(self.start + shown, False, self._heights[:shown + 1])]
+
+        rest = PagedTable(
+            self.header, self.rows, self.col_widths, self.style,
+            footer=self.footer, footer_style=self.footer_style,
+            row_backgrounds=self.row_backgrounds,
+            chunk_rows=shown + max(shown // 4, 2),  # หน้าถัดไปมักได้จำนวนแถวใกล้เคียงกัน
+            start=self.start + shown,
+        )
+        return parts + [rest]
+
+    def draw(self):
+        self._table.drawOn(self.canv, 0, 0)
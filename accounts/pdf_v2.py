@@ -0,0 +1,238 @@
+"""
+PDF ใบสำคัญรับเงิน เวอร์ชัน 2 (HTML → PDF) ผ่าน backend ที่เปลี่ยนได้
+
+เดิม receipt_pdf_v2_view / receipt_pdf_v2_download_view เรียก pdfkit.from_string ซึ่ง spawn wkhtmltopdf ใหม่
+ทุก request และ path ของ binary ฝังเป็น C:\\Program Files\\... ใช้บน worker Linux ไม่ได้ ตอนนี้:
+
+    backend   เลือกด้วย RECEIPT_PDF_V2_BACKEND — 'wkhtmltopdf' หรือ 'reportlab' (ใช้ PDF ปกติเลย)
+              backend ใหม่: สืบทอด HTMLPDFBackend แล้วเพิ่มใน BACKENDS
+    pool      wkhtmltopdf แปลงได้ 1 เอกสารต่อ process จึงเตรียม process ที่เริ่มทำงานแล้ว (รอ HTML ทาง stdin)
+              ไว้ WKHTMLTOPDF_POOL_SIZE ตัว — request ไม่ต้องรอ process เริ่ม ใช้แล้วเติมตัวใหม่เบื้องหลัง
+    cache     PDF ที่ได้เก็บใน cache กลาง (utils/cache.py) ตาม hash ของ HTML ที่ render จากใบสำคัญ
+              ใบไหนข้อมูลเปลี่ยน HTML ก็เปลี่ยน → key ใหม่เอง ไม่ต้องสั่ง invalidate
+    fallback  backend ใช้ไม่ได้ (ไม่พบ binary) หรือแปลงไม่สำเร็จ → ส่ง PDF จาก ReportLab (pdf_generator.py) แทน
+
+    return render_receipt_pdf_v2(request, receipt, inline=True)
+"""
+import atexit
+import functools
+import hashlib
+import logging
+import queue
+import shutil
+import subprocess
+import threading
+from io import BytesIO
+
+from django.conf import settings
+from django.template.loader import render_to_string
+
+from utils import cache
+from utils.file_response import file_response
+
+
+logger = logging.getLogger(__name__)
+
+CACHE_NAMESPACE = 'receipt_pdf_v2'
+
+
+class PDFRenderError(Exception):
+    """backend แปลง HTML เป็น PDF ไม่สำเร็จ"""
+    pass
+
+
+class HTMLPDFBackend:
+    """
+    interface ของ backend แปลง HTML เป็น PDF
+
+    name      ชื่อที่ใช้ใน RECEIPT_PDF_V2_BACKEND และเป็นส่วนหนึ่งของ cache key
+    version   เปลี่ยนเมื่อ option การแปลงเปลี่ยน (PDF เดิมใน cache จะไม่ถูกใช้)
+    """
+
+    name = None
+    version = 1
+
+    def is_available(self):
+        return False
+
+    def start(self):
+        """เตรียม backend ให้พร้อม (เรียกครั้งเดียวตอนสร้างใน get_backend)"""
+        pass
+
+    def render(self, html):
+        """แปลง HTML (str) เป็น PDF (bytes) — ล้มเหลวให้ raise PDFRenderError"""
+        raise NotImplementedError
+
+    def close(self):
+        pass
+
+
+class WkhtmltopdfBackend(HTMLPDFBackend):
+    """wkhtmltopdf ผ่าน subprocess — อ่าน HTML จาก stdin เขียน PDF ออก stdout พร้อม pool ของ process ที่เตรียมไว้"""
+
+    name = 'wkhtmltopdf'
+
+    # option เดียวกับที่ส่งให้ pdfkit เดิม
+    OPTIONS = [
+        '--quiet',
+        '--page-size', 'A4',
+        '--encoding', 'UTF-8',
+        '--margin-top', '0.5in',
+        '--margin-right', '0.5in',
+        '--margin-bottom', '0.5in',
+        '--margin-left', '0.5in',
+        '--no-outline',
+        '--enable-local-file-access',
+        '--print-media-type',
+    ]
+
+    def __init__(self, binary, pool_size=2, timeout=30):
+        self.binary = binary
+        self.pool_size = max(pool_size, 0)
+        self.timeout = timeout
+        self._idle = queue.Queue()
+        self._refill_lock = threading.Lock()
+        self._closed = False
+
+    def is_available(self):
+        return bool(self.binary)
+
+    def _spawn(self):
+        return subprocess.Popen(
+            [self.binary, *self.OPTIONS, '-', '-'],
+            stdin=subprocess.PIPE, stdout=subprocess.PIPE, stderr=subprocess.PIPE,
+        )
+
+    def _take(self):
+        """process ที่พร้อมใช้จาก pool (ข้ามตัวที่ตายไปแล้ว) — pool ว่างก็ spawn ใหม่ตรงนั้น"""
+        while True:
+            try:
+                process = self._idle.get_nowait()
+            except queue.Empty:
+                return self._spawn()
+            if process.poll() is None:
+                return process
+
+    def start(self):
+        if self.pool_size:
+            threading.Thread(target=self._refill, daemon=True).start()
+
+    def _refill(self):
+        # ไม่ต้องรอกัน — ถ้ามี thread เติมอยู่แล้วก็ปล่อยให้ตัวนั้นเติมจนเต็ม
+        if not self._refill_lock.acquire(blocking=False):
+            return
+        try:
+            while not self._closed and self._idle.qsize() < self.pool_size:
+                self._idle.put(self._spawn())
+        except OSError as e:
+            logger.warning(f'wkhtmltopdf pool refill failed: {e}')
+        finally:
+            self._refill_lock.release()
+
+    def render(self, html):
+        try:
+            process = self._take()
+        except OSError as e:
+            raise PDFRenderError(f'เริ่ม wkhtmltopdf ไม่ได้: {e}')
+
+        self.start()
+
+        try:
+            pdf, stderr = process.communicate(html.encode('utf-8'), timeout=self.timeout)
+        except subprocess.TimeoutExpired:
+            process.kill()
+            process.communicate()
+            raise PDFRenderError(f'wkhtmltopdf ใช้เวลาเกิน {self.timeout} วินาที')
+
+        # wkhtmltopdf คืน exit code 1 ได้แม้ได้ PDF ครบ (เช่นโหลดรูปบางรูปไม่ได้) จึงตรวจจากเนื้อไฟล์ด้วย
+        if not pdf.startswith(b'%PDF'):
+            message = stderr.decode('utf-8', 'replace').strip()[-500:]
+            raise PDFRenderError(f'wkhtmltopdf exit {process.returncode}: {message}')
+        return pdf
+
+    def close(self):
+        self._closed = True
+        while True:
+            try:
+                process = self._idle.get_nowait()
+            except queue.Empty:
+                return
+            process.kill()
+            process.wait()
+
+
+def _wkhtmltopdf_backend():
+    binary = getattr(settings, 'WKHTMLTOPDF_PATH', '') or shutil.which('wkhtmltopdf')
+    return WkhtmltopdfBackend(
+        binary,
+        pool_size=getattr(settings, 'WKHTMLTOPDF_POOL_SIZE', 2),
+        timeout=getattr(settings, 'WKHTMLTOPDF_TIMEOUT', 30),
+    )
+
+
+# ชื่อ backend → ฟังก์ชันสร้าง ('reportlab' ไม่มีในนี้ = ใช้ PDF จาก pdf_generator.py)
+BACKENDS = {
+    'wkhtmltopdf': _wkhtmltopdf_backend,
+}
+
+
+@functools.lru_cache(maxsize=None)
+def get_backend():
+    """
+    backend ตาม RECEIPT_PDF_V2_BACKEND หนึ่งตัวต่อ process — None ถ้าต้องใช้ ReportLab แทน
+    """
+    name = getattr(settings, 'RECEIPT_PDF_V2_BACKEND', 'wkhtmltopdf')
+    factory = BACKENDS.get(name)
+    if factory is None:
+        if name != 'reportlab':
+            logger.warning(f'Unknown RECEIPT_PDF_V2_BACKEND {name!r}, using ReportLab')
+        return None
+
+    backend = factory()
+    if not backend.is_available():
+        logger.warning(f'PDF v2 backend {name!r} is not available, using ReportLab')
+        return None
+    backend.start()
+    atexit.register(backend.close)
+    return backend
+
+
+def render_receipt_html(request, receipt):
+    """HTML ของใบสำคัญสำหรับ PDF v2"""
+    context = {
+        'receipt': receipt,
+        'items': receipt.items.all().order_by('order'),
+        'qr_data': f"{receipt.receipt_number}",
+    }
+    return render_to_string('accounts/receipt_pdf_v2.html', context, request)
+
+
+def render_receipt_pdf_v2(request, receipt, inline=True):
+    """
+    HttpResponse ของ PDF v2 — ใช้ PDF ที่ cache ไว้ถ้า HTML เดิม ไม่งั้นแปลงด้วย backend
+
+    Args:
+        inline: True = แสดงในเบราว์เซอร์, False = download
+    """
+    backend = get_backend()
+    if backend is None:
+        from .pdf_generator import generate_receipt_pdf
+        return generate_receipt_pdf(receipt, inline=inline, request=request)
+
+    html = render_receipt_html(request, receipt)
+    digest = hashlib.sha256(html.encode('utf-8')).hexdigest()
+    try:
+        pdf = cache.get_or_set(
+            CACHE_NAMESPACE, (backend.name, backend.version, digest),
+            lambda: backend.render(html),
+            timeout=getattr(settings, 'RECEIPT_PDF_V2_CACHE_SECONDS', 3600),
+        )
+    except PDFRenderError as e:
+        logger.warning(f'PDF v2 render failed for receipt {receipt.id}, using ReportLab: {e}')
+        from .pdf_generator import generate_receipt_pdf
+        return generate_receipt_pdf(receipt, inline=inline, request=request)
+
+    filename_number = receipt.receipt_number if receipt.receipt_number else f'draft_{receipt.id}'
+    # PDF ที่ cache ไว้ได้ byte เดิมทุก request — รองรับ Range ด้วย ETag จากเนื้อหา
+    return file_response(request, BytesIO(pdf), f'receipt_{filename_number}_v2.pdf', 'application/pdf',
+                         as_attachment=not inline, etag=hashlib.sha256(pdf).hexdigest())
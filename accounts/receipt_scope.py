@@ -0,0 +1,185 @@
+"""
+ขอบเขตใบสำคัญรับเงินที่ผู้ใช้มองเห็นได้ (ReceiptScope) และตัวกรองจาก query string (ReceiptFilters)
+
+เดิมแต่ละ view/exporter เขียนบล็อกเลือก scope เอง (receipt_view_all / receipt_view_department /
+ของตัวเอง) และอ่าน date_from, date_to, department, status, q เองทุกที่ ตอนนี้ใช้ร่วมกันจากที่นี่
+
+    scope = ReceiptScope.for_request(request)       # ตรวจสิทธิ์ครั้งเดียว จำไว้บน request
+    receipts = scope.receipts()                     # รายการใบสำคัญ / แดชบอร์ด
+    receipts = scope.report_receipts()              # รายงาน/ส่งออก: เฉพาะใบที่มีเลขที่แล้ว
+    filters = scope.filters(request.GET)
+    receipts = filters.apply(receipts)
+"""
+from datetime import datetime
+
+from django.db.models import Q
+
+from .models import Department, Receipt
+
+
+class ReceiptFilters:
+    """
+    ตัวกรองใบสำคัญจาก query string — สร้างผ่าน ReceiptScope.filters()
+
+    ค่าดิบ (date_from, date_to, department, status, q) ส่งกลับไปแสดงในฟอร์มได้ตรง ๆ
+    วันที่ที่อ่านไม่ได้ถูกข้าม และเก็บชื่อช่องไว้ใน invalid_dates ให้ view แจ้งเตือนเองถ้าต้องการ
+    """
+
+    def __init__(self, params, allow_department):
+        self.date_from = params.get('date_from') or ''
+        self.date_to = params.get('date_to') or ''
+        self.department = params.get('department') or ''
+        self.status = params.get('status') or ''
+        self.q = (params.get('q') or '').strip()
+
+        self.invalid_dates = []
+        self.start_date = self._parse_date('date_from')
+        self.end_date = self._parse_date('date_to')
+        # กรองหน่วยงานได้เฉพาะผู้ที่ดูได้ทุกหน่วยงาน — คนอื่นถูกจำกัดที่หน่วยงานตัวเองอยู่แล้ว
+        self.department_id = Department.get_id_by_name(self.department) if self.department and allow_department else None
+        self.filter_department = bool(self.department and allow_department)
+
+    def _parse_date(self, field):
+        value = getattr(self, field)
+        if not value:
+            return None
+        try:
+            return datetime.strptime(value, '%Y-%m-%d').date()
+        except ValueError:
+            self.invalid_dates.append(field)
+            return None
+
+    @property
+    def has_date_range(self):
+        """มีการระบุช่วงวันที่เอง (รายงานสรุปใช้แทนช่วงเวลาอัตโนมัติ)"""
+        return bool(self.date_from or self.date_to)
+
+    @property
+    def applied(self):
+        """มีตัวกรองที่มีผลจริงอย่างน้อยหนึ่งตัว"""
+        return bool(self.start_date or self.end_date or self.filter_department or self.status or self.q)
+
+    def apply(self, receipts, status=True, search=True):
+        """
+        กรอง queryset ใบสำคัญ
+
+        Args:
+            receipts: queryset จาก ReceiptScope
+            status: กรองตามสถานะด้วย (รายงานสรุปไม่ใช้)
+            search: ค้นหาเลขที่/ชื่อผู้รับเงินด้วย (รายงานสรุปไม่ใช้)
+        """
+        if self.start_date:
+            receipts = receipts.filter(receipt_date__gte=self.start_date)
+        if self.end_date:
+            receipts = receipts.filter(receipt_date__lte=self.end_date)
+        if self.filter_department:
+            receipts = receipts.filter(department_id=self.department_id)
+        if status and self.status:
+            receipts = receipts.filter(status=self.status)
+        if search and self.q:
+            receipts = receipts.filter(
+                Q(receipt_number__icontains=self.q) |
+                Q(recipient_name__icontains=self.q)
+            )
+        return receipts
+
+
+class ReceiptScope:
+    """
+    ขอบเขตใบสำคัญของผู้ใช้หนึ่งคน — ตรวจสิทธิ์ที่เกี่ยวข้องครั้งเดียวตอนสร้าง
+
+    ระดับ (level):
+        ALL         receipt_view_all         ทุกหน่วยงาน
+        DEPARTMENT  receipt_view_department  หน่วยงานของตัวเอง
+        OWN         อื่น ๆ                   เฉพาะใบที่ตัวเองสร้าง
+
+    รายงาน/ส่งออกใช้แค่ 2 ระดับ: ทุกหน่วยงาน (ALL) หรือหน่วยงานของตัวเอง
+    """
+
+    ALL = 'all'
+    DEPARTMENT = 'department'
+    OWN = 'own'
+
+    REQUEST_ATTR = '_receipt_scope'
+
+    def __init__(self, user):
+        self.user = user
+        self.can_view_all = user.has_permission('receipt_view_all')
+        self.can_view_department = user.has_permission('receipt_view_department')
+        self.can_view_own = user.has_permission('receipt_view_own')
+        self.can_view_reports = (
+            self.can_view_all or self.can_view_department or user.has_permission('report_view')
+        )
+        self.department_name = user.get_department()
+        self.department_id = user.get_department_id()
+
+        if self.can_view_all:
+            self.level = self.ALL
+        elif self.can_view_department:
+            self.level = self.DEPARTMENT
+        else:
+            self.level = self.OWN
+
+    @classmethod
+    def for_request(cls, request):
+        """scope ของ request.user — สร้างครั้งแรกที่เรียก แล้วใช้ซ้ำตลอด request"""
+        scope = getattr(request, cls.REQUEST_ATTR, None)
+        if scope is None or scope.user is not request.user:
+            scope = cls(request.user)
+            setattr(request, cls.REQUEST_ATTR, scope)
+        return scope
+
+    @property
+    def sees_department(self):
+        """ดูใบสำคัญของคนอื่นได้ (ระดับหน่วยงานขึ้นไป)"""
+        return self.level != self.OWN
+
+    @property
+    def label(self):
+        """ข้อความบอกขอบเขตในหน้ารายการ"""
+        if self.level == self.ALL:
+            return 'ทั้งหมด'
+        if self.level == self.DEPARTMENT:
+            return f'หน่วยงาน: {self.department_name}'
+        return 'ของฉัน'
+
+    @property
+    def report_label(self):
+        """ข้อความบอกขอบเขตในรายงาน/ไฟล์ส่งออก"""
+        if self.can_view_all:
+            return 'ทุกหน่วยงาน'
+        return f'หน่วยงาน: {self.department_name}'
+
+    def receipts(self):
+        """ใบสำคัญทุกสถานะที่ผู้ใช้มองเห็นได้"""
+        if self.level == self.ALL:
+            return Receipt.objects.all()
+        if self.level == self.DEPARTMENT:
+            return Receipt.objects.filter(department_id=self.department_id)
+        return Receipt.objects.filter(created_by=self.user)
+
+    def can_view(self, receipt):
+        """ดูใบสำคัญนี้ได้หรือไม่ (หน้ารายละเอียด / PDF)"""
+        if self.can_view_all:
+            return True
+        if self.can_view_department and receipt.department_id == self.department_id:
+            return True
+        return self.can_view_own and receipt.created_by_id == self.user.pk
+
+    def report_receipts(self):
+        """ใบสำคัญสำหรับรายงาน/ส่งออก — เฉพาะใบที่ผ่านกระบวนการทางบัญชีแล้ว (มีเลขที่เอกสาร)"""
+        receipts = Receipt.objects.exclude(receipt_number__isnull=True).exclude(receipt_number='')
+        if not self.can_view_all:
+            receipts = receipts.filter(department_id=self.department_id)
+        return receipts
+
+    def report_departments(self):
+        """หน่วยงานที่แสดงในรายงาน (ตัวเลือกตัวกรอง / สรุปรายหน่วยงาน)"""
+        departments = Department.objects.filter(is_active=True)
+        if not self.can_view_all:
+            departments = departments.filter(pk=self.department_id)
+        return departments
+
+    def filters(self, params):
+        """อ่านตัวกรองจาก query string ตามสิทธิ์ของ scope นี้"""
+        return ReceiptFilters(params, allow_department=self.can_view_all)
@@ -0,0 +1,198 @@
+"""
+ข้อมูลสรุปรายรับ — ใช้ร่วมกันระหว่างหน้ารายงานสรุปรายรับ, ส่งออก Excel และส่งออก PDF
+
+เดิม revenue_summary_report_view, revenue_summary_excel_export และ revenue_summary_pdf_export มีโค้ดสรุปชุดเดียวกัน
+คนละชุด และนับ/รวมยอดทีละหน่วยงานทีละช่วงเวลา (5 query ต่อแถว — ช่วงวันที่กำหนดเองทั้งปีงบประมาณเกิน 1,800 query)
+ทุกครั้งที่เปิดหน้าหรือส่งออก ตอนนี้:
+
+    - ยอดรวม, รายหน่วยงาน และรายวัน ได้จาก aggregate แบบ group อย่างละ 1 query แล้วรวมเป็นช่วงเวลาใน Python
+    - ผลเก็บใน cache กลางตามขอบเขตรายงาน + ตัวกรอง + วันที่ปัจจุบัน หน้าเว็บกับไฟล์ส่งออกที่กดต่อกันจึงใช้ผลชุดเดียวกัน
+      (ผู้ใช้หน่วยงานเดียวกันก็ใช้ร่วมกัน) ใบสำคัญหรือหน่วยงานเปลี่ยน → ล้างทั้ง namespace (accounts/signals.py)
+
+    summary = get_revenue_summary(scope, filters, period_type)
+    summary['total_summary'], summary['department_summary'], summary['period_summary']
+"""
+from bisect import bisect_right
+from datetime import date, timedelta
+
+from django.conf import settings
+from django.db.models import Count, Q, Sum
+from django.utils import timezone
+
+from utils.cache import get_or_set
+from utils.fiscal_year import get_current_fiscal_year, get_fiscal_year_dates
+
+
+REVENUE_SUMMARY_CACHE_NAMESPACE = 'revenue_summary'
+
+THAI_MONTHS = ['ม.ค.', 'ก.พ.', 'มี.ค.', 'เม.ย.', 'พ.ค.', 'มิ.ย.',
+               'ก.ค.', 'ส.ค.', 'ก.ย.', 'ต.ค.', 'พ.ย.', 'ธ.ค.']
+
+
+def _status_aggregates():
+    """นับทุกสถานะ + ยอดเงินเฉพาะใบที่เสร็จสิ้น"""
+    return {
+        'count': Count('id'),
+        'completed_count': Count('id', filter=Q(status='completed')),
+        'cancelled_count': Count('id', filter=Q(status='cancelled')),
+        'draft_count': Count('id', filter=Q(status='draft')),
+        'amount': Sum('total_amount', filter=Q(status='completed')),
+    }
+
+
+def summary_periods(period_type, filters, now):
+    """
+    ช่วงเวลาของตารางรายรับ เรียงจากเก่าไปใหม่
+
+    Returns:
+        list ของ (ป้ายชื่อ, วันแรก, วันสุดท้าย) — รายวันใช้ date เป็นป้ายชื่อ (ให้ template ใช้ thai_date filter)
+    """
+    periods = []
+    if filters.has_date_range:
+        # โหมดกำหนดเอง - รายวันตามช่วงที่กำหนด
+        if filters.start_date and filters.end_date:
+            start_date, end_date = filters.start_date, filters.end_date
+        elif filters.start_date:
+            start_date, end_date = filters.start_date, now.date()  # จนถึงวันนี้
+        elif filters.end_date:
+            end_date = filters.end_date
+            start_date = end_date - timedelta(days=30)  # ย้อนหลัง 30 วัน
+        else:
+            # วันที่อ่านไม่ได้ทั้งคู่
+            start_date, end_date = now.date() - timedelta(days=30), now.date()
+
+        current_date = start_date
+        while current_date <= end_date:
+            periods.append((current_date, current_date, current_date))
+            current_date += timedelta(days=1)
+
+    elif period_type == 'daily':
+        # รายวัน (30 วันล่าสุด)
+        for i in range(29, -1, -1):
+            current_date = (now - timedelta(days=i)).date()
+            periods.append((current_date, current_date, current_date))
+
+    elif period_type == 'monthly':
+        # รายเดือน (12 เดือนล่าสุด)
+        for i in range(11, -1, -1):
+            target_month = now.month - i
+            target_year = now.year
+            while target_month <= 0:
+                target_month += 12
+                target_year -= 1
+
+            month_start_date = date(target_year, target_month, 1)
+            if target_month == 12:
+                month_end_date = date(target_year + 1, 1, 1)
+            else:
+                month_end_date = date(target_year, target_month + 1, 1)
+            label = f"{THAI_MONTHS[target_month - 1]} {target_year + 543}"
+            periods.append((label, month_start_date, month_end_date - timedelta(days=1)))
+
+    elif period_type == 'fiscal_year':
+        # รายปีงบประมาณ (5 ปีล่าสุด)
+        current_fiscal = get_current_fiscal_year()
+        for i in range(4, -1, -1):
+            fiscal_year = current_fiscal - i
+            fiscal_start, fiscal_end = get_fiscal_year_dates(fiscal_year)
+            periods.append((f"ปีงบ {fiscal_year}", fiscal_start, fiscal_end))
+
+    return periods
+
+
+def build_revenue_summary(receipts, departments, periods):
+    """
+    สรุปรายรับจาก queryset ใบสำคัญ (ไม่ผ่าน cache)
+
+    Args:
+        receipts: ใบสำคัญที่กรองหน่วยงาน/วันที่แล้ว (ทุกสถานะ)
+        departments: หน่วยงานที่แสดงในสรุปรายหน่วยงาน (ตามลำดับนี้ก่อนเรียงตามยอดเงิน)
+        periods: ผลจาก summary_periods()
+    """
+    # สรุปรวมทั้งหมด - นับทุกสถานะ ยอดเงินเฉพาะเสร็จสิ้น
+    totals = receipts.aggregate(**_status_aggregates(), departments=Count('department', distinct=True))
+    total_summary = {
+        'total_amount': totals['amount'] or 0,
+        'total_count': totals['count'],
+        'completed_count': totals['completed_count'],
+        'cancelled_count': totals['cancelled_count'],
+        'draft_count': totals['draft_count'],
+        'total_departments': totals['departments'],
+    }
+
+    # สรุปตามหน่วยงาน (แสดงเฉพาะหน่วยงานที่มีข้อมูล) เรียงตามยอดเงิน
+    by_department = {
+        row['department']: row
+        for row in receipts.values('department').annotate(**_status_aggregates()).order_by()
+    }
+    department_summary = []
+    for dept in departments:
+        row = by_department.get(dept.pk)
+        if not row or not row['count']:
+            continue
+        amount = row['amount'] or 0
+        department_summary.append({
+            'department': dept.name,
+            'department_code': dept.code,
+            'count': row['count'],  # รวมทุกสถานะ
+            'completed_count': row['completed_count'],
+            'cancelled_count': row['cancelled_count'],
+            'draft_count': row['draft_count'],
+            'amount': amount,
+            'percentage': round((amount / total_summary['total_amount'] * 100) if total_summary['total_amount'] > 0 else 0, 1)
+        })
+    department_summary.sort(key=lambda x: x['amount'], reverse=True)
+
+    # สรุปตามช่วงเวลา - รวมยอดรายวันเข้าช่วงของตัวเอง
+    period_summary = [
+        {'period': label, 'count': 0, 'completed_count': 0, 'cancelled_count': 0, 'draft_count': 0, 'amount': 0}
+        for label, _, _ in periods
+    ]
+    if periods:
+        starts = [start for _, start, _ in periods]
+        daily = receipts.filter(
+            receipt_date__gte=periods[0][1], receipt_date__lte=periods[-1][2],
+        ).values('receipt_date').annotate(**_status_aggregates()).order_by()
+        for row in daily:
+            index = bisect_right(starts, row['receipt_date']) - 1
+            if index < 0 or row['receipt_date'] > periods[index][2]:
+                continue
+            bucket = period_summary[index]
+            for field in ('count', 'completed_count', 'cancelled_count', 'draft_count'):
+                bucket[field] += row[field]
+            if row['amount'] is not None:
+                bucket['amount'] += row['amount']
+
+    return {
+        'total_summary': total_summary,
+        'department_summary': department_summary,
+        'period_summary': period_summary,
+    }
+
+
+def get_revenue_summary(scope, filters, period_type):
+    """
+    สรุปรายรับตามขอบเขตของผู้ใช้และตัวกรองรายงานสรุป (cache ไว้ REVENUE_SUMMARY_CACHE_SECONDS วินาที)
+
+    Args:
+        scope: ReceiptScope ของผู้ใช้
+        filters: ReceiptFilters จาก scope.filters(request.GET)
+        period_type: 'daily', 'monthly' หรือ 'fiscal_year' (ไม่มีผลเมื่อระบุช่วงวันที่เอง)
+    """
+    now = timezone.now()
+    # รายงานขึ้นกับขอบเขต (ทุกหน่วยงาน / หน่วยงานเดียว) ไม่ใช่ตัวผู้ใช้
+    scope_key = 'all' if scope.can_view_all else f'department:{scope.department_id}'
+    key_parts = (
+        scope_key, period_type, filters.has_date_range, filters.start_date, filters.end_date,
+        filters.department_id if filters.filter_department else None, now.date(),
+    )
+
+    def build():
+        receipts = filters.apply(scope.report_receipts(), status=False, search=False)
+        periods = summary_periods(period_type, filters, now)
+        return build_revenue_summary(receipts, scope.report_departments(), periods)
+
+    return get_or_set(
+        REVENUE_SUMMARY_CACHE_NAMESPACE, key_parts, build,
+        timeout=getattr(settings, 'REVENUE_SUMMARY_CACHE_SECONDS', 300),
+    )
@@ -0,0 +1,66 @@
+"""
+Signal handlers ของแอป accounts (ลงทะเบียนใน AccountsConfig.ready)
+
+ล้าง cache ด้วย transaction.on_commit — ถ้าล้างใน post_save ทันที request อื่นที่อ่านก่อน transaction commit
+จะเติม cache ด้วยข้อมูลเก่ากลับเข้าไปใน version ใหม่ (นอก transaction on_commit เรียกทันที)
+"""
+from django.db import transaction
+from django.db.models.signals import m2m_changed, post_delete, post_save
+from django.dispatch import receiver
+
+from .models import (
+    DEPARTMENT_CACHE_NAMESPACE, Department, DocumentVolume, Permission, Receipt, ReceiptTemplate, Role, UserRole,
+    active_receipt_templates, invalidate_permission_names,
+)
+
+
+@receiver(post_save, sender=DocumentVolume)
+@receiver(post_delete, sender=DocumentVolume)
+@receiver(post_save, sender=Department)
+@receiver(post_delete, sender=Department)
+def invalidate_fiscal_year_cache(sender, **kwargs):
+    """ล้าง cache สรุปเล่มเอกสาร/การแจ้งเตือนปีงบประมาณ (utils/fiscal_year_info.py)"""
+    from utils.cache import invalidate_namespace
+    from utils.fiscal_year_info import FISCAL_YEAR_CACHE_NAMESPACE
+
+    transaction.on_commit(lambda: invalidate_namespace(FISCAL_YEAR_CACHE_NAMESPACE))
+
+
+@receiver(post_save, sender=Department)
+@receiver(post_delete, sender=Department)
+def invalidate_department_id_map(sender, **kwargs):
+    """ล้าง cache แผนที่ ชื่อหน่วยงาน → id (Department.get_id_map)"""
+    from utils.cache import invalidate_namespace
+
+    transaction.on_commit(lambda: invalidate_namespace(DEPARTMENT_CACHE_NAMESPACE))
+
+
+@receiver(post_save, sender=Receipt)
+@receiver(post_delete, sender=Receipt)
+@receiver(post_save, sender=Department)
+@receiver(post_delete, sender=Department)
+def invalidate_revenue_summary(sender, **kwargs):
+    """ล้าง cache สรุปรายรับ (accounts/revenue_summary.py)"""
+    from utils.cache import invalidate_namespace
+    from accounts.revenue_summary import REVENUE_SUMMARY_CACHE_NAMESPACE
+
+    transaction.on_commit(lambda: invalidate_namespace(REVENUE_SUMMARY_CACHE_NAMESPACE))
+
+
+@receiver(post_save, sender=Permission)
+@receiver(post_delete, sender=Permission)
+@receiver(post_save, sender=Role)
+@receiver(post_delete, sender=Role)
+@receiver(post_save, sender=UserRole)
+@receiver(post_delete, sender=UserRole)
+@receiver(m2m_changed, sender=Role.permissions.through)
+def invalidate_permission_cache(sender, **kwargs):
+    """ล้าง cache ชุดสิทธิ์ของผู้ใช้ (permission_names_for_user)"""
+    invalidate_permission_names()
+
+
+@receiver(post_save, sender=ReceiptTemplate)
+@receiver(post_delete, sender=ReceiptTemplate)
+def invalidate_receipt_templates(sender, **kwargs):
+    """ล้าง cache รายการสำเร็จรูปที่เปิดใช้ (active_receipt_templates)"""
+    transaction.on_commit(active_receipt_templates.invalidate)
@@ -0,0 +1,22 @@
+"""
+view ของแอป accounts แยกตามหน้าที่
+
+    auth               เข้าสู่ระบบ/ออกจากระบบ, แดชบอร์ด
+    users              จัดการผู้ใช้, สร้างผู้ใช้แบบ manual, ดึงข้อมูลจาก NPU ใหม่
+    roles              บทบาทและสิทธิ์
+    departments        หน่วยงาน และเล่มเอกสาร
+    receipts           สร้าง/แก้ไข/ดูใบสำคัญรับเงิน
+    receipt_templates  Template รายการในใบสำคัญ
+    receipt_pdf        PDF ใบสำคัญรับเงิน
+    public             ตรวจสอบใบสำคัญจาก QR code (ไม่ต้องเข้าสู่ระบบ)
+    edit_requests      คำร้องขอแก้ไข
+    cancel_requests    ยกเลิกใบสำคัญ / คำขอยกเลิก
+    approvals          อนุมัติ/ปฏิเสธหลายรายการพร้อมกัน
+    reports            หน้ารายงาน
+    exports            ส่งออกรายงานเป็น Excel/PDF
+    audit              audit log และประวัติการใช้งาน
+
+ไฟล์นี้จงใจไม่ import โมดูลย่อย — urls.py อ้างถึง view ด้วย lazy_view('accounts.views.<โมดูล>.<ชื่อ>')
+โมดูลย่อยจึงถูกโหลดเมื่อมีคนเปิดหน้านั้นครั้งแรกเท่านั้น
+ขอบเขตใบสำคัญที่ผู้ใช้มองเห็นได้ (ทั้งหมด/หน่วยงาน/ของตัวเอง) ใช้ ReceiptScope ใน accounts/receipt_scope.py
+"""
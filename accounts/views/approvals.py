@@ -0,0 +1,117 @@
+"""
+อนุมัติ/ปฏิเสธคำร้องขอแก้ไขและคำขอยกเลิกหลายรายการพร้อมกัน
+"""
+from decimal import InvalidOperation
+
+from django.contrib.auth.decorators import login_required
+from django.http import JsonResponse
+import json
+
+from ..models import ReceiptEditRequest
+
+
+# จำนวนคำร้องสูงสุดต่อการกดครั้งเดียว
+APPROVAL_BATCH_LIMIT = 100
+
+
+@login_required
+def approval_batch_ajax(request, kind):
+    """
+    อนุมัติ/ปฏิเสธคำร้องขอแก้ไข (kind='edit') หรือคำขอยกเลิก (kind='cancel') หลายรายการในครั้งเดียว
+
+    POST JSON: {"ids": [...], "action": "approve" | "reject", "notes": "..."}
+
+    ตรวจสิทธิ์ทุกรายการด้วยสิทธิ์ที่โหลดไว้ครั้งเดียว (annotate_can_approve) แล้วดำเนินการ
+    รายการที่ผ่านทั้งหมดใน transaction เดียว ผลลัพธ์แยกรายรายการใน results
+    """
+    from accounts.models import ReceiptCancelRequest
+
+    if request.method != 'POST':
+        return JsonResponse({'success': False, 'message': 'Method not allowed'}, status=405)
+
+    models_by_kind = {'edit': ReceiptEditRequest, 'cancel': ReceiptCancelRequest}
+    model = models_by_kind.get(kind)
+    if model is None:
+        return JsonResponse({'success': False, 'message': 'ประเภทคำร้องไม่ถูกต้อง'}, status=404)
+
+    try:
+        data = json.loads(request.body)
+    except json.JSONDecodeError:
+        return JsonResponse({'success': False, 'message': 'ข้อมูลไม่ถูกต้อง'}, status=400)
+
+    action = data.get('action')
+    notes = (data.get('notes') or '').strip()
+    if action not in ('approve', 'reject'):
+        return JsonResponse({'success': False, 'message': 'กรุณาเลือกการดำเนินการ'}, status=400)
+    if action == 'reject' and kind == 'edit' and not notes:
+        return JsonResponse({'success': False, 'message': 'กรุณาระบุเหตุผลในการปฏิเสธ'}, status=400)
+
+    try:
+        ids = list(dict.fromkeys(int(request_id) for request_id in data.get('ids', [])))
+    except (ValueError, TypeError):
+        return JsonResponse({'success': False, 'message': 'รายการคำร้องไม่ถูกต้อง'}, status=400)
+    if not ids:
+        return JsonResponse({'success': False, 'message': 'กรุณาเลือกคำร้องอย่างน้อย 1 รายการ'}, status=400)
+    if len(ids) > APPROVAL_BATCH_LIMIT:
+        return JsonResponse({
+            'success': False,
+            'message': f'เลือกได้ไม่เกิน {APPROVAL_BATCH_LIMIT} รายการต่อครั้ง'
+        }, status=400)
+
+    found = model.objects.select_related('receipt').in_bulk(ids)
+    requests_to_check = model.annotate_can_approve(found.values(), request.user)
+
+    results = {}
+    eligible = []
+    for item in requests_to_check:
+        if item.status != 'pending':
+            results[item.pk] = ('not_pending', 'คำร้องนี้ได้รับการพิจารณาแล้ว')
+        elif not item.can_approve:
+            results[item.pk] = ('forbidden', 'คุณไม่มีสิทธิ์พิจารณาคำร้องนี้')
+        else:
+            eligible.append(item)
+
+    if kind == 'cancel' and action == 'approve' and eligible:
+        blocked = ReceiptCancelRequest.find_blocked(eligible)
+        for item in eligible:
+            if item.pk in blocked:
+                results[item.pk] = ('blocked', blocked[item.pk])
+        eligible = [item for item in eligible if item.pk not in blocked]
+
+    if eligible:
+        try:
+            # approve_many / reject_many ทำทุกรายการใน transaction เดียว (สำเร็จทั้งหมดหรือไม่บันทึกเลย)
+            if action == 'approve':
+                model.approve_many(eligible, request.user, notes)
+            else:
+                model.reject_many(eligible, request.user, notes)
+        except ValueError as e:
+            # มีคนพิจารณาบางรายการไปก่อนระหว่างนี้ — ไม่มีอะไรถูกบันทึก ให้โหลดหน้าใหม่แล้วลองอีกครั้ง
+            return JsonResponse({'success': False, 'message': str(e)}, status=409)
+        except InvalidOperation:
+            # new_items_data ของบางคำร้องแปลงเป็นจำนวนเงินไม่ได้ — ไม่มีอะไรถูกบันทึก
+            return JsonResponse({
+                'success': False,
+                'message': 'ข้อมูลรายการในคำร้องไม่ถูกต้อง ไม่สามารถอนุมัติได้'
+            }, status=400)
+        done_status = 'approved' if action == 'approve' else 'rejected'
+        for item in eligible:
+            results[item.pk] = (done_status, '')
+
+    response_items = []
+    for request_id in ids:
+        item = found.get(request_id)
+        status, message = results.get(request_id, ('not_found', 'ไม่พบคำร้อง'))
+        response_items.append({
+            'id': request_id,
+            'request_number': item.request_number if item else '',
+            'status': status,
+            'message': message,
+        })
+
+    return JsonResponse({
+        'success': True,
+        'processed': len(eligible),
+        'message': f'{"อนุมัติ" if action == "approve" else "ปฏิเสธ"}แล้ว {len(eligible)} จาก {len(ids)} รายการ',
+        'results': response_items,
+    })
@@ -0,0 +1,167 @@
+"""
+ประวัติการเปลี่ยนแปลงใบสำคัญ (audit log) และประวัติการใช้งานของผู้ใช้
+"""
+from django.shortcuts import render, redirect
+from django.contrib.auth.decorators import login_required
+from django.contrib import messages
+from django.core.paginator import Paginator
+from django.db.models import Q
+
+from ..models import Department, ReceiptChangeLog, User, UserActivityLog
+
+
+@login_required
+def audit_log_view(request):
+    """
+    หน้าแสดงประวัติการเปลี่ยนแปลงทั้งหมด (Audit Log)
+    สำหรับ Admin และผู้มีสิทธิ์
+    """
+    from django.core.paginator import Paginator
+    from django.db.models import Q
+
+    # ตรวจสอบสิทธิ์ (อนุญาตเฉพาะ Admin หรือ Department Manager)
+    if not (request.user.has_permission('receipt_view_all') or request.user.is_staff):
+        messages.error(request, 'คุณไม่มีสิทธิ์เข้าถึงหน้านี้')
+        return redirect('dashboard')
+
+    # Get filter parameters
+    action_filter = request.GET.get('action', '')
+    department_filter = request.GET.get('department', '')
+    user_filter = request.GET.get('user', '')
+    date_from = request.GET.get('date_from', '')
+    date_to = request.GET.get('date_to', '')
+    search_query = request.GET.get('q', '')
+
+    # Base queryset
+    logs = ReceiptChangeLog.objects.select_related('receipt', 'user', 'edit_request').all()
+
+    # Apply filters
+    if action_filter:
+        logs = logs.filter(action=action_filter)
+
+    if department_filter:
+        logs = logs.filter(receipt__department__id=department_filter)
+
+    if user_filter:
+        logs = logs.filter(user__id=user_filter)
+
+    if date_from:
+        from datetime import datetime
+        logs = logs.filter(created_at__gte=datetime.strptime(date_from, '%Y-%m-%d'))
+
+    if date_to:
+        from datetime import datetime
+        logs = logs.filter(created_at__lte=datetime.strptime(date_to, '%Y-%m-%d').replace(hour=23, minute=59, second=59))
+
+    if search_query:
+        logs = logs.filter(
+            Q(receipt__receipt_number__icontains=search_query) |
+            Q(user__full_name__icontains=search_query) |
+            Q(notes__icontains=search_query)
+        )
+
+    # Pagination
+    paginator = Paginator(logs.order_by('-created_at'), 50)
+    page_number = request.GET.get('page')
+    page_obj = paginator.get_page(page_number)
+
+    # Get filter options
+    departments = Department.objects.filter(is_active=True).order_by('name')
+    actions = ReceiptChangeLog.ACTION_CHOICES
+
+    # Get users who have made changes
+    from django.db.models import Count
+    active_users = User.objects.filter(
+        id__in=ReceiptChangeLog.objects.values_list('user_id', flat=True).distinct()
+    ).order_by('full_name')
+
+    context = {
+        'title': 'ประวัติการเปลี่ยนแปลง (Audit Log)',
+        'logs': page_obj,
+        'departments': departments,
+        'actions': actions,
+        'active_users': active_users,
+        'action_filter': action_filter,
+        'department_filter': department_filter,
+        'user_filter': user_filter,
+        'date_from': date_from,
+        'date_to': date_to,
+        'search_query': search_query,
+        'total_count': logs.count(),
+    }
+
+    return render(request, 'accounts/audit_log.html', context)
+
+
+@login_required
+def user_activity_log_view(request):
+    """
+    หน้าแสดงประวัติการใช้งานระบบ (User Activity Log)
+    สำหรับผู้ดูแลระบบเท่านั้น
+    """
+    # Permission check - Admin only
+    if not (request.user.is_staff or request.user.is_superuser or request.user.has_permission('report_view')):
+        messages.error(request, 'คุณไม่มีสิทธิ์เข้าถึงหน้านี้ (เฉพาะผู้ดูแลระบบ)')
+        return redirect('dashboard')
+
+    # Get all activity logs
+    logs = UserActivityLog.objects.select_related('user').all()
+
+    # Filter by action
+    action_filter = request.GET.get('action', '')
+    if action_filter:
+        logs = logs.filter(action=action_filter)
+
+    # Filter by user
+    user_filter = request.GET.get('user', '')
+    if user_filter:
+        logs = logs.filter(user_id=user_filter)
+
+    # Filter by date range
+    date_from = request.GET.get('date_from', '')
+    date_to = request.GET.get('date_to', '')
+    if date_from:
+        from datetime import datetime
+        date_from_obj = datetime.strptime(date_from, '%Y-%m-%d').date()
+        logs = logs.filter(created_at__date__gte=date_from_obj)
+    if date_to:
+        from datetime import datetime
+        date_to_obj = datetime.strptime(date_to, '%Y-%m-%d').date()
+        logs = logs.filter(created_at__date__lte=date_to_obj)
+
+    # Search in username, IP address
+    search_query = request.GET.get('q', '')
+    if search_query:
+        logs = logs.filter(
+            Q(username_attempted__icontains=search_query) |
+            Q(ip_address__icontains=search_query) |
+            Q(user__full_name__icontains=search_query) |
+            Q(notes__icontains=search_query)
+        )
+
+    # Count total before pagination
+    total_count = logs.count()
+
+    # Pagination
+    paginator = Paginator(logs.order_by('-created_at'), 50)  # 50 items per page
+    page_number = request.GET.get('page', 1)
+    page_obj = paginator.get_page(page_number)
+
+    # Get filter options
+    actions = UserActivityLog.ACTION_CHOICES
+    active_users = User.objects.filter(is_active=True).order_by('full_name')
+
+    context = {
+        'title': 'ประวัติการใช้งานระบบ',
+        'logs': page_obj,
+        'total_count': total_count,
+        'actions': actions,
+        'active_users': active_users,
+        'action_filter': action_filter,
+        'user_filter': user_filter,
+        'date_from': date_from,
+        'date_to': date_to,
+        'search_query': search_query,
+    }
+
+    return render(request, 'accounts/user_activity_log.html', context)
@@ -0,0 +1,299 @@
+"""
+ยกเลิกใบสำคัญ และคำขออนุมัติยกเลิก
+"""
+from django.shortcuts import render, redirect, get_object_or_404
+from django.contrib.auth.decorators import login_required
+from django.contrib import messages
+from django.core.paginator import Paginator
+from django.db.models import Q
+
+
+@login_required
+def receipt_cancel_direct_view(request, receipt_id):
+    """ยกเลิกใบสำคัญโดยตรง (สำหรับ draft หรือ user ที่มีสิทธิ์)"""
+    from django.core.exceptions import PermissionDenied
+    from django.contrib import messages
+    from accounts.models import Receipt
+
+    receipt = get_object_or_404(Receipt, id=receipt_id)
+
+    # ตรวจสอบว่าสามารถยกเลิกได้โดยตรงหรือไม่
+    if not receipt.can_be_cancelled_directly(request.user):
+        messages.error(request, 'คุณไม่สามารถยกเลิกใบสำคัญนี้ได้โดยตรง กรุณาส่งคำขออนุมัติ')
+        return redirect('receipt_detail', receipt_id=receipt.id)
+
+    if request.method == 'POST':
+        cancel_reason = request.POST.get('cancel_reason', '')
+
+        try:
+            receipt.cancel(request.user, cancel_reason)
+            messages.success(request, f'ยกเลิกใบสำคัญ {receipt.receipt_number} เรียบร้อยแล้ว')
+            return redirect('receipt_detail', receipt_id=receipt.id)
+
+        except (PermissionDenied, ValueError) as e:
+            messages.error(request, str(e))
+            return redirect('receipt_detail', receipt_id=receipt.id)
+
+    # GET request - redirect กลับไปหน้า detail
+    return redirect('receipt_detail', receipt_id=receipt.id)
+
+
+@login_required
+def receipt_cancel_request_view(request, receipt_id):
+    """สร้างคำขอยกเลิกใบสำคัญ (สำหรับ completed receipts)"""
+    from django.contrib import messages
+    from accounts.models import Receipt, ReceiptCancelRequest
+
+    receipt = get_object_or_404(Receipt, id=receipt_id)
+
+    # ตรวจสอบว่าสามารถส่งคำขอยกเลิกได้หรือไม่
+    if not receipt.can_be_cancelled_by(request.user):
+        messages.error(request, 'คุณไม่มีสิทธิ์ยกเลิกใบสำคัญนี้')
+        return redirect('receipt_detail', receipt_id=receipt.id)
+
+    # ตรวจสอบสถานะใบสำคัญ
+    if receipt.status != 'completed':
+        messages.error(request, 'สามารถส่งคำขอยกเลิกได้เฉพาะใบสำคัญที่เสร็จสิ้นแล้วเท่านั้น')
+        return redirect('receipt_detail', receipt_id=receipt.id)
+
+    # ตรวจสอบว่ามีคำขอรออยู่หรือไม่
+    existing_request = ReceiptCancelRequest.objects.filter(
+        receipt=receipt,
+        status='pending'
+    ).first()
+
+    if existing_request:
+        messages.warning(request, 'มีคำขอยกเลิกรออนุมัติอยู่แล้ว')
+        return redirect('cancel_request_detail', request_id=existing_request.id)
+
+    if request.method == 'POST':
+        cancel_reason = request.POST.get('cancel_reason', '').strip()
+
+        if not cancel_reason:
+            messages.error(request, 'กรุณาระบุเหตุผลการยกเลิก')
+            return render(request, 'accounts/receipt_cancel_request.html', {
+                'receipt': receipt,
+                'title': f'ขออนุมัติยกเลิก {receipt.receipt_number}'
+            })
+
+        # สร้างคำขอยกเลิก
+        cancel_request = ReceiptCancelRequest.objects.create(
+            receipt=receipt,
+            requested_by=request.user,
+            cancel_reason=cancel_reason
+        )
+
+        messages.success(request, f'ส่งคำขอยกเลิก {cancel_request.request_number} เรียบร้อยแล้ว')
+        return redirect('cancel_request_detail', request_id=cancel_request.id)
+
+    # GET request - แสดงฟอร์มขอยกเลิก
+    context = {
+        'receipt': receipt,
+        'title': f'ขออนุมัติยกเลิก {receipt.receipt_number}'
+    }
+    return render(request, 'accounts/receipt_cancel_request.html', context)
+
+
+@login_required
+def cancel_request_detail_view(request, request_id):
+    """แสดงรายละเอียดคำขอยกเลิก และรองรับการอนุมัติ/ปฏิเสธ"""
+    from django.core.exceptions import PermissionDenied
+    from accounts.models import ReceiptCancelRequest
+
+    cancel_request = get_object_or_404(ReceiptCancelRequest, id=request_id)
+
+    # ตรวจสอบสิทธิ์ดู (เจ้าของคำขอ หรือ ผู้ที่สามารถอนุมัติได้)
+    can_view = (
+        cancel_request.requested_by == request.user or
+        cancel_request.can_be_approved_by(request.user) or
+        request.user.has_permission('receipt_view_all')
+    )
+
+    if not can_view:
+        messages.error(request, 'คุณไม่มีสิทธิ์ดูคำขอยกเลิกนี้')
+        return redirect('receipt_list')
+
+    # ตรวจสอบว่าสามารถอนุมัติได้หรือไม่
+    can_approve = cancel_request.can_be_approved_by(request.user)
+
+    # Handle POST request สำหรับการอนุมัติ/ปฏิเสธ
+    if request.method == 'POST' and can_approve:
+        action = request.POST.get('action')
+        notes = request.POST.get('notes', '')
+
+        try:
+            if action == 'approve':
+                cancel_request.approve(request.user, notes)
+                messages.success(request, f'อนุมัติคำขอยกเลิก {cancel_request.request_number} เรียบร้อยแล้ว')
+            elif action == 'reject':
+                cancel_request.reject(request.user, notes)
+                messages.success(request, f'ปฏิเสธคำขอยกเลิก {cancel_request.request_number} เรียบร้อยแล้ว')
+            else:
+                messages.error(request, 'กรุณาเลือกการดำเนินการ')
+
+        except (PermissionDenied, ValueError) as e:
+            messages.error(request, str(e))
+
+        return redirect('cancel_request_detail', request_id=cancel_request.id)
+
+    # เพิ่ม can_withdraw ให้ context
+    can_withdraw = (
+        cancel_request.status == 'pending' and
+        cancel_request.requested_by == request.user
+    )
+
+    context = {
+        'cancel_request': cancel_request,
+        'can_approve': can_approve,
+        'can_withdraw': can_withdraw,
+        'title': f'คำขอยกเลิก {cancel_request.request_number}'
+    }
+    return render(request, 'accounts/cancel_request_detail.html', context)
+
+
+# DEPRECATED: ฟอร์มอนุมัติถูกรวมเข้าไปใน cancel_request_detail_view แล้ว
+# @login_required
+# def cancel_request_approve_view(request, request_id):
+#     """อนุมัติคำขอยกเลิก"""
+#     from django.contrib import messages
+#     from django.core.exceptions import PermissionDenied
+#     from accounts.models import ReceiptCancelRequest
+#
+#     cancel_request = get_object_or_404(ReceiptCancelRequest, id=request_id)
+#
+#     # ตรวจสอบสิทธิ์
+#     if not cancel_request.can_be_approved_by(request.user):
+#         messages.error(request, 'คุณไม่มีสิทธิ์อนุมัติคำขอนี้')
+#         return redirect('cancel_request_detail', request_id=cancel_request.id)
+#
+#     if request.method == 'POST':
+#         action = request.POST.get('action')
+#         approval_notes = request.POST.get('approval_notes', '')
+#
+#         try:
+#             if action == 'approve':
+#                 cancel_request.approve(request.user, approval_notes)
+#                 messages.success(request, f'อนุมัติคำขอยกเลิก {cancel_request.request_number} เรียบร้อยแล้ว')
+#             elif action == 'reject':
+#                 cancel_request.reject(request.user, approval_notes)
+#                 messages.success(request, f'ปฏิเสธคำขอยกเลิก {cancel_request.request_number} เรียบร้อยแล้ว')
+#
+#         except (PermissionDenied, ValueError) as e:
+#             messages.error(request, str(e))
+#
+#         return redirect('cancel_request_detail', request_id=cancel_request.id)
+#
+#     # GET request - แสดงหน้าอนุมัติ
+#     context = {
+#         'cancel_request': cancel_request,
+#         'title': f'พิจารณาคำขอยกเลิก {cancel_request.request_number}'
+#     }
+#     return render(request, 'accounts/cancel_request_approval.html', context)
+
+
+@login_required
+def cancel_request_withdraw_view(request, request_id):
+    """ถอนคำขอยกเลิก"""
+    from django.contrib import messages
+    from accounts.models import ReceiptCancelRequest
+
+    cancel_request = get_object_or_404(ReceiptCancelRequest, id=request_id)
+
+    # ตรวจสอบสิทธิ์ - เฉพาะผู้ส่งคำขอ
+    if cancel_request.requested_by != request.user:
+        messages.error(request, 'คุณไม่มีสิทธิ์ถอนคำขอนี้')
+        return redirect('cancel_request_detail', request_id=cancel_request.id)
+
+    # ตรวจสอบสถานะ - ถอนได้เฉพาะ pending
+    if cancel_request.status != 'pending':
+        messages.error(request, 'สามารถถอนได้เฉพาะคำขอที่รออนุมัติเท่านั้น')
+        return redirect('cancel_request_detail', request_id=cancel_request.id)
+
+    if request.method == 'POST':
+        cancel_request.withdraw()
+        messages.success(request, f'ถอนคำขอ {cancel_request.request_number} เรียบร้อยแล้ว')
+        return redirect('cancel_request_detail', request_id=cancel_request.id)
+
+    # GET request - redirect กลับหน้า detail
+    return redirect('cancel_request_detail', request_id=cancel_request.id)
+
+
+@login_required
+def cancel_request_list_view(request):
+    """
+    รายการคำร้องขอยกเลิกใบสำคัญรับเงิน
+    - Basic User: ดูเฉพาะคำร้องของตัวเอง
+    - Department Manager: ดูคำร้องของหน่วยงานตัวเอง + ที่สามารถอนุมัติได้
+    - Admin: ดูทั้งหมด
+    """
+    from ..models import ReceiptCancelRequest
+
+    # กรองข้อมูลตามสิทธิ์
+    if request.user.has_permission('receipt_view_all'):
+        # Admin: ดูทั้งหมด
+        cancel_requests = ReceiptCancelRequest.objects.all()
+        view_scope = 'ทั้งหมด'
+    elif request.user.has_permission('receipt_cancel_approve_manager'):
+        # Senior Manager: ดูทั้งหมด
+        cancel_requests = ReceiptCancelRequest.objects.all()
+        view_scope = 'ทั้งหมด (Senior Manager)'
+    elif request.user.has_permission('receipt_cancel_approve'):
+        # Department Manager: ดูเฉพาะหน่วยงานตัวเอง
+        cancel_requests = ReceiptCancelRequest.objects.filter(
+            receipt__department_id=request.user.get_department_id()
+        )
+        view_scope = f'หน่วยงาน: {request.user.get_department()}'
+    else:
+        # Basic User: ดูเฉพาะของตัวเอง
+        cancel_requests = ReceiptCancelRequest.objects.filter(
+            requested_by=request.user
+        )
+        view_scope = 'คำขอของฉัน'
+
+    # คำนวณสถิติก่อน filter (เพื่อให้เห็นภาพรวมทั้งหมด) — conditional aggregate query เดียว
+    from django.db.models import Count
+    stats = cancel_requests.aggregate(
+        total=Count('id'),
+        pending=Count('id', filter=Q(status='pending')),
+        approved=Count('id', filter=Q(status='applied')),  # ดำเนินการแล้ว
+        rejected=Count('id', filter=Q(status='rejected')),
+    )
+
+    # Filter และ Search
+    status_filter = request.GET.get('status', '')
+    search_query = request.GET.get('q', '')
+
+    if status_filter:
+        cancel_requests = cancel_requests.filter(status=status_filter)
+
+    if search_query:
+        cancel_requests = cancel_requests.filter(
+            Q(request_number__icontains=search_query) |
+            Q(receipt__receipt_number__icontains=search_query) |
+            Q(receipt__recipient_name__icontains=search_query) |
+            Q(cancel_reason__icontains=search_query)
+        )
+
+    # Pagination
+    paginator = Paginator(cancel_requests.select_related('receipt', 'requested_by', 'approved_by').order_by('-created_at'), 15)
+    page_number = request.GET.get('page')
+    page_obj = paginator.get_page(page_number)
+
+    # เช็คสิทธิ์อนุมัติเฉพาะรายการในหน้านี้ (สิทธิ์ของผู้ขอทั้งหน้าโหลดด้วย query เดียว)
+    page_obj.object_list = ReceiptCancelRequest.annotate_can_approve(page_obj.object_list, request.user)
+
+    # สถิติเดิม (เก็บไว้เพื่อ backward compatibility)
+    pending_count = stats['pending']
+
+    context = {
+        'title': 'รายการคำขออนุมัติยกเลิก',
+        'cancel_requests': page_obj,
+        'view_scope': view_scope,
+        'status_filter': status_filter,
+        'search_query': search_query,
+        'pending_count': pending_count,
+        'stats': stats,
+        'can_batch_approve': any(r.can_approve for r in page_obj.object_list),
+    }
+
+    return render(request, 'accounts/cancel_request_list.html', context)
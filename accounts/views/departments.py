@@ -0,0 +1,470 @@
+"""
+จัดการหน่วยงาน และเล่มเอกสาร (เลขที่ใบสำคัญ)
+"""
+from django.shortcuts import render, redirect
+from django.contrib.auth.decorators import login_required
+from django.contrib import messages
+from django.http import JsonResponse
+import json
+
+
+@login_required
+def department_management_view(request):
+    """หน้าจัดการหน่วยงาน"""
+    if not (request.user.is_staff or request.user.is_superuser or request.user.has_permission('system_config')):
+        messages.error(request, 'ไม่มีสิทธิ์เข้าถึงหน้านี้')
+        return redirect('dashboard')
+
+    from ..models import Department
+    from django.contrib.auth import get_user_model
+    from django.db.models import Count, Q
+
+    User = get_user_model()
+
+    try:
+        # Get all departments from MySQL database
+        departments = Department.objects.all().order_by('name')
+
+        departments_data = []
+        for dept in departments:
+            # Count users associated with this department (from User.department text field)
+            user_count = User.objects.filter(
+                Q(department=dept.name) | Q(department__icontains=dept.code)
+            ).count()
+
+            departments_data.append({
+                'id': dept.id,
+                'name': dept.name,
+                'code': dept.code,
+                'is_active': dept.is_active,
+                'user_count': user_count,
+                'has_code': True,
+                'created_at': dept.created_at.isoformat() if dept.created_at else None,
+                'address': dept.address or '',
+                'postal_code': dept.postal_code or '',
+                'phone': dept.phone or '',
+            })
+
+        context = {
+            'title': 'จัดการหน่วยงาน',
+            'departments': departments_data,
+            'departments_json': json.dumps(departments_data),
+        }
+
+        return render(request, 'accounts/department_management.html', context)
+
+    except Exception as e:
+        import logging
+        logging.error(f"Error loading departments: {str(e)}")
+        messages.error(request, f'เกิดข้อผิดพลาดในการโหลดข้อมูลหน่วยงาน: {str(e)}')
+
+        # Return empty data
+        context = {
+            'title': 'จัดการหน่วยงาน',
+            'departments': [],
+            'departments_json': '[]',
+        }
+        return render(request, 'accounts/department_management.html', context)
+
+
+@login_required
+def department_create_view(request):
+    """กำหนดชื่อย่อให้หน่วยงาน NPU (AJAX)"""
+    if not (request.user.is_staff or request.user.is_superuser or request.user.has_permission('system_config')):
+        return JsonResponse({'success': False, 'message': 'ไม่มีสิทธิ์'}, status=403)
+
+    if request.method == 'POST':
+        try:
+            from ..models import Department
+            from django.contrib.auth import get_user_model
+
+            data = json.loads(request.body)
+            code = data.get('code', '').strip().upper()
+            department_name = data.get('name', '').strip()  # Changed from 'department_name' to 'name'
+            is_active = data.get('is_active', True)
+
+            # Address fields
+            address = data.get('address', '').strip()
+            postal_code = data.get('postal_code', '').strip()
+            phone = data.get('phone', '').strip()
+
+            # Validate input
+            if not code or not department_name:
+                return JsonResponse({'success': False, 'message': 'กรุณากรอกชื่อย่อและเลือกหน่วยงาน'})
+
+            # Check if this NPU department exists in users
+            User = get_user_model()
+            if not User.objects.filter(department=department_name).exists():
+                return JsonResponse({'success': False, 'message': 'ไม่พบหน่วยงานนี้ในระบบ NPU'})
+
+            # Check if department already has a code
+            if Department.objects.filter(name=department_name).exists():
+                return JsonResponse({'success': False, 'message': 'หน่วยงานนี้มีชื่อย่อแล้ว'})
+
+            # Note: Multiple departments can now share the same code (e.g., sub-departments under same parent)
+            # So we removed the unique code validation
+
+            # Create department code
+            department = Department.objects.create(
+                name=department_name,
+                code=code,
+                is_active=is_active,
+                address=address,
+                postal_code=postal_code,
+                phone=phone
+            )
+
+            return JsonResponse({
+                'success': True,
+                'message': f'กำหนดชื่อย่อ "{code}" ให้หน่วยงาน "{department_name}" เรียบร้อย',
+                'department_id': department.id
+            })
+
+        except json.JSONDecodeError:
+            return JsonResponse({'success': False, 'message': 'ข้อมูลไม่ถูกต้อง'}, status=400)
+        except Exception as e:
+            return JsonResponse({'success': False, 'message': str(e)}, status=500)
+
+    return JsonResponse({'success': False, 'message': 'Method not allowed'}, status=405)
+
+
+@login_required
+def department_edit_view(request, department_id):
+    """แก้ไขชื่อย่อหน่วยงาน (AJAX)"""
+    if not (request.user.is_staff or request.user.is_superuser or request.user.has_permission('system_config')):
+        return JsonResponse({'success': False, 'message': 'ไม่มีสิทธิ์'}, status=403)
+
+    try:
+        from ..models import Department
+        department = Department.objects.get(id=department_id)
+    except Department.DoesNotExist:
+        return JsonResponse({'success': False, 'message': 'ไม่พบหน่วยงาน'}, status=404)
+
+    if request.method == 'POST':
+        try:
+            data = json.loads(request.body)
+            code = data.get('code', '').strip().upper()
+            is_active = data.get('is_active', True)
+
+            # Address fields
+            address = data.get('address', '').strip()
+            postal_code = data.get('postal_code', '').strip()
+            phone = data.get('phone', '').strip()
+
+            # Validate input
+            if not code:
+                return JsonResponse({'success': False, 'message': 'กรุณากรอกชื่อย่อ'})
+
+            # Note: Multiple departments can now share the same code (e.g., sub-departments under same parent)
+            # So we removed the unique code validation
+
+            # Update department data
+            department.code = code
+            department.is_active = is_active
+            department.address = address
+            department.postal_code = postal_code
+            department.phone = phone
+            department.save()
+
+            return JsonResponse({
+                'success': True,
+                'message': f'แก้ไขชื่อย่อของ "{department.name}" เป็น "{code}" เรียบร้อย'
+            })
+
+        except json.JSONDecodeError:
+            return JsonResponse({'success': False, 'message': 'ข้อมูลไม่ถูกต้อง'}, status=400)
+        except Exception as e:
+            return JsonResponse({'success': False, 'message': str(e)}, status=500)
+
+    elif request.method == 'GET':
+        # Return department data for editing
+        department_data = {
+            'id': department.id,
+            'code': department.code,
+            'name': department.name,  # Read-only from NPU AD
+            'is_active': department.is_active,
+            'address': department.address,
+            'postal_code': department.postal_code,
+            'phone': department.phone,
+        }
+        return JsonResponse({'success': True, 'department': department_data})
+
+    return JsonResponse({'success': False, 'message': 'Method not allowed'}, status=405)
+
+
+@login_required
+def department_delete_view(request, department_id):
+    """ลบหน่วยงาน (AJAX)"""
+    if not (request.user.is_staff or request.user.is_superuser or request.user.has_permission('system_config')):
+        return JsonResponse({'success': False, 'message': 'ไม่มีสิทธิ์'}, status=403)
+
+    if request.method == 'POST':
+        try:
+            from ..models import Department
+            department = Department.objects.get(id=department_id)
+
+            # Check if any users are assigned to this department
+            from django.contrib.auth import get_user_model
+            User = get_user_model()
+            user_count = User.objects.filter(department_internal_name=department.name).count()
+            if user_count > 0:
+                return JsonResponse({
+                    'success': False,
+                    'message': f'ไม่สามารถลบได้ มีบุคลากร {user_count} คนในหน่วยงานนี้'
+                })
+
+            department_name = department.name
+            department.delete()
+
+            return JsonResponse({
+                'success': True,
+                'message': f'ลบหน่วยงาน "{department_name}" เรียบร้อย'
+            })
+
+        except Department.DoesNotExist:
+            return JsonResponse({'success': False, 'message': 'ไม่พบหน่วยงาน'}, status=404)
+        except Exception as e:
+            return JsonResponse({'success': False, 'message': str(e)}, status=500)
+
+    return JsonResponse({'success': False, 'message': 'Method not allowed'}, status=405)
+
+
+@login_required
+def department_activate_view(request, department_id):
+    """เปิดใช้งานหน่วยงาน (AJAX)"""
+    if not (request.user.is_staff or request.user.is_superuser or request.user.has_permission('system_config')):
+        return JsonResponse({'success': False, 'message': 'ไม่มีสิทธิ์'}, status=403)
+
+    if request.method == 'POST':
+        try:
+            from ..models import Department
+            department = Department.objects.get(id=department_id)
+
+            department.is_active = True
+            department.save()
+
+            return JsonResponse({
+                'success': True,
+                'message': f'เปิดใช้งานหน่วยงาน "{department.name}" เรียบร้อย'
+            })
+
+        except Department.DoesNotExist:
+            return JsonResponse({'success': False, 'message': 'ไม่พบหน่วยงาน'}, status=404)
+        except Exception as e:
+            return JsonResponse({'success': False, 'message': str(e)}, status=500)
+
+    return JsonResponse({'success': False, 'message': 'Method not allowed'}, status=405)
+
+
+@login_required
+def department_deactivate_view(request, department_id):
+    """ปิดใช้งานหน่วยงาน (AJAX)"""
+    if not (request.user.is_staff or request.user.is_superuser or request.user.has_permission('system_config')):
+        return JsonResponse({'success': False, 'message': 'ไม่มีสิทธิ์'}, status=403)
+
+    if request.method == 'POST':
+        try:
+            from ..models import Department
+            department = Department.objects.get(id=department_id)
+
+            department.is_active = False
+            department.save()
+
+            return JsonResponse({
+                'success': True,
+                'message': f'ปิดใช้งานหน่วยงาน "{department.name}" เรียบร้อย'
+            })
+
+        except Department.DoesNotExist:
+            return JsonResponse({'success': False, 'message': 'ไม่พบหน่วยงาน'}, status=404)
+        except Exception as e:
+            return JsonResponse({'success': False, 'message': str(e)}, status=500)
+
+    return JsonResponse({'success': False, 'message': 'Method not allowed'}, status=405)
+
+
+@login_required
+def available_npu_departments_ajax(request):
+    """ดึงหน่วยงาน NPU ที่ยังไม่มีชื่อย่อ (AJAX)"""
+    if not (request.user.is_staff or request.user.is_superuser or request.user.has_permission('system_config')):
+        return JsonResponse({'success': False, 'message': 'ไม่มีสิทธิ์'}, status=403)
+
+    try:
+        from ..models import Department
+        from django.contrib.auth import get_user_model
+        from django.db.models import Count
+
+        User = get_user_model()
+
+        # Get unique departments from users (from NPU AD)
+        npu_departments = User.objects.exclude(
+            department__isnull=True
+        ).exclude(
+            department__exact=''
+        ).values('department').annotate(
+            user_count=Count('id')
+        ).order_by('department')
+
+        # Get departments that already have codes
+        existing_dept_names = set(Department.objects.values_list('name', flat=True))
+
+        # Filter out departments that already have codes
+        available_departments = []
+        for dept in npu_departments:
+            if dept['department'] not in existing_dept_names:
+                available_departments.append({
+                    'name': dept['department'],
+                    'user_count': dept['user_count']
+                })
+
+        return JsonResponse({
+            'success': True,
+            'departments': available_departments
+        })
+
+    except Exception as e:
+        return JsonResponse({'success': False, 'message': str(e)}, status=500)
+
+
+@login_required
+def document_numbering_view(request):
+    """หน้าตั้งค่าเลขที่เอกสาร"""
+    if not (request.user.is_staff or request.user.is_superuser or request.user.has_permission('system_config')):
+        messages.error(request, 'ไม่มีสิทธิ์เข้าถึงหน้านี้')
+        return redirect('dashboard')
+
+    try:
+        from ..models import DocumentVolume, Department
+        from utils.fiscal_year import get_current_fiscal_year, format_fiscal_year_display
+        from utils.notifications import get_dashboard_notifications
+        from utils.fiscal_year_info import get_fiscal_year_info_card, get_volume_status_summary
+        from django.db.models import Q
+
+        current_fy = get_current_fiscal_year()
+
+        # ดึงข้อมูลการแจ้งเตือน
+        notifications = get_dashboard_notifications()
+
+        # ดึงข้อมูลปีงบประมาณแบบ Real-time
+        fiscal_year_info = get_fiscal_year_info_card()
+        volume_summary = get_volume_status_summary(current_fy)
+
+        # ดึงข้อมูลเล่มทั้งหมดในปีงบประมาณปัจจุบัน
+        current_volumes = DocumentVolume.objects.filter(
+            fiscal_year=current_fy
+        ).select_related('department', 'created_by', 'closed_by').order_by('department__name')
+
+        # ดึงข้อมูลหน่วยงานที่ยังไม่มีเล่ม
+        departments_with_volumes = set(current_volumes.values_list('department_id', flat=True))
+        departments_without_volumes = Department.objects.filter(
+            is_active=True
+        ).exclude(id__in=departments_with_volumes)
+
+        # ดึงข้อมูลเล่มจากปีก่อนหน้า (สำหรับอ้างอิง)
+        previous_volumes = DocumentVolume.objects.filter(
+            fiscal_year=current_fy - 1
+        ).select_related('department').order_by('department__name')
+
+        # สถิติโดยรวม
+        total_volumes = current_volumes.count()
+        active_volumes = current_volumes.filter(status='active').count()
+        total_documents_issued = sum(vol.last_document_number for vol in current_volumes)
+
+        volumes_stats = []
+        for volume in current_volumes:
+            # Get latest receipt for this volume
+            from ..models import Receipt
+            latest_receipt = Receipt.objects.filter(
+                department=volume.department,
+                status='completed',
+                receipt_date__gte=volume.fiscal_year_start,
+                receipt_date__lte=volume.fiscal_year_end
+            ).order_by('-receipt_date', '-created_at').first()
+
+            volumes_stats.append({
+                'volume': volume,
+                'total_receipts': volume.last_document_number,
+                'latest_receipt': latest_receipt,
+            })
+
+        context = {
+            'title': 'ตั้งค่าเลขที่เอกสาร',
+            'current_fiscal_year': current_fy,
+            'fiscal_year_display': format_fiscal_year_display(current_fy),
+            'notifications': notifications,
+            'fiscal_year_info': fiscal_year_info,
+            'volume_summary': volume_summary,
+            'volumes_stats': volumes_stats,
+            'current_volumes': current_volumes,
+            'departments_without_volumes': departments_without_volumes,
+            'previous_volumes': previous_volumes,
+            'stats': {
+                'total_volumes': total_volumes,
+                'active_volumes': active_volumes,
+                'closed_volumes': current_volumes.filter(status='closed').count(),
+                'total_documents_issued': total_documents_issued,
+                'departments_count': Department.objects.filter(is_active=True).count(),
+                'coverage_percentage': (total_volumes / Department.objects.filter(is_active=True).count() * 100) if Department.objects.filter(is_active=True).count() > 0 else 0
+            }
+        }
+
+        return render(request, 'accounts/document_numbering.html', context)
+
+    except ImportError as e:
+        messages.error(request, f'ระบบยังไม่พร้อมใช้งาน: {str(e)}')
+        return redirect('dashboard')
+    except Exception as e:
+        messages.error(request, f'เกิดข้อผิดพลาด: {str(e)}')
+        return redirect('dashboard')
+
+
+@login_required
+def close_volume_ajax(request, volume_id):
+    """ปิดเล่มเอกสาร (AJAX)"""
+    if not (request.user.is_staff or request.user.is_superuser or request.user.has_permission('system_config')):
+        return JsonResponse({'success': False, 'message': 'ไม่มีสิทธิ์'}, status=403)
+
+    if request.method == 'POST':
+        try:
+            from ..models import DocumentVolume, DocumentVolumeLog
+            import json
+
+            data = json.loads(request.body)
+            reason = data.get('reason', '')
+
+            try:
+                volume = DocumentVolume.objects.get(id=volume_id)
+            except DocumentVolume.DoesNotExist:
+                return JsonResponse({'success': False, 'message': 'ไม่พบเล่มเอกสาร'}, status=404)
+
+            if volume.status == 'closed':
+                return JsonResponse({'success': False, 'message': f'เล่ม {volume.volume_code} ถูกปิดแล้ว'})
+
+            # ปิดเล่ม
+            volume.close_volume(user=request.user)
+
+            # บันทึก log
+            DocumentVolumeLog.objects.create(
+                volume=volume,
+                action='closed',
+                user=request.user,
+                notes=f'ปิดเล่ม: {reason}' if reason else 'ปิดเล่มโดยผู้ดูแลระบบ'
+            )
+
+            return JsonResponse({
+                'success': True,
+                'message': f'ปิดเล่ม {volume.volume_code} เรียบร้อย',
+                'volume': {
+                    'id': volume.id,
+                    'volume_code': volume.volume_code,
+                    'status': volume.get_status_display(),
+                    'closed_at': volume.closed_at.strftime('%d/%m/%Y %H:%M') if volume.closed_at else None
+                }
+            })
+
+        except json.JSONDecodeError:
+            return JsonResponse({'success': False, 'message': 'ข้อมูลไม่ถูกต้อง'}, status=400)
+        except Exception as e:
+            return JsonResponse({'success': False, 'message': str(e)}, status=500)
+
+    return JsonResponse({'success': False, 'message': 'Method not allowed'}, status=405)
@@ -0,0 +1,379 @@
+"""
+คำร้องขอแก้ไขใบสำคัญรับเงิน
+"""
+from decimal import InvalidOperation
+
+from django.shortcuts import render, redirect, get_object_or_404
+from django.contrib.auth.decorators import login_required
+from django.contrib import messages
+from django.core.exceptions import PermissionDenied
+from django.core.paginator import Paginator
+from django.db.models import Q
+
+from ..forms import ReceiptEditRequestForm, EditRequestApprovalForm
+from ..models import Receipt, ReceiptEditRequest, ReceiptChangeLog
+
+
+@login_required
+def edit_request_create_view(request, receipt_id):
+    """
+    ฟอร์มสำหรับส่งคำร้องขอแก้ไขใบสำคัญรับเงิน
+    สำหรับ Basic User ที่ต้องการแก้ไขใบสำคัญ
+    """
+    receipt = get_object_or_404(Receipt, id=receipt_id)
+
+    # ตรวจสอบสิทธิ์ - เฉพาะเจ้าของเอกสารเท่านั้นที่ขอแก้ไขได้
+    if receipt.created_by != request.user:
+        messages.error(request, 'คุณสามารถขอแก้ไขได้เฉพาะเอกสารที่คุณสร้างเองเท่านั้น')
+        return redirect('receipt_detail', receipt_id=receipt.id)
+
+    # ตรวจสอบสถานะใบสำคัญ - ต้องเป็น completed เท่านั้น
+    if receipt.status != 'completed':
+        messages.error(request, 'สามารถขอแก้ไขได้เฉพาะใบสำคัญที่เสร็จสมบูรณ์แล้วเท่านั้น')
+        return redirect('receipt_detail', receipt_id=receipt.id)
+
+    # ตรวจสอบว่ามีคำร้องขอแก้ไขค้างอยู่หรือไม่
+    pending_request = receipt.edit_requests.filter(status='pending').first()
+    if pending_request:
+        messages.warning(request, f'มีคำร้องขอแก้ไข {pending_request.request_number} รออนุมัติอยู่แล้ว')
+        return redirect('edit_request_detail', request_id=pending_request.id)
+
+    # Import formset
+    from ..forms import ReceiptEditRequestItemFormSet
+
+    if request.method == 'POST':
+        form = ReceiptEditRequestForm(request.POST, receipt=receipt)
+        formset = ReceiptEditRequestItemFormSet(request.POST, queryset=receipt.items.all())
+
+        # Debug output
+        print("Form valid:", form.is_valid())
+        if not form.is_valid():
+            print("Form errors:", form.errors)
+        print("Formset valid:", formset.is_valid())
+        if not formset.is_valid():
+            print("Formset errors:", formset.errors)
+
+        if form.is_valid() and formset.is_valid():
+            edit_request = form.save(commit=False)
+            edit_request.receipt = receipt
+            edit_request.requested_by = request.user
+
+            # Calculate new total from formset
+            new_total = 0
+            for form_item in formset:
+                if form_item.cleaned_data and not form_item.cleaned_data.get('DELETE', False):
+                    quantity = form_item.cleaned_data.get('quantity', 0)
+                    unit_price = form_item.cleaned_data.get('unit_price', 0)
+                    new_total += quantity * unit_price
+
+            edit_request.new_total_amount = new_total
+            edit_request.save()
+
+            # Save formset data as JSON for the edit request
+            items_data = []
+            for form_item in formset:
+                if form_item.cleaned_data and not form_item.cleaned_data.get('DELETE', False):
+                    items_data.append({
+                        'id': form_item.cleaned_data.get('id').id if form_item.cleaned_data.get('id') else None,
+                        'description': form_item.cleaned_data.get('description'),
+                        'quantity': form_item.cleaned_data.get('quantity'),
+                        'unit_price': float(form_item.cleaned_data.get('unit_price', 0)),
+                    })
+
+            # Store items data in a separate field (we'll add this to model later)
+            import json
+            edit_request.new_items_data = json.dumps(items_data)
+            edit_request.save()
+
+            # บันทึก Change Log
+            ReceiptChangeLog.log_change(
+                receipt=receipt,
+                action='edit_requested',
+                user=request.user,
+                notes=f'ส่งคำร้องขอแก้ไข: {edit_request.reason}',
+                edit_request=edit_request
+            )
+
+            messages.success(request, f'ส่งคำร้องขอแก้ไข {edit_request.request_number} เรียบร้อยแล้ว')
+            return redirect('edit_request_detail', request_id=edit_request.id)
+    else:
+        form = ReceiptEditRequestForm(receipt=receipt)
+        formset = ReceiptEditRequestItemFormSet(queryset=receipt.items.all())
+
+    context = {
+        'form': form,
+        'formset': formset,
+        'receipt': receipt,
+        'page_title': f'ขอแก้ไขใบสำคัญ {receipt.receipt_number}'
+    }
+    return render(request, 'accounts/edit_request_create.html', context)
+
+
+@login_required
+def edit_request_list_view(request):
+    """
+    รายการคำร้องขอแก้ไขใบสำคัญรับเงิน
+    - Basic User: ดูเฉพาะคำร้องของตัวเอง
+    - Department Manager: ดูคำร้องของหน่วยงานตัวเอง
+    - Admin: ดูทั้งหมด
+    """
+    # กรองข้อมูลตามสิทธิ์
+    if request.user.has_permission('receipt_view_all'):
+        # Admin: ดูทั้งหมด
+        edit_requests_base = ReceiptEditRequest.objects.all()
+    elif request.user.has_permission('receipt_edit_approve'):
+        # Department Manager: ดูเฉพาะหน่วยงานตัวเอง
+        edit_requests_base = ReceiptEditRequest.objects.filter(
+            receipt__department_id=request.user.get_department_id()
+        )
+    else:
+        # Basic User: ดูเฉพาะของตัวเอง
+        edit_requests_base = ReceiptEditRequest.objects.filter(
+            requested_by=request.user
+        )
+
+    # คำนวณสถิติจาก queryset ที่ยังไม่ถูก filter (ใช้ base queryset)
+    stats = {
+        'total': edit_requests_base.count(),
+        'pending': edit_requests_base.filter(status='pending').count(),
+        'approved': edit_requests_base.filter(status__in=['approved', 'applied']).count(),  # รวม approved + applied
+        'rejected': edit_requests_base.filter(status='rejected').count(),
+    }
+
+    # Filter และ Search (ใช้สำหรับแสดงในตาราง)
+    edit_requests = edit_requests_base
+    status_filter = request.GET.get('status', '')
+    search_query = request.GET.get('q', '')
+
+    if status_filter:
+        edit_requests = edit_requests.filter(status=status_filter)
+
+    if search_query:
+        edit_requests = edit_requests.filter(
+            Q(request_number__icontains=search_query) |
+            Q(receipt__receipt_number__icontains=search_query) |
+            Q(receipt__recipient_name__icontains=search_query) |
+            Q(reason__icontains=search_query)
+        )
+
+    # Pagination
+    paginator = Paginator(edit_requests.select_related('receipt', 'requested_by').order_by('-created_at'), 10)
+    page_number = request.GET.get('page')
+    page_obj = paginator.get_page(page_number)
+
+    # เช็คสิทธิ์อนุมัติเฉพาะรายการในหน้านี้ (สิทธิ์ของผู้ขอทั้งหน้าโหลดด้วย query เดียว)
+    page_obj.object_list = ReceiptEditRequest.annotate_can_approve(page_obj.object_list, request.user)
+
+    context = {
+        'page_obj': page_obj,
+        'stats': stats,
+        'can_batch_approve': any(r.can_approve for r in page_obj.object_list),
+        'status_filter': status_filter,
+        'search_query': search_query,
+        'page_title': 'รายการคำร้องขอแก้ไข'
+    }
+    return render(request, 'accounts/edit_request_list.html', context)
+
+
+@login_required
+def edit_request_detail_view(request, request_id):
+    """
+    รายละเอียดคำร้องขอแก้ไขใบสำคัญรับเงิน
+    รองรับทั้งการดู (GET) และการอนุมัติ/ปฏิเสธ (POST)
+    """
+    edit_request = get_object_or_404(ReceiptEditRequest, id=request_id)
+
+    # ตรวจสอบสิทธิ์การดู
+    can_view = False
+    if request.user.has_permission('receipt_view_all'):
+        can_view = True
+    elif request.user.has_permission('receipt_edit_approve') and edit_request.receipt.department_id == request.user.get_department_id():
+        can_view = True
+    elif edit_request.requested_by == request.user:
+        can_view = True
+
+    if not can_view:
+        messages.error(request, 'คุณไม่มีสิทธิ์ดูคำร้องนี้')
+        return redirect('edit_request_list')
+
+    # ตรวจสอบสิทธิ์การอนุมัติ
+    can_approve = edit_request.can_be_approved_by(request.user) and edit_request.status == 'pending'
+
+    # Handle POST request (approval/rejection)
+    if request.method == 'POST' and can_approve:
+        action = request.POST.get('action')
+        notes = request.POST.get('notes', '')
+
+        if action == 'approve':
+            # approve บันทึก Change Log (อนุมัติ + ค่าที่เปลี่ยนทีละฟิลด์) ให้เองใน transaction เดียวกัน
+            # มีคนพิจารณาไปก่อน (กดซ้ำ/อนุมัติพร้อมกัน) หรือข้อมูลรายการในคำร้องเสีย → แจ้งเตือนแทน error 500
+            try:
+                edit_request.approve(request.user, notes)
+            except (ValueError, PermissionDenied) as e:
+                messages.error(request, str(e))
+                return redirect('edit_request_detail', request_id=edit_request.id)
+            except InvalidOperation:
+                messages.error(request, 'ข้อมูลรายการในคำร้องไม่ถูกต้อง ไม่สามารถอนุมัติได้')
+                return redirect('edit_request_detail', request_id=edit_request.id)
+
+            messages.success(request, f'อนุมัติคำร้อง {edit_request.request_number} เรียบร้อยแล้ว')
+            return redirect('receipt_detail', receipt_id=edit_request.receipt.id)
+
+        elif action == 'reject':
+            if not notes.strip():
+                messages.error(request, 'กรุณาระบุเหตุผลในการปฏิเสธ')
+            else:
+                try:
+                    edit_request.reject(request.user, notes)
+                except (ValueError, PermissionDenied) as e:
+                    messages.error(request, str(e))
+                    return redirect('edit_request_detail', request_id=edit_request.id)
+
+                # บันทึก Change Log
+                ReceiptChangeLog.log_change(
+                    receipt=edit_request.receipt,
+                    action='edit_rejected',
+                    user=request.user,
+                    notes=notes,
+                    edit_request=edit_request
+                )
+
+                messages.success(request, f'ปฏิเสธคำร้อง {edit_request.request_number} เรียบร้อยแล้ว')
+                return redirect('receipt_detail', receipt_id=edit_request.receipt.id)
+
+    # ประวัติการเปลี่ยนแปลง
+    change_logs = edit_request.change_logs.all().order_by('-created_at')
+
+    # Parse new items data if exists
+    new_items = []
+    if edit_request.new_items_data:
+        import json
+        try:
+            items_data = json.loads(edit_request.new_items_data)
+            for item_data in items_data:
+                quantity = item_data.get('quantity', 1)
+                unit_price = item_data.get('unit_price', 0)
+                new_items.append({
+                    'description': item_data.get('description', ''),
+                    'quantity': quantity,
+                    'unit_price': unit_price,
+                    'total': quantity * unit_price
+                })
+        except json.JSONDecodeError:
+            pass
+
+    context = {
+        'edit_request': edit_request,
+        'receipt': edit_request.receipt,
+        'can_approve': can_approve,
+        'change_logs': change_logs,
+        'new_items': new_items,
+        'page_title': f'คำร้องขอแก้ไข {edit_request.request_number}'
+    }
+    return render(request, 'accounts/edit_request_detail.html', context)
+
+
+@login_required
+def edit_request_approval_view(request, request_id):
+    """
+    หน้าอนุมัติ/ปฏิเสธคำร้องขอแก้ไขใบสำคัญรับเงิน
+    สำหรับ Department Manager หรือ Admin
+    """
+    edit_request = get_object_or_404(ReceiptEditRequest, id=request_id)
+
+    # ตรวจสอบสิทธิ์การอนุมัติ
+    if not edit_request.can_be_approved_by(request.user):
+        messages.error(request, 'คุณไม่มีสิทธิ์อนุมัติคำร้องนี้')
+        return redirect('edit_request_detail', request_id=edit_request.id)
+
+    # ตรวจสอบสถานะ - ต้องเป็น pending เท่านั้น
+    if edit_request.status != 'pending':
+        messages.error(request, 'คำร้องนี้ได้รับการพิจารณาแล้ว')
+        return redirect('edit_request_detail', request_id=edit_request.id)
+
+    if request.method == 'POST':
+        form = EditRequestApprovalForm(request.POST)
+        if form.is_valid():
+            action = form.cleaned_data['action']
+            notes = form.cleaned_data['notes']
+
+            if action == 'approve':
+                # approve บันทึก Change Log (อนุมัติ + ค่าที่เปลี่ยนทีละฟิลด์) ให้เองใน transaction เดียวกัน
+                try:
+                    edit_request.approve(request.user, notes)
+                except (ValueError, PermissionDenied) as e:
+                    messages.error(request, str(e))
+                    return redirect('edit_request_detail', request_id=edit_request.id)
+                except InvalidOperation:
+                    messages.error(request, 'ข้อมูลรายการในคำร้องไม่ถูกต้อง ไม่สามารถอนุมัติได้')
+                    return redirect('edit_request_detail', request_id=edit_request.id)
+
+                messages.success(request, f'อนุมัติคำร้อง {edit_request.request_number} เรียบร้อยแล้ว')
+
+            elif action == 'reject':
+                try:
+                    edit_request.reject(request.user, notes)
+                except (ValueError, PermissionDenied) as e:
+                    messages.error(request, str(e))
+                    return redirect('edit_request_detail', request_id=edit_request.id)
+
+                # บันทึก Change Log
+                ReceiptChangeLog.log_change(
+                    receipt=edit_request.receipt,
+                    action='edit_rejected',
+                    user=request.user,
+                    notes=notes,
+                    edit_request=edit_request
+                )
+
+                messages.success(request, f'ปฏิเสธคำร้อง {edit_request.request_number} เรียบร้อยแล้ว')
+
+            return redirect('edit_request_detail', request_id=edit_request.id)
+    else:
+        form = EditRequestApprovalForm()
+
+    context = {
+        'form': form,
+        'edit_request': edit_request,
+        'receipt': edit_request.receipt,
+        'page_title': f'พิจารณาคำร้อง {edit_request.request_number}'
+    }
+    return render(request, 'accounts/edit_request_approval.html', context)
+
+
+@login_required
+def edit_request_withdraw_view(request, request_id):
+    """
+    ถอนคำร้องขอแก้ไขใบสำคัญรับเงิน (สำหรับผู้ส่งคำร้อง)
+    """
+    edit_request = get_object_or_404(ReceiptEditRequest, id=request_id)
+
+    # ตรวจสอบสิทธิ์ - เฉพาะผู้ส่งคำร้อง
+    if edit_request.requested_by != request.user:
+        messages.error(request, 'คุณไม่มีสิทธิ์ถอนคำร้องนี้')
+        return redirect('edit_request_detail', request_id=edit_request.id)
+
+    # ตรวจสอบสถานะ - ถอนได้เฉพาะ pending
+    if edit_request.status != 'pending':
+        messages.error(request, 'สามารถถอนได้เฉพาะคำร้องที่รออนุมัติเท่านั้น')
+        return redirect('edit_request_detail', request_id=edit_request.id)
+
+    # ถ้าเป็น GET request ให้ redirect ไปยัง detail page โดยตรง
+    # เพราะ button มี onclick confirm แล้ว
+    if request.method != 'POST':
+        return redirect('edit_request_detail', request_id=edit_request.id)
+
+    # Process POST request for withdrawal
+    edit_request.withdraw()
+
+    # บันทึก Change Log
+    ReceiptChangeLog.log_change(
+        receipt=edit_request.receipt,
+        action='edit_requested',  # ใช้ action เดิมเนื่องจากไม่มี 'edit_withdrawn'
+        user=request.user,
+        notes='ถอนคำร้องขอแก้ไข',
+        edit_request=edit_request
+    )
+
+    messages.success(request, f'ถอนคำร้อง {edit_request.request_number} เรียบร้อยแล้ว')
+    return redirect('edit_request_detail', request_id=edit_request.id)
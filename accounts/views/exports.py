@@ -0,0 +1,1240 @@
+"""
+ส่งออกรายงานเป็น Excel/PDF (openpyxl, ReportLab)
+
+openpyxl/ReportLab import ในแต่ละฟังก์ชัน — worker ที่ไม่เคยส่งออกจึงไม่ต้องโหลด
+"""
+from collections import defaultdict
+from itertools import islice
+
+from django.contrib import messages
+from django.contrib.auth.decorators import login_required
+from django.db.models import Q
+from django.http import HttpResponse
+from django.shortcuts import redirect
+
+from ..models import ReceiptChangeLog, ReceiptItem, User, UserActivityLog
+from ..receipt_scope import ReceiptScope
+from ..revenue_summary import get_revenue_summary
+
+
+# จำนวนใบสำคัญที่อ่านจากฐานข้อมูลต่อรอบในรายงาน PDF (รายการของทั้งรอบดึงใน query เดียว)
+REPORT_BATCH_SIZE = 500
+
+
+def _batched(iterable, size):
+    """แบ่ง iterable เป็น list ละ size ตัว"""
+    iterator = iter(iterable)
+    while batch := list(islice(iterator, size)):
+        yield batch
+
+
+@login_required
+def revenue_summary_excel_export(request):
+    """
+    Export รายงานสรุปรายรับเป็น Excel
+    """
+    import openpyxl
+    from openpyxl.styles import Font, Alignment, Border, Side, PatternFill
+    from django.http import HttpResponse
+    from datetime import date
+    from utils.fiscal_year import get_current_fiscal_year
+    from accounts.utils import convert_to_thai_date
+    
+    # ตรวจสอบสิทธิ์การเข้าถึงรายงาน
+    scope = ReceiptScope.for_request(request)
+    if not scope.can_view_reports:
+        messages.error(request, 'คุณไม่มีสิทธิ์เข้าถึงหน้ารายงาน')
+        return redirect('dashboard')
+
+    # ใช้ logic เดียวกันกับ revenue_summary_report_view - กรองเฉพาะใบที่ผ่านกระบวนการทางบัญชี
+    view_scope = scope.report_label
+
+    # รับค่า filter
+    period_type = request.GET.get('period', 'monthly')
+    filters = scope.filters(request.GET)
+
+    # ตรวจสอบ Custom Date Range Mode
+    is_custom_mode = filters.has_date_range
+
+    # สรุปยอดรวม / รายหน่วยงาน / รายช่วงเวลา (ชุดเดียวกับหน้ารายงานและไฟล์ส่งออก — cache ไว้ใน accounts/revenue_summary.py)
+    summary = get_revenue_summary(scope, filters, period_type)
+    total_summary = summary['total_summary']
+    department_summary = summary['department_summary']
+    period_summary = summary['period_summary']
+
+    # สร้าง Excel workbook
+    wb = openpyxl.Workbook()
+    ws = wb.active
+    ws.title = "รายงานสรุปรายรับ"
+    
+    # กำหนดสี - เทาอ่อนเหมือน PDF
+    header_fill = PatternFill(start_color="D3D3D3", end_color="D3D3D3", fill_type="solid")
+    summary_fill = PatternFill(start_color="E7E6E6", end_color="E7E6E6", fill_type="solid")
+    border = Border(
+        left=Side(style='thin'),
+        right=Side(style='thin'),
+        top=Side(style='thin'),
+        bottom=Side(style='thin')
+    )
+    
+    # Header information
+    current_fiscal = get_current_fiscal_year()
+    ws['A1'] = "รายงานสรุปรายรับ"
+    ws['A2'] = f"ประจำปีงบประมาณ {current_fiscal}"
+    ws['A3'] = f"ขอบเขต: {view_scope}"
+    
+    # ช่วงวันที่ (แปลงเป็นภาษาไทย)
+    date_range = ""
+    if is_custom_mode:
+        if filters.start_date and filters.end_date:
+            start_thai = convert_to_thai_date(filters.start_date, 'short')
+            end_thai = convert_to_thai_date(filters.end_date, 'short')
+            date_range = f"ระหว่างวันที่ {start_thai} ถึง {end_thai}"
+        elif filters.start_date:
+            start_thai = convert_to_thai_date(filters.start_date, 'short')
+            date_range = f"ตั้งแต่วันที่ {start_thai}"
+        elif filters.end_date:
+            end_thai = convert_to_thai_date(filters.end_date, 'short')
+            date_range = f"จนถึงวันที่ {end_thai}"
+    else:
+        date_range = f"โหมด: {period_type}"
+
+    ws['A4'] = date_range
+    
+    # ปรับ style สำหรับ header
+    for row in range(1, 5):
+        ws[f'A{row}'].font = Font(bold=True, size=14 if row == 1 else 12)
+        ws[f'A{row}'].alignment = Alignment(horizontal='center' if row == 1 else 'left')
+    
+    ws.merge_cells('A1:E1')
+
+    # สรุปยอดรวม - รูปแบบตารางเหมือน PDF
+    ws['A6'] = "สรุปยอดรวม"
+    ws['A6'].font = Font(bold=True, size=12)
+
+    # Headers ตารางสรุปยอดรวม
+    summary_headers_row = 7
+    ws.cell(row=summary_headers_row, column=1, value="รายการ").font = Font(bold=True)
+    ws.cell(row=summary_headers_row, column=1).fill = header_fill
+    ws.cell(row=summary_headers_row, column=1).border = border
+    ws.cell(row=summary_headers_row, column=1).alignment = Alignment(horizontal='center')
+
+    ws.cell(row=summary_headers_row, column=2, value="จำนวน").font = Font(bold=True)
+    ws.cell(row=summary_headers_row, column=2).fill = header_fill
+    ws.cell(row=summary_headers_row, column=2).border = border
+    ws.cell(row=summary_headers_row, column=2).alignment = Alignment(horizontal='center')
+
+    # ข้อมูลสรุปยอดรวม
+    ws.cell(row=8, column=1, value="ยอดเงินรวม").border = border
+    ws.cell(row=8, column=2, value=f"{total_summary['total_amount']:,.2f} บาท").border = border
+    ws.cell(row=8, column=2).alignment = Alignment(horizontal='right')
+
+    ws.cell(row=9, column=1, value="ใบสำคัญเสร็จสิ้น").border = border
+    ws.cell(row=9, column=2, value=f"{total_summary['completed_count']:,} ใบ").border = border
+    ws.cell(row=9, column=2).alignment = Alignment(horizontal='right')
+
+    ws.cell(row=10, column=1, value="ใบสำคัญยกเลิก").border = border
+    ws.cell(row=10, column=2, value=f"{total_summary['cancelled_count']:,} ใบ").border = border
+    ws.cell(row=10, column=2).alignment = Alignment(horizontal='right')
+
+    ws.cell(row=11, column=1, value="รวมทั้งหมด").border = border
+    ws.cell(row=11, column=2, value=f"{total_summary['total_count']:,} ใบ").border = border
+    ws.cell(row=11, column=2).alignment = Alignment(horizontal='right')
+    ws.cell(row=11, column=1).font = Font(bold=True)
+    ws.cell(row=11, column=2).font = Font(bold=True)
+
+    ws.cell(row=12, column=1, value="หน่วยงานที่มีข้อมูล").border = border
+    ws.cell(row=12, column=2, value=f"{total_summary['total_departments']} หน่วยงาน").border = border
+    ws.cell(row=12, column=2).alignment = Alignment(horizontal='right')
+
+    # สรุปตามหน่วยงาน (ย้ายขึ้นมาก่อน)
+    dept_start_row = 14
+    ws[f'A{dept_start_row}'] = "สรุปตามหน่วยงาน"
+    ws[f'A{dept_start_row}'].font = Font(bold=True, size=12)
+
+    # Headers สำหรับตารางหน่วยงาน
+    dept_headers = ['หน่วยงาน', 'รหัส', 'เสร็จสิ้น', 'ยกเลิก', 'รวม', 'ยอดเงิน (บาท)', 'เปอร์เซ็นต์']
+    dept_header_row = dept_start_row + 1
+
+    for col, header in enumerate(dept_headers, 1):
+        cell = ws.cell(row=dept_header_row, column=col)
+        cell.value = header
+        cell.font = Font(bold=True)
+        cell.fill = header_fill
+        cell.alignment = Alignment(horizontal='center')
+        cell.border = border
+
+    # ข้อมูลหน่วยงาน
+    for i, dept in enumerate(department_summary, 1):
+        row = dept_header_row + i
+        ws.cell(row=row, column=1, value=dept['department']).border = border
+        ws.cell(row=row, column=2, value=dept['department_code']).border = border
+        ws.cell(row=row, column=3, value=dept['completed_count']).border = border
+        ws.cell(row=row, column=4, value=dept['cancelled_count']).border = border
+        ws.cell(row=row, column=5, value=dept['count']).border = border
+        ws.cell(row=row, column=6, value=dept['amount']).border = border
+        ws.cell(row=row, column=7, value=f"{dept['percentage']}%").border = border
+
+        # จัดรูปแบบ
+        ws.cell(row=row, column=3).alignment = Alignment(horizontal='center')
+        ws.cell(row=row, column=4).alignment = Alignment(horizontal='center')
+        ws.cell(row=row, column=5).alignment = Alignment(horizontal='center')
+        ws.cell(row=row, column=6).alignment = Alignment(horizontal='right')
+        ws.cell(row=row, column=7).alignment = Alignment(horizontal='center')
+
+    # ตารางรายรับ (เปลี่ยนชื่อจาก "สรุปตามช่วงเวลา")
+    period_start_row = dept_header_row + len(department_summary) + 2
+
+    # ชื่อตาราง
+    if is_custom_mode:
+        period_title = "ตารางรายรับ (รายวัน - กำหนดเอง)"
+    elif period_type == 'daily':
+        period_title = "ตารางรายรับ (รายวัน)"
+    elif period_type == 'monthly':
+        period_title = "ตารางรายรับ (รายเดือน)"
+    elif period_type == 'fiscal_year':
+        period_title = "ตารางรายรับ (รายปีงบประมาณ)"
+    else:
+        period_title = "ตารางรายรับ"
+
+    ws[f'A{period_start_row}'] = period_title
+    ws[f'A{period_start_row}'].font = Font(bold=True, size=12)
+
+    # Headers สำหรับตารางรายรับ
+    headers = ['ช่วงเวลา', 'เสร็จสิ้น', 'ยกเลิก', 'รวม', 'ยอดเงิน (บาท)']
+    period_header_row = period_start_row + 1
+
+    for col, header in enumerate(headers, 1):
+        cell = ws.cell(row=period_header_row, column=col)
+        cell.value = header
+        cell.font = Font(bold=True)
+        cell.fill = header_fill
+        cell.alignment = Alignment(horizontal='center')
+        cell.border = border
+
+    # คำนวณยอดรวม
+    total_count = 0
+    total_completed = 0
+    total_cancelled = 0
+    total_amount = 0
+
+    # ข้อมูลตารางรายรับ
+    for i, period in enumerate(period_summary, 1):
+        row = period_header_row + i
+
+        # แปลงวันที่เป็นภาษาไทยถ้าเป็น date object
+        if isinstance(period['period'], date):
+            period_display = convert_to_thai_date(period['period'], 'short')
+        else:
+            period_display = str(period['period'])
+
+        ws.cell(row=row, column=1, value=period_display).border = border
+        ws.cell(row=row, column=2, value=period.get('completed_count', 0)).border = border
+        ws.cell(row=row, column=3, value=period.get('cancelled_count', 0)).border = border
+        ws.cell(row=row, column=4, value=period['count']).border = border
+        ws.cell(row=row, column=5, value=period['amount']).border = border
+
+        # จัดรูปแบบตัวเลข
+        ws.cell(row=row, column=2).alignment = Alignment(horizontal='center')
+        ws.cell(row=row, column=3).alignment = Alignment(horizontal='center')
+        ws.cell(row=row, column=4).alignment = Alignment(horizontal='center')
+        ws.cell(row=row, column=5).alignment = Alignment(horizontal='right')
+
+        # เก็บยอดรวม
+        total_completed += period.get('completed_count', 0)
+        total_cancelled += period.get('cancelled_count', 0)
+        total_count += period['count']
+        total_amount += period['amount']
+
+    # เพิ่มแถวรวม
+    summary_row = period_header_row + len(period_summary) + 1
+    ws.cell(row=summary_row, column=1, value="รวม").border = border
+    ws.cell(row=summary_row, column=1).font = Font(bold=True)
+    ws.cell(row=summary_row, column=1).fill = header_fill
+    ws.cell(row=summary_row, column=1).alignment = Alignment(horizontal='center')
+
+    ws.cell(row=summary_row, column=2, value=total_completed).border = border
+    ws.cell(row=summary_row, column=2).font = Font(bold=True)
+    ws.cell(row=summary_row, column=2).fill = header_fill
+    ws.cell(row=summary_row, column=2).alignment = Alignment(horizontal='center')
+
+    ws.cell(row=summary_row, column=3, value=total_cancelled).border = border
+    ws.cell(row=summary_row, column=3).font = Font(bold=True)
+    ws.cell(row=summary_row, column=3).fill = header_fill
+    ws.cell(row=summary_row, column=3).alignment = Alignment(horizontal='center')
+
+    ws.cell(row=summary_row, column=4, value=total_count).border = border
+    ws.cell(row=summary_row, column=4).font = Font(bold=True)
+    ws.cell(row=summary_row, column=4).fill = header_fill
+    ws.cell(row=summary_row, column=4).alignment = Alignment(horizontal='center')
+
+    ws.cell(row=summary_row, column=5, value=total_amount).border = border
+    ws.cell(row=summary_row, column=5).font = Font(bold=True)
+    ws.cell(row=summary_row, column=3).fill = header_fill
+    ws.cell(row=summary_row, column=3).alignment = Alignment(horizontal='right')
+    
+    # ปรับความกว้างคอลัมน์
+    ws.column_dimensions['A'].width = 20
+    ws.column_dimensions['B'].width = 15
+    ws.column_dimensions['C'].width = 15
+    ws.column_dimensions['D'].width = 20
+    ws.column_dimensions['E'].width = 15
+    
+    # สร้าง response
+    response = HttpResponse(content_type='application/vnd.openxmlformats-officedocument.spreadsheetml.sheet')
+    response['Content-Disposition'] = 'attachment; filename="revenue_summary_report.xlsx"'
+    
+    wb.save(response)
+    return response
+
+
+@login_required
+def revenue_summary_pdf_export(request):
+    """
+    Export รายงานสรุปรายรับเป็น PDF
+    """
+    from reportlab.pdfgen import canvas
+    from reportlab.lib.pagesizes import A4
+    from reportlab.platypus import SimpleDocTemplate, Table, Paragraph, Spacer, Image
+    from reportlab.lib.units import inch, cm
+    from utils.file_response import file_response, spooled_file
+    from datetime import date
+    from utils.fiscal_year import get_current_fiscal_year
+    from accounts.pdf_styles import report_styles, thai_fonts
+    from accounts.utils import convert_to_thai_date
+    from django.conf import settings
+    import os
+    
+    # ฟอนต์ไทย + style (ลงทะเบียน/สร้างครั้งเดียวต่อ process)
+    fonts = thai_fonts()
+    thai_font, thai_font_bold = fonts.regular, fonts.bold
+    styles = report_styles(fonts)
+    
+    # ตรวจสอบสิทธิ์การเข้าถึงรายงาน
+    scope = ReceiptScope.for_request(request)
+    if not scope.can_view_reports:
+        messages.error(request, 'คุณไม่มีสิทธิ์เข้าถึงหน้ารายงาน')
+        return redirect('dashboard')
+
+    # ใช้ logic เดียวกันกับ revenue_summary_report_view - กรองเฉพาะใบที่ผ่านกระบวนการทางบัญชี
+    view_scope = scope.report_label
+
+    # รับค่า filter
+    period_type = request.GET.get('period', 'monthly')
+    filters = scope.filters(request.GET)
+
+    # ตรวจสอบ Custom Date Range Mode
+    is_custom_mode = filters.has_date_range
+
+    # สรุปยอดรวม / รายหน่วยงาน / รายช่วงเวลา (ชุดเดียวกับหน้ารายงานและไฟล์ส่งออก — cache ไว้ใน accounts/revenue_summary.py)
+    summary = get_revenue_summary(scope, filters, period_type)
+    total_summary = summary['total_summary']
+    department_summary = summary['department_summary']
+    period_summary = summary['period_summary']
+
+    # เขียน PDF ลง spooled temp file แล้วส่งด้วย FileResponse (ไม่คัดลอกทั้งไฟล์เป็น bytes)
+    output = spooled_file()
+    
+    # สร้าง PDF document (landscape สำหรับตารางกว้าง)
+    from reportlab.lib.pagesizes import landscape
+    doc = SimpleDocTemplate(output, pagesize=landscape(A4), topMargin=0.5*inch)
+    
+    # styles หัวรายงานแบบไม่มี logo
+    title_style = styles.summary_title
+    header_style = styles.summary_header
+    
+    # สร้างเนื้อหา PDF
+    story = []
+
+    # เพิ่ม Logo มหาวิทยาลัยที่มุมซ้ายบน
+    current_fiscal = get_current_fiscal_year()
+
+    # ช่วงวันที่ (แปลงเป็นวันที่ไทย)
+    date_range = ""
+    if filters.start_date and filters.end_date:
+        start_thai = convert_to_thai_date(filters.start_date, 'short')
+        end_thai = convert_to_thai_date(filters.end_date, 'short')
+        date_range = f"ระหว่างวันที่ {start_thai} ถึง {end_thai}"
+    elif filters.start_date:
+        start_thai = convert_to_thai_date(filters.start_date, 'short')
+        date_range = f"ตั้งแต่วันที่ {start_thai}"
+    elif filters.end_date:
+        end_thai = convert_to_thai_date(filters.end_date, 'short')
+        date_range = f"จนถึงวันที่ {end_thai}"
+    else:
+        date_range = "ทุกช่วงเวลา"
+
+    # สร้าง Header พร้อม Logo
+    try:
+        logo_path = os.path.join(settings.BASE_DIR, 'static', 'images', 'logo.png')
+        if not os.path.exists(logo_path):
+            logo_path = os.path.join(settings.BASE_DIR, 'static', 'images', 'logo.jpg')
+
+        if os.path.exists(logo_path):
+            # สร้างตารางแบบ 2 คอลัมน์: Logo (ซ้าย) | ข้อมูลรายงาน (ขวา)
+            logo_img = Image(logo_path, width=3*cm, height=3*cm)
+
+            # ข้อความด้านขวา - ใช้ thai_font
+            header_text = f'''<para align=center>
+                <font name="{thai_font}" size=18><b>รายงานสรุปรายรับ</b></font><br/>
+                <font name="{thai_font}" size=12>ประจำปีงบประมาณ {current_fiscal}</font><br/>
+                <font name="{thai_font}" size=12>ขอบเขต: {view_scope}</font><br/>
+                <font name="{thai_font}" size=12>{date_range}</font>
+            </para>'''
+
+            header_data = [[logo_img, Paragraph(header_text, styles.header_para)]]
+            header_table = Table(header_data, colWidths=[3.5*cm, 7.5*inch])
+            header_table.setStyle(styles.header_table)
+
+            story.append(header_table)
+        else:
+            # ถ้าไม่มี logo ให้แสดงแบบเดิม
+            story.append(Paragraph('รายงานสรุปรายรับ', title_style))
+            story.append(Paragraph(f'ประจำปีงบประมาณ {current_fiscal}', header_style))
+            story.append(Paragraph(f'ขอบเขต: {view_scope}', header_style))
+            story.append(Paragraph(date_range, header_style))
+
+    except Exception as e:
+        # ถ้า error ให้แสดงแบบเดิม
+        story.append(Paragraph('รายงานสรุปรายรับ', title_style))
+        story.append(Paragraph(f'ประจำปีงบประมาณ {current_fiscal}', header_style))
+        story.append(Paragraph(f'ขอบเขต: {view_scope}', header_style))
+        story.append(Paragraph(date_range, header_style))
+
+    story.append(Spacer(1, 4))
+
+    # สรุปยอดรวม - รูปแบบเดียวกับตารางอื่น
+    story.append(Paragraph('สรุปยอดรวม', styles.sub_header))
+
+    summary_headers = ['รายการ', 'จำนวน']
+    summary_data = [summary_headers]
+    summary_data.append(['ยอดเงินรวม', f'{total_summary["total_amount"]:,.2f} บาท'])
+    summary_data.append(['จำนวนใบสำคัญ', f'{total_summary["total_count"]:,} ใบ'])
+    summary_data.append(['หน่วยงานที่มีข้อมูล', f'{total_summary["total_departments"]} หน่วยงาน'])
+
+    summary_table = Table(summary_data, colWidths=[5*inch, 5*inch])
+    summary_table.setStyle(styles.summary_table)
+
+    story.append(summary_table)
+    story.append(Spacer(1, 4))
+
+    # สรุปตามหน่วยงาน (ย้ายขึ้นมาก่อน)
+    if department_summary:
+        story.append(Paragraph('สรุปตามหน่วยงาน', styles.sub_header))
+
+        dept_headers = ['หน่วยงาน', 'รหัส', 'เสร็จสิ้น', 'ยกเลิก', 'รวม', 'ยอดเงิน (บาท)', 'เปอร์เซ็นต์']
+        dept_data = [dept_headers]
+
+        for dept in department_summary[:10]:  # จำกัด 10 อันดับแรก
+            dept_data.append([
+                dept['department'][:30],
+                dept['department_code'],
+                str(dept['completed_count']),
+                str(dept['cancelled_count']),
+                str(dept['count']),
+                f"{dept['amount']:,.0f}",
+                f"{dept['percentage']}%"
+            ])
+
+        # ตารางเต็มกระดาษ landscape A4 - ความกว้างรวม 10 inch
+        dept_table = Table(dept_data, colWidths=[2.8*inch, 1.2*inch, 0.9*inch, 0.9*inch, 0.9*inch, 2*inch, 1.3*inch])
+        dept_table.setStyle(styles.department_table)
+
+        story.append(dept_table)
+        story.append(Spacer(1, 4))
+
+    # ตารางรายรับ (เปลี่ยนชื่อจาก "แนวโน้มรายรับ")
+    if period_summary:
+        period_title = "ตารางรายรับ"
+        if period_type == 'daily':
+            period_title = "ตารางรายรับ (รายวัน)"
+        elif period_type == 'monthly':
+            period_title = "ตารางรายรับ (รายเดือน)"
+        elif period_type == 'fiscal_year':
+            period_title = "ตารางรายรับ (รายปีงบประมาณ)"
+
+        story.append(Paragraph(period_title, styles.sub_header))
+
+        period_headers = ['ช่วงเวลา', 'เสร็จสิ้น', 'ยกเลิก', 'รวม', 'ยอดเงิน (บาท)']
+        period_data = [period_headers]
+
+        # คำนวณยอดรวม
+        total_completed = 0
+        total_cancelled = 0
+        total_count = 0
+        total_amount = 0
+
+        # แสดงข้อมูลครบถ้วนตามที่ผู้ใช้เลือก period
+        for period in period_summary:
+            # แปลงวันที่เป็นรูปแบบไทยถ้าเป็น date object
+            if isinstance(period['period'], date):
+                period_display = convert_to_thai_date(period['period'], 'short')
+            else:
+                period_display = str(period['period'])
+
+            period_data.append([
+                period_display,
+                str(period.get('completed_count', 0)),
+                str(period.get('cancelled_count', 0)),
+                str(period['count']),
+                f"{period['amount']:,.0f}"
+            ])
+
+            # เก็บยอดรวม
+            total_completed += period.get('completed_count', 0)
+            total_cancelled += period.get('cancelled_count', 0)
+            total_count += period['count']
+            total_amount += period['amount']
+
+        # เพิ่มแถวรวมท้ายตาราง
+        period_data.append([
+            'รวม',
+            str(total_completed),
+            str(total_cancelled),
+            str(total_count),
+            f"{total_amount:,.0f}"
+        ])
+
+        # ตารางเต็มกระดาษ landscape A4 - ความกว้างรวม 10 inch (แถวรวมท้ายตารางอยู่ใน styles.period_table)
+        period_table = Table(period_data, colWidths=[3*inch, 1.5*inch, 1.5*inch, 1.5*inch, 2.5*inch])
+        period_table.setStyle(styles.period_table)
+
+        story.append(period_table)
+
+    # เพิ่มลายเซ็นต์และชื่อท้ายรายงาน
+    story.append(Spacer(1, 20))
+
+    # สร้างตารางลายเซ็นต์ (เยื้องขวา)
+    signature_data = [
+        ['ลงชื่อ ............................................................................'],
+        ['( ............................................................................ )'],
+        ['ตำแหน่ง ..........................................................................']
+    ]
+
+    signature_table = Table(signature_data, colWidths=[4*inch])
+    signature_table.setStyle(styles.signature_table)
+
+    # สร้างตารางเพื่อจัดให้ลายเซ็นต์อยู่ทางขวา
+    align_right_data = [['', signature_table]]
+    align_right_table = Table(align_right_data, colWidths=[5.5*inch, 4.5*inch])
+    align_right_table.setStyle(styles.signature_align_table)
+
+    story.append(align_right_table)
+
+    # สร้าง PDF
+    doc.build(story)
+    
+    return file_response(request, output, 'revenue_summary_report.pdf', 'application/pdf')
+
+
+@login_required
+def receipt_report_pdf_export(request):
+    """
+    Export รายงานใบสำคัญรับเงินเป็น PDF
+    หมายเหตุ: รายงานนี้แสดงเฉพาะใบสำคัญที่ผ่านกระบวนการทางบัญชีแล้ว (ไม่รวมร่าง)
+    """
+    from reportlab.pdfgen import canvas
+    from reportlab.lib.pagesizes import A4, landscape
+    from reportlab.platypus import SimpleDocTemplate, Table, Paragraph, Spacer, Image
+    from reportlab.lib.units import inch, cm
+    from utils.file_response import file_response, spooled_file
+    from django.db.models import Count, Sum
+    from utils.fiscal_year import get_current_fiscal_year
+    from accounts.pdf_styles import report_styles, thai_fonts
+    from accounts.pdf_tables import PagedTable
+    from accounts.utils import convert_to_thai_date
+    from django.conf import settings
+    import os
+
+    # ฟอนต์ไทย + style (ลงทะเบียน/สร้างครั้งเดียวต่อ process)
+    fonts = thai_fonts()
+    thai_font, thai_font_bold = fonts.regular, fonts.bold
+    styles = report_styles(fonts)
+
+    # ตรวจสอบสิทธิ์การเข้าถึงรายงาน
+    scope = ReceiptScope.for_request(request)
+    if not scope.can_view_reports:
+        messages.error(request, 'คุณไม่มีสิทธิ์เข้าถึงหน้ารายงาน')
+        return redirect('dashboard')
+
+    # ใช้ logic เดียวกันกับ receipt_report_view สำหรับ filter
+    # กรองเฉพาะเอกสารที่ผ่านกระบวนการทางบัญชีแล้ว (มีเลขที่เอกสาร)
+    view_scope = scope.report_label
+    filters = scope.filters(request.GET)
+    receipts = filters.apply(scope.report_receipts())
+
+    receipts = receipts.order_by('receipt_date', 'receipt_number')
+
+    # เขียน PDF ลง spooled temp file แล้วส่งด้วย FileResponse (inline - เปิดในแท็บใหม่)
+    output = spooled_file()
+
+    # สร้าง PDF document
+    doc = SimpleDocTemplate(output, pagesize=landscape(A4), topMargin=0.5*inch)
+
+    # styles หัวรายงานแบบไม่มี logo
+    title_style = styles.title
+    header_style = styles.header
+
+    # สร้างเนื้อหา PDF
+    story = []
+
+    # Header information
+    current_fiscal = get_current_fiscal_year()
+
+    # ช่วงวันที่ (แปลงเป็นวันที่ไทย)
+    date_range = ""
+    if filters.start_date and filters.end_date:
+        start_thai = convert_to_thai_date(filters.start_date, 'short')
+        end_thai = convert_to_thai_date(filters.end_date, 'short')
+        date_range = f"ระหว่างวันที่ {start_thai} ถึง {end_thai}"
+    elif filters.start_date:
+        start_thai = convert_to_thai_date(filters.start_date, 'short')
+        date_range = f"ตั้งแต่วันที่ {start_thai}"
+    elif filters.end_date:
+        end_thai = convert_to_thai_date(filters.end_date, 'short')
+        date_range = f"จนถึงวันที่ {end_thai}"
+    else:
+        date_range = "ทุกช่วงเวลา"
+
+    # สร้าง Header พร้อม Logo
+    try:
+        logo_path = os.path.join(settings.BASE_DIR, 'static', 'images', 'logo.png')
+        if not os.path.exists(logo_path):
+            logo_path = os.path.join(settings.BASE_DIR, 'static', 'images', 'logo.jpg')
+
+        if os.path.exists(logo_path):
+            # สร้างตารางแบบ 2 คอลัมน์: Logo (ซ้าย) | ข้อมูลรายงาน (ขวา)
+            logo_img = Image(logo_path, width=3*cm, height=3*cm)
+
+            # ข้อความด้านขวา - ใช้ thai_font
+            scope_text = f'ขอบเขต: {view_scope}' if not filters.department else f'ชื่อหน่วยงาน: {filters.department}'
+            header_text = f'''<para align=center>
+                <font name="{thai_font_bold}" size=18><b>รายงานใบสำคัญรับเงิน</b></font><br/>
+                <font name="{thai_font}" size=12>ประจำปีงบประมาณ {current_fiscal}</font><br/>
+                <font name="{thai_font}" size=12>{scope_text}</font><br/>
+                <font name="{thai_font}" size=12>{date_range}</font>
+            </para>'''
+
+            header_data = [[logo_img, Paragraph(header_text, styles.header_para)]]
+            header_table = Table(header_data, colWidths=[3.5*cm, 7.5*inch])
+            header_table.setStyle(styles.header_table)
+
+            story.append(header_table)
+        else:
+            # ถ้าไม่มี logo ให้แสดงแบบเดิม
+            story.append(Paragraph('รายงานใบสำคัญรับเงิน', title_style))
+            story.append(Paragraph(f'ประจำปีงบประมาณ {current_fiscal}', header_style))
+            if filters.department:
+                story.append(Paragraph(f'ชื่อหน่วยงาน: {filters.department}', header_style))
+            else:
+                story.append(Paragraph(f'ขอบเขต: {view_scope}', header_style))
+            story.append(Paragraph(date_range, header_style))
+
+    except Exception as e:
+        # ถ้า error ให้แสดงแบบเดิม
+        story.append(Paragraph('รายงานใบสำคัญรับเงิน', title_style))
+        story.append(Paragraph(f'ประจำปีงบประมาณ {current_fiscal}', header_style))
+        if filters.department:
+            story.append(Paragraph(f'ชื่อหน่วยงาน: {filters.department}', header_style))
+        else:
+            story.append(Paragraph(f'ขอบเขต: {view_scope}', header_style))
+        story.append(Paragraph(date_range, header_style))
+
+    story.append(Spacer(1, 4))
+
+    # เพิ่มหัวข้อตาราง
+    story.append(Paragraph('รายการใบสำคัญรับเงิน', styles.sub_header))
+
+    # style สำหรับเซลล์ในตาราง
+    cell_style = styles.cell
+
+    # สร้างตาราง - ตามฟอร์มที่หน่วยงานกำหนด
+    headers = ['ลำดับ', 'ใบสำคัญเลขที่', 'วันที่ขอ', 'รายการ', 'จำนวนเงิน', 'ผู้รับเงิน', 'ผู้จ่ายเงิน', 'หมายเหตุ']
+    table_rows = []
+
+    # คำนวณยอดรวม - แยกตามสถานะ จากทุกรายการที่ตรง filter (รวมแถวที่เกิน RECEIPT_REPORT_PDF_MAX_ROWS)
+    totals = receipts.aggregate(
+        receipt_count=Count('id'),
+        completed_count=Count('id', filter=Q(status='completed')),
+        cancelled_count=Count('id', filter=Q(status='cancelled')),
+        total_amount=Sum('total_amount', filter=Q(status='completed')),
+    )
+    completed_count = totals['completed_count']
+    cancelled_count = totals['cancelled_count']
+    total_amount = totals['total_amount'] or 0
+    status_map = {'draft': 'ร่าง', 'completed': 'เสร็จสิ้น', 'cancelled': 'ยกเลิก'}
+    row_backgrounds = {}  # index ของแถวที่ยกเลิก → สีพื้นหลัง
+
+    # อ่านเฉพาะคอลัมน์ที่ใช้ทีละ batch (ไม่สร้าง model object) แล้วดึงรายการ (items) ของทั้ง batch ใน query เดียว
+    max_rows = getattr(settings, 'RECEIPT_REPORT_PDF_MAX_ROWS', 5000)
+    rows = receipts.values_list(
+        'id', 'receipt_number', 'receipt_date', 'total_amount', 'recipient_name', 'is_loan', 'status', 'created_by_id',
+    )[:max_rows].iterator(chunk_size=REPORT_BATCH_SIZE)
+    payer_names = {}  # created_by_id → ชื่อที่แสดง
+
+    for batch in _batched(rows, REPORT_BATCH_SIZE):
+        items_by_receipt = defaultdict(list)
+        for receipt_id, description in ReceiptItem.objects.filter(
+            receipt_id__in=[row[0] for row in batch]
+        ).order_by('receipt_id', 'order').values_list('receipt_id', 'description'):
+            items_by_receipt[receipt_id].append(description)
+
+        loan_users = {row[7] for row in batch if row[5] and row[7]} - payer_names.keys()
+        if loan_users:
+            for user in User.objects.filter(pk__in=loan_users):
+                payer_names[user.pk] = user.get_display_name()
+
+        for receipt_id, receipt_number, receipt_date, amount, recipient_name, is_loan, status, created_by_id in batch:
+            index = len(table_rows) + 1
+
+            # แปลงวันที่เป็นรูปแบบไทย
+            if receipt_date:
+                thai_date = convert_to_thai_date(receipt_date, 'short')
+            else:
+                thai_date = "-"
+
+            # รวมรายการ (items) - แสดงเต็มไม่ย่อ และขึ้นบรรทัดใหม่ทุกรายการ
+            items_text = items_by_receipt.get(receipt_id)
+            items_display_text = "<br/>".join(items_text) if items_text else "-"  # ใช้ <br/> สำหรับ Paragraph
+
+            # แปลงเป็น Paragraph เพื่อให้ word wrap ทำงาน
+            items_paragraph = Paragraph(items_display_text, cell_style)
+
+            # ผู้รับเงิน และ ผู้จ่ายเงิน - ขึ้นอยู่กับประเภท
+            recipient_text = recipient_name or "-"
+            if is_loan:
+                # กรณียืมเงิน - แสดงทั้งผู้รับและผู้จ่าย
+                payer_text = payer_names.get(created_by_id, "-")
+                payment_type = "ยืมเงิน"
+            else:
+                # กรณีจ่ายปกติ - แสดงเฉพาะผู้รับ, ผู้จ่ายเป็น "-"
+                payer_text = "-"
+                payment_type = "จ่ายปกติ"
+
+            # แปลงเป็น Paragraph เพื่อให้ตัดคำได้
+            recipient_paragraph = Paragraph(recipient_text, cell_style)
+            payer_paragraph = Paragraph(payer_text, cell_style)
+
+            # หมายเหตุ: สถานะ / ประเภทการจ่าย
+            note = f"{status_map.get(status, status)} / {payment_type}"
+
+            table_rows.append([
+                str(index),
+                receipt_number or "-",
+                thai_date,
+                items_paragraph,  # ใช้ Paragraph แทน plain text
+                f"{amount:,.2f}",
+                recipient_paragraph,  # ใช้ Paragraph เพื่อให้ตัดคำได้
+                payer_paragraph,  # ใช้ Paragraph เพื่อให้ตัดคำได้
+                note
+            ])
+
+            # แถวที่ยกเลิกใส่สีพื้นหลัง (สีเทาอ่อนกว่าหัวตาราง)
+            if status == 'cancelled':
+                row_backgrounds[index - 1] = styles.cancelled_row_background
+
+    # สร้างข้อความแสดงสถานะ
+    status_parts = []
+    if completed_count > 0:
+        status_parts.append(f'เสร็จสิ้น {completed_count}')
+    if cancelled_count > 0:
+        status_parts.append(f'ยกเลิก {cancelled_count}')
+    status_text = ' '.join(status_parts) if status_parts else '0 ใบ'
+
+    # แถวรวม - ใช้ merge cells
+    total_row = [
+        status_text,  # Merge ลำดับ + ใบสำคัญเลขที่ (0-1)
+        '',
+        'รวม',  # Merge วันที่ขอ + รายการ (2-3)
+        '',
+        f'{total_amount:,.2f}',
+        '',
+        '',
+        ''
+    ]
+
+    # สร้างตาราง - เต็มหน้า landscape A4 (ปรับคอลัมน์ให้สมดุล)
+    # ลดความกว้าง: ใบสำคัญเลขที่(0.8), วันที่ขอ(0.8), จำนวนเงิน(0.8), หมายเหตุ(1.1)
+    # เพิ่มความกว้าง: ผู้รับเงิน, ผู้จ่ายเงิน
+    # จัดทีละหน้า หัวตารางซ้ำทุกหน้า แถวรวมอยู่ท้ายหน้าสุดท้าย (styles.receipt_table)
+    table = PagedTable(
+        headers, table_rows,
+        [0.4*inch, 0.8*inch, 0.8*inch, 3.35*inch, 0.8*inch, 1.65*inch, 1.65*inch, 1.1*inch],
+        styles.receipt_table_body,
+        footer=total_row, footer_style=styles.receipt_table,
+        row_backgrounds=row_backgrounds,
+    )
+
+    story.append(table)
+
+    # เพิ่มหมายเหตุใต้ตาราง
+    story.append(Spacer(1, 8))
+    note_text = "หมายเหตุ: ยอดรวมคำนวณจากรายการที่เสร็จสิ้นเท่านั้น รายการที่ยกเลิกไม่นำมารวมในการคำนวณ"
+    story.append(Paragraph(note_text, styles.note))
+    if len(table_rows) < totals['receipt_count']:
+        story.append(Paragraph(
+            f"แสดง {len(table_rows):,} จาก {totals['receipt_count']:,} รายการ "
+            f"(ยอดรวมและจำนวนใบคำนวณจากทุกรายการ) กรุณากรองช่วงวันที่ให้แคบลงหรือ Export เป็น Excel เพื่อดูครบทุกรายการ",
+            styles.note,
+        ))
+
+    # เพิ่มลายเซ็นต์ท้ายรายงาน
+    story.append(Spacer(1, 20))
+
+    # สร้างตารางลายเซ็นต์
+    signature_data = [
+        ['ลงชื่อ ............................................................................'],
+        ['( ............................................................................ )'],
+        ['ตำแหน่ง ..........................................................................']
+    ]
+
+    signature_table = Table(signature_data, colWidths=[4*inch])
+    signature_table.setStyle(styles.signature_table)
+
+    # สร้างตารางเพื่อจัดให้ลายเซ็นต์อยู่ทางขวา
+    align_right_data = [['', signature_table]]
+    align_right_table = Table(align_right_data, colWidths=[5.5*inch, 4.5*inch])
+    align_right_table.setStyle(styles.signature_align_table)
+
+    story.append(align_right_table)
+
+    # สร้าง PDF
+    doc.build(story)
+
+    return file_response(request, output, 'receipt_report.pdf', 'application/pdf')
+
+
+@login_required
+def receipt_report_excel_export(request):
+    """
+    Export รายงานใบสำคัญรับเงินเป็น Excel ตามฟอร์มที่กำหนด
+    หมายเหตุ: รายงานนี้แสดงเฉพาะใบสำคัญที่ผ่านกระบวนการทางบัญชีแล้ว (ไม่รวมร่าง)
+    """
+    import openpyxl
+    from openpyxl.styles import Font, Alignment, Border, Side, PatternFill
+    from openpyxl.utils import get_column_letter
+    from django.http import HttpResponse
+    from django.db.models import Sum
+    from datetime import datetime
+    from utils.fiscal_year import get_current_fiscal_year
+    from accounts.utils import convert_to_thai_date
+
+    # ตรวจสอบสิทธิ์การเข้าถึงรายงาน
+    scope = ReceiptScope.for_request(request)
+    if not scope.can_view_reports:
+        messages.error(request, 'คุณไม่มีสิทธิ์เข้าถึงหน้ารายงาน')
+        return redirect('dashboard')
+
+    # ใช้ logic เดียวกันกับ receipt_report_view สำหรับ filter
+    # กรองเฉพาะเอกสารที่ผ่านกระบวนการทางบัญชีแล้ว (มีเลขที่เอกสาร)
+    view_scope = scope.report_label
+    filters = scope.filters(request.GET)
+    receipts = filters.apply(scope.report_receipts())
+
+    # เรียงลำดับ - จากวันที่น้อยไปมาก (ต้นเดือนไปปลายเดือน)
+    receipts = receipts.select_related('department', 'created_by').order_by('receipt_date', 'receipt_number')
+
+    # สร้าง Excel workbook
+    wb = openpyxl.Workbook()
+    ws = wb.active
+    ws.title = "รายงานใบสำคัญรับเงิน"
+
+    # กำหนดสี - ใช้เหมือน PDF
+    header_fill = PatternFill(start_color="D3D3D3", end_color="D3D3D3", fill_type="solid")  # lightgrey
+    cancelled_fill = PatternFill(start_color="E8E8E8", end_color="E8E8E8", fill_type="solid")  # อ่อนกว่า
+    border = Border(
+        left=Side(style='thin'),
+        right=Side(style='thin'),
+        top=Side(style='thin'),
+        bottom=Side(style='thin')
+    )
+
+    # Header information
+    current_fiscal = get_current_fiscal_year()
+    ws['A1'] = "รายงานใบสำคัญรับเงิน"
+    ws['A2'] = f"ประจำปีงบประมาณ {current_fiscal}"
+
+    # แสดงหน่วยงาน
+    if filters.department:
+        ws['A3'] = f"ชื่อหน่วยงาน: {filters.department}"
+    else:
+        ws['A3'] = f"ขอบเขต: {view_scope}"
+
+    # แสดงช่วงวันที่ - แปลงเป็นวันที่ไทย
+    if filters.start_date and filters.end_date:
+        start_thai = convert_to_thai_date(filters.start_date, 'short')
+        end_thai = convert_to_thai_date(filters.end_date, 'short')
+        date_range = f"ระหว่างวันที่ {start_thai} ถึง {end_thai}"
+    elif filters.start_date:
+        start_thai = convert_to_thai_date(filters.start_date, 'short')
+        date_range = f"ตั้งแต่วันที่ {start_thai}"
+    elif filters.end_date:
+        end_thai = convert_to_thai_date(filters.end_date, 'short')
+        date_range = f"จนถึงวันที่ {end_thai}"
+    else:
+        date_range = "ทุกช่วงเวลา"
+
+    ws['A4'] = date_range
+
+    # ปรับ style สำหรับ header
+    for row in range(1, 5):
+        ws[f'A{row}'].font = Font(bold=True, size=14 if row == 1 else 12)
+        ws[f'A{row}'].alignment = Alignment(horizontal='center' if row == 1 else 'left')
+
+    # Merge cells สำหรับ title
+    ws.merge_cells('A1:H1')
+
+    # หัวข้อตาราง
+    ws['A5'] = "รายการใบสำคัญรับเงิน"
+    ws['A5'].font = Font(bold=True, size=12)
+    ws.merge_cells('A5:H5')
+
+    # Table headers (row 6) - ตามฟอร์ม
+    headers = [
+        'ลำดับ',
+        'ใบสำคัญเลขที่',
+        'วันที่ขอ',
+        'รายการ',
+        'จำนวนเงิน',
+        'ผู้รับเงิน',
+        'ผู้จ่ายเงิน',
+        'หมายเหตุ'
+    ]
+
+    for col, header in enumerate(headers, 1):
+        cell = ws.cell(row=6, column=col)
+        cell.value = header
+        cell.font = Font(bold=True)
+        cell.fill = header_fill
+        cell.alignment = Alignment(horizontal='center', vertical='center')
+        cell.border = border
+
+    # Data rows
+    row_num = 7
+    total_amount = 0
+    total_count = 0
+    status_map = {'draft': 'ร่าง', 'completed': 'เสร็จสิ้น', 'cancelled': 'ยกเลิก'}
+
+    for index, receipt in enumerate(receipts[:200], 1):  # จำกัด 200 รายการ
+        # รวมรายการ - แสดงเต็ม และขึ้นบรรทัดใหม่
+        items_text = []
+        for item in receipt.items.all():
+            items_text.append(f"{item.description}")
+        items_display = "\n".join(items_text) if items_text else "-"
+
+        # ผู้รับเงิน และ ผู้จ่ายเงิน - ขึ้นอยู่กับประเภท
+        recipient = receipt.recipient_name or "-"
+        if receipt.is_loan:
+            # กรณียืมเงิน - แสดงทั้งผู้รับและผู้จ่าย
+            payer = receipt.created_by.get_display_name() if receipt.created_by else "-"
+            payment_type = "ยืมเงิน"
+        else:
+            # กรณีจ่ายปกติ - แสดงเฉพาะผู้รับ, ผู้จ่ายเป็น "-"
+            payer = "-"
+            payment_type = "จ่ายปกติ"
+
+        # หมายเหตุ: สถานะ / ประเภทการจ่าย
+        note = f"{status_map.get(receipt.status, receipt.status)} / {payment_type}"
+
+        # แปลงวันที่เป็นรูปแบบไทย
+        if receipt.receipt_date:
+            thai_date = convert_to_thai_date(receipt.receipt_date, 'short')
+        else:
+            thai_date = "-"
+
+        # เพิ่มข้อมูลลงในแถว
+        row_data = [
+            index,  # ลำดับ
+            receipt.receipt_number or "-",  # ใบสำคัญเลขที่
+            thai_date,  # วันที่ขอ (แบบไทย)
+            items_display,  # รายการ (แสดงเต็ม)
+            receipt.total_amount,  # จำนวนเงิน
+            recipient,  # ผู้รับเงิน
+            payer,  # ผู้จ่ายเงิน (ขึ้นอยู่กับประเภท)
+            note  # หมายเหตุ: สถานะ / ประเภทการจ่าย
+        ]
+
+        for col, value in enumerate(row_data, 1):
+            cell = ws.cell(row=row_num, column=col)
+            cell.value = value
+            cell.border = border
+
+            # จัดตำแหน่ง
+            if col == 1:  # ลำดับ
+                cell.alignment = Alignment(horizontal='center', vertical='top', wrap_text=True)
+            elif col == 5:  # จำนวนเงิน
+                cell.alignment = Alignment(horizontal='right', vertical='top', wrap_text=True)
+                cell.number_format = '#,##0.00'
+            elif col in [2, 3, 8]:  # เลขที่, วันที่, หมายเหตุ
+                cell.alignment = Alignment(horizontal='center', vertical='top', wrap_text=True)
+            else:  # รายการ, ผู้รับเงิน, ผู้จ่ายเงิน
+                cell.alignment = Alignment(horizontal='left', vertical='top', wrap_text=True)
+
+            # ใส่สีพื้นหลังสำหรับรายการที่ยกเลิก
+            if receipt.status == 'cancelled':
+                cell.fill = cancelled_fill
+
+        # นับยอดรวม - แยกตามสถานะ
+        if receipt.status == 'completed':
+            total_amount += receipt.total_amount
+            total_count += 1
+        elif receipt.status == 'cancelled':
+            pass  # นับไว้แล้วในตัวแปรแยก
+
+        row_num += 1
+
+    # สร้างข้อความแสดงสถานะ
+    completed_count = receipts.filter(status='completed').count()
+    cancelled_count = receipts.filter(status='cancelled').count()
+    status_parts = []
+    if completed_count > 0:
+        status_parts.append(f'เสร็จสิ้น {completed_count}')
+    if cancelled_count > 0:
+        status_parts.append(f'ยกเลิก {cancelled_count}')
+    status_text = ' '.join(status_parts) if status_parts else '0 ใบ'
+
+    # แถวรวม - Merge cells เหมือน PDF
+    summary_row = row_num
+
+    # Merge (ลำดับ + ใบสำคัญเลขที่) = คอลัมน์ 1-2
+    ws.merge_cells(start_row=summary_row, start_column=1, end_row=summary_row, end_column=2)
+    ws.cell(row=summary_row, column=1, value=status_text).font = Font(bold=True, size=12)
+    ws.cell(row=summary_row, column=1).alignment = Alignment(horizontal='center', vertical='center')
+    ws.cell(row=summary_row, column=1).fill = header_fill
+    ws.cell(row=summary_row, column=1).border = border
+
+    # Merge (วันที่ขอ + รายการ) = คอลัมน์ 3-4
+    ws.merge_cells(start_row=summary_row, start_column=3, end_row=summary_row, end_column=4)
+    ws.cell(row=summary_row, column=3, value="รวม").font = Font(bold=True, size=12)
+    ws.cell(row=summary_row, column=3).alignment = Alignment(horizontal='center', vertical='center')
+    ws.cell(row=summary_row, column=3).fill = header_fill
+    ws.cell(row=summary_row, column=3).border = border
+
+    # จำนวนเงิน = คอลัมน์ 5
+    ws.cell(row=summary_row, column=5, value=total_amount).font = Font(bold=True, size=12)
+    ws.cell(row=summary_row, column=5).alignment = Alignment(horizontal='right', vertical='center')
+    ws.cell(row=summary_row, column=5).number_format = '#,##0.00'
+    ws.cell(row=summary_row, column=5).fill = header_fill
+    ws.cell(row=summary_row, column=5).border = border
+
+    # Merge (ผู้รับเงิน + ผู้จ่ายเงิน + หมายเหตุ) = คอลัมน์ 6-8
+    ws.merge_cells(start_row=summary_row, start_column=6, end_row=summary_row, end_column=8)
+    ws.cell(row=summary_row, column=6).fill = header_fill
+    ws.cell(row=summary_row, column=6).border = border
+
+    # หมายเหตุใต้ตาราง
+    note_row = summary_row + 1
+    ws.cell(row=note_row, column=1, value="หมายเหตุ: ยอดรวมคำนวณจากรายการที่เสร็จสิ้นเท่านั้น รายการที่ยกเลิกไม่นำมารวมในการคำนวณ")
+    ws.cell(row=note_row, column=1).font = Font(size=11)
+    ws.cell(row=note_row, column=1).alignment = Alignment(horizontal='left', vertical='center')
+    ws.merge_cells(start_row=note_row, start_column=1, end_row=note_row, end_column=8)
+
+    # ปรับขนาดคอลัมน์
+    column_widths = [8, 18, 15, 50, 15, 25, 20, 15]
+    for col, width in enumerate(column_widths, 1):
+        ws.column_dimensions[get_column_letter(col)].width = width
+
+    # สร้าง response
+    response = HttpResponse(
+        content_type='application/vnd.openxmlformats-officedocument.spreadsheetml.sheet'
+    )
+
+    # สร้างชื่อไฟล์
+    filename = f"รายงานใบสำคัญรับเงิน_{datetime.now().strftime('%Y%m%d_%H%M%S')}.xlsx"
+    response['Content-Disposition'] = f'attachment; filename="{filename}"'
+
+    # บันทึก workbook
+    wb.save(response)
+    
+    return response
+
+
+@login_required
+def audit_log_excel_export(request):
+    """
+    Export Audit Log เป็น Excel
+    """
+    import openpyxl
+    from openpyxl.styles import Font, Alignment, PatternFill
+    from django.http import HttpResponse
+    from datetime import datetime
+
+    # ตรวจสอบสิทธิ์
+    if not (request.user.has_permission('receipt_view_all') or request.user.is_staff):
+        messages.error(request, 'คุณไม่มีสิทธิ์ export ข้อมูล')
+        return redirect('audit_log')
+
+    # Get same filters as main view
+    action_filter = request.GET.get('action', '')
+    department_filter = request.GET.get('department', '')
+    user_filter = request.GET.get('user', '')
+    date_from = request.GET.get('date_from', '')
+    date_to = request.GET.get('date_to', '')
+    search_query = request.GET.get('q', '')
+
+    # Build queryset with same filters
+    logs = ReceiptChangeLog.objects.select_related('receipt', 'user', 'edit_request').all()
+
+    if action_filter:
+        logs = logs.filter(action=action_filter)
+    if department_filter:
+        logs = logs.filter(receipt__department__id=department_filter)
+    if user_filter:
+        logs = logs.filter(user__id=user_filter)
+    if date_from:
+        logs = logs.filter(created_at__gte=datetime.strptime(date_from, '%Y-%m-%d'))
+    if date_to:
+        logs = logs.filter(created_at__lte=datetime.strptime(date_to, '%Y-%m-%d').replace(hour=23, minute=59, second=59))
+    if search_query:
+        from django.db.models import Q
+        logs = logs.filter(
+            Q(receipt__receipt_number__icontains=search_query) |
+            Q(user__full_name__icontains=search_query) |
+            Q(notes__icontains=search_query)
+        )
+
+    logs = logs.order_by('-created_at')
+
+    # Create workbook
+    wb = openpyxl.Workbook()
+    ws = wb.active
+    ws.title = 'Audit Log'
+
+    # Headers
+    headers = ['วันที่-เวลา', 'เลขที่ใบสำคัญ', 'การดำเนินการ', 'ฟิลด์', 'ค่าเดิม', 'ค่าใหม่', 'ผู้ดำเนินการ', 'หมายเหตุ']
+    ws.append(headers)
+
+    # Style headers
+    header_fill = PatternFill(start_color='366092', end_color='366092', fill_type='solid')
+    header_font = Font(bold=True, color='FFFFFF')
+    for cell in ws[1]:
+        cell.fill = header_fill
+        cell.font = header_font
+        cell.alignment = Alignment(horizontal='center')
+
+    # Add data
+    for log in logs:
+        ws.append([
+            log.created_at.strftime('%d/%m/%Y %H:%M:%S'),
+            log.receipt.receipt_number,
+            log.get_action_display(),
+            log.field_name or '-',
+            log.old_value or '-',
+            log.new_value or '-',
+            log.user.get_display_name() if log.user else '-',
+            log.notes or '-'
+        ])
+
+    # Adjust column widths
+    ws.column_dimensions['A'].width = 20
+    ws.column_dimensions['B'].width = 18
+    ws.column_dimensions['C'].width = 20
+    ws.column_dimensions['D'].width = 15
+    ws.column_dimensions['E'].width = 20
+    ws.column_dimensions['F'].width = 20
+    ws.column_dimensions['G'].width = 25
+    ws.column_dimensions['H'].width = 40
+
+    # Create response
+    response = HttpResponse(
+        content_type='application/vnd.openxmlformats-officedocument.spreadsheetml.sheet'
+    )
+    filename = f'audit_log_{datetime.now().strftime("%Y%m%d_%H%M%S")}.xlsx'
+    response['Content-Disposition'] = f'attachment; filename={filename}'
+
+    wb.save(response)
+    return response
+
+
+@login_required
+def user_activity_log_excel_export(request):
+    """Export User Activity Log เป็น Excel"""
+    # Permission check - Admin only
+    if not (request.user.is_staff or request.user.is_superuser or request.user.has_permission('report_view')):
+        messages.error(request, 'คุณไม่มีสิทธิ์ใช้งานฟังก์ชันนี้')
+        return redirect('dashboard')
+
+    # Get filtered logs (same logic as view)
+    logs = UserActivityLog.objects.select_related('user').all()
+
+    # Apply same filters as view
+    action_filter = request.GET.get('action', '')
+    if action_filter:
+        logs = logs.filter(action=action_filter)
+
+    user_filter = request.GET.get('user', '')
+    if user_filter:
+        logs = logs.filter(user_id=user_filter)
+
+    date_from = request.GET.get('date_from', '')
+    date_to = request.GET.get('date_to', '')
+    if date_from:
+        from datetime import datetime
+        date_from_obj = datetime.strptime(date_from, '%Y-%m-%d').date()
+        logs = logs.filter(created_at__date__gte=date_from_obj)
+    if date_to:
+        from datetime import datetime
+        date_to_obj = datetime.strptime(date_to, '%Y-%m-%d').date()
+        logs = logs.filter(created_at__date__lte=date_to_obj)
+
+    search_query = request.GET.get('q', '')
+    if search_query:
+        logs = logs.filter(
+            Q(username_attempted__icontains=search_query) |
+            Q(ip_address__icontains=search_query) |
+            Q(user__full_name__icontains=search_query) |
+            Q(notes__icontains=search_query)
+        )
+
+    logs = logs.order_by('-created_at')
+
+    # Create Excel workbook
+    import openpyxl
+    from openpyxl.styles import Font, PatternFill, Alignment
+    from datetime import datetime
+
+    wb = openpyxl.Workbook()
+    ws = wb.active
+    ws.title = 'User Activity Log'
+
+    # Headers
+    headers = ['วันที่-เวลา', 'ผู้ใช้', 'การดำเนินการ', 'IP Address', 'User Agent', 'หมายเหตุ']
+    ws.append(headers)
+
+    # Style headers
+    header_fill = PatternFill(start_color='4472C4', end_color='4472C4', fill_type='solid')
+    header_font = Font(bold=True, color='FFFFFF')
+
+    for cell in ws[1]:
+        cell.fill = header_fill
+        cell.font = header_font
+        cell.alignment = Alignment(horizontal='center', vertical='center')
+
+    # Add data
+    for log in logs:
+        ws.append([
+            log.created_at.strftime('%d/%m/%Y %H:%M:%S'),
+            log.user.get_display_name() if log.user else log.username_attempted,
+            log.get_action_display(),
+            log.ip_address or '-',
+            (log.user_agent[:50] + '...') if len(log.user_agent) > 50 else log.user_agent or '-',
+            log.notes or '-'
+        ])
+
+    # Adjust column widths
+    ws.column_dimensions['A'].width = 20
+    ws.column_dimensions['B'].width = 30
+    ws.column_dimensions['C'].width = 20
+    ws.column_dimensions['D'].width = 18
+    ws.column_dimensions['E'].width = 50
+    ws.column_dimensions['F'].width = 40
+
+    # Create response
+    response = HttpResponse(
+        content_type='application/vnd.openxmlformats-officedocument.spreadsheetml.sheet'
+    )
+    filename = f'user_activity_log_{datetime.now().strftime("%Y%m%d_%H%M%S")}.xlsx'
+    response['Content-Disposition'] = f'attachment; filename={filename}'
+
+    wb.save(response)
+    return response
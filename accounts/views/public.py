@@ -0,0 +1,139 @@
+"""
+หน้าที่เปิดได้โดยไม่ต้องเข้าสู่ระบบ: ตรวจสอบใบสำคัญจาก QR code / เลขที่
+"""
+from django.shortcuts import render, redirect
+from django.contrib.auth.decorators import login_required
+from django.contrib import messages
+from django.http import JsonResponse
+
+from ..models import Receipt
+
+
+def receipt_verify_view(request, verification_hash=None):
+    """
+    หน้าตรวจสอบใบสำคัญรับเงินผ่าน QR Code
+    """
+    context = {
+        'title': 'ตรวจสอบใบสำคัญรับเงิน',
+        'receipt': None,
+        'found': True
+    }
+
+    # ถ้ามี hash จาก URL parameter
+    if verification_hash:
+        try:
+            receipt = Receipt.objects.select_related('department', 'created_by').prefetch_related('items').get(
+                verification_hash=verification_hash
+            )
+
+            # ตรวจสอบความถูกต้องของ hash
+            if receipt.verify_integrity():
+                context['receipt'] = receipt
+            else:
+                context['found'] = False
+                messages.error(request, 'ข้อมูลใบสำคัญรับเงินไม่ตรงกับที่บันทึกในระบบ')
+
+        except Receipt.DoesNotExist:
+            context['found'] = False
+            messages.error(request, 'ไม่พบใบสำคัญรับเงินที่ต้องการตรวจสอบ')
+
+    # ถ้ามี hash จาก GET parameter
+    elif request.GET.get('hash'):
+        hash_param = request.GET.get('hash').strip()
+        if len(hash_param) == 64:  # SHA-256 hash length
+            return redirect('receipt_verify', verification_hash=hash_param)
+        else:
+            messages.error(request, 'รหัสตรวจสอบไม่ถูกต้อง (ต้องเป็น 64 ตัวอักษร)')
+
+    return render(request, 'accounts/receipt_verify.html', context)
+
+
+@login_required
+def receipt_qr_image_view(request, receipt_id):
+    """
+    สร้างภาพ QR Code สำหรับใบสำคัญรับเงิน
+    """
+    try:
+        receipt = Receipt.objects.get(id=receipt_id)
+
+        # Import QR generator
+        from utils.qr_generator import create_verification_qr_for_receipt
+
+        # บันทึก receipt ก่อนสร้าง QR (กรณียังไม่มี hash)
+        if not receipt.verification_hash or not receipt.qr_code_data:
+            receipt.save()
+
+        # สร้าง QR Code เป็น base64
+        qr_base64 = create_verification_qr_for_receipt(receipt)
+
+        return JsonResponse({
+            'success': True,
+            'qr_image': qr_base64,
+            'verification_url': receipt.get_verification_url(),
+            'hash': receipt.verification_hash
+        })
+
+    except Receipt.DoesNotExist:
+        return JsonResponse({'success': False, 'message': 'ไม่พบใบสำคัญรับเงิน'}, status=404)
+    except Exception as e:
+        import traceback
+        print(f"QR Generation Error: {traceback.format_exc()}")
+        return JsonResponse({'success': False, 'message': str(e)}, status=500)
+
+
+def receipt_check_public_view(request, dept_code=None, date_part=None, number_part=None, receipt_number=None):
+    """
+    หน้าตรวจสอบใบสำคัญรับเงินแบบง่าย (Public - ไม่ต้อง Login)
+    URL Pattern:
+    - /check/ARC/260925/0005 -> dept_code=ARC, date_part=260925, number_part=0005 (ใหม่)
+    - /check/260925/0005 -> date_part=260925, number_part=0005 (เก่า - backward compatibility)
+    """
+    # รวม date_part และ number_part เป็นเลขที่เอกสาร
+    if date_part and number_part:
+        receipt_number = f"{date_part}/{number_part}"
+
+    context = {
+        'title': 'ตรวจสอบใบสำคัญรับเงิน',
+        'receipt': None,
+        'found': False,
+        'receipt_number_search': receipt_number,
+        'dept_code_search': dept_code
+    }
+
+    try:
+        # สร้าง query filter
+        filters = {
+            'receipt_number': receipt_number,
+            'status': 'completed'  # แสดงเฉพาะที่เสร็จสิ้น
+        }
+
+        # ถ้ามี dept_code ให้ค้นหาเฉพาะหน่วยงานนั้น
+        if dept_code:
+            filters['department__code'] = dept_code
+
+        # ค้นหาใบสำคัญจากเลขที่เอกสาร
+        receipts = Receipt.objects.select_related('department', 'created_by').prefetch_related('items').filter(**filters)
+
+        if receipts.count() == 0:
+            context['found'] = False
+            if dept_code:
+                context['error_message'] = f'ไม่พบใบสำคัญรับเงินหมายเลข {receipt_number} ของหน่วยงาน {dept_code}'
+            else:
+                context['error_message'] = f'ไม่พบใบสำคัญรับเงินหมายเลข {receipt_number}'
+        elif receipts.count() == 1:
+            # มีใบเดียว แสดงตามปกติ
+            context['receipt'] = receipts.first()
+            context['found'] = True
+            context['qr_url'] = request.build_absolute_uri()
+        else:
+            # มีหลายใบ (หลายหน่วยงาน) ให้เลือก
+            context['found'] = True
+            context['multiple_receipts'] = list(receipts)
+            context['receipt'] = None
+            context['qr_url'] = request.build_absolute_uri()
+
+    except Exception as e:
+        context['found'] = False
+        context['error_message'] = f'เกิดข้อผิดพลาด: {str(e)}'
+
+    return render(request, 'accounts/receipt_check_public.html', context)
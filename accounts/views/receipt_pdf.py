@@ -0,0 +1,117 @@
+"""
+PDF ใบสำคัญรับเงิน (ReportLab และเวอร์ชัน 2 จาก HTML)
+"""
+from django.shortcuts import redirect
+from django.contrib.auth.decorators import login_required
+from django.contrib import messages
+
+from ..models import Receipt
+from ..receipt_scope import ReceiptScope
+
+
+@login_required
+def receipt_pdf_view(request, receipt_id):
+    """
+    สร้างและแสดง PDF ใบสำคัญรับเงินแบบ inline
+    """
+    try:
+        receipt = Receipt.objects.get(id=receipt_id)
+
+        # ตรวจสอบสิทธิ์ (ทั้งหมด / หน่วยงานเดียวกัน / ใบที่ตัวเองสร้าง)
+        if not ReceiptScope.for_request(request).can_view(receipt):
+            messages.error(request, 'ไม่มีสิทธิ์ดูใบสำคัญรับเงินนี้')
+            return redirect('receipt_list')
+
+        # สร้าง PDF แบบ inline
+        from ..pdf_generator import generate_receipt_pdf
+        return generate_receipt_pdf(receipt, inline=True, request=request)
+
+    except Receipt.DoesNotExist:
+        messages.error(request, 'ไม่พบใบสำคัญรับเงินที่ต้องการ')
+        return redirect('receipt_list')
+    except Exception as e:
+        import logging
+        logging.error(f'PDF generation error: {str(e)}')
+        messages.error(request, f'เกิดข้อผิดพลาดในการสร้าง PDF: {str(e)}')
+        return redirect('receipt_list')
+
+
+@login_required
+def receipt_pdf_download_view(request, receipt_id):
+    """
+    ดาวน์โหลด PDF ใบสำคัญรับเงิน
+    """
+    try:
+        receipt = Receipt.objects.get(id=receipt_id)
+
+        # ตรวจสอบสิทธิ์ (ทั้งหมด / หน่วยงานเดียวกัน / ใบที่ตัวเองสร้าง)
+        if not ReceiptScope.for_request(request).can_view(receipt):
+            messages.error(request, 'ไม่มีสิทธิ์ดูใบสำคัญรับเงินนี้')
+            return redirect('receipt_list')
+
+        # สร้าง PDF แบบ download
+        from ..pdf_generator import generate_receipt_pdf
+        return generate_receipt_pdf(receipt, inline=False, request=request)
+
+    except Receipt.DoesNotExist:
+        messages.error(request, 'ไม่พบใบสำคัญรับเงินที่ต้องการ')
+        return redirect('receipt_list')
+    except Exception as e:
+        import logging
+        logging.error(f'PDF download error: {str(e)}')
+        messages.error(request, f'เกิดข้อผิดพลาดในการดาวน์โหลด PDF: {str(e)}')
+        return redirect('receipt_list')
+
+
+@login_required
+def receipt_pdf_v2_view(request, receipt_id):
+    """
+    ดู PDF ใบสำคัญรับเงิน เวอร์ชัน 2 (HTML → PDF ตาม RECEIPT_PDF_V2_BACKEND — ดู accounts/pdf_v2.py)
+    """
+    try:
+        receipt = Receipt.objects.get(id=receipt_id)
+
+        # ตรวจสอบสิทธิ์ (ทั้งหมด / หน่วยงานเดียวกัน / ใบที่ตัวเองสร้าง)
+        if not ReceiptScope.for_request(request).can_view(receipt):
+            messages.error(request, 'ไม่มีสิทธิ์ดูใบสำคัญรับเงินนี้')
+            return redirect('receipt_list')
+
+        # backend ใช้ไม่ได้จะได้ PDF จาก ReportLab แทน
+        from ..pdf_v2 import render_receipt_pdf_v2
+        return render_receipt_pdf_v2(request, receipt, inline=True)
+
+    except Receipt.DoesNotExist:
+        messages.error(request, 'ไม่พบใบสำคัญรับเงินที่ต้องการ')
+        return redirect('receipt_list')
+    except Exception as e:
+        import logging
+        logging.error(f'PDF v2 generation error: {str(e)}')
+        messages.error(request, f'เกิดข้อผิดพลาดในการสร้าง PDF v2: {str(e)}')
+        return redirect('receipt_list')
+
+
+@login_required
+def receipt_pdf_v2_download_view(request, receipt_id):
+    """
+    ดาวน์โหลด PDF ใบสำคัญรับเงิน เวอร์ชัน 2 (HTML → PDF ตาม RECEIPT_PDF_V2_BACKEND — ดู accounts/pdf_v2.py)
+    """
+    try:
+        receipt = Receipt.objects.get(id=receipt_id)
+
+        # ตรวจสอบสิทธิ์ (ทั้งหมด / หน่วยงานเดียวกัน / ใบที่ตัวเองสร้าง)
+        if not ReceiptScope.for_request(request).can_view(receipt):
+            messages.error(request, 'ไม่มีสิทธิ์ดูใบสำคัญรับเงินนี้')
+            return redirect('receipt_list')
+
+        # backend ใช้ไม่ได้จะได้ PDF จาก ReportLab แทน
+        from ..pdf_v2 import render_receipt_pdf_v2
+        return render_receipt_pdf_v2(request, receipt, inline=False)
+
+    except Receipt.DoesNotExist:
+        messages.error(request, 'ไม่พบใบสำคัญรับเงินที่ต้องการ')
+        return redirect('receipt_list')
+    except Exception as e:
+        import logging
+        logging.error(f'PDF v2 download error: {str(e)}')
+        messages.error(request, f'เกิดข้อผิดพลาดในการดาวน์โหลด PDF v2: {str(e)}')
+        return redirect('receipt_list')
@@ -0,0 +1,125 @@
+"""
+จัดการ Template รายการในใบสำคัญ (Admin เท่านั้น)
+"""
+from django.shortcuts import render, redirect, get_object_or_404
+from django.contrib.auth.decorators import login_required
+from django.contrib import messages
+
+from ..models import ReceiptTemplate
+
+
+# Template Management Views (Admin Only)
+@login_required
+def receipt_templates_list(request):
+    """แสดงรายการ Template ทั้งหมด (Admin เท่านั้น)"""
+    if not (request.user.is_staff or request.user.is_superuser or request.user.has_permission('system_config')):
+        messages.error(request, 'คุณไม่มีสิทธิ์เข้าถึงหน้านี้')
+        return redirect('dashboard')
+
+    templates = ReceiptTemplate.objects.all().order_by('category', 'name')
+
+    context = {
+        'title': 'จัดการรายการสำเร็จรูป',
+        'templates': templates,
+    }
+
+    return render(request, 'accounts/receipt_templates_list.html', context)
+
+
+@login_required
+def receipt_template_create(request):
+    """สร้าง Template ใหม่ (Admin เท่านั้น)"""
+    if not (request.user.is_staff or request.user.is_superuser or request.user.has_permission('system_config')):
+        messages.error(request, 'คุณไม่มีสิทธิ์เข้าถึงหน้านี้')
+        return redirect('dashboard')
+
+    if request.method == 'POST':
+        # Process form data
+        name = request.POST.get('name', '').strip()
+        category = request.POST.get('category', '').strip()
+        max_amount = request.POST.get('max_amount', '').strip()
+        fixed_amount = request.POST.get('fixed_amount', '').strip()
+        is_active = request.POST.get('is_active') == 'on'
+
+        # Validation
+        if not name:
+            messages.error(request, 'กรุณากรอกชื่อรายการ')
+        elif ReceiptTemplate.objects.filter(name=name).exists():
+            messages.error(request, 'ชื่อรายการนี้มีอยู่แล้ว')
+        else:
+            # Create template
+            template = ReceiptTemplate.objects.create(
+                name=name,
+                category=category,
+                max_amount=float(max_amount) if max_amount else None,
+                fixed_amount=float(fixed_amount) if fixed_amount else None,
+                is_active=is_active
+            )
+
+            messages.success(request, f'สร้างรายการ "{template.name}" เรียบร้อยแล้ว')
+            return redirect('receipt_templates_list')
+
+    context = {
+        'title': 'เพิ่มรายการสำเร็จรูป',
+    }
+
+    return render(request, 'accounts/receipt_template_create.html', context)
+
+
+@login_required
+def receipt_template_edit(request, template_id):
+    """แก้ไข Template (Admin เท่านั้น)"""
+    if not (request.user.is_staff or request.user.is_superuser or request.user.has_permission('system_config')):
+        messages.error(request, 'คุณไม่มีสิทธิ์เข้าถึงหน้านี้')
+        return redirect('dashboard')
+
+    template = get_object_or_404(ReceiptTemplate, id=template_id)
+
+    if request.method == 'POST':
+        # Process form data
+        name = request.POST.get('name', '').strip()
+        category = request.POST.get('category', '').strip()
+        max_amount = request.POST.get('max_amount', '').strip()
+        fixed_amount = request.POST.get('fixed_amount', '').strip()
+        is_active = request.POST.get('is_active') == 'on'
+
+        # Validation
+        if not name:
+            messages.error(request, 'กรุณากรอกชื่อรายการ')
+        elif ReceiptTemplate.objects.filter(name=name).exclude(id=template.id).exists():
+            messages.error(request, 'ชื่อรายการนี้มีอยู่แล้ว')
+        else:
+            # Update template
+            template.name = name
+            template.category = category
+            template.max_amount = float(max_amount) if max_amount else None
+            template.fixed_amount = float(fixed_amount) if fixed_amount else None
+            template.is_active = is_active
+            template.save()
+
+            messages.success(request, f'อัปเดตรายการ "{template.name}" เรียบร้อยแล้ว')
+            return redirect('receipt_templates_list')
+
+    context = {
+        'title': 'แก้ไขรายการสำเร็จรูป',
+        'template': template,
+    }
+
+    return render(request, 'accounts/receipt_template_edit.html', context)
+
+
+@login_required
+def receipt_template_delete(request, template_id):
+    """ลบ Template (Admin เท่านั้น)"""
+    if not (request.user.is_staff or request.user.is_superuser or request.user.has_permission('system_config')):
+        messages.error(request, 'คุณไม่มีสิทธิ์เข้าถึงหน้านี้')
+        return redirect('dashboard')
+
+    template = get_object_or_404(ReceiptTemplate, id=template_id)
+
+    if request.method == 'POST':
+        template_name = template.name
+        template.delete()
+        messages.success(request, f'ลบรายการ "{template_name}" เรียบร้อยแล้ว')
+
+    return redirect('receipt_templates_list')
@@ -0,0 +1,599 @@
+"""
+สร้าง แก้ไข และดูใบสำคัญรับเงิน
+"""
+from django.shortcuts import render, redirect
+from django.contrib.auth.decorators import login_required
+from django.contrib import messages
+from django.http import JsonResponse
+from django.core.paginator import Paginator
+from django.db import IntegrityError
+import json
+
+from ..models import Receipt, ReceiptTemplate, ReceiptItem, Department, ReceiptChangeLog
+from ..receipt_scope import ReceiptScope
+
+
+@login_required
+def receipt_create_view(request):
+    """
+    หน้าสร้างใบสำคัญรับเงิน Frontend
+    """
+    # ตรวจสอบสิทธิ์การสร้างใบสำคัญ
+    if not request.user.has_permission('receipt_create'):
+        messages.error(request, 'คุณไม่มีสิทธิ์สร้างใบสำคัญรับเงิน')
+        return redirect('dashboard')
+
+    # ดึงหน่วยงานของผู้ใช้
+    try:
+        user_department = Department.objects.get(pk=request.user.get_department_id())
+    except Department.DoesNotExist:
+        messages.error(request, 'ไม่พบหน่วยงานของคุณในระบบ กรุณาติดต่อผู้ดูแล')
+        return redirect('dashboard')
+
+    # ดึงรายการสำเร็จรูป
+    receipt_templates = ReceiptTemplate.get_active_templates()
+
+    context = {
+        'title': 'สร้างใบสำคัญรับเงิน',
+        'department': user_department,
+        'receipt_templates': receipt_templates,
+        'user_full_name': request.user.get_display_name(),
+    }
+
+    return render(request, 'accounts/receipt_create.html', context)
+
+
+@login_required
+def receipt_list_view(request):
+    """
+    รายการใบสำคัญรับเงินของผู้ใช้
+    """
+    # ตรวจสอบสิทธิ์
+    if not request.user.has_permission('receipt_view_own'):
+        messages.error(request, 'คุณไม่มีสิทธิ์ดูรายการใบสำคัญรับเงิน')
+        return redirect('dashboard')
+
+    # Filter receipts based on user permissions (ทั้งหมด / หน่วยงาน / ของตัวเอง)
+    scope = ReceiptScope.for_request(request)
+    filters = scope.filters(request.GET)
+    receipts = filters.apply(scope.receipts())
+    status_filter = filters.status
+    search_query = filters.q
+
+    # Order and paginate (prefetch items with template category)
+    receipts = receipts.select_related('department', 'created_by').prefetch_related('items__template').order_by('-created_at')
+
+    paginator = Paginator(receipts, 20)
+    page = request.GET.get('page')
+    receipts_page = paginator.get_page(page)
+
+    # Check if user can request edit
+    user_can_request_edit = request.user.has_permission('receipt_edit_request')
+
+    # Check if user can approve edit requests
+    user_can_approve_edit = (
+        request.user.has_permission('receipt_edit_approve') or
+        request.user.has_permission('receipt_edit_approve_manager') or
+        request.user.has_permission('receipt_view_all')
+    )
+
+    # Add edit request status and cancel request status to each receipt
+    for receipt in receipts_page:
+        pending_request = receipt.edit_requests.filter(status='pending').first()
+        approved_request = receipt.edit_requests.filter(status='approved').first()
+        applied_request = receipt.edit_requests.filter(status='applied').first()
+
+        if pending_request:
+            receipt.edit_status = 'pending'
+            receipt.pending_request = pending_request
+            # Check if current user can approve this specific request
+            receipt.can_approve_pending = pending_request.can_be_approved_by(request.user)
+        elif applied_request:
+            receipt.edit_status = 'applied'
+            receipt.applied_request = applied_request
+        elif approved_request:
+            receipt.edit_status = 'approved'
+            receipt.approved_request = approved_request
+        else:
+            receipt.edit_status = None
+
+        # Add cancel request status
+        pending_cancel_request = receipt.cancel_requests.filter(status='pending').first()
+        rejected_cancel_request = receipt.cancel_requests.filter(status='rejected').first()
+
+        if pending_cancel_request:
+            receipt.cancel_status = 'pending'
+            receipt.pending_cancel_request = pending_cancel_request
+            # Check if current user can approve this cancel request
+            receipt.can_approve_cancel_request = pending_cancel_request.can_be_approved_by(request.user)
+        elif rejected_cancel_request:
+            receipt.cancel_status = 'rejected'
+            receipt.rejected_cancel_request = rejected_cancel_request
+        else:
+            receipt.cancel_status = None
+
+    context = {
+        'title': 'รายการใบสำคัญรับเงิน',
+        'receipts': receipts_page,
+        'view_scope': scope.label,
+        'status_filter': status_filter,
+        'search_query': search_query,
+        'status_choices': Receipt.STATUS_CHOICES,
+        'user_can_request_edit': user_can_request_edit,
+        'user_can_approve_edit': user_can_approve_edit,
+    }
+
+    return render(request, 'accounts/receipt_list.html', context)
+
+
+@login_required
+def receipt_detail_view(request, receipt_id):
+    """
+    รายละเอียดใบสำคัญรับเงิน
+    """
+    try:
+        receipt = Receipt.objects.select_related('department', 'created_by').prefetch_related('items').get(id=receipt_id)
+
+        # ตรวจสอบสิทธิ์ในการดู (ทั้งหมด / หน่วยงานเดียวกัน / ใบที่ตัวเองสร้าง)
+        if not ReceiptScope.for_request(request).can_view(receipt):
+            messages.error(request, 'คุณไม่มีสิทธิ์ดูใบสำคัญรับเงินนี้')
+            return redirect('receipt_list')
+
+        # Check for cancel request status
+        pending_cancel_request = receipt.cancel_requests.filter(status='pending').first()
+        rejected_cancel_request = receipt.cancel_requests.filter(status='rejected').first()
+
+        # Check for edit request status
+        pending_edit_request = receipt.edit_requests.filter(status='pending').first()
+        rejected_edit_request = receipt.edit_requests.filter(status='rejected').first()
+
+        # Get change logs (audit trail)
+        change_logs = receipt.change_logs.select_related('user', 'edit_request').all()
+
+        context = {
+            'title': f'ใบสำคัญรับเงิน {receipt.receipt_number}',
+            'receipt': receipt,
+            'can_be_cancelled_directly': receipt.can_be_cancelled_directly(request.user),
+            'can_be_cancelled_by': receipt.can_be_cancelled_by(request.user),
+            'pending_cancel_request': pending_cancel_request,
+            'rejected_cancel_request': rejected_cancel_request,
+            'pending_edit_request': pending_edit_request,
+            'rejected_edit_request': rejected_edit_request,
+            'change_logs': change_logs,
+            'user_can_request_edit': (receipt.created_by == request.user),  # เฉพาะเจ้าของเท่านั้น
+        }
+
+        return render(request, 'accounts/receipt_detail.html', context)
+
+    except Receipt.DoesNotExist:
+        messages.error(request, 'ไม่พบใบสำคัญรับเงินที่ต้องการ')
+        return redirect('receipt_list')
+
+
+@login_required
+def receipt_save_ajax(request):
+    """
+    บันทึกใบสำคัญรับเงินผ่าน AJAX
+    """
+    if request.method != 'POST':
+        return JsonResponse({'success': False, 'message': 'Method not allowed'}, status=405)
+
+    # ตรวจสอบสิทธิ์
+    if not request.user.has_permission('receipt_create'):
+        return JsonResponse({'success': False, 'message': 'ไม่มีสิทธิ์สร้างใบสำคัญรับเงิน'}, status=403)
+
+    try:
+        data = json.loads(request.body)
+
+        # ตรวจสอบข้อมูลจำเป็น
+        required_fields = ['recipient_name', 'recipient_address', 'recipient_id_card']
+        for field in required_fields:
+            if not data.get(field):
+                return JsonResponse({'success': False, 'message': f'กรุณากรอก{field}'}, status=400)
+
+        # ตรวจสอบจำนวนเงิน
+        try:
+            total_amount = float(data.get('total_amount', 0))
+            if total_amount <= 0:
+                return JsonResponse({'success': False, 'message': 'จำนวนเงินต้องมากกว่า 0'}, status=400)
+        except (ValueError, TypeError):
+            return JsonResponse({'success': False, 'message': 'จำนวนเงินไม่ถูกต้อง'}, status=400)
+
+        # ดึงหน่วยงาน (รองรับทั้ง staff และ student)
+        department_name = request.user.get_department()
+        if not department_name:
+            return JsonResponse({'success': False, 'message': 'ไม่พบข้อมูลหน่วยงานของคุณ'}, status=400)
+
+        # หาหรือสร้าง Department (สำหรับนักศึกษาที่คณะยังไม่มีในระบบ)
+        # ปกติหน่วยงานมีอยู่แล้ว → ดึงด้วย pk จาก map ชื่อ → id ที่ cache ไว้
+        department = None
+        department_id = request.user.get_department_id()
+        if department_id:
+            department = Department.objects.filter(pk=department_id).first()
+        if department is None:
+            department, created = Department.objects.get_or_create(
+                name=department_name,
+                defaults={
+                    'code': department_name[:20],  # ใช้ชื่อย่อจากชื่อเต็ม (ตัดไม่เกิน 20 ตัวอักษร)
+                    'is_active': True,
+                }
+            )
+
+        # สร้างใบสำคัญรับเงิน
+        from datetime import datetime
+        from utils.fiscal_year import get_current_fiscal_year, get_fiscal_year_dates
+
+        status = data.get('status', 'draft')
+
+        # ตั้งค่าและตรวจสอบ receipt_date
+        receipt_date = None
+        if data.get('receipt_date'):
+            try:
+                # Parse วันที่จาก string (YYYY-MM-DD)
+                receipt_date = datetime.strptime(data.get('receipt_date'), '%Y-%m-%d').date()
+
+                # ตรวจสอบวันที่
+                today = datetime.now().date()
+
+                # ห้ามวันที่อนาคต
+                if receipt_date > today:
+                    return JsonResponse({'success': False, 'message': 'ไม่สามารถกำหนดวันที่ล่วงหน้าได้'}, status=400)
+
+                # ตรวจสอบว่าไม่เกินต้นปีงบประมาณ
+                current_fy = get_current_fiscal_year()
+                fiscal_start, fiscal_end = get_fiscal_year_dates(current_fy)
+
+                if receipt_date < fiscal_start:
+                    return JsonResponse({
+                        'success': False,
+                        'message': f'วันที่ย้อนหลังเกินกำหนด (ย้อนหลังได้ถึง {fiscal_start.strftime("%d/%m/%Y")} เท่านั้น)'
+                    }, status=400)
+
+            except ValueError:
+                return JsonResponse({'success': False, 'message': 'รูปแบบวันที่ไม่ถูกต้อง'}, status=400)
+        elif status == 'completed':
+            # ถ้าบันทึกเป็นเสร็จสิ้นแต่ไม่มีวันที่ ให้ใช้วันที่ปัจจุบัน
+            receipt_date = datetime.now().date()
+
+        # ตรวจและรวมยอดรายการในหน่วยความจำก่อน — รายการผิดจะไม่ทิ้งใบสำคัญค้างไว้ครึ่งทาง
+        from decimal import Decimal, InvalidOperation
+        from django.db import transaction
+
+        items_data = data.get('items', [])
+        items = []
+        calculated_total = Decimal('0')
+
+        for idx, item_data in enumerate(items_data, 1):
+            try:
+                amount = Decimal(str(item_data.get('amount', 0)))
+                if not amount.is_finite():
+                    raise ValueError
+            except (InvalidOperation, ValueError, TypeError):
+                return JsonResponse({'success': False, 'message': f'รายการที่ {idx} มีข้อผิดพลาด: จำนวนเงินไม่ถูกต้อง'}, status=400)
+            if amount <= 0:
+                continue
+            calculated_total += amount
+
+            # จัดการ template_id
+            template_id = item_data.get('template_id')
+            if template_id and str(template_id).lower() in ['null', 'none', '']:
+                template_id = None
+            elif template_id:
+                try:
+                    template_id = int(template_id)
+                except (ValueError, TypeError):
+                    template_id = None
+
+            items.append(ReceiptItem(
+                template_id=template_id,
+                description=item_data.get('description', ''),
+                amount=amount,
+                order=idx,
+                additional_recipient_name=item_data.get('additional_recipient_name', None)
+            ))
+
+        # บันทึกครั้งเดียวด้วยยอดรวมจริงจากรายการ: เลขที่/hash/QR/จำนวนเงินตัวหนังสือ/ยอดเล่ม
+        # ถูกสร้างใน Receipt.save() รอบเดียว แล้วเพิ่มรายการทั้งหมดด้วย bulk_create
+        with transaction.atomic():
+            receipt = Receipt.objects.create(
+                department=department,
+                created_by=request.user,
+                recipient_name=data.get('recipient_name', ''),
+                recipient_address=data.get('recipient_address', ''),
+                recipient_postal_code=data.get('recipient_postal_code', ''),
+                recipient_id_card=data.get('recipient_id_card', ''),
+                is_loan=data.get('is_loan', False),
+                total_amount=calculated_total,
+                status=status,
+                receipt_date=receipt_date
+            )
+
+            for item in items:
+                item.receipt = receipt
+            ReceiptItem.objects.bulk_create(items)
+
+            # บันทึก Change Log
+            ReceiptChangeLog.log_change(
+                receipt=receipt,
+                action='created',
+                user=request.user,
+                notes=f'สร้างใบสำคัญรับเงิน (สถานะ: {receipt.get_status_display()})'
+            )
+
+        return JsonResponse({
+            'success': True,
+            'message': 'บันทึกใบสำคัญรับเงินเรียบร้อย',
+            'receipt_id': receipt.id,
+            'receipt_number': receipt.receipt_number,
+            'receipt_date': receipt.receipt_date.strftime('%d/%m/%Y') if receipt.receipt_date else '',
+            'verification_url': receipt.get_verification_url()
+        })
+
+    except json.JSONDecodeError:
+        return JsonResponse({'success': False, 'message': 'ข้อมูล JSON ไม่ถูกต้อง'}, status=400)
+    except IntegrityError as e:
+        import logging
+        logging.error(f'Receipt save IntegrityError: {str(e)}')
+        # ถ้าเกิด duplicate receipt number ให้ลองใหม่
+        if 'Duplicate entry' in str(e) or 'UNIQUE constraint' in str(e):
+            return JsonResponse({'success': False, 'message': 'เลขที่ใบสำคัญซ้ำ กรุณาลองใหม่อีกครั้ง'}, status=409)
+        return JsonResponse({'success': False, 'message': f'เกิดข้อผิดพลาดในการบันทึก: {str(e)}'}, status=500)
+    except Exception as e:
+        import logging
+        import traceback
+        logging.error(f'Receipt save error: {str(e)}')
+        logging.error(traceback.format_exc())
+        return JsonResponse({'success': False, 'message': f'เกิดข้อผิดพลาด: {str(e)}'}, status=500)
+
+
+@login_required
+def receipt_edit_view(request, receipt_id):
+    """
+    หน้าแก้ไขใบสำคัญรับเงิน (เฉพาะร่าง)
+    """
+    try:
+        receipt = Receipt.objects.get(id=receipt_id)
+    except Receipt.DoesNotExist:
+        messages.error(request, 'ไม่พบใบสำคัญรับเงินที่ต้องการ')
+        return redirect('receipt_list')
+
+    # ตรวจสอบสิทธิ์
+    if not request.user.has_permission('receipt_create'):
+        messages.error(request, 'คุณไม่มีสิทธิ์แก้ไขใบสำคัญรับเงิน')
+        return redirect('receipt_list')
+
+    # ตรวจสอบว่าเป็นร่างและเป็นของผู้ใช้เท่านั้น
+    if receipt.status != 'draft':
+        messages.error(request, 'สามารถแก้ไขได้เฉพาะใบสำคัญสถานะ "ร่าง" เท่านั้น')
+        return redirect('receipt_detail', receipt_id=receipt_id)
+
+    if receipt.created_by != request.user:
+        messages.error(request, 'คุณสามารถแก้ไขได้เฉพาะใบสำคัญของตัวเองเท่านั้น')
+        return redirect('receipt_detail', receipt_id=receipt_id)
+
+    # ดึงข้อมูลที่จำเป็น
+    try:
+        user_department = Department.objects.get(pk=request.user.get_department_id())
+    except Department.DoesNotExist:
+        messages.error(request, 'ไม่พบหน่วยงานของคุณในระบบ')
+        return redirect('receipt_detail', receipt_id=receipt_id)
+
+    # ดึงรายการสำเร็จรูป
+    receipt_templates = ReceiptTemplate.get_active_templates()
+
+    # ดึงรายการใบสำคัญ
+    receipt_items = receipt.items.all().order_by('order')
+
+    context = {
+        'title': f'แก้ไขใบสำคัญรับเงิน - {receipt.receipt_number}',
+        'receipt': receipt,
+        'receipt_items': receipt_items,
+        'department': user_department,
+        'receipt_templates': receipt_templates,
+        'user_full_name': request.user.get_display_name(),
+    }
+
+    return render(request, 'accounts/receipt_edit.html', context)
+
+
+@login_required
+def receipt_update_ajax(request, receipt_id):
+    """
+    อัปเดตใบสำคัญรับเงิน (เฉพาะร่าง) ผ่าน AJAX
+    """
+    if request.method != 'POST':
+        return JsonResponse({'success': False, 'message': 'Method not allowed'}, status=405)
+
+    try:
+        receipt = Receipt.objects.get(id=receipt_id)
+    except Receipt.DoesNotExist:
+        return JsonResponse({'success': False, 'message': 'ไม่พบใบสำคัญรับเงิน'}, status=404)
+
+    # ตรวจสอบสิทธิ์
+    if not request.user.has_permission('receipt_create'):
+        return JsonResponse({'success': False, 'message': 'ไม่มีสิทธิ์แก้ไขใบสำคัญรับเงิน'}, status=403)
+
+    # ตรวจสอบว่าเป็นร่างและเป็นของผู้ใช้
+    if receipt.status != 'draft':
+        return JsonResponse({'success': False, 'message': 'สามารถแก้ไขได้เฉพาะใบสำคัญสถานะ "ร่าง" เท่านั้น'}, status=400)
+
+    if receipt.created_by != request.user:
+        return JsonResponse({'success': False, 'message': 'คุณสามารถแก้ไขได้เฉพาะใบสำคัญของตัวเองเท่านั้น'}, status=403)
+
+    try:
+        data = json.loads(request.body)
+
+        # ตรวจสอบข้อมูลจำเป็น
+        required_fields = ['recipient_name', 'recipient_address', 'recipient_id_card']
+        for field in required_fields:
+            if not data.get(field):
+                return JsonResponse({'success': False, 'message': f'กรุณากรอก{field}'}, status=400)
+
+        # ตรวจสอบจำนวนเงิน
+        try:
+            total_amount = float(data.get('total_amount', 0))
+            if total_amount <= 0:
+                return JsonResponse({'success': False, 'message': 'จำนวนเงินต้องมากกว่า 0'}, status=400)
+        except (ValueError, TypeError):
+            return JsonResponse({'success': False, 'message': 'จำนวนเงินไม่ถูกต้อง'}, status=400)
+
+        # ตรวจสอบและอัปเดต receipt_date
+        from datetime import datetime
+        from utils.fiscal_year import get_current_fiscal_year, get_fiscal_year_dates
+
+        if data.get('receipt_date'):
+            try:
+                # Parse วันที่จาก string (YYYY-MM-DD)
+                new_receipt_date = datetime.strptime(data.get('receipt_date'), '%Y-%m-%d').date()
+
+                # ตรวจสอบวันที่
+                today = datetime.now().date()
+
+                # ห้ามวันที่อนาคต
+                if new_receipt_date > today:
+                    return JsonResponse({'success': False, 'message': 'ไม่สามารถกำหนดวันที่ล่วงหน้าได้'}, status=400)
+
+                # ตรวจสอบว่าไม่เกินต้นปีงบประมาณ
+                current_fy = get_current_fiscal_year()
+                fiscal_start, fiscal_end = get_fiscal_year_dates(current_fy)
+
+                if new_receipt_date < fiscal_start:
+                    return JsonResponse({
+                        'success': False,
+                        'message': f'วันที่ย้อนหลังเกินกำหนด (ย้อนหลังได้ถึง {fiscal_start.strftime("%d/%m/%Y")} เท่านั้น)'
+                    }, status=400)
+
+                receipt.receipt_date = new_receipt_date
+
+            except ValueError:
+                return JsonResponse({'success': False, 'message': 'รูปแบบวันที่ไม่ถูกต้อง'}, status=400)
+
+        new_status = data.get('status', 'draft')
+
+        # ถ้าเปลี่ยนจาก draft เป็น completed และยังไม่มี receipt_date ให้ตั้งวันที่ปัจจุบัน
+        if new_status == 'completed' and not receipt.receipt_date:
+            receipt.receipt_date = datetime.now().date()
+
+        # อัปเดตข้อมูลใบสำคัญ
+        receipt.recipient_name = data.get('recipient_name', '')
+        receipt.recipient_address = data.get('recipient_address', '')
+        receipt.recipient_postal_code = data.get('recipient_postal_code', '')
+        receipt.recipient_id_card = data.get('recipient_id_card', '')
+        receipt.is_loan = data.get('is_loan', False)
+        receipt.status = new_status
+
+        # ลบรายการเก่าทั้งหมด
+        receipt.items.all().delete()
+
+        # สร้างรายการใหม่
+        items_data = data.get('items', [])
+        calculated_total = 0
+
+        for idx, item_data in enumerate(items_data, 1):
+            try:
+                amount = float(item_data.get('amount', 0))
+                if amount <= 0:
+                    continue
+                calculated_total += amount
+
+                # จัดการ template_id
+                template_id = item_data.get('template_id')
+                if template_id and str(template_id).lower() in ['null', 'none', '']:
+                    template_id = None
+                elif template_id:
+                    try:
+                        template_id = int(template_id)
+                    except (ValueError, TypeError):
+                        template_id = None
+
+                ReceiptItem.objects.create(
+                    receipt=receipt,
+                    template_id=template_id,
+                    description=item_data.get('description', ''),
+                    amount=amount,
+                    order=idx,
+                    additional_recipient_name=item_data.get('additional_recipient_name', None)
+                )
+            except (ValueError, TypeError) as e:
+                return JsonResponse({'success': False, 'message': f'รายการที่ {idx} มีข้อผิดพลาด: {str(e)}'}, status=400)
+
+        # อัปเดต total_amount และ force regenerate total_amount_text
+        receipt.total_amount = calculated_total
+        receipt.total_amount_text = Receipt.convert_amount_to_thai_text(calculated_total)
+        receipt.save()  # จะ auto-generate ทั้ง hash และ qr code ใหม่
+
+        # บันทึก Change Log
+        ReceiptChangeLog.log_change(
+            receipt=receipt,
+            action='updated',
+            user=request.user,
+            notes=f'แก้ไขใบสำคัญรับเงิน (สถานะ: {receipt.get_status_display()})'
+        )
+
+        return JsonResponse({
+            'success': True,
+            'message': 'อัปเดตใบสำคัญรับเงินเรียบร้อย',
+            'receipt_id': receipt.id,
+            'receipt_number': receipt.receipt_number,
+            'receipt_date': receipt.receipt_date.strftime('%d/%m/%Y') if receipt.receipt_date else '',
+            'verification_url': receipt.get_verification_url()
+        })
+
+    except json.JSONDecodeError:
+        return JsonResponse({'success': False, 'message': 'ข้อมูล JSON ไม่ถูกต้อง'}, status=400)
+    except Exception as e:
+        import logging
+        logging.error(f'Receipt update error: {str(e)}')
+        return JsonResponse({'success': False, 'message': f'เกิดข้อผิดพลาด: {str(e)}'}, status=500)
+
+
+@login_required
+def receipt_complete_draft_ajax(request, receipt_id):
+    """
+    เปลี่ยนสถานะใบสำคัญจาก draft เป็น completed
+    """
+    if request.method != 'POST':
+        return JsonResponse({'success': False, 'message': 'Method not allowed'}, status=405)
+
+    try:
+        receipt = Receipt.objects.get(id=receipt_id)
+    except Receipt.DoesNotExist:
+        return JsonResponse({'success': False, 'message': 'ไม่พบใบสำคัญรับเงิน'}, status=404)
+
+    # ตรวจสอบสิทธิ์
+    if receipt.created_by != request.user:
+        return JsonResponse({'success': False, 'message': 'คุณสามารถบันทึกได้เฉพาะใบสำคัญของตัวเองเท่านั้น'}, status=403)
+
+    # ตรวจสอบสถานะ
+    if receipt.status != 'draft':
+        return JsonResponse({'success': False, 'message': 'สามารถบันทึกได้เฉพาะใบสำคัญสถานะ "ร่าง" เท่านั้น'}, status=400)
+
+    # เปลี่ยนสถานะเป็น completed
+    from datetime import datetime
+    old_status = receipt.status
+    receipt.status = 'completed'
+
+    # ตั้งค่า receipt_date เฉพาะกรณีที่ยังไม่มีการกำหนดวันที่ (เผื่อกรณี legacy data)
+    # ไม่แทนที่วันที่ที่ผู้ใช้กำหนดไว้แล้ว
+    if not receipt.receipt_date:
+        receipt.receipt_date = datetime.now().date()
+
+    receipt.save()
+
+    # บันทึก Change Log
+    ReceiptChangeLog.log_change(
+        receipt=receipt,
+        action='updated',
+        user=request.user,
+        field_name='status',
+        old_value=old_status,
+        new_value='completed',
+        notes='เปลี่ยนสถานะจากร่างเป็นเสร็จสิ้น'
+    )
+
+    return JsonResponse({
+        'success': True,
+        'message': f'บันทึกใบสำคัญ {receipt.receipt_number} เรียบร้อยแล้ว',
+        'receipt_id': receipt.id,
+        'receipt_number': receipt.receipt_number
+    })
@@ -0,0 +1,366 @@
+"""
+หน้ารายงาน (HTML): ภาพรวมรายงาน, รายงานใบสำคัญรับเงิน, สรุปรายได้
+
+การส่งออก Excel/PDF อยู่ที่ exports.py
+"""
+from django.contrib import messages
+from django.contrib.auth.decorators import login_required
+from django.core.paginator import Paginator
+from django.shortcuts import redirect, render
+
+from ..models import Receipt, ReceiptEditRequest
+from ..receipt_scope import ReceiptScope
+from ..revenue_summary import get_revenue_summary
+
+
+@login_required
+def reports_dashboard_view(request):
+    """
+    รายงานแดชบอร์ด - หน้าหลักของระบบรายงาน
+    Features:
+    - ยอดรวมทั้งปีงบประมาณ
+    - ยอดเดือนนี้
+    - ใบสำคัญเสร็จสิ้น
+    - คำขอแก้ไข (รอ/อนุมัติ)
+    """
+    from django.db.models import Sum, Count
+    from django.utils import timezone
+    from datetime import datetime, timedelta
+    from utils.fiscal_year import get_current_fiscal_year, get_fiscal_year_dates
+
+    # ตรวจสอบสิทธิ์การเข้าถึงรายงาน
+    scope = ReceiptScope.for_request(request)
+    if not scope.can_view_reports:
+        messages.error(request, 'คุณไม่มีสิทธิ์เข้าถึงหน้ารายงาน')
+        return redirect('dashboard')
+
+    # กำหนด scope การดู - กรองเฉพาะใบที่ผ่านกระบวนการทางบัญชี (มีเลขที่)
+    receipts = scope.report_receipts()
+    if scope.can_view_all:
+        edit_requests = ReceiptEditRequest.objects.all()
+    else:
+        # Basic User และ Department Manager - ดูระดับหน่วยงาน
+        edit_requests = ReceiptEditRequest.objects.filter(receipt__department_id=scope.department_id)
+    view_scope = scope.report_label
+    
+    # วันที่ปัจจุบัน
+    now = timezone.now()
+    current_month_start = now.replace(day=1, hour=0, minute=0, second=0, microsecond=0)
+    
+    # ปีงบประมาณปัจจุบัน
+    current_fiscal_year = get_current_fiscal_year()
+    fiscal_start, fiscal_end = get_fiscal_year_dates(current_fiscal_year)
+    fiscal_receipts = receipts.filter(receipt_date__gte=fiscal_start, receipt_date__lte=fiscal_end)
+    
+    # สถิติเดือนปัจจุบัน - ใช้ receipt_date แทน created_at
+    current_month_end = (current_month_start + timedelta(days=32)).replace(day=1) - timedelta(days=1)
+    monthly_receipts = receipts.filter(receipt_date__gte=current_month_start.date(), receipt_date__lte=current_month_end.date())
+    
+    # 1. ยอดรวมทั้งปีงบประมาณ
+    fiscal_year_amount = fiscal_receipts.filter(status='completed').aggregate(
+        total=Sum('total_amount')
+    )['total'] or 0
+    fiscal_year_count = fiscal_receipts.filter(status='completed').count()
+    
+    # 2. ยอดเดือนนี้
+    monthly_amount = monthly_receipts.filter(status='completed').aggregate(
+        total=Sum('total_amount')
+    )['total'] or 0
+    monthly_count = monthly_receipts.filter(status='completed').count()
+    
+    # 3. ใบสำคัญเสร็จสิ้น (ทั้งหมด)
+    completed_amount = receipts.filter(status='completed').aggregate(
+        total=Sum('total_amount')
+    )['total'] or 0
+    completed_count = receipts.filter(status='completed').count()
+    
+    # 4. คำขอแก้ไข
+    pending_edit_requests = edit_requests.filter(status='pending').count()
+    approved_edit_requests = edit_requests.filter(status__in=['approved', 'applied']).count()
+    
+    # สถิติสถานะรวม (ใบสำคัญ + คำขอแก้ไข)
+    status_summary = []
+
+    # สถานะใบสำคัญรับเงิน (ไม่รวม draft เพราะกรองออกไปแล้ว)
+    for status_code, status_name in Receipt.STATUS_CHOICES:
+        if status_code == 'draft':
+            continue  # ข้าม draft เพราะกรองออกแล้ว
+
+        count = receipts.filter(status=status_code).count()
+        amount = receipts.filter(status=status_code).aggregate(
+            total=Sum('total_amount')
+        )['total'] or 0
+
+        # กำหนดสี badge
+        if status_code == 'completed':
+            badge_color = 'success'
+        else:  # cancelled
+            badge_color = 'danger'
+
+        status_summary.append({
+            'name': status_name,
+            'count': count,
+            'amount': amount,
+            'badge_color': badge_color,
+            'unit': 'ใบ',
+            'type': 'receipt'
+        })
+    
+    # สถานะคำขอแก้ไข
+    edit_request_statuses = [
+        ('pending', 'รออนุมัติ', 'warning'),
+        ('approved', 'อนุมัติแล้ว', 'success'), 
+        ('applied', 'ดำเนินการแล้ว', 'info'),
+        ('rejected', 'ปฏิเสธ', 'danger'),
+        ('withdrawn', 'ถอนคำร้อง', 'secondary'),
+    ]
+    
+    for status_code, status_name, badge_color in edit_request_statuses:
+        count = edit_requests.filter(status=status_code).count()
+        status_summary.append({
+            'name': status_name,
+            'count': count,
+            'amount': None,  # คำขอแก้ไขไม่มียอดเงิน
+            'badge_color': badge_color,
+            'unit': 'คำขอ',
+            'type': 'edit_request'
+        })
+    
+    # สถิติตามสถานะ (สำหรับส่วนแสดงผล - ไม่รวม draft)
+    status_stats = {}
+    for status_code, status_name in Receipt.STATUS_CHOICES:
+        if status_code == 'draft':
+            continue  # ข้าม draft เพราะกรองออกแล้ว
+
+        count = receipts.filter(status=status_code).count()
+        amount = receipts.filter(status=status_code).aggregate(
+            total=Sum('total_amount')
+        )['total'] or 0
+        status_stats[status_code] = {
+            'name': status_name,
+            'count': count,
+            'amount': amount
+        }
+    
+    # สถิติตามหน่วยงาน (ถ้าดูได้ทุกหน่วยงาน)
+    department_stats = []
+    if scope.can_view_all:
+        departments = scope.report_departments()
+        for dept in departments:
+            dept_receipts = receipts.filter(department=dept, status='completed')
+            count = dept_receipts.count()
+            amount = dept_receipts.aggregate(total=Sum('total_amount'))['total'] or 0
+            if count > 0:  # แสดงเฉพาะหน่วยงานที่มีใบสำคัญ
+                department_stats.append({
+                    'department': dept.name,
+                    'count': count,
+                    'amount': amount
+                })
+        
+        # เรียงตามยอดเงิน
+        department_stats.sort(key=lambda x: x['amount'], reverse=True)
+    
+    # สถิติ 7 วันที่ผ่านมา (วันปัจจุบันบนสุด)
+    daily_stats = []
+    day_names_short = ['M', 'Tu', 'W', 'Th', 'F', 'Sa', 'Su']  # 0=Monday, 6=Sunday
+    # สีโทนอ่อนสำหรับแต่ละวัน
+    day_colors = ['primary', 'success', 'info', 'warning', 'danger', 'secondary', 'dark']
+    
+    for i in range(6, -1, -1):  # เรียงจาก วันปัจจุบัน ย้อนกลับ 7 วัน
+        day = now - timedelta(days=i)
+        day_date = day.date()
+
+        day_receipts = receipts.filter(
+            receipt_date=day_date,
+            status='completed'
+        )
+        
+        # ตัวย่อวันและสี badge
+        day_name_short = day_names_short[day.weekday()]
+        day_color = day_colors[day.weekday()]
+        
+        daily_stats.append({
+            'day_short': day_name_short,
+            'day_color': day_color,
+            'date': day.date(),  # ส่งเป็น date object เพื่อใช้ thai_date filter ในเทมเพลต
+            'count': day_receipts.count(),
+            'amount': day_receipts.aggregate(total=Sum('total_amount'))['total'] or 0
+        })
+    
+    # เดือนไทยเต็มสำหรับหัวตาราง
+    thai_months_full = [
+        'มกราคม', 'กุมภาพันธ์', 'มีนาคม', 'เมษายน', 'พฤษภาคม', 'มิถุนายน',
+        'กรกฎาคม', 'สิงหาคม', 'กันยายน', 'ตุลาคม', 'พฤศจิกายน', 'ธันวาคม'
+    ]
+    current_thai_month = thai_months_full[now.month - 1]
+    
+    context = {
+        'title': 'รายงานแดชบอร์ด',
+        'view_scope': view_scope,
+        # 4 การ์ดหลัก
+        'fiscal_year_amount': fiscal_year_amount,
+        'fiscal_year_count': fiscal_year_count,
+        'monthly_amount': monthly_amount,
+        'monthly_count': monthly_count,
+        'completed_amount': completed_amount,
+        'completed_count': completed_count,
+        'pending_edit_requests': pending_edit_requests,
+        'approved_edit_requests': approved_edit_requests,
+        # ข้อมูลเสริม
+        'current_fiscal_year': current_fiscal_year,
+        'status_stats': status_stats,
+        'department_stats': department_stats,
+        'daily_stats': daily_stats,
+        'current_thai_month': current_thai_month,
+        'status_summary': status_summary,
+        'current_month': now.strftime('%B %Y'),
+        'current_month_thai': now.strftime('%m/%Y'),
+    }
+    
+    return render(request, 'accounts/reports_dashboard.html', context)
+
+
+@login_required
+def receipt_report_view(request):
+    """
+    รายงานใบสำคัญรับเงินแบบรายละเอียด
+    Features:
+    - Filter ตามวันที่
+    - Filter ตามหน่วยงาน
+    - Filter ตามสถานะ (เฉพาะเสร็จสิ้นและยกเลิก - ไม่รวมร่าง)
+    - แสดงเป็นตาราง
+    - Export PDF/Excel
+
+    หมายเหตุ: รายงานนี้แสดงเฉพาะใบสำคัญที่ผ่านกระบวนการทางบัญชีแล้ว
+    ไม่รวมสถานะ "ร่าง" เพราะยังไม่มีผลทางบัญชี
+    """
+    from django.db.models import Sum
+
+    # ตรวจสอบสิทธิ์การเข้าถึงรายงาน
+    scope = ReceiptScope.for_request(request)
+    if not scope.can_view_reports:
+        messages.error(request, 'คุณไม่มีสิทธิ์เข้าถึงหน้ารายงาน')
+        return redirect('dashboard')
+
+    # กำหนด scope การดู - กรองเฉพาะเอกสารที่ผ่านกระบวนการทางบัญชีแล้ว (มีเลขที่เอกสาร)
+    departments = scope.report_departments()
+    view_scope = scope.report_label
+
+    # กรองตามวันที่ / หน่วยงาน (ถ้ามีสิทธิ์ดูทุกหน่วยงาน) / สถานะ / คำค้นหา
+    filters = scope.filters(request.GET)
+    for _ in filters.invalid_dates:
+        messages.warning(request, 'รูปแบบวันที่ไม่ถูกต้อง')
+    receipts = filters.apply(scope.report_receipts())
+    filter_applied = filters.applied
+
+    # เรียงลำดับ - ล่าสุดก่อน (เพื่อให้ผู้ใช้เห็นข้อมูลใหม่ที่หน้าแรก)
+    receipts = receipts.select_related('department', 'created_by').order_by('-receipt_date', '-receipt_number')
+
+    # สรุปยอดรวม
+    total_amount = receipts.filter(status='completed').aggregate(
+        total=Sum('total_amount')
+    )['total'] or 0
+
+    total_count = receipts.count()
+    completed_count = receipts.filter(status='completed').count()
+    cancelled_count = receipts.filter(status='cancelled').count()
+    
+    # Pagination
+    paginator = Paginator(receipts, 50)  # 50 รายการต่อหน้า
+    page = request.GET.get('page')
+    receipts_page = paginator.get_page(page)
+    
+    # สรุปตามสถานะ (เฉพาะ completed และ cancelled)
+    status_summary = {}
+    for status_code, status_name in Receipt.STATUS_CHOICES:
+        if status_code != 'draft':  # ข้าม draft ในรายงาน
+            count = receipts.filter(status=status_code).count()
+            amount = receipts.filter(status=status_code).aggregate(
+                total=Sum('total_amount')
+            )['total'] or 0
+            status_summary[status_code] = {
+                'name': status_name,
+                'count': count,
+                'amount': amount
+            }
+
+    # กรอง STATUS_CHOICES เฉพาะเสร็จสิ้นและยกเลิก (ไม่รวมร่าง)
+    report_status_choices = [
+        (code, name) for code, name in Receipt.STATUS_CHOICES
+        if code != 'draft'
+    ]
+
+    context = {
+        'title': 'รายงานใบสำคัญรับเงิน',
+        'receipts': receipts_page,
+        'departments': departments,
+        'status_choices': report_status_choices,  # ใช้ตัวเลือกที่กรองแล้ว
+        'view_scope': view_scope,
+        'total_amount': total_amount,
+        'total_count': total_count,
+        'completed_count': completed_count,
+        'cancelled_count': cancelled_count,
+        'status_summary': status_summary,
+        'filter_applied': filter_applied,
+
+        # Filter values for form
+        'date_from': filters.date_from,
+        'date_to': filters.date_to,
+        'department_filter': filters.department,
+        'status_filter': filters.status,
+        'search_query': filters.q,
+    }
+
+    return render(request, 'accounts/receipt_report.html', context)
+
+
+@login_required
+def revenue_summary_report_view(request):
+    """
+    รายงานสรุปรายรับ - สรุปยอดรับเงินตามช่วงเวลาและหน่วยงาน
+    Features:
+    - สรุปตามรายวัน, รายเดือน, รายปีงบประมาณ
+    - สรุปตามหน่วยงาน
+    - Charts และ graphs
+    - Export Excel/PDF
+    """
+    # ตรวจสอบสิทธิ์การเข้าถึงรายงาน
+    scope = ReceiptScope.for_request(request)
+    if not scope.can_view_reports:
+        messages.error(request, 'คุณไม่มีสิทธิ์เข้าถึงหน้ารายงาน')
+        return redirect('dashboard')
+
+    # กำหนด scope การดู - กรองเฉพาะใบที่ผ่านกระบวนการทางบัญชี (มีเลขที่)
+    departments = scope.report_departments()
+    view_scope = scope.report_label
+
+    # รับค่า filter
+    period_type = request.GET.get('period', 'monthly')  # daily, monthly, fiscal_year
+    filters = scope.filters(request.GET)
+
+    # ตรวจสอบ Custom Date Range Mode
+    is_custom_mode = filters.has_date_range
+
+    # สรุปยอดรวม / รายหน่วยงาน / รายช่วงเวลา (ชุดเดียวกับหน้ารายงานและไฟล์ส่งออก — cache ไว้ใน accounts/revenue_summary.py)
+    summary = get_revenue_summary(scope, filters, period_type)
+    total_summary = summary['total_summary']
+    department_summary = summary['department_summary']
+    period_summary = summary['period_summary']
+
+    context = {
+        'title': 'รายงานสรุปรายรับ',
+        'view_scope': view_scope,
+        'total_summary': total_summary,
+        'department_summary': department_summary,
+        'period_summary': period_summary,
+        'period_type': period_type,
+        'departments': departments,
+        'is_custom_mode': is_custom_mode,
+        
+        # Filter values
+        'date_from': filters.date_from,
+        'date_to': filters.date_to,
+        'department_filter': filters.department,
+    }
+    
+    return render(request, 'accounts/revenue_summary_report.html', context)
@@ -0,0 +1,287 @@
+"""
+บทบาทและสิทธิ์ และการกำหนดบทบาทให้ผู้ใช้
+"""
+from django.shortcuts import render, redirect
+from django.contrib.auth.decorators import login_required
+from django.contrib import messages
+from django.http import JsonResponse
+import json
+
+from ..models import Permission, Role, UserRole, invalidate_permission_names
+
+
+@login_required
+def roles_permissions_view(request):
+    """แสดงหน้าจัดการบทบาทและสิทธิ์"""
+    if not (request.user.is_staff or request.user.is_superuser or request.user.has_permission('role_manage')):
+        messages.error(request, 'ไม่มีสิทธิ์เข้าถึงหน้านี้')
+        return redirect('dashboard')
+
+    roles = Role.objects.filter(is_active=True).prefetch_related('permissions')
+    permissions = Permission.objects.filter(is_active=True)
+
+    context = {
+        'title': 'บทบาทและสิทธิ์',
+        'roles': roles,
+        'permissions': permissions,
+    }
+
+    return render(request, 'accounts/roles_permissions.html', context)
+
+
+@login_required
+def role_create_view(request):
+    """สร้างบทบาทใหม่ (AJAX)"""
+    if not (request.user.is_staff or request.user.is_superuser or request.user.has_permission('role_manage')):
+        return JsonResponse({'success': False, 'message': 'ไม่มีสิทธิ์'}, status=403)
+
+    if request.method == 'POST':
+        try:
+            data = json.loads(request.body)
+            name = data.get('name', '').strip()
+            display_name = data.get('display_name', '').strip()
+            description = data.get('description', '').strip()
+            permission_ids = data.get('permission_ids', [])
+
+            # Validate input
+            if not name or not display_name:
+                return JsonResponse({'success': False, 'message': 'กรุณากรอกชื่อบทบาทและชื่อแสดง'})
+
+            # Check if role name already exists
+            if Role.objects.filter(name=name).exists():
+                return JsonResponse({'success': False, 'message': 'ชื่อบทบาทนี้มีอยู่แล้ว'})
+
+            # Create role
+            role = Role.objects.create(
+                name=name,
+                display_name=display_name,
+                description=description
+            )
+
+            # Add permissions
+            if permission_ids:
+                permissions = Permission.objects.filter(id__in=permission_ids, is_active=True)
+                role.permissions.set(permissions)
+
+            return JsonResponse({
+                'success': True,
+                'message': f'สร้างบทบาท "{display_name}" เรียบร้อย',
+                'role_id': role.id
+            })
+
+        except json.JSONDecodeError:
+            return JsonResponse({'success': False, 'message': 'ข้อมูลไม่ถูกต้อง'}, status=400)
+        except Exception as e:
+            return JsonResponse({'success': False, 'message': str(e)}, status=500)
+
+    return JsonResponse({'success': False, 'message': 'Method not allowed'}, status=405)
+
+
+@login_required
+def role_edit_view(request, role_id):
+    """แก้ไขบทบาท (AJAX)"""
+    if not (request.user.is_staff or request.user.is_superuser or request.user.has_permission('role_manage')):
+        return JsonResponse({'success': False, 'message': 'ไม่มีสิทธิ์'}, status=403)
+
+    try:
+        role = Role.objects.get(id=role_id, is_active=True)
+    except Role.DoesNotExist:
+        return JsonResponse({'success': False, 'message': 'ไม่พบบทบาท'}, status=404)
+
+    if request.method == 'POST':
+        try:
+            data = json.loads(request.body)
+            display_name = data.get('display_name', '').strip()
+            description = data.get('description', '').strip()
+            permission_ids = data.get('permission_ids', [])
+
+            # Validate input
+            if not display_name:
+                return JsonResponse({'success': False, 'message': 'กรุณากรอกชื่อแสดง'})
+
+            # Update role
+            role.display_name = display_name
+            role.description = description
+            role.save()
+
+            # Update permissions
+            if permission_ids:
+                permissions = Permission.objects.filter(id__in=permission_ids, is_active=True)
+                role.permissions.set(permissions)
+            else:
+                role.permissions.clear()
+
+            return JsonResponse({
+                'success': True,
+                'message': f'แก้ไขบทบาท "{display_name}" เรียบร้อย'
+            })
+
+        except json.JSONDecodeError:
+            return JsonResponse({'success': False, 'message': 'ข้อมูลไม่ถูกต้อง'}, status=400)
+        except Exception as e:
+            return JsonResponse({'success': False, 'message': str(e)}, status=500)
+
+    elif request.method == 'GET':
+        # Return role data for editing
+        role_data = {
+            'id': role.id,
+            'name': role.name,
+            'display_name': role.display_name,
+            'description': role.description,
+            'permission_ids': list(role.permissions.values_list('id', flat=True))
+        }
+        return JsonResponse({'success': True, 'role': role_data})
+
+    return JsonResponse({'success': False, 'message': 'Method not allowed'}, status=405)
+
+
+@login_required
+def role_delete_view(request, role_id):
+    """ลบบทบาท (AJAX)"""
+    if not (request.user.is_staff or request.user.is_superuser or request.user.has_permission('role_manage')):
+        return JsonResponse({'success': False, 'message': 'ไม่มีสิทธิ์'}, status=403)
+
+    if request.method == 'POST':
+        try:
+            role = Role.objects.get(id=role_id, is_active=True)
+
+            # Check if any users have this role
+            user_count = UserRole.objects.filter(role=role, is_active=True).count()
+            if user_count > 0:
+                return JsonResponse({
+                    'success': False,
+                    'message': f'ไม่สามารถลบได้ มีผู้ใช้ {user_count} คนที่มีบทบาทนี้'
+                })
+
+            role_name = role.display_name
+            role.is_active = False
+            role.save()
+
+            return JsonResponse({
+                'success': True,
+                'message': f'ลบบทบาท "{role_name}" เรียบร้อย'
+            })
+
+        except Role.DoesNotExist:
+            return JsonResponse({'success': False, 'message': 'ไม่พบบทบาท'}, status=404)
+        except Exception as e:
+            return JsonResponse({'success': False, 'message': str(e)}, status=500)
+
+    return JsonResponse({'success': False, 'message': 'Method not allowed'}, status=405)
+
+
+@login_required
+def user_role_assign_view(request, user_id):
+    """กำหนดบทบาทให้ผู้ใช้ (AJAX)"""
+    if not (request.user.is_staff or request.user.is_superuser or request.user.has_permission('user_manage')):
+        return JsonResponse({'success': False, 'message': 'ไม่มีสิทธิ์'}, status=403)
+
+    try:
+        from django.contrib.auth import get_user_model
+        User = get_user_model()
+        user = User.objects.get(id=user_id)
+    except User.DoesNotExist:
+        return JsonResponse({'success': False, 'message': 'ไม่พบผู้ใช้'}, status=404)
+
+    if request.method == 'POST':
+        try:
+            data = json.loads(request.body)
+            role_ids = data.get('role_ids', [])
+
+            # Clear existing roles
+            UserRole.objects.filter(user=user).update(is_active=False)
+            invalidate_permission_names()
+
+            # Assign new roles
+            if role_ids:
+                roles = Role.objects.filter(id__in=role_ids, is_active=True)
+                for role in roles:
+                    user.assign_role(role, assigned_by=request.user)
+
+            return JsonResponse({
+                'success': True,
+                'message': f'กำหนดบทบาทให้ {user.get_display_name()} เรียบร้อย'
+            })
+
+        except json.JSONDecodeError:
+            return JsonResponse({'success': False, 'message': 'ข้อมูลไม่ถูกต้อง'}, status=400)
+        except Exception as e:
+            return JsonResponse({'success': False, 'message': str(e)}, status=500)
+
+    elif request.method == 'GET':
+        # Return user roles for editing
+        user_roles = user.get_roles()
+        user_data = {
+            'id': user.id,
+            'name': user.get_display_name(),
+            'role_ids': list(user_roles.values_list('id', flat=True))
+        }
+        return JsonResponse({'success': True, 'user': user_data})
+
+    return JsonResponse({'success': False, 'message': 'Method not allowed'}, status=405)
+
+
+@login_required
+def get_available_roles_ajax(request):
+    """AJAX endpoint to get available roles"""
+    if not (request.user.is_staff or request.user.is_superuser or request.user.has_permission('user_manage')):
+        return JsonResponse({'success': False, 'message': 'ไม่มีสิทธิ์ในการดำเนินการ'}, status=403)
+
+    if request.method == 'GET':
+        roles = Role.objects.filter(is_active=True).values('id', 'name', 'display_name', 'description')
+        return JsonResponse({'success': True, 'roles': list(roles)})
+
+    return JsonResponse({'success': False, 'message': 'Method not allowed'}, status=405)
+
+
+@login_required
+def user_roles_ajax(request, user_id):
+    """AJAX endpoint to get/set user roles"""
+    if not (request.user.is_staff or request.user.is_superuser or request.user.has_permission('user_manage')):
+        return JsonResponse({'success': False, 'message': 'ไม่มีสิทธิ์ในการดำเนินการ'}, status=403)
+
+    try:
+        from django.contrib.auth import get_user_model
+        User = get_user_model()
+        user = User.objects.get(id=user_id)
+    except User.DoesNotExist:
+        return JsonResponse({'success': False, 'message': 'ไม่พบผู้ใช้'}, status=404)
+
+    if request.method == 'GET':
+        # Return user data for role assignment
+        user_roles = user.get_roles()
+        user_data = {
+            'id': user.id,
+            'full_name': user.full_name or user.username,
+            'ldap_uid': user.ldap_uid,
+            'department': user.get_department() or 'ไม่ระบุ',
+            'role_ids': list(user_roles.values_list('id', flat=True)),  # Get role IDs for matching
+        }
+        return JsonResponse({'success': True, 'user': user_data})
+
+    elif request.method == 'POST':
+        try:
+            data = json.loads(request.body)
+            role_ids = data.get('role_ids', [])
+
+            # Clear existing roles
+            UserRole.objects.filter(user=user).update(is_active=False)
+            invalidate_permission_names()
+
+            # Assign new roles based on role IDs from database
+            if role_ids:
+                roles = Role.objects.filter(id__in=role_ids, is_active=True)
+                for role in roles:
+                    user.assign_role(role, assigned_by=request.user)
+
+            return JsonResponse({
+                'success': True,
+                'message': f'อัปเดตบทบาทผู้ใช้ {user.full_name or user.username} เรียบร้อย'
+            })
+
+        except json.JSONDecodeError:
+            return JsonResponse({'success': False, 'message': 'ข้อมูลไม่ถูกต้อง'}, status=400)
+        except Exception as e:
+            return JsonResponse({'success': False, 'message': str(e)}, status=500)
+
+    return JsonResponse({'success': False, 'message': 'Method not allowed'}, status=405)
@@ -0,0 +1,894 @@
+"""
+จัดการผู้ใช้: อนุมัติ/ระงับบัญชี, เปลี่ยนรหัสผ่าน, ดึงข้อมูลจาก NPU ใหม่ และสร้าง/แก้ไขผู้ใช้แบบ manual
+"""
+from django.shortcuts import render, redirect
+from django.contrib.auth.decorators import login_required
+from django.contrib import messages
+from django.http import JsonResponse
+from django.db.models import Q
+from django.utils import timezone
+from django.utils.safestring import mark_safe
+import json
+
+from ..models import Role, UserRole, Department, User, UserActivityLog
+
+
+@login_required
+def approve_user_ajax(request, user_id):
+    """AJAX endpoint to approve user"""
+    if not (request.user.is_staff or request.user.is_superuser or request.user.has_permission('user_manage')):
+        return JsonResponse({'success': False, 'message': 'ไม่มีสิทธิ์ในการดำเนินการ'}, status=403)
+
+    if request.method == 'POST':
+        try:
+            from django.contrib.auth import get_user_model
+            User = get_user_model()
+            user = User.objects.get(id=user_id)
+
+            if user.approval_status == 'pending':
+                user.approve_user()
+                return JsonResponse({
+                    'success': True,
+                    'message': f'อนุมัติผู้ใช้ {user.full_name or user.username} เรียบร้อย'
+                })
+            else:
+                return JsonResponse({
+                    'success': False,
+                    'message': f'ผู้ใช้อยู่ในสถานะ {user.approval_status} แล้ว'
+                })
+
+        except User.DoesNotExist:
+            return JsonResponse({'success': False, 'message': 'ไม่พบผู้ใช้'}, status=404)
+        except Exception as e:
+            return JsonResponse({'success': False, 'message': str(e)}, status=500)
+
+    return JsonResponse({'success': False, 'message': 'Method not allowed'}, status=405)
+
+
+@login_required
+def reject_user_ajax(request, user_id):
+    """AJAX endpoint to reject user"""
+    if not (request.user.is_staff or request.user.is_superuser or request.user.has_permission('user_manage')):
+        return JsonResponse({'success': False, 'message': 'ไม่มีสิทธิ์ในการดำเนินการ'}, status=403)
+
+    if request.method == 'POST':
+        try:
+            from django.contrib.auth import get_user_model
+            User = get_user_model()
+            user = User.objects.get(id=user_id)
+
+            if user.approval_status == 'pending':
+                user.reject_user()
+                return JsonResponse({
+                    'success': True,
+                    'message': f'ปฏิเสธผู้ใช้ {user.full_name or user.username} เรียบร้อย'
+                })
+            else:
+                return JsonResponse({
+                    'success': False,
+                    'message': f'ผู้ใช้อยู่ในสถานะ {user.approval_status} แล้ว'
+                })
+
+        except User.DoesNotExist:
+            return JsonResponse({'success': False, 'message': 'ไม่พบผู้ใช้'}, status=404)
+        except Exception as e:
+            return JsonResponse({'success': False, 'message': str(e)}, status=500)
+
+    return JsonResponse({'success': False, 'message': 'Method not allowed'}, status=405)
+
+
+@login_required
+def user_details_ajax(request, user_id):
+    """AJAX endpoint to get user details"""
+    if not (request.user.is_staff or request.user.is_superuser or request.user.has_permission('user_manage')):
+        return JsonResponse({'success': False, 'message': 'ไม่มีสิทธิ์ในการดำเนินการ'}, status=403)
+
+    try:
+        from django.contrib.auth import get_user_model
+        User = get_user_model()
+        user = User.objects.get(id=user_id)
+
+        user_data = {
+            'ldap_uid': user.ldap_uid,
+            'full_name': user.full_name,
+            'department': user.get_department(),
+            'position_title': user.position_title,
+            'staff_type': user.staff_type,
+            'employment_status': user.employment_status,
+            'contact_email': user.contact_email,
+            'approval_status': user.approval_status,
+            'date_joined': user.date_joined.strftime('%d/%m/%Y %H:%M'),
+            'last_login': user.last_login.strftime('%d/%m/%Y %H:%M') if user.last_login else 'ไม่เคยเข้าใช้',
+            'last_npu_sync': user.last_npu_sync.strftime('%d/%m/%Y %H:%M') if user.last_npu_sync else 'ไม่เคย',
+        }
+
+        # ผู้ใช้จาก NPU ดึงข้อมูลใหม่ได้ ถ้ามีคีย์ไว้ค้นหา (เลขบัตร / รหัสนักศึกษา)
+        identifier = user.student_code if user.user_type == 'student' else user.ldap_uid
+        can_resync = user.source == 'npu_api' and bool(identifier)
+
+        html = f"""
+        <div class="row g-3">
+            <div class="col-md-6">
+                <label class="form-label fw-bold">รหัสบัตรประชาชน:</label>
+                <p class="form-control-plaintext">{user_data['ldap_uid']}</p>
+            </div>
+            <div class="col-md-6">
+                <label class="form-label fw-bold">ชื่อ-นามสกุล:</label>
+                <p class="form-control-plaintext">{user_data['full_name'] or 'ไม่ระบุ'}</p>
+            </div>
+            <div class="col-md-6">
+                <label class="form-label fw-bold">หน่วยงาน:</label>
+                <p class="form-control-plaintext">{user_data['department'] or 'ไม่ระบุ'}</p>
+            </div>
+            <div class="col-md-6">
+                <label class="form-label fw-bold">ตำแหน่ง:</label>
+                <p class="form-control-plaintext">{user_data['position_title'] or 'ไม่ระบุ'}</p>
+            </div>
+            <div class="col-md-6">
+                <label class="form-label fw-bold">ประเภทบุคลากร:</label>
+                <p class="form-control-plaintext">{user_data['staff_type'] or 'ไม่ระบุ'}</p>
+            </div>
+            <div class="col-md-6">
+                <label class="form-label fw-bold">สถานะการทำงาน:</label>
+                <p class="form-control-plaintext">{user_data['employment_status'] or 'ไม่ระบุ'}</p>
+            </div>
+            <div class="col-md-6">
+                <label class="form-label fw-bold">อีเมล:</label>
+                <p class="form-control-plaintext">{user_data['contact_email'] or 'ไม่ระบุ'}</p>
+            </div>
+            <div class="col-md-6">
+                <label class="form-label fw-bold">สถานะการอนุมัติ:</label>
+                <p class="form-control-plaintext">
+                    <span class="badge bg-warning">{user_data['approval_status']}</span>
+                </p>
+            </div>
+            <div class="col-md-6">
+                <label class="form-label fw-bold">วันที่สมัคร:</label>
+                <p class="form-control-plaintext">{user_data['date_joined']}</p>
+            </div>
+            <div class="col-md-6">
+                <label class="form-label fw-bold">เข้าใช้ล่าสุด:</label>
+                <p class="form-control-plaintext">{user_data['last_login']}</p>
+            </div>
+            <div class="col-md-6">
+                <label class="form-label fw-bold">ข้อมูล NPU อัปเดตล่าสุด:</label>
+                <p class="form-control-plaintext">{user_data['last_npu_sync']}</p>
+            </div>
+        </div>
+        """
+
+        return JsonResponse({
+            'success': True,
+            'html': html,
+            'can_resync': can_resync,
+            'user_id': user.id,
+        })
+
+    except User.DoesNotExist:
+        return JsonResponse({'success': False, 'message': 'ไม่พบผู้ใช้'}, status=404)
+    except Exception as e:
+        return JsonResponse({'success': False, 'message': str(e)}, status=500)
+
+
+@login_required
+def npu_resync_ajax(request, user_id):
+    """
+    ดึงข้อมูลจาก NPU มาอัปเดตผู้ใช้เป็นรายคน (แอดมินกดเอง)
+
+    ทำไมต้องมี: ข้อมูล NPU ถูกดึงมาแค่ครั้งเดียวตอนสร้างบัญชี
+    (`_create_staff_user()` ใน backends.py) ส่วนการ login ครั้งต่อ ๆ ไป
+    `_check_database_staff()` ตรวจแค่รหัสผ่าน ไม่เคย sync ซ้ำ
+    ผู้ใช้ที่ย้ายหน่วยงานจึงค้างอยู่หน่วยงานเดิมตลอดไป
+
+    GET  = ดูก่อนว่าจะเปลี่ยนอะไรบ้าง **ไม่เขียนอะไรลงฐานข้อมูล**
+    POST = เขียนจริง แล้วบันทึกลง UserActivityLog
+
+    ใช้ endpoint lookup ที่ยืนยันสิทธิ์ด้วย JWT อย่างเดียว จึงไม่ต้องมีรหัสผ่านของเจ้าตัว
+    """
+    if not (request.user.is_staff or request.user.is_superuser or request.user.has_permission('user_manage')):
+        return JsonResponse({'success': False, 'message': 'ไม่มีสิทธิ์ในการดำเนินการ'}, status=403)
+
+    from django.db import transaction
+    from ..npu_api import NPULookupError
+    # import ตอนใช้ — npu_resync ดึง requests/urllib3 มาด้วย ไม่ต้องโหลดตอน worker เริ่ม
+    from ..npu_resync import (
+        NPU_RESYNC_FIELD_LABELS, NPUResyncSkip, diff_npu_fields, fetch_npu_data, missing_department_warning,
+    )
+
+    try:
+        target_user = User.objects.get(id=user_id)
+    except User.DoesNotExist:
+        return JsonResponse({'success': False, 'message': 'ไม่พบผู้ใช้'}, status=404)
+
+    if target_user.source != 'npu_api':
+        return JsonResponse({
+            'success': False,
+            'message': 'ผู้ใช้รายนี้ไม่ได้มาจาก NPU API (สร้างเองแบบ manual) จึงไม่มีต้นทางให้ดึงข้อมูล'
+        }, status=400)
+
+    # เลือก client กับชุดฟิลด์ตามประเภทผู้ใช้
+    try:
+        fresh_data, allowed_fields, department_field = fetch_npu_data(target_user)
+    except NPUResyncSkip as e:
+        return JsonResponse({'success': False, 'message': str(e)}, status=400)
+    except NPULookupError as e:
+        return JsonResponse({'success': False, 'message': str(e)}, status=502)
+
+    # เทียบทีละฟิลด์
+    changes = diff_npu_fields(target_user, fresh_data, allowed_fields)
+
+    warnings = []
+    if department_field in changes:
+        warning = missing_department_warning(changes[department_field][1])
+        if warning:
+            warnings.append(warning)
+
+    changes_display = [
+        {
+            'field': field,
+            'label': NPU_RESYNC_FIELD_LABELS.get(field, field),
+            'old': str(old) if old not in (None, '') else '',
+            'new': str(new),
+        }
+        for field, (old, new) in changes.items()
+    ]
+
+    # GET = พรีวิวอย่างเดียว ไม่แตะฐานข้อมูล
+    if request.method != 'POST':
+        return JsonResponse({
+            'success': True,
+            'applied': False,
+            'user_display': target_user.get_display_name(),
+            'changes': changes_display,
+            'warnings': warnings,
+            'last_npu_sync': target_user.last_npu_sync.strftime('%d/%m/%Y %H:%M') if target_user.last_npu_sync else 'ไม่เคย',
+        })
+
+    # POST = เขียนจริง
+    try:
+        with transaction.atomic():
+            for field, (_old, new_value) in changes.items():
+                setattr(target_user, field, new_value)
+            target_user.last_npu_sync = timezone.now()
+            target_user.save(update_fields=list(changes.keys()) + ['last_npu_sync'])
+
+            UserActivityLog.log_npu_resync(
+                user=target_user,
+                performed_by=request.user,
+                changes=changes,
+                request=request,
+            )
+    except Exception as e:
+        return JsonResponse({'success': False, 'message': f'บันทึกไม่สำเร็จ: {e}'}, status=500)
+
+    return JsonResponse({
+        'success': True,
+        'applied': True,
+        'user_display': target_user.get_display_name(),
+        'changes': changes_display,
+        'warnings': warnings,
+        'message': (
+            f'อัปเดตข้อมูลจาก NPU สำเร็จ ({len(changes_display)} รายการ)'
+            if changes_display else 'ข้อมูลตรงกับ NPU อยู่แล้ว ไม่มีอะไรเปลี่ยน'
+        ),
+    })
+
+
+@login_required
+def user_management_view(request):
+    """
+    User Management Page - separate from dashboard
+    Features:
+    - Tabbed interface for different user statuses
+    - Bulk operations
+    - Role assignment
+    - Search and filter functionality
+    """
+    if not (request.user.is_staff or request.user.is_superuser or request.user.has_permission('user_manage')):
+        messages.error(request, 'ไม่มีสิทธิ์เข้าถึงหน้านี้')
+        return redirect('dashboard')
+
+    from django.contrib.auth import get_user_model
+    from django.db.models import Count
+    User = get_user_model()
+
+    # Get user statistics — conditional aggregate query เดียวแทน COUNT 4 ครั้ง
+    stats = User.objects.aggregate(
+        total_users=Count('id'),
+        pending_users=Count('id', filter=Q(approval_status='pending')),
+        approved_users=Count('id', filter=Q(approval_status='approved', is_active=True)),  # Only active approved users
+        suspended_users=Count('id', filter=Q(is_active=False)),
+    )
+
+    # รายชื่อผู้ใช้แต่ละแท็บโหลดทีละหน้าผ่าน user_management_tab_ajax (โหลดเมื่อเปิดแท็บ)
+    # Get available roles / departments for filter dropdowns
+    available_roles = Role.objects.filter(is_active=True)
+    available_departments = Department.objects.filter(is_active=True).values_list('name', flat=True)
+
+    context = {
+        'title': 'จัดการผู้ใช้งาน',
+        'stats': stats,
+        'available_roles': available_roles,
+        'available_departments': available_departments,
+        'page_size': USER_TAB_PAGE_SIZE,
+    }
+
+    return render(request, 'accounts/user_management.html', context)
+
+
+# เงื่อนไขของแต่ละแท็บในหน้าจัดการผู้ใช้ (ใช้ทั้งตัวกรองแท็บ และตัวกรองสถานะของแท็บ "ทั้งหมด")
+USER_TAB_FILTERS = {
+    'approved': Q(approval_status='approved', is_active=True),
+    'pending': Q(approval_status='pending'),
+    'suspended': Q(is_active=False),
+    'all': Q(),
+}
+
+
+USER_TAB_PAGE_SIZE = 50
+
+
+USER_TAB_MAX_PAGE_SIZE = 200
+
+
+def _encode_user_cursor(sort_at, user_id):
+    return f'{sort_at.isoformat()}|{user_id}'
+
+
+def _decode_user_cursor(cursor):
+    """คืน (sort_at, user_id) หรือ None ถ้า cursor ไม่ถูกต้อง"""
+    from datetime import datetime
+    try:
+        sort_at, user_id = cursor.rsplit('|', 1)
+        return datetime.fromisoformat(sort_at), int(user_id)
+    except (ValueError, AttributeError):
+        return None
+
+
+@login_required
+def user_management_tab_ajax(request, tab):
+    """
+    รายชื่อผู้ใช้ของแท็บในหน้าจัดการผู้ใช้ ทีละหน้า (keyset pagination)
+
+    GET parameters:
+        q          ค้นหาใน username, ชื่อ-นามสกุล, เลขบัตรประชาชน, หน่วยงาน/คณะ
+        department ชื่อหน่วยงาน/คณะ (ตรงทั้งคำ)
+        role       ชื่อบทบาท
+        status     เฉพาะแท็บ all: pending / approved / suspended
+        cursor     ค่า next_cursor จากหน้าก่อน (ไม่ส่ง = หน้าแรก)
+
+    เรียงจากใหม่ไปเก่าด้วย (เวลา, id) แล้วใช้ค่าคู่นี้ของแถวสุดท้ายเป็น cursor
+    หน้าถัดไปจึงไม่ต้อง OFFSET ข้ามแถวก่อนหน้าทั้งหมด
+    """
+    if not (request.user.is_staff or request.user.is_superuser or request.user.has_permission('user_manage')):
+        return JsonResponse({'success': False, 'message': 'ไม่มีสิทธิ์ในการดำเนินการ'}, status=403)
+
+    if tab not in USER_TAB_FILTERS:
+        return JsonResponse({'success': False, 'message': 'ไม่พบแท็บที่ระบุ'}, status=404)
+
+    from django.contrib.auth import get_user_model
+    from django.db.models import F, Prefetch
+    from django.db.models.functions import Coalesce
+    from django.template.loader import render_to_string
+    User = get_user_model()
+
+    users = User.objects.filter(USER_TAB_FILTERS[tab])
+
+    status_filter = request.GET.get('status', '')
+    if tab == 'all' and status_filter in USER_TAB_FILTERS:
+        users = users.filter(USER_TAB_FILTERS[status_filter])
+
+    search = request.GET.get('q', '').strip()
+    if search:
+        users = users.filter(
+            Q(username__icontains=search)
+            | Q(full_name__icontains=search)
+            | Q(ldap_uid__icontains=search)
+            | Q(department__icontains=search)
+            | Q(student_faculty__icontains=search)
+        )
+
+    department_filter = request.GET.get('department', '').strip()
+    if department_filter:
+        users = users.filter(Q(department=department_filter) | Q(student_faculty=department_filter))
+
+    # กรองบทบาทด้วย join เดียว (user+role เป็น unique_together จึงไม่มีแถวซ้ำ)
+    role_filter = request.GET.get('role', '').strip()
+    if role_filter:
+        users = users.filter(userrole__role__name=role_filter, userrole__is_active=True)
+
+    try:
+        page_size = max(1, min(int(request.GET.get('page_size', USER_TAB_PAGE_SIZE)), USER_TAB_MAX_PAGE_SIZE))
+    except ValueError:
+        page_size = USER_TAB_PAGE_SIZE
+
+    # แท็บผู้ใช้งานเรียงตามวันที่อนุมัติ (ผู้ใช้เก่าที่ไม่มีวันที่อนุมัติใช้วันที่สมัครแทน)
+    sort_expression = Coalesce('approved_at', 'date_joined') if tab == 'approved' else F('date_joined')
+    users = users.annotate(sort_at=sort_expression)
+
+    cursor = request.GET.get('cursor', '')
+    # จำนวนทั้งหมดตามตัวกรองนับเฉพาะหน้าแรก หน้าถัดไปใช้ค่าเดิมที่ฝั่ง browser จำไว้
+    total = users.count() if not cursor else None
+    if cursor:
+        decoded = _decode_user_cursor(cursor)
+        if decoded is None:
+            return JsonResponse({'success': False, 'message': 'cursor ไม่ถูกต้อง'}, status=400)
+        sort_at, last_id = decoded
+        users = users.filter(Q(sort_at__lt=sort_at) | Q(sort_at=sort_at, id__lt=last_id))
+
+    # บทบาทของทุกแถวในหน้าโหลดด้วย query เดียว (แทน user.get_roles ทีละแถว)
+    active_roles = UserRole.objects.filter(is_active=True, role__is_active=True).select_related('role')
+    page = list(
+        users.order_by('-sort_at', '-id')
+        .prefetch_related(Prefetch('userrole_set', queryset=active_roles, to_attr='active_user_roles'))
+        [:page_size + 1]
+    )
+    has_more = len(page) > page_size
+    page = page[:page_size]
+
+    html = render_to_string('accounts/user_management_rows.html', {
+        'tab': tab,
+        'users': page,
+        'is_first_page': not cursor,
+    }, request)
+
+    return JsonResponse({
+        'success': True,
+        'html': html,
+        'count': len(page),
+        'total': total,
+        'has_more': has_more,
+        'next_cursor': _encode_user_cursor(page[-1].sort_at, page[-1].id) if has_more else None,
+    })
+
+
+@login_required
+def suspend_user_ajax(request, user_id):
+    """AJAX endpoint to suspend user"""
+    if not (request.user.is_staff or request.user.is_superuser or request.user.has_permission('user_manage')):
+        return JsonResponse({'success': False, 'message': 'ไม่มีสิทธิ์ในการดำเนินการ'}, status=403)
+
+    if request.method == 'POST':
+        try:
+            from django.contrib.auth import get_user_model
+            User = get_user_model()
+            user = User.objects.get(id=user_id)
+
+            if user.is_active:
+                user.is_active = False
+                user.save()
+                return JsonResponse({
+                    'success': True,
+                    'message': f'ระงับผู้ใช้ {user.full_name or user.username} เรียบร้อย'
+                })
+            else:
+                return JsonResponse({
+                    'success': False,
+                    'message': 'ผู้ใช้ถูกระงับอยู่แล้ว'
+                })
+
+        except User.DoesNotExist:
+            return JsonResponse({'success': False, 'message': 'ไม่พบผู้ใช้'}, status=404)
+        except Exception as e:
+            return JsonResponse({'success': False, 'message': str(e)}, status=500)
+
+    return JsonResponse({'success': False, 'message': 'Method not allowed'}, status=405)
+
+
+@login_required
+def activate_user_ajax(request, user_id):
+    """AJAX endpoint to activate user"""
+    if not (request.user.is_staff or request.user.is_superuser or request.user.has_permission('user_manage')):
+        return JsonResponse({'success': False, 'message': 'ไม่มีสิทธิ์ในการดำเนินการ'}, status=403)
+
+    if request.method == 'POST':
+        try:
+            from django.contrib.auth import get_user_model
+            User = get_user_model()
+            user = User.objects.get(id=user_id)
+
+            if not user.is_active:
+                user.is_active = True
+                user.save()
+                return JsonResponse({
+                    'success': True,
+                    'message': f'เปิดใช้งานผู้ใช้ {user.full_name or user.username} เรียบร้อย'
+                })
+            else:
+                return JsonResponse({
+                    'success': False,
+                    'message': 'ผู้ใช้ใช้งานได้อยู่แล้ว'
+                })
+
+        except User.DoesNotExist:
+            return JsonResponse({'success': False, 'message': 'ไม่พบผู้ใช้'}, status=404)
+        except Exception as e:
+            return JsonResponse({'success': False, 'message': str(e)}, status=500)
+
+    return JsonResponse({'success': False, 'message': 'Method not allowed'}, status=405)
+
+
+@login_required
+def change_password_ajax(request, user_id):
+    """AJAX endpoint to set/reset password for any user (AD or Local)"""
+    if not (request.user.is_staff or request.user.is_superuser or request.user.has_permission('user_manage')):
+        return JsonResponse({'success': False, 'message': 'ไม่มีสิทธิ์ในการดำเนินการ'}, status=403)
+
+    if request.method == 'POST':
+        try:
+            from django.contrib.auth import get_user_model
+            User = get_user_model()
+            user = User.objects.get(id=user_id)
+
+            data = json.loads(request.body)
+            new_password = data.get('new_password', '').strip()
+            confirm_password = data.get('confirm_password', '').strip()
+
+            if not new_password:
+                return JsonResponse({'success': False, 'message': 'กรุณากรอกรหัสผ่านใหม่'}, status=400)
+
+            if len(new_password) < 8:
+                return JsonResponse({'success': False, 'message': 'รหัสผ่านต้องมีอย่างน้อย 8 ตัวอักษร'}, status=400)
+
+            if new_password != confirm_password:
+                return JsonResponse({'success': False, 'message': 'รหัสผ่านไม่ตรงกัน'}, status=400)
+
+            is_ad_user = user.source == 'npu_api'
+            user.set_password(new_password)
+            user.save(update_fields=['password'])
+
+            print(f"✓ Password reset by {request.user.username} for {user.username} ({'AD override' if is_ad_user else 'local'})")
+
+            msg = (
+                f'ตั้งรหัสผ่าน Override สำเร็จสำหรับ {user.full_name or user.username} '
+                f'(จะใช้รหัสนี้แทน NPU)'
+                if is_ad_user else
+                f'เปลี่ยนรหัสผ่านสำเร็จสำหรับ {user.full_name or user.username}'
+            )
+            return JsonResponse({'success': True, 'message': msg, 'is_ad_user': is_ad_user})
+
+        except User.DoesNotExist:
+            return JsonResponse({'success': False, 'message': 'ไม่พบผู้ใช้'}, status=404)
+        except Exception as e:
+            return JsonResponse({'success': False, 'message': str(e)}, status=500)
+
+    return JsonResponse({'success': False, 'message': 'Method not allowed'}, status=405)
+
+
+@login_required
+def remove_password_override_ajax(request, user_id):
+    """AJAX endpoint to remove local password override — revert AD user back to NPU auth"""
+    if not (request.user.is_staff or request.user.is_superuser or request.user.has_permission('user_manage')):
+        return JsonResponse({'success': False, 'message': 'ไม่มีสิทธิ์ในการดำเนินการ'}, status=403)
+
+    if request.method == 'POST':
+        try:
+            from django.contrib.auth import get_user_model
+            User = get_user_model()
+            user = User.objects.get(id=user_id)
+
+            if user.source != 'npu_api':
+                return JsonResponse({'success': False, 'message': 'ใช้ได้เฉพาะ AD User เท่านั้น'}, status=400)
+
+            if not user.has_usable_password():
+                return JsonResponse({'success': False, 'message': 'ไม่มี Override password อยู่'}, status=400)
+
+            user.set_unusable_password()
+            user.save(update_fields=['password'])
+
+            return JsonResponse({
+                'success': True,
+                'message': f'ลบ Override password สำเร็จ {user.full_name or user.username} จะ login ผ่าน NPU ตามปกติ'
+            })
+
+        except User.DoesNotExist:
+            return JsonResponse({'success': False, 'message': 'ไม่พบผู้ใช้'}, status=404)
+        except Exception as e:
+            return JsonResponse({'success': False, 'message': str(e)}, status=500)
+
+    return JsonResponse({'success': False, 'message': 'Method not allowed'}, status=405)
+
+
+@login_required
+def manual_staff_create_view(request):
+    """
+    สร้างเจ้าหน้าที่แบบ Manual (superuser only)
+
+    Features:
+    - Create staff with local password
+    - Auto-approve
+    - Assign roles
+    - Audit logging
+    """
+    # Superuser only
+    if not (request.user.is_staff or request.user.is_superuser or request.user.has_permission('user_manage')):
+        messages.error(request, 'ไม่มีสิทธิ์สร้างผู้ใช้แบบ Manual')
+        return redirect('user_management')
+
+    from ..forms import ManualStaffCreateForm
+
+    if request.method == 'POST':
+        form = ManualStaffCreateForm(request.POST)
+
+        if form.is_valid():
+            try:
+                # Create user instance (don't save yet)
+                user = form.save(commit=False)
+
+                # Set user type and source
+                user.user_type = 'staff'
+                user.source = 'manual'
+
+                # Auto-approve manual users
+                user.approval_status = 'approved'
+                user.is_active = True
+                user.approved_at = timezone.now()
+
+                # Set creator
+                user.created_by_user = request.user
+
+                # Set department from dropdown
+                department_obj = form.cleaned_data.get('department_select')
+                if department_obj:
+                    user.department = department_obj.name
+
+                # Set username (priority: ldap_uid > custom username > auto-generate)
+                custom_username = form.cleaned_data.get('username', '')
+                if custom_username:
+                    custom_username = custom_username.strip()
+
+                if user.ldap_uid:
+                    user.username = user.ldap_uid
+                elif custom_username:
+                    user.username = custom_username
+                else:
+                    # Fallback: auto-generate (ไม่ควรเกิด เพราะ form validation)
+                    import time
+                    user.username = f"staff_{user.first_name_th[:4]}_{int(time.time())}"
+
+                # Set password
+                password = form.cleaned_data['password1']
+                user.set_password(password)
+
+                # Save user
+                user.save()
+
+                # Assign role (single role only)
+                selected_role = form.cleaned_data.get('role')
+                if selected_role:
+                    user.assign_role(selected_role)
+
+                # Log activity
+                print(f"✓ Manual staff created: {user.username} by {request.user.username}")
+
+                messages.success(
+                    request,
+                    mark_safe(
+                        f'สร้างเจ้าหน้าที่ {user.get_display_name()} สำเร็จ<br>'
+                        f'Username: <strong>{user.username}</strong><br>'
+                        f'รหัสผ่าน: <strong>{password}</strong><br>'
+                        f'<strong class="text-danger">⚠️ กรุณาบันทึกรหัสผ่านนี้และแจ้งให้ผู้ใช้ทราบ</strong>'
+                    )
+                )
+
+                return redirect('user_management')
+
+            except Exception as e:
+                messages.error(request, f'เกิดข้อผิดพลาด: {str(e)}')
+    else:
+        form = ManualStaffCreateForm()
+
+    context = {
+        'title': 'สร้างเจ้าหน้าที่แบบ Manual',
+        'form': form,
+        'user_type': 'staff'
+    }
+
+    return render(request, 'accounts/manual_user_create.html', context)
+
+
+@login_required
+def manual_student_create_view(request):
+    """
+    สร้างนักศึกษาแบบ Manual (superuser only)
+
+    Features:
+    - Create student with local password
+    - Auto-approve
+    - Assign roles
+    - Audit logging
+    """
+    # Superuser only
+    if not (request.user.is_staff or request.user.is_superuser or request.user.has_permission('user_manage')):
+        messages.error(request, 'ไม่มีสิทธิ์สร้างผู้ใช้แบบ Manual')
+        return redirect('user_management')
+
+    from ..forms import ManualStudentCreateForm
+
+    if request.method == 'POST':
+        form = ManualStudentCreateForm(request.POST)
+
+        if form.is_valid():
+            try:
+                # Create user instance (don't save yet)
+                user = form.save(commit=False)
+
+                # Set user type and source
+                user.user_type = 'student'
+                user.source = 'manual'
+
+                # Auto-approve manual users
+                user.approval_status = 'approved'
+                user.is_active = True
+                user.approved_at = timezone.now()
+
+                # Set creator
+                user.created_by_user = request.user
+
+                # Set faculty from dropdown
+                faculty_obj = form.cleaned_data.get('student_faculty_select')
+                if faculty_obj:
+                    user.student_faculty = faculty_obj.name
+
+                # Set username (priority: custom username > student_code > auto-generate)
+                custom_username = form.cleaned_data.get('username', '')
+                if custom_username:
+                    custom_username = custom_username.strip()
+
+                if custom_username:
+                    user.username = custom_username
+                elif user.student_code:
+                    # Use student_code as username if available
+                    user.username = user.student_code
+                else:
+                    # Fallback: auto-generate (ไม่ควรเกิด เพราะ form validation)
+                    import time
+                    user.username = f"student_{user.first_name_th[:4]}_{int(time.time())}"
+
+                # Set password
+                password = form.cleaned_data['password1']
+                user.set_password(password)
+
+                # Save user
+                user.save()
+
+                # Assign role (single role only)
+                selected_role = form.cleaned_data.get('role')
+                if selected_role:
+                    user.assign_role(selected_role)
+
+                # Log activity
+                print(f"✓ Manual student created: {user.username} by {request.user.username}")
+
+                messages.success(
+                    request,
+                    mark_safe(
+                        f'สร้างนักศึกษา {user.get_display_name()} สำเร็จ<br>'
+                        f'รหัสนักศึกษา: <strong>{user.student_code}</strong><br>'
+                        f'รหัสผ่าน: <strong>{password}</strong><br>'
+                        f'<strong class="text-danger">⚠️ กรุณาบันทึกรหัสผ่านนี้และแจ้งให้นักศึกษาทราบ</strong>'
+                    )
+                )
+
+                return redirect('user_management')
+
+            except Exception as e:
+                messages.error(request, f'เกิดข้อผิดพลาด: {str(e)}')
+    else:
+        form = ManualStudentCreateForm()
+
+    context = {
+        'title': 'สร้างนักศึกษาแบบ Manual',
+        'form': form,
+        'user_type': 'student'
+    }
+
+    return render(request, 'accounts/manual_user_create.html', context)
+
+
+@login_required
+def manual_user_edit_view(request, user_id):
+    """
+    แก้ไขผู้ใช้ที่สร้างแบบ Manual (superuser only)
+
+    Features:
+    - Edit manual users only (NPU API users cannot be edited)
+    - Update user info and roles
+    - Audit logging
+    """
+    # Superuser only
+    if not (request.user.is_staff or request.user.is_superuser or request.user.has_permission('user_manage')):
+        messages.error(request, 'ไม่มีสิทธิ์แก้ไขผู้ใช้')
+        return redirect('user_management')
+
+    try:
+        user = User.objects.get(id=user_id)
+    except User.DoesNotExist:
+        messages.error(request, 'ไม่พบผู้ใช้ที่ต้องการแก้ไข')
+        return redirect('user_management')
+
+    # Check if manual user
+    if user.source != 'manual':
+        messages.error(request, 'ไม่สามารถแก้ไขผู้ใช้จาก NPU API ได้ (แก้ไขได้เฉพาะผู้ใช้ Manual เท่านั้น)')
+        return redirect('user_management')
+
+    from ..forms import ManualStaffEditForm, ManualStudentEditForm
+
+    # Determine form based on user type
+    if user.user_type == 'staff':
+        FormClass = ManualStaffEditForm
+        template_user_type = 'staff'
+        title = f'แก้ไขข้อมูลเจ้าหน้าที่: {user.get_display_name()}'
+    else:  # student
+        FormClass = ManualStudentEditForm
+        template_user_type = 'student'
+        title = f'แก้ไขข้อมูลนักศึกษา: {user.get_display_name()}'
+
+    if request.method == 'POST':
+        form = FormClass(request.POST, instance=user)
+
+        if form.is_valid():
+            try:
+                # Save user data
+                updated_user = form.save(commit=False)
+
+                # Update department/faculty from dropdown
+                if user.user_type == 'staff':
+                    department_obj = form.cleaned_data.get('department_select')
+                    if department_obj:
+                        updated_user.department = department_obj.name
+                else:  # student
+                    faculty_obj = form.cleaned_data.get('student_faculty_select')
+                    if faculty_obj:
+                        updated_user.student_faculty = faculty_obj.name
+
+                updated_user.save()
+
+                # Update role (single role only)
+                # Clear existing roles
+                user.userrole_set.all().delete()
+                # Assign new role
+                selected_role = form.cleaned_data.get('role')
+                if selected_role:
+                    user.assign_role(selected_role)
+
+                # Log activity
+                print(f"✓ Manual user updated: {user.username} by {request.user.username}")
+
+                messages.success(request, f'แก้ไขข้อมูล {user.get_display_name()} สำเร็จ')
+                return redirect('user_management')
+
+            except Exception as e:
+                messages.error(request, f'เกิดข้อผิดพลาด: {str(e)}')
+    else:
+        # Pre-fill form with existing data
+        form = FormClass(instance=user)
+
+        # Set initial department/faculty dropdown
+        if user.user_type == 'staff' and user.department:
+            try:
+                dept = Department.objects.get(name=user.department, is_active=True)
+                form.fields['department_select'].initial = dept
+            except Department.DoesNotExist:
+                pass
+        elif user.user_type == 'student' and user.student_faculty:
+            try:
+                faculty = Department.objects.get(name=user.student_faculty, is_active=True)
+                form.fields['student_faculty_select'].initial = faculty
+            except Department.DoesNotExist:
+                pass
+
+        # Set initial role
+        current_role = user.userrole_set.first()
+        if current_role:
+            form.fields['role'].initial = current_role.role_id
+
+    context = {
+        'title': title,
+        'form': form,
+        'user_type': template_user_type,
+        'edit_user': user,
+        'is_edit': True
+    }
+
+    return render(request, 'accounts/manual_user_edit.html', context)
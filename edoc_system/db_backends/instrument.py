@@ -0,0 +1,133 @@
+"""
+Instrumentation + connection pool แบบเลือกเปิดได้ สำหรับ DB backend ของระบบ
+
+ตัวนับ (ต่อ worker process):
+    connects      — เปิด connection ใหม่จริง (จ่ายค่า handshake)
+    reconnects    — เปิดใหม่จริงบน DatabaseWrapper ที่เคยมี connection มาก่อน
+                    (หมดอายุตาม CONN_MAX_AGE, health check ไม่ผ่าน, หรือปิดตอนจบ request)
+    pool_hits     — หยิบ connection ที่เปิดค้างไว้จาก pool มาใช้แทนการเปิดใหม่
+    pool_returns  — คืน connection กลับเข้า pool แทนการปิด
+    connect_ms    — เวลารวมที่ใช้เปิด connection ใหม่
+
+Pool (DB_POOL_SIZE > 0) มีไว้สำหรับ worker แบบ thread ที่ thread เกิด-ตายบ่อย
+ซึ่ง CONN_MAX_AGE อย่างเดียวช่วยไม่ได้ เพราะ Django ผูก connection กับ thread —
+เมื่อเปิด pool ให้ตั้ง CONN_MAX_AGE=0 แล้ว connection จะถูกคืนเข้า pool ตอนจบ request
+"""
+import os
+import queue
+import threading
+import time
+
+
+_stats_lock = threading.Lock()
+_stats = {
+    'connects': 0,
+    'reconnects': 0,
+    'pool_hits': 0,
+    'pool_returns': 0,
+    'connect_ms': 0.0,
+}
+
+# pool แยกตาม alias ของ DB — เก็บ (connection, เวลาที่เปิด)
+_pools = {}
+_pools_lock = threading.Lock()
+
+
+def _incr(key, amount=1):
+    with _stats_lock:
+        _stats[key] += amount
+
+
+def get_connection_stats():
+    """ตัวนับของ worker นี้ (ใช้ใน /health/ และคำสั่ง bench_db_connections)"""
+    with _stats_lock:
+        stats = dict(_stats)
+    stats['connect_ms'] = round(stats['connect_ms'], 1)
+    stats['pid'] = os.getpid()
+    stats['pooled_idle'] = sum(p.qsize() for p in _pools.values())
+    return stats
+
+
+def reset_connection_stats():
+    with _stats_lock:
+        for key in _stats:
+            _stats[key] = 0.0 if key == 'connect_ms' else 0
+
+
+class InstrumentedConnectionMixin:
+    """
+    ผสมกับ DatabaseWrapper ของ backend จริง
+
+    ตั้งค่าผ่าน DATABASES['default']['OPTIONS'] ไม่ได้เพราะ OPTIONS ถูกส่งต่อให้ driver ตรง ๆ
+    จึงอ่านจาก key ระดับบนของ settings_dict: POOL_SIZE, POOL_RECYCLE (วินาที)
+    """
+
+    # backend ที่ connection ใช้ข้าม thread ได้เท่านั้นถึงจะเปิด pool ได้
+    supports_pooling = False
+
+    def _pool(self):
+        size = self.settings_dict.get('POOL_SIZE') or 0
+        if not self.supports_pooling or size <= 0:
+            return None
+        with _pools_lock:
+            if self.alias not in _pools:
+                _pools[self.alias] = queue.Queue(maxsize=size)
+            return _pools[self.alias]
+
+    def get_new_connection(self, conn_params):
+        pool = self._pool()
+        if pool is not None:
+            recycle = self.settings_dict.get('POOL_RECYCLE') or 0
+            while True:
+                try:
+                    conn, opened_at = pool.get_nowait()
+                except queue.Empty:
+                    break
+                if recycle and time.monotonic() - opened_at > recycle:
+                    self._close_raw(conn)
+                    continue
+                if self._is_raw_usable(conn):
+                    _incr('pool_hits')
+                    self._opened_at = opened_at
+                    return conn
+                self._close_raw(conn)
+
+        t0 = time.monotonic()
+        conn = super().get_new_connection(conn_params)
+        _incr('connect_ms', (time.monotonic() - t0) * 1000)
+        _incr('connects')
+        if getattr(self, '_ever_connected', False):
+            _incr('reconnects')
+        self._ever_connected = True
+        self._opened_at = time.monotonic()
+        return conn
+
+    def _close(self):
+        pool = self._pool()
+        # คืนเข้า pool เฉพาะ connection ที่สะอาด — ไม่อยู่ใน transaction และไม่เคย error
+        if (pool is not None and self.connection is not None
+                and not self.in_atomic_block and not self.errors_occurred):
+            try:
+                self.connection.rollback()
+                pool.put_nowait((self.connection, getattr(self, '_opened_at', time.monotonic())))
+                _incr('pool_returns')
+                return None
+            except queue.Full:
+                pass
+            except Exception:
+                # rollback ไม่ผ่าน = connection เสียแล้ว ปิดทิ้งตามปกติ
+                pass
+        return super()._close()
+
+    def _is_raw_usable(self, conn):
+        try:
+            conn.ping()
+        except Exception:
+            return False
+        return True
+
+    def _close_raw(self, conn):
+        try:
+            conn.close()
+        except Exception:
+            pass
@@ -0,0 +1,12 @@
+"""
+MySQL backend ของระบบ = backend มาตรฐานของ Django + ตัวนับ connection และ pool แบบเลือกเปิด
+(ดู edoc_system/db_backends/instrument.py)
+"""
+from django.db.backends.mysql import base
+
+from edoc_system.db_backends.instrument import InstrumentedConnectionMixin
+
+
+class DatabaseWrapper(InstrumentedConnectionMixin, base.DatabaseWrapper):
+    # mysqlclient connection ใช้ข้าม thread ได้ (ทีละ thread) จึงเปิด pool ได้
+    supports_pooling = True
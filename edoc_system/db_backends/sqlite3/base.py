@@ -0,0 +1,11 @@
+"""
+SQLite backend สำหรับ development (ดู SQLite fallback ใน settings.py) — มีแค่ตัวนับ connection
+ไม่เปิด pool เพราะ sqlite3 connection ผูกกับ thread ที่สร้าง
+"""
+from django.db.backends.sqlite3 import base
+
+from edoc_system.db_backends.instrument import InstrumentedConnectionMixin
+
+
+class DatabaseWrapper(InstrumentedConnectionMixin, base.DatabaseWrapper):
+    pass
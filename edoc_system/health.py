@@ -0,0 +1,218 @@
+"""
+Health / readiness endpoint สำหรับ NMS Agent monitoring
+
+โหมดปกติ (`/health/`) เช็กเฉพาะของถูก ๆ: DB (SELECT 1), cache, สถานะ NPU API,
+ฟอนต์ PDF และ connection ของ DB — ใช้ทุกครั้งที่ agent poll
+โหมดลึก (`/health/?deep=1`) เพิ่มการเช็ก migration ที่ยังไม่ได้ apply ซึ่งต้องโหลด
+migration graph ทั้งหมด จึงไม่ควรเรียกถี่
+
+ผลลัพธ์ถูกเก็บไว้ในหน่วยความจำของ process สั้น ๆ (HEALTH_CHECK_CACHE_SECONDS)
+เพื่อไม่ให้การ poll ถี่ ๆ ไปกด DB — เก็บใน process ไม่ใช่ Django cache
+เพราะ cache เองก็เป็นหนึ่งในสิ่งที่ต้องเช็ก
+"""
+import os
+import threading
+import time
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import connection, connections
+from django.http import JsonResponse
+from django.utils import timezone
+
+
+# ฟอนต์ที่ accounts.pdf_styles.thai_fonts ลงทะเบียน — ไม่ import pdf_styles ตรง ๆ
+# เพราะจะลาก reportlab/qrcode ทั้งชุดเข้ามาใน process ที่แค่ตอบ health
+REQUIRED_PDF_FONTS = [
+    'THSarabunNew.ttf',
+    'THSarabunNew Bold.ttf',
+    'THSarabunNew Italic.ttf',
+    'THSarabunNew BoldItalic.ttf',
+]
+
+# เช็กที่พังแล้วต้องตอบ 503 (ระบบใช้งานไม่ได้จริง)
+# ที่เหลือพังแค่ทำให้ status เป็น 'warning' แต่ยังตอบ 200
+CRITICAL_CHECKS = ('db', 'migrations')
+
+# เช็กที่ต้องใช้ DB — ถ้า DB ล่มจะข้าม ไม่ให้รอ timeout ซ้ำทีละตัว
+DB_DEPENDENT_CHECKS = ('npu_api', 'db_connections', 'migrations')
+
+_result_cache = {}
+_result_lock = threading.Lock()
+_refreshing = set()  # โหมด (deep) ที่มี request กำลังเช็กอยู่
+
+
+def _timed(func):
+    """เรียก check แล้วแนบเวลาที่ใช้ (ms) — exception ใด ๆ ถือว่า check นั้น error"""
+    t0 = time.monotonic()
+    try:
+        result = func()
+    except Exception as e:
+        result = {'status': 'error', 'error': str(e)}
+    result['ms'] = round((time.monotonic() - t0) * 1000, 1)
+    return result
+
+
+def check_db():
+    connection.ensure_connection()
+    with connection.cursor() as cursor:
+        cursor.execute('SELECT 1')
+    return {'status': 'ok'}
+
+
+def check_cache():
+    """เขียน-อ่าน-ลบ key ทดสอบใน default cache"""
+    from django.core.cache import cache
+
+    key = f'health:probe:{os.getpid()}'
+    token = str(time.monotonic())
+    cache.set(key, token, 10)
+    value = cache.get(key)
+    cache.delete(key)
+    if value != token:
+        return {'status': 'error', 'error': 'cache round-trip mismatch'}
+    return {'status': 'ok', 'backend': settings.CACHES['default']['BACKEND'].rsplit('.', 1)[-1]}
+
+
+def check_npu_api():
+    """
+    สถานะ NPU API จาก NPUApiLog ล่าสุด (ไม่ยิง API จริง)
+
+    ถ้า log ล่าสุด N รายการในช่วงเวลาที่กำหนดเป็น 'error' ติดกันทั้งหมด ถือว่า breaker เปิด
+    ('failed' คือรหัสผ่านผิด/ไม่พบข้อมูล ซึ่ง API ยังทำงานปกติ จึงไม่นับ)
+    """
+    from accounts.models import NPUApiLog
+
+    window = timezone.now() - timedelta(minutes=settings.HEALTH_NPU_WINDOW_MINUTES)
+    threshold = settings.HEALTH_NPU_ERROR_THRESHOLD
+
+    recent = list(
+        NPUApiLog.objects.filter(created_at__gte=window)
+        .order_by('-created_at')
+        .values_list('status', flat=True)[:threshold]
+    )
+    last_success = (
+        NPUApiLog.objects.filter(status__in=['success', 'failed'])
+        .order_by('-created_at')
+        .values_list('created_at', flat=True)
+        .first()
+    )
+
+    breaker_open = len(recent) >= threshold and all(s == 'error' for s in recent)
+    return {
+        'status': 'error' if breaker_open else 'ok',
+        'breaker': 'open' if breaker_open else 'closed',
+        'recent_calls': len(recent),
+        'last_success': last_success.isoformat() if last_success else None,
+    }
+
+
+def check_fonts():
+    font_dir = os.path.join(settings.BASE_DIR, 'static', 'fonts')
+    missing = [f for f in REQUIRED_PDF_FONTS if not os.path.exists(os.path.join(font_dir, f))]
+    if missing:
+        return {'status': 'error', 'missing': missing}
+    return {'status': 'ok'}
+
+
+def check_db_connections():
+    """connection ของ DB ที่ process นี้ถืออยู่ ค่า persistent connection และตัวนับ connect ของ worker"""
+    open_count = sum(1 for conn in connections.all() if conn.connection is not None)
+    db_settings = connection.settings_dict
+    result = {
+        'status': 'ok',
+        'open': open_count,
+        'conn_max_age': db_settings.get('CONN_MAX_AGE', 0),
+        'health_checks': db_settings.get('CONN_HEALTH_CHECKS', False),
+        'pool_size': db_settings.get('POOL_SIZE', 0),
+    }
+    if hasattr(connection, 'supports_pooling'):
+        from edoc_system.db_backends.instrument import get_connection_stats
+        result['worker'] = get_connection_stats()
+    if connection.vendor == 'mysql':
+        with connection.cursor() as cursor:
+            cursor.execute("SHOW STATUS WHERE Variable_name IN ('Threads_connected', 'Max_used_connections')")
+            for name, value in cursor.fetchall():
+                result[name.lower()] = int(value)
+    return result
+
+
+def check_migrations():
+    """หา migration ที่ยังไม่ได้ apply (โหลด migration graph — ใช้เฉพาะ deep mode)"""
+    from django.db.migrations.executor import MigrationExecutor
+
+    executor = MigrationExecutor(connection)
+    plan = executor.migration_plan(executor.loader.graph.leaf_nodes())
+    if plan:
+        return {
+            'status': 'error',
+            'pending': [f'{m.app_label}.{m.name}' for m, _backwards in plan],
+        }
+    return {'status': 'ok'}
+
+
+def run_checks(deep=False):
+    checks = {
+        'db': check_db,
+        'cache': check_cache,
+        'npu_api': check_npu_api,
+        'fonts': check_fonts,
+        'db_connections': check_db_connections,
+    }
+    if deep:
+        checks['migrations'] = check_migrations
+
+    results = {}
+    for name, func in checks.items():
+        if name in DB_DEPENDENT_CHECKS and results['db']['status'] != 'ok':
+            results[name] = {'status': 'skipped', 'ms': 0}
+            continue
+        results[name] = _timed(func)
+
+    failed = [n for n, r in results.items() if r['status'] == 'error']
+    if any(n in CRITICAL_CHECKS for n in failed):
+        status = 'degraded'
+    elif failed:
+        status = 'warning'
+    else:
+        status = 'ok'
+
+    db = results['db']
+    return {
+        'status': status,
+        # คง key เดิม db/db_ms ไว้ให้ NMS Agent ที่ parse รูปแบบเดิม
+        'db': 'ok' if db['status'] == 'ok' else f"error: {db.get('error', '')}",
+        'db_ms': db['ms'],
+        'deep': deep,
+        'checked_at': timezone.now().isoformat(),
+        'checks': results,
+    }
+
+
+# Health endpoint สำหรับ NMS Agent monitoring (public)
+def health(request):
+    deep = request.GET.get('deep') == '1'
+    ttl = settings.HEALTH_CHECK_CACHE_SECONDS
+
+    # ล็อกเฉพาะตอนอ่าน/สลับผลใน cache — ตัวเช็กรันนอกล็อก ถ้า DB/NPU ช้า request อื่นไม่ต้องรอต่อคิว
+    with _result_lock:
+        cached = _result_cache.get(deep)
+        fresh = cached is not None and time.monotonic() - cached[0] < ttl
+        # ผลหมดอายุแต่มีอีก request กำลังเช็กใหม่อยู่ — ตอบผลเดิมไปก่อน ไม่เช็กซ้ำพร้อมกัน
+        refresh = not fresh and not (cached is not None and deep in _refreshing)
+        if refresh:
+            _refreshing.add(deep)
+
+    if not refresh:
+        payload = dict(cached[1], cached=True)
+    else:
+        try:
+            payload = run_checks(deep=deep)
+        finally:
+            with _result_lock:
+                _refreshing.discard(deep)
+        with _result_lock:
+            _result_cache[deep] = (time.monotonic(), payload)
+        payload = dict(payload, cached=False)
+
+    return JsonResponse(payload, status=503 if payload['status'] == 'degraded' else 200)
@@ -24,6 +24,43 @@ ALLOWED_HOSTS = config('ALLOWED_HOSTS', default='localhost,127.0.0.1', cast=lamb
 # Base URL for QR Code verification
 BASE_URL = config('BASE_URL', default='http://localhost:8002')
 
+# QR Code (utils/qr_generator.py)
+# QR_CACHE_DIR: เก็บ PNG ของ QR ใบสำคัญที่เสร็จสิ้นแล้ว (URL ไม่เปลี่ยนอีก) ไว้ใช้ข้าม worker/restart — ว่าง = ไม่เก็บลงดิสก์
+# QR_PDF_MODE: 'vector' วาด QR ใน PDF เป็นสี่เหลี่ยมด้วย ReportLab (ไม่ต้องเข้ารหัส PNG) / 'raster' ฝังเป็นรูป PNG แบบเดิม
+QR_CACHE_DIR = config('QR_CACHE_DIR', default=str(BASE_DIR / 'cache' / 'qr'))
+QR_PDF_MODE = config('QR_PDF_MODE', default='vector')
+
+# PDF ใบสำคัญรับเงิน (accounts/pdf_generator.py)
+# RECEIPT_PDF_MODE: 'flow' จัดหน้าทั้งใบด้วย Platypus ทุกครั้ง / 'overlay' หัวเอกสาร (logo + ชื่อเอกสาร) เตรียมครั้งเดียวต่อ process
+# แล้ววาดเฉพาะเล่มที่/เลขที่ทับ (accounts/pdf_overlay.py — วัดผลด้วย python manage.py bench_receipt_pdf)
+RECEIPT_PDF_MODE = config('RECEIPT_PDF_MODE', default='flow')
+
+# PDF ใบสำคัญเวอร์ชัน 2 จาก HTML (accounts/pdf_v2.py)
+# RECEIPT_PDF_V2_BACKEND: 'wkhtmltopdf' / 'reportlab' — backend ใช้ไม่ได้หรือแปลงพังจะได้ PDF จาก ReportLab แทน
+# WKHTMLTOPDF_PATH: path ของ binary (ว่าง = หาจาก PATH), WKHTMLTOPDF_POOL_SIZE: process ที่เตรียมรอไว้ (0 = spawn ตอนใช้)
+# RECEIPT_PDF_V2_CACHE_SECONDS: อายุ PDF ที่แปลงแล้วใน cache กลาง (key = hash ของ HTML)
+RECEIPT_PDF_V2_BACKEND = config('RECEIPT_PDF_V2_BACKEND', default='wkhtmltopdf')
+WKHTMLTOPDF_PATH = config('WKHTMLTOPDF_PATH', default='')
+WKHTMLTOPDF_POOL_SIZE = config('WKHTMLTOPDF_POOL_SIZE', default=2, cast=int)
+WKHTMLTOPDF_TIMEOUT = config('WKHTMLTOPDF_TIMEOUT', default=30, cast=int)
+RECEIPT_PDF_V2_CACHE_SECONDS = config('RECEIPT_PDF_V2_CACHE_SECONDS', default=3600, cast=int)
+
+# PDF ที่สร้างตอน request (ใบสำคัญ/รายงาน) เขียนลง spooled temp file ก่อนส่งด้วย FileResponse (utils/file_response.py)
+# FILE_RESPONSE_SPOOL_BYTES: ขนาดที่ยังเก็บในหน่วยความจำ เกินนี้ย้ายลงไฟล์ชั่วคราวบนดิสก์
+FILE_RESPONSE_SPOOL_BYTES = config('FILE_RESPONSE_SPOOL_BYTES', default=2 * 1024 * 1024, cast=int)
+
+# รายงานใบสำคัญ PDF จัดตารางทีละหน้า (accounts/pdf_tables.py) — เวลาโตตามจำนวนแถวแบบเส้นตรง
+# RECEIPT_REPORT_PDF_MAX_ROWS: จำนวนใบสำคัญสูงสุดในรายงาน PDF หนึ่งฉบับ (เดิมจำกัด 200)
+RECEIPT_REPORT_PDF_MAX_ROWS = config('RECEIPT_REPORT_PDF_MAX_ROWS', default=5000, cast=int)
+
+# รายงานสรุปรายรับ: หน้าเว็บ/Excel/PDF ใช้ผลสรุปชุดเดียวกันจาก cache กลาง (accounts/revenue_summary.py)
+# ใบสำคัญหรือหน่วยงานเปลี่ยนจะล้าง cache ทันที ค่านี้เป็นแค่อายุสูงสุด
+REVENUE_SUMMARY_CACHE_SECONDS = config('REVENUE_SUMMARY_CACHE_SECONDS', default=300, cast=int)
+
+# ปิดปีงบประมาณ (python manage.py close_fiscal_year — accounts/fiscal_year_close.py)
+# FISCAL_YEAR_CLOSE_PDF_DIR: โฟลเดอร์ใน MEDIA_ROOT ที่เก็บ PDF ใบสำคัญของปีที่ปิดแล้ว (ส่งไฟล์นี้แทนการสร้างใหม่)
+FISCAL_YEAR_CLOSE_PDF_DIR = config('FISCAL_YEAR_CLOSE_PDF_DIR', default='fiscal_year_close')
+
 
 # Application definition
 
@@ -77,14 +114,25 @@ WSGI_APPLICATION = 'edoc_system.wsgi.application'
 # Database
 # https://docs.djangoproject.com/en/4.2/ref/settings/#databases
 
+# ENGINE เป็น backend ของระบบเอง (MySQL มาตรฐาน + ตัวนับ connection/pool) — ดู edoc_system/db_backends/
+# CONN_MAX_AGE: เก็บ connection ไว้ใช้ซ้ำข้าม request กี่วินาที (0 = เปิด-ปิดทุก request แบบเดิม)
+#   ค่านี้ต้องน้อยกว่า wait_timeout ของ MySQL ไม่งั้นจะได้ connection ที่ server ตัดไปแล้ว
+# CONN_HEALTH_CHECKS: ping connection ที่ใช้ซ้ำก่อน request แรก ถ้าตายจะเปิดใหม่ให้แทนที่จะ error
+# POOL_SIZE / POOL_RECYCLE: pool สำหรับ worker แบบ thread (0 = ปิด) — เปิดแล้วให้ตั้ง CONN_MAX_AGE=0
+#   connection จะถูกคืนเข้า pool ตอนจบ request แทนการปิด และถูกปิดทิ้งเมื่ออายุเกิน POOL_RECYCLE วินาที
+# ดูเหตุผลเรื่องจำนวน connect ต่อ host ได้ที่ doc/runbook-mysql-host-blocked.md
 DATABASES = {
     'default': {
-        'ENGINE': 'django.db.backends.mysql',
+        'ENGINE': 'edoc_system.db_backends.mysql',
         'NAME': config('DB_NAME', default='your_database_name'),
         'USER': config('DB_USER', default='your_database_user'),
         'PASSWORD': config('DB_PASSWORD', default='your_database_password'),
         'HOST': config('DB_HOST', default='localhost'),
         'PORT': config('DB_PORT', default='3306'),
+        'CONN_MAX_AGE': config('DB_CONN_MAX_AGE', default=60, cast=int),
+        'CONN_HEALTH_CHECKS': config('DB_CONN_HEALTH_CHECKS', default=True, cast=bool),
+        'POOL_SIZE': config('DB_POOL_SIZE', default=0, cast=int),
+        'POOL_RECYCLE': config('DB_POOL_RECYCLE', default=300, cast=int),
         'OPTIONS': {
             'charset': 'utf8mb4',
             'init_command': "SET sql_mode='STRICT_TRANS_TABLES'",
@@ -95,12 +143,52 @@ DATABASES = {
 # SQLite fallback for development (uncomment if needed)
 # DATABASES = {
 #     'default': {
-#         'ENGINE': 'django.db.backends.sqlite3',
+#         'ENGINE': 'edoc_system.db_backends.sqlite3',
 #         'NAME': BASE_DIR / 'db.sqlite3',
 #     }
 # }
 
 
+# Cache
+# https://docs.djangoproject.com/en/4.2/topics/cache/
+# 2 ชั้น (ใช้ผ่าน utils/cache.py):
+#   'default' — แชร์ทุก worker: redis (ต้องตั้ง REDIS_URL และติดตั้ง redis) / file (default) /
+#               locmem (แยกต่อ process — ใช้ตอน dev/ทดสอบ ที่ไม่อยากให้มีไฟล์ cache)
+#   'local'   — LocMem ใน process สำหรับ key เล็ก ๆ ที่อ่านถี่มาก
+CACHE_BACKEND = config('CACHE_BACKEND', default='file')
+REDIS_URL = config('REDIS_URL', default='')
+
+if CACHE_BACKEND == 'redis' and REDIS_URL:
+    _shared_cache = {
+        'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+        'LOCATION': REDIS_URL,
+    }
+elif CACHE_BACKEND == 'locmem':
+    _shared_cache = {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'LOCATION': 'edoc-shared',
+    }
+else:
+    _shared_cache = {
+        'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+        'LOCATION': config('CACHE_DIR', default=str(BASE_DIR / 'cache')),
+        'OPTIONS': {'MAX_ENTRIES': 5000},
+    }
+
+CACHES = {
+    'default': {**_shared_cache, 'KEY_PREFIX': 'edoc', 'TIMEOUT': 300},
+    'local': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'LOCATION': 'edoc-local',
+        'TIMEOUT': 60,
+        'OPTIONS': {'MAX_ENTRIES': 1000},
+    },
+}
+
+# worker อื่นจะเห็นการ invalidate_namespace ช้าได้ไม่เกินกี่วินาที
+CACHE_NAMESPACE_VERSION_TTL = config('CACHE_NAMESPACE_VERSION_TTL', default=5, cast=int)
+
+
 # Custom User Model
 AUTH_USER_MODEL = 'accounts.User'
 
@@ -208,6 +296,13 @@ NPU_STUDENT_API_SETTINGS = {
     }
 }
 
+# Health endpoint (/health/) สำหรับ NMS Agent
+# เก็บผลไว้กี่วินาทีก่อนเช็กใหม่ — agent poll ถี่แค่ไหนก็แตะ DB ไม่เกินนี้ต่อ process
+HEALTH_CHECK_CACHE_SECONDS = config('HEALTH_CHECK_CACHE_SECONDS', default=5, cast=int)
+# NPU API ถือว่าล่ม (breaker เปิด) เมื่อ log ล่าสุดในช่วงเวลานี้เป็น error ติดกันครบจำนวน
+HEALTH_NPU_WINDOW_MINUTES = config('HEALTH_NPU_WINDOW_MINUTES', default=15, cast=int)
+HEALTH_NPU_ERROR_THRESHOLD = config('HEALTH_NPU_ERROR_THRESHOLD', default=5, cast=int)
+
 # File-based Authentication Settings (Legacy - kept for fallback)
 USERS_FILE_PATH = config('USERS_FILE_PATH', default=os.path.join(BASE_DIR, 'data', 'users.csv'))
 
@@ -2,37 +2,20 @@
 URL configuration for edoc_system project.
 File-based authentication system URLs.
 """
-import time
-
 from django.contrib import admin
 from django.urls import path, include
 from django.conf import settings
 from django.conf.urls.static import static
-from django.db import connection
-from django.http import JsonResponse
-from accounts.views import receipt_check_public_view
-
+from accounts.admin import cache_stats_view
+from accounts.urls import lazy_view
+from edoc_system.health import health
 
-# Health endpoint สำหรับ NMS Agent monitoring — เช็ก DB ด้วย SELECT 1 (public)
-def health(request):
-    t0 = time.monotonic()
-    try:
-        connection.ensure_connection()
-        with connection.cursor() as cursor:
-            cursor.execute('SELECT 1')
-        db_status = 'ok'
-    except Exception as e:
-        db_status = f'error: {e}'
-    db_ms = round((time.monotonic() - t0) * 1000)
-    status = 'ok' if db_status == 'ok' else 'degraded'
-    return JsonResponse(
-        {'status': status, 'db': db_status, 'db_ms': db_ms},
-        status=200 if status == 'ok' else 503,
-    )
+receipt_check_public_view = lazy_view('accounts.views.public.receipt_check_public_view')
 
 
 urlpatterns = [
-    path('health/', health, name='nms_health'),  # NMS monitoring
+    path('health/', health, name='nms_health'),  # NMS monitoring (?deep=1 เช็ก migration ด้วย)
+    path('admin/cache-stats/', admin.site.admin_view(cache_stats_view), name='admin_cache_stats'),
     path('admin/', admin.site.urls),
     path('accounts/', include('accounts.urls')),
     path('', include('accounts.urls')),  # Keep root URLs for backwards compatibility
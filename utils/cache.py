@@ -0,0 +1,256 @@
+"""
+Cache 2 ชั้นของระบบ + namespace versioning + ตัวนับ hit/miss
+
+ชั้นของ cache (ดู CACHES ใน settings.py):
+    local   — LocMemCache ใน process (เร็วสุด ไม่ข้าม worker) สำหรับ key เล็ก ๆ ที่อ่านถี่มาก
+              เช่น ชุดสิทธิ์ของผู้ใช้ ข้อมูลปีงบประมาณ รายการ template
+    default — cache ที่แชร์กันทุก worker (Redis ถ้าตั้ง REDIS_URL, ไม่งั้นเป็นไฟล์)
+
+Namespace versioning:
+    ทุก key อยู่ใต้ namespace เช่น 'fiscal_year' และมีเลข version ของ namespace ฝังใน key
+    invalidate_namespace('fiscal_year') = เปลี่ยน version เป็นเลขสุ่มใหม่ → key เก่าทั้งหมดใช้ไม่ได้ทันที
+    โดยไม่ต้องไล่ลบทีละ key (key เก่าหมดอายุไปเองตาม timeout)
+    version เป็นเลขสุ่ม 63 bit ไม่ใช่ตัวนับ — ถ้า key version หายจาก shared cache (ถูก cull/evict/ล้าง cache)
+    version ใหม่จะไม่ซ้ำเลขเดิมที่ key เก่ายังค้างอยู่ และ invalidate พร้อมกันหลาย worker ก็ไม่มีครั้งไหนหาย
+
+    เลข version ถูกจำไว้ใน local cache CACHE_NAMESPACE_VERSION_TTL วินาที
+    worker อื่นจึงเห็นการ invalidate ช้าได้ไม่เกินค่านี้ ส่วน worker ที่สั่ง invalidate เห็นทันที
+
+Example (accounts/models.py):
+    >>> @cached(PERMISSION_CACHE_NAMESPACE, timeout=3600, local_timeout=60)
+    ... def permission_names_for_user(user_id):
+    ...     ...
+    >>> permission_names_for_user.invalidate()     # = invalidate_namespace(PERMISSION_CACHE_NAMESPACE)
+
+ไม่มี decorator cache ทั้ง response ของ view — หน้าของระบบเป็นหน้าตามผู้ใช้ที่มี CSRF token/messages
+ให้ cache ข้อมูลที่หน้าใช้ (get_or_set/cached) แทน
+"""
+import functools
+import hashlib
+import secrets
+import threading
+import time
+from typing import Any, Callable, Iterable, Optional
+
+from django.conf import settings
+from django.core.cache import caches
+
+
+LOCAL_ALIAS = 'local'
+SHARED_ALIAS = 'default'
+
+_MISSING = object()
+
+# ตัวนับของ process นี้ — สะสมไว้แล้วค่อย flush ไปรวมใน shared cache เป็นช่วง ๆ
+# เพื่อไม่ให้ทุก hit ต้องเขียน shared cache อีกรอบ
+STAT_FIELDS = ('local_hit', 'shared_hit', 'miss')
+_STATS_FLUSH_SECONDS = 30
+_STATS_FLUSH_EVENTS = 200
+_STATS_NAMESPACES_KEY = 'cachestats:namespaces'
+
+_stats_lock = threading.Lock()
+_pending_stats = {}
+_pending_events = 0
+_last_flush = time.monotonic()
+
+
+def _local():
+    return caches[LOCAL_ALIAS]
+
+
+def _shared():
+    return caches[SHARED_ALIAS]
+
+
+# ========== Namespace versioning ==========
+
+def _new_version() -> int:
+    """เลข version ที่ไม่เคยใช้ (สุ่ม 63 bit — ไม่เริ่มนับใหม่จากเลขเดิมเมื่อ key version หาย)"""
+    return secrets.randbits(63)
+
+
+def get_namespace_version(namespace: str) -> int:
+    """เลข version ปัจจุบันของ namespace"""
+    key = f'nsver:{namespace}'
+    version = _local().get(key)
+    if version is None:
+        version = _shared().get(key)
+        if version is None:
+            # ยังไม่เคยมี (หรือถูก evict/ล้าง cache) — worker ที่ add ก่อนได้ตั้งค่า ที่เหลืออ่านค่านั้น
+            new_version = _new_version()
+            _shared().add(key, new_version, None)
+            version = _shared().get(key, new_version)
+        _local().set(key, version, settings.CACHE_NAMESPACE_VERSION_TTL)
+    return version
+
+
+def invalidate_namespace(namespace: str) -> None:
+    """ทำให้ทุก key ใน namespace หมดอายุทันที (ตั้ง version ใหม่)"""
+    key = f'nsver:{namespace}'
+    # set ค่าใหม่แทน incr — incr ของ file cache เป็น get แล้ว set ถ้า invalidate พร้อมกันอาจได้เลขเดียวกัน
+    version = _new_version()
+    _shared().set(key, version, None)
+    _local().set(key, version, settings.CACHE_NAMESPACE_VERSION_TTL)
+
+
+def make_key(namespace: str, *parts: Any) -> str:
+    """
+    สร้าง key แบบมี namespace + version
+
+    ส่วนของ key ที่ยาวหรือมีอักขระที่ memcached/redis ไม่ชอบจะถูก hash ให้สั้นลง
+    """
+    raw = ':'.join(str(p) for p in parts)
+    if len(raw) > 120 or not raw.isascii() or any(c.isspace() for c in raw):
+        raw = hashlib.md5(raw.encode('utf-8')).hexdigest()
+    return f'{namespace}:v{get_namespace_version(namespace)}:{raw}'
+
+
+# ========== ตัวนับ hit/miss ==========
+
+def _record(namespace: str, field: str) -> None:
+    global _pending_events, _last_flush
+    with _stats_lock:
+        ns_stats = _pending_stats.setdefault(namespace, dict.fromkeys(STAT_FIELDS, 0))
+        ns_stats[field] += 1
+        _pending_events += 1
+        due = (_pending_events >= _STATS_FLUSH_EVENTS
+               or time.monotonic() - _last_flush >= _STATS_FLUSH_SECONDS)
+        if not due:
+            return
+        pending = {ns: dict(s) for ns, s in _pending_stats.items()}
+        _pending_stats.clear()
+        _pending_events = 0
+        _last_flush = time.monotonic()
+    _flush_stats(pending)
+
+
+def _flush_stats(pending: dict) -> None:
+    """รวมตัวนับของ process นี้เข้าไปใน shared cache (นับได้ข้าม worker)"""
+    try:
+        shared = _shared()
+        namespaces = set(shared.get(_STATS_NAMESPACES_KEY) or [])
+        if not set(pending) <= namespaces:
+            shared.set(_STATS_NAMESPACES_KEY, sorted(namespaces | set(pending)), None)
+        for namespace, ns_stats in pending.items():
+            for field, count in ns_stats.items():
+                if not count:
+                    continue
+                key = f'cachestats:{namespace}:{field}'
+                if not shared.add(key, count, None):
+                    try:
+                        shared.incr(key, count)
+                    except ValueError:
+                        shared.set(key, count, None)
+    except Exception:
+        # ตัวนับเป็นแค่ข้อมูลประกอบ ห้ามทำให้ request พัง
+        pass
+
+
+def get_cache_stats() -> dict:
+    """
+    ตัวนับ hit/miss แยกตาม namespace (รวมทุก worker ที่ flush แล้ว + ของ process นี้ที่ยังค้าง)
+
+    Returns:
+        dict: {namespace: {'local_hit', 'shared_hit', 'miss', 'hit_rate'}}
+    """
+    with _stats_lock:
+        pending = {ns: dict(s) for ns, s in _pending_stats.items()}
+
+    shared = _shared()
+    namespaces = set(shared.get(_STATS_NAMESPACES_KEY) or []) | set(pending)
+    result = {}
+    for namespace in sorted(namespaces):
+        ns_stats = {}
+        for field in STAT_FIELDS:
+            ns_stats[field] = (shared.get(f'cachestats:{namespace}:{field}') or 0) \
+                + pending.get(namespace, {}).get(field, 0)
+        total = sum(ns_stats.values())
+        hits = ns_stats['local_hit'] + ns_stats['shared_hit']
+        ns_stats['hit_rate'] = round(hits * 100 / total, 1) if total else 0
+        result[namespace] = ns_stats
+    return result
+
+
+def reset_cache_stats() -> None:
+    global _pending_events
+    with _stats_lock:
+        _pending_stats.clear()
+        _pending_events = 0
+    shared = _shared()
+    for namespace in shared.get(_STATS_NAMESPACES_KEY) or []:
+        shared.delete_many([f'cachestats:{namespace}:{f}' for f in STAT_FIELDS])
+    shared.delete(_STATS_NAMESPACES_KEY)
+
+
+# ========== อ่าน/เขียนแบบ 2 ชั้น ==========
+
+def get_or_set(namespace: str, key_parts: Iterable, func: Callable[[], Any],
+               timeout: Optional[int] = 300, local_timeout: Optional[int] = None) -> Any:
+    """
+    อ่านค่าจาก cache ถ้าไม่มีให้เรียก func แล้วเก็บผล
+
+    Args:
+        namespace: กลุ่มของ key (ใช้ invalidate ทั้งกลุ่ม)
+        key_parts: ส่วนประกอบของ key
+        func: ฟังก์ชันคำนวณค่าเมื่อ cache miss
+        timeout: อายุใน shared cache (วินาที, None = ไม่หมดอายุ)
+        local_timeout: อายุใน local cache ของ process (None = ไม่ใช้ชั้น local)
+    """
+    key = make_key(namespace, *key_parts)
+
+    if local_timeout:
+        value = _local().get(key, _MISSING)
+        if value is not _MISSING:
+            _record(namespace, 'local_hit')
+            return value
+
+    value = _shared().get(key, _MISSING)
+    if value is not _MISSING:
+        _record(namespace, 'shared_hit')
+    else:
+        _record(namespace, 'miss')
+        value = func()
+        _shared().set(key, value, timeout)
+
+    if local_timeout:
+        if timeout is not None:
+            local_timeout = min(local_timeout, timeout)
+        _local().set(key, value, local_timeout)
+    return value
+
+
+def delete(namespace: str, *parts: Any) -> None:
+    """ลบ key เดียวออกจากทั้ง 2 ชั้น (ชั้น local ของ worker อื่นจะหมดอายุเองตาม local_timeout)"""
+    key = make_key(namespace, *parts)
+    _local().delete(key)
+    _shared().delete(key)
+
+
+def cached(namespace: str, timeout: Optional[int] = 300, local_timeout: Optional[int] = None,
+           key: Optional[Callable[..., Any]] = None):
+    """
+    Decorator สำหรับ cache ผลของฟังก์ชัน
+
+    Args:
+        key: ฟังก์ชันสร้าง key จาก argument (default: repr ของ args/kwargs ทั้งหมด)
+             ต้องระบุเองเมื่อ argument เป็น object ที่ repr ไม่คงที่ เช่น model instance
+
+    ฟังก์ชันที่ถูกครอบจะมี .invalidate() สำหรับล้างทั้ง namespace
+    และ .uncached สำหรับเรียกตัวจริงโดยไม่ผ่าน cache
+    """
+    def decorator(func):
+        base = f'{func.__module__}.{func.__qualname__}'
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            if key is not None:
+                parts = (base, key(*args, **kwargs))
+            else:
+                parts = (base, repr(args), repr(sorted(kwargs.items())))
+            return get_or_set(namespace, parts, lambda: func(*args, **kwargs),
+                              timeout=timeout, local_timeout=local_timeout)
+
+        wrapper.invalidate = lambda: invalidate_namespace(namespace)
+        wrapper.uncached = func
+        return wrapper
+    return decorator
@@ -0,0 +1,104 @@
+"""
+ส่งไฟล์ที่สร้างขึ้นตอน request (PDF ใบสำคัญ/รายงาน) แบบไม่ถือสำเนาหลายชุดในหน่วยความจำ
+
+เดิมสร้าง PDF ลง BytesIO → getvalue() (สำเนาที่ 2) → response.write() (สำเนาที่ 3)
+ตอนนี้ตัวสร้างเขียนลง spooled temp file ตรง ๆ — ไฟล์เล็กอยู่ในหน่วยความจำ เกิน FILE_RESPONSE_SPOOL_BYTES
+ย้ายลงดิสก์เอง แล้วส่งด้วย FileResponse ทีละ block พร้อม Content-Length
+
+Range (bytes แบบช่วงเดียว) รองรับเฉพาะไฟล์ที่เนื้อหาคงที่ (ส่ง etag มา เช่น PDF ที่เก็บไว้/ที่ cache ไว้)
+PDF ที่สร้างใหม่ทุก request ไม่ได้ byte เดิมทุกครั้ง (เวลาสร้าง, id ของเอกสาร) ถ้าตัวอ่านขอช่วงต่อจาก
+response ก่อนหน้าจะได้ไฟล์ที่ประกอบจากคนละชุด — จึงตอบ Accept-Ranges: none และส่งทั้งไฟล์เสมอ
+
+    output = spooled_file()                 # response ปิดไฟล์ให้เมื่อส่งเสร็จ
+    doc = SimpleDocTemplate(output, ...)
+    doc.build(story)
+    return file_response(request, output, 'report.pdf', 'application/pdf')
+"""
+import os
+import re
+import tempfile
+
+from django.conf import settings
+from django.http import FileResponse, HttpResponse
+from django.utils.http import content_disposition_header
+
+
+RANGE_HEADER = re.compile(r'^bytes=(\d*)-(\d*)$')
+
+
+def spooled_file():
+    """temp file สำหรับเขียนผลลัพธ์ — อยู่ในหน่วยความจำจนเกิน FILE_RESPONSE_SPOOL_BYTES แล้วย้ายลงดิสก์"""
+    max_size = getattr(settings, 'FILE_RESPONSE_SPOOL_BYTES', 2 * 1024 * 1024)
+    return tempfile.SpooledTemporaryFile(max_size=max_size)
+
+
+def parse_range(header, size):
+    """
+    อ่าน Range header แบบช่วงเดียว
+
+    Returns:
+        None ถ้าไม่มี/ไม่รองรับ (ส่งทั้งไฟล์), False ถ้าช่วงอยู่นอกไฟล์ (416), หรือ (start, end) แบบรวมปลาย
+    """
+    match = RANGE_HEADER.match(header.strip()) if header else None
+    if not match or match.groups() == ('', ''):
+        return None
+
+    first, last = match.groups()
+    if first:
+        start = int(first)
+        end = min(int(last), size - 1) if last else size - 1
+        if last and int(last) < start:
+            return None
+    else:
+        # bytes=-N คือ N ไบต์สุดท้าย
+        start = max(size - int(last), 0)
+        end = size - 1
+    if start >= size or end < start:
+        return False
+    return start, end
+
+
+def file_response(request, file, filename, content_type, as_attachment=False, etag=None):
+    """
+    Response ของไฟล์ที่เขียนเสร็จแล้ว (ตำแหน่งใดก็ได้ — อ่านตั้งแต่ต้นไฟล์)
+
+    Args:
+        request: ใช้อ่าน Range/If-Range header (None = ส่งทั้งไฟล์เสมอ)
+        file: file object ที่ seek ได้ — response เป็นเจ้าของและปิดให้
+        as_attachment: True = download, False = แสดงในเบราว์เซอร์
+        etag: ค่าที่เปลี่ยนเมื่อเนื้อหาไฟล์เปลี่ยน (ไม่มี " ) — ระบุเฉพาะไฟล์ที่เนื้อหาคงที่ จึงรองรับ Range
+              None = ไฟล์ที่สร้างใหม่ทุก request ไม่รองรับ Range
+    """
+    file.seek(0, os.SEEK_END)
+    size = file.tell()
+    file.seek(0)
+
+    byte_range = None
+    if request is not None and etag is not None:
+        quoted_etag = f'"{etag}"'
+        # If-Range ไม่ตรง = ไฟล์เปลี่ยนไปจากที่ตัวอ่านมีอยู่ ส่งทั้งไฟล์
+        if request.META.get('HTTP_IF_RANGE', quoted_etag) == quoted_etag:
+            byte_range = parse_range(request.META.get('HTTP_RANGE', ''), size)
+    if byte_range is None:
+        response = FileResponse(file, content_type=content_type)
+    else:
+        if byte_range is False:
+            file.close()
+            response = HttpResponse(status=416)
+            response['Content-Range'] = f'bytes */{size}'
+            return response
+        # ช่วงที่ขอมักเล็ก (ตัวอ่าน PDF ขอทีละส่วน) จึงอ่านเฉพาะช่วงนั้นส่งไป
+        start, end = byte_range
+        file.seek(start)
+        data = file.read(end - start + 1)
+        file.close()
+        response = HttpResponse(data, status=206, content_type=content_type)
+        response['Content-Range'] = f'bytes {start}-{end}/{size}'
+    # ตั้งเอง — FileResponse ตัด path ออกจากชื่อไฟล์ (os.path.basename) ทำให้ receipt_190126/0001.pdf เหลือ 0001.pdf
+    response['Content-Disposition'] = content_disposition_header(as_attachment, filename)
+    if etag is None:
+        response['Accept-Ranges'] = 'none'
+    else:
+        response['Accept-Ranges'] = 'bytes'
+        response['ETag'] = f'"{etag}"'
+    return response
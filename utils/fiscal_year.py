@@ -241,6 +241,27 @@ def validate_document_date(document_date: date, allow_previous_fiscal: bool = Fa
     return True, ""
 
 
+def seconds_until_next_day(now: datetime = None) -> int:
+    """
+    จำนวนวินาทีจนถึงเที่ยงคืนถัดไป (ใช้เป็นอายุ cache ของข้อมูลที่เปลี่ยนตามวัน)
+
+    ปีงบประมาณใหม่เริ่มตอนเที่ยงคืนของวันที่ 1 ต.ค. เสมอ
+    cache ที่หมดอายุตอนเที่ยงคืนจึงไม่มีทางคร่อมการเปลี่ยนปีงบประมาณ
+
+    Args:
+        now (datetime, optional): เวลาอ้างอิง (default: เวลาปัจจุบัน)
+
+    Returns:
+        int: วินาทีที่เหลือ (อย่างน้อย 1)
+
+    Example:
+        seconds_until_next_day(datetime(2025, 9, 30, 23, 59, 0)) -> 60
+    """
+    now = now or datetime.now()
+    next_midnight = datetime.combine(now.date() + timedelta(days=1), datetime.min.time())
+    return max(1, int((next_midnight - now).total_seconds()))
+
+
 if __name__ == "__main__":
     # ตัวอย่างการใช้งาน
     print("=== Thai Fiscal Year Utilities Demo ===")
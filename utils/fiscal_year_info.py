@@ -7,17 +7,49 @@ from typing import Dict, Any
 from .fiscal_year import (
     get_current_fiscal_year,
     get_fiscal_year_dates,
-    format_fiscal_year_display
+    format_fiscal_year_display,
+    seconds_until_next_day,
 )
 
 
+# namespace ของ cache ข้อมูลปีงบประมาณ/เล่มเอกสาร — ถูกล้างทั้งหมดเมื่อ DocumentVolume
+# หรือ Department เปลี่ยน (ดู accounts/signals.py)
+FISCAL_YEAR_CACHE_NAMESPACE = 'fiscal_year'
+FISCAL_YEAR_CACHE_MAX_SECONDS = 600
+
+
+def cached_for_today(name: str, func, *key_parts, max_seconds: int = FISCAL_YEAR_CACHE_MAX_SECONDS):
+    """
+    cache ผลของ func ภายในวันเดียวกัน
+
+    key มีวันที่ปัจจุบันฝังอยู่ และอายุ cache ไม่เกินเที่ยงคืน จึงขึ้นวันใหม่
+    (รวมถึงวันแรกของปีงบประมาณใหม่) ด้วยข้อมูลใหม่เสมอ
+    """
+    from utils.cache import get_or_set
+
+    today = datetime.now().date()
+    timeout = min(max_seconds, seconds_until_next_day())
+    return get_or_set(
+        FISCAL_YEAR_CACHE_NAMESPACE,
+        (name, today.isoformat(), *key_parts),
+        func,
+        timeout=timeout,
+        local_timeout=min(60, timeout),
+    )
+
+
 def get_fiscal_year_info_card() -> Dict[str, Any]:
     """
-    สร้างข้อมูลสำหรับการ์ดแสดงข้อมูลปีงบประมาณ
+    สร้างข้อมูลสำหรับการ์ดแสดงข้อมูลปีงบประมาณ (cache ไว้ถึงเที่ยงคืน)
     
     Returns:
         Dict: ข้อมูลสำหรับแสดงในการ์ด
     """
+    return cached_for_today('info_card', _build_fiscal_year_info_card,
+                            max_seconds=seconds_until_next_day())
+
+
+def _build_fiscal_year_info_card() -> Dict[str, Any]:
     current_fy = get_current_fiscal_year()
     today = datetime.now().date()
     
@@ -167,27 +199,34 @@ def get_volume_status_summary(current_fy: int) -> Dict[str, Any]:
     Returns:
         Dict: สรุปสถานะเล่มเอกสาร
     """
+    return cached_for_today('volume_summary', lambda: _build_volume_status_summary(current_fy), current_fy)
+
+
+def _build_volume_status_summary(current_fy: int) -> Dict[str, Any]:
     try:
+        from django.db.models import Count, Exists, OuterRef, Q
         from accounts.models import DocumentVolume, Department
         
-        # เล่มทั้งหมดในปีนี้
-        total_volumes = DocumentVolume.objects.filter(fiscal_year=current_fy).count()
-        active_volumes = DocumentVolume.objects.filter(
-            fiscal_year=current_fy, 
-            status='active'
-        ).count()
+        # เล่มทั้งหมด/ที่ยังเปิดใช้ในปีนี้ — query เดียว
+        volume_counts = DocumentVolume.objects.filter(fiscal_year=current_fy).aggregate(
+            total=Count('id'),
+            active=Count('id', filter=Q(status='active')),
+        )
+        total_volumes = volume_counts['total']
+        active_volumes = volume_counts['active']
         closed_volumes = total_volumes - active_volumes
         
-        # หน่วยงานทั้งหมด
-        total_departments = Department.objects.filter(is_active=True).count()
-        
-        # หน่วยงานที่มีเล่มแล้ว
-        departments_with_volumes = DocumentVolume.objects.filter(
-            fiscal_year=current_fy
-        ).values_list('department_id', flat=True).distinct().count()
-        
-        # หน่วยงานที่ยังไม่มีเล่ม
-        departments_without_volumes = total_departments - departments_with_volumes
+        # หน่วยงานที่ใช้งานอยู่ และหน่วยงานที่ยังไม่มีเล่ม (NOT EXISTS) — query เดียว
+        has_volume = Exists(DocumentVolume.objects.filter(
+            department_id=OuterRef('pk'), fiscal_year=current_fy
+        ))
+        department_counts = Department.objects.filter(is_active=True).aggregate(
+            total=Count('id'),
+            without_volume=Count('id', filter=~has_volume),
+        )
+        total_departments = department_counts['total']
+        departments_without_volumes = department_counts['without_volume']
+        departments_with_volumes = total_departments - departments_without_volumes
         
         # เปอร์เซ็นต์ความครอบคลุม
         coverage_percentage = (departments_with_volumes / total_departments * 100) if total_departments > 0 else 0
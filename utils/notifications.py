@@ -95,6 +95,7 @@ class FiscalYearNotificationManager:
         warnings = []
         
         try:
+            from django.db.models import Exists, OuterRef
             from accounts.models import DocumentVolume, Department
             
             # ตรวจสอบเล่มที่ใกล้เต็ม
@@ -148,36 +149,33 @@ class FiscalYearNotificationManager:
                         ]
                     })
             
-            # ตรวจสอบหน่วยงานที่ยังไม่มีเล่มในปีงบประมาณปัจจุบัน
-            departments_with_volumes = set(
-                DocumentVolume.objects.filter(
-                    fiscal_year=self.current_fiscal_year
-                ).values_list('department_id', flat=True)
-            )
-            
-            all_active_departments = Department.objects.filter(is_active=True)
+            # หน่วยงานที่ยังไม่มีเล่มในปีงบประมาณปัจจุบัน — anti-join (NOT EXISTS) query เดียว
+            departments_without_volumes = Department.objects.filter(is_active=True).exclude(
+                Exists(DocumentVolume.objects.filter(
+                    department_id=OuterRef('pk'), fiscal_year=self.current_fiscal_year
+                ))
+            ).only('name', 'code')
             
-            for dept in all_active_departments:
-                if dept.id not in departments_with_volumes:
-                    warnings.append({
-                        'type': 'volume_missing',
-                        'level': 'info',
-                        'title': f'ยังไม่มีเล่มสำหรับ {dept.name}',
-                        'message': f'{dept.name} ({dept.code}) ยังไม่มีเล่มเอกสารสำหรับปีงบประมาณ {self.current_fiscal_year}',
-                        'details': {
-                            'department': dept.name,
-                            'department_code': dept.code,
-                            'fiscal_year': self.current_fiscal_year,
-                            'note': 'เล่มจะถูกสร้างอัตโนมัติเมื่อออกใบสำคัญแรก'
-                        },
-                        'actions': [
-                            {
-                                'label': 'สร้างเล่มล่วงหน้า',
-                                'url': '/accounts/management/document-numbering/',
-                                'type': 'info'
-                            }
-                        ]
-                    })
+            for dept in departments_without_volumes:
+                warnings.append({
+                    'type': 'volume_missing',
+                    'level': 'info',
+                    'title': f'ยังไม่มีเล่มสำหรับ {dept.name}',
+                    'message': f'{dept.name} ({dept.code}) ยังไม่มีเล่มเอกสารสำหรับปีงบประมาณ {self.current_fiscal_year}',
+                    'details': {
+                        'department': dept.name,
+                        'department_code': dept.code,
+                        'fiscal_year': self.current_fiscal_year,
+                        'note': 'เล่มจะถูกสร้างอัตโนมัติเมื่อออกใบสำคัญแรก'
+                    },
+                    'actions': [
+                        {
+                            'label': 'สร้างเล่มล่วงหน้า',
+                            'url': '/accounts/management/document-numbering/',
+                            'type': 'info'
+                        }
+                    ]
+                })
         
         except ImportError:
             pass  # Models ยังไม่ได้ migrate
@@ -186,11 +184,16 @@ class FiscalYearNotificationManager:
     
     def get_all_notifications(self) -> Dict[str, Any]:
         """
-        รวบรวมการแจ้งเตือนทั้งหมด
+        รวบรวมการแจ้งเตือนทั้งหมด (cache ไว้ภายในวัน และถูกล้างเมื่อเล่มเอกสาร/หน่วยงานเปลี่ยน)
         
         Returns:
             Dict: ข้อมูลการแจ้งเตือนทั้งหมด
         """
+        from .fiscal_year_info import cached_for_today
+
+        return cached_for_today('notifications', self._build_all_notifications, self.current_fiscal_year)
+    
+    def _build_all_notifications(self) -> Dict[str, Any]:
         transition_warnings = self.get_transition_warnings()
         volume_warnings = self.get_volume_warnings()
         
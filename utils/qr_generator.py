@@ -1,24 +1,38 @@
 """
 QR Code Generation Utilities for Receipt Verification
+
+QR ของใบสำคัญเดิมถูกสร้างใหม่ทุกครั้ง (encode → rasterize → ย่อด้วย LANCZOS → encode PNG)
+ทั้งที่ข้อมูลใน QR คือ URL ตรวจสอบที่ไม่เปลี่ยน จึง cache ไว้ 3 ชั้น:
+    - matrix ของ QR (LRU ตาม data + border)         ใช้ร่วมกันทั้ง PNG และ vector
+    - PNG bytes (LRU ตาม data + size + border)       ใช้กับหน้าเว็บ/base64
+    - ไฟล์ PNG บนดิสก์ (settings.QR_CACHE_DIR)       เฉพาะใบสำคัญที่เสร็จสิ้นแล้ว ใช้ข้าม worker/restart
+
+สำหรับ PDF มี qr_drawing() วาด QR เป็นสี่เหลี่ยมด้วย ReportLab โดยตรง ไม่ต้องผ่าน PNG เลย
 """
+import functools
+import hashlib
+import logging
+import os
 import qrcode
 from io import BytesIO
 import base64
 from PIL import Image, ImageDraw, ImageFont
 import json
 
+from django.conf import settings
 
-def generate_qr_code_image(data, size=(200, 200), border=4):
+
+logger = logging.getLogger(__name__)
+
+QR_MATRIX_CACHE_SIZE = 512
+QR_PNG_CACHE_SIZE = 256
+QR_DRAWING_CACHE_SIZE = 256
+
+
+@functools.lru_cache(maxsize=QR_MATRIX_CACHE_SIZE)
+def get_qr_matrix(data, border=4):
     """
-    สร้าง QR Code image จากข้อมูล
-    
-    Args:
-        data (str): ข้อมูลที่จะใส่ใน QR Code
-        size (tuple): ขนาดของภาพ QR Code
-        border (int): ขนาด border
-        
-    Returns:
-        PIL.Image: QR Code image
+    matrix ของ QR Code (รวม border) เป็น tuple ของแถว แต่ละแถวเป็น tuple ของ bool (True = จุดดำ)
     """
     qr = qrcode.QRCode(
         version=1,  # ควบคุมขนาด QR Code (1-40)
@@ -26,37 +40,153 @@ def generate_qr_code_image(data, size=(200, 200), border=4):
         box_size=10,  # ขนาดของแต่ละ box
         border=border,  # ขนาด border
     )
-    
     qr.add_data(data)
     qr.make(fit=True)
+    return tuple(tuple(row) for row in qr.get_matrix())
+
+
+def _render_qr_png(data, size, border):
+    """วาด matrix เป็นภาพขาวดำขนาด size แล้ว encode เป็น PNG"""
+    matrix = get_qr_matrix(data, border)
+    modules = len(matrix)
+
+    # วาด 1 pixel ต่อ 1 module แล้วขยายทีเดียว — ภาพขาวดำ (mode '1') PIL ย่อ/ขยายแบบ NEAREST เสมอ
+    # จึงได้ภาพเดียวกับการวาด box_size 10 แล้ว resize แบบเดิมทุก pixel แต่ไม่ต้องสร้างภาพใหญ่ก่อน
+    img = Image.new('1', (modules, modules), 1)
+    img.putdata([0 if dark else 1 for row in matrix for dark in row])
+    img = img.resize(size, Image.Resampling.NEAREST)
+
+    buffer = BytesIO()
+    img.save(buffer, format='PNG', optimize=False)
+    return buffer.getvalue()
+
+
+def _disk_cache_path(data, size, border):
+    cache_dir = getattr(settings, 'QR_CACHE_DIR', '')
+    if not cache_dir:
+        return None
+    digest = hashlib.sha256(f'{data}|{size[0]}x{size[1]}|{border}'.encode('utf-8')).hexdigest()
+    return os.path.join(cache_dir, digest[:2], f'{digest}.png')
+
+
+@functools.lru_cache(maxsize=QR_PNG_CACHE_SIZE)
+def get_qr_png(data, size=(200, 200), border=4, persist=False):
+    """
+    PNG bytes ของ QR Code (cache ใน process แบบ LRU)
+
+    Args:
+        data (str): ข้อมูลที่จะใส่ใน QR Code
+        size (tuple): ขนาดภาพ (pixels)
+        border (int): ขนาด border (จำนวน module)
+        persist (bool): เก็บ/อ่านไฟล์ใน settings.QR_CACHE_DIR ด้วย
+                        ใช้กับข้อมูลที่ไม่เปลี่ยนอีกแล้วเท่านั้น (URL ของใบสำคัญที่เสร็จสิ้น)
+
+    Returns:
+        bytes: PNG
+    """
+    size = tuple(size)
+    path = _disk_cache_path(data, size, border) if persist else None
+    if path:
+        try:
+            with open(path, 'rb') as f:
+                return f.read()
+        except FileNotFoundError:
+            pass
+        except OSError as e:
+            logger.warning(f'อ่าน QR cache ไม่ได้ ({path}): {e}')
+
+    png = _render_qr_png(data, size, border)
+
+    if path:
+        try:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            tmp_path = f'{path}.{os.getpid()}.tmp'
+            with open(tmp_path, 'wb') as f:
+                f.write(png)
+            os.replace(tmp_path, path)
+        except OSError as e:
+            # เขียนไม่ได้ก็ยังใช้ภาพที่สร้างได้ตามปกติ
+            logger.warning(f'เขียน QR cache ไม่ได้ ({path}): {e}')
+    return png
+
+
+@functools.lru_cache(maxsize=QR_DRAWING_CACHE_SIZE)
+def qr_drawing(data, size, border=4):
+    """
+    QR Code เป็น ReportLab Drawing (vector) ขนาด size x size point — วางด้วย drawing.drawOn(canvas, x, y)
+
+    จุดดำที่ติดกันในแถวเดียวกันรวมเป็นสี่เหลี่ยมเดียว เพื่อลดจำนวน shape ใน PDF
+    Drawing ที่ได้ใช้ซ้ำได้ (อย่าแก้ไข object ที่คืนไป)
+    """
+    from reportlab.graphics.shapes import Drawing, Rect
+    from reportlab.lib import colors
+
+    matrix = get_qr_matrix(data, border)
+    modules = len(matrix)
+    unit = float(size) / modules
+
+    drawing = Drawing(size, size)
+    drawing.add(Rect(0, 0, size, size, fillColor=colors.white, strokeColor=None))
+    for row_index, row in enumerate(matrix):
+        # แถวแรกของ matrix อยู่บนสุด แต่แกน y ของ ReportLab นับจากล่างขึ้นบน
+        y = size - (row_index + 1) * unit
+        col = 0
+        while col < modules:
+            if not row[col]:
+                col += 1
+                continue
+            start = col
+            while col < modules and row[col]:
+                col += 1
+            drawing.add(Rect(start * unit, y, (col - start) * unit, unit,
+                             fillColor=colors.black, strokeColor=None, strokeWidth=0))
+    return drawing
+
+
+def clear_qr_cache(disk=False):
+    """ล้าง cache ใน process (และไฟล์บนดิสก์ถ้า disk=True)"""
+    get_qr_matrix.cache_clear()
+    get_qr_png.cache_clear()
+    qr_drawing.cache_clear()
+
+    cache_dir = getattr(settings, 'QR_CACHE_DIR', '')
+    if disk and cache_dir and os.path.isdir(cache_dir):
+        for root, _dirs, files in os.walk(cache_dir):
+            for name in files:
+                if name.endswith('.png'):
+                    os.remove(os.path.join(root, name))
+
+
+def generate_qr_code_image(data, size=(200, 200), border=4):
+    """
+    สร้าง QR Code image จากข้อมูล
     
-    # สร้างภาพ QR Code
-    img = qr.make_image(fill_color="black", back_color="white")
-    
-    # ปรับขนาดภาพ
-    img = img.resize(size, Image.Resampling.LANCZOS)
-    
+    Args:
+        data (str): ข้อมูลที่จะใส่ใน QR Code
+        size (tuple): ขนาดของภาพ QR Code
+        border (int): ขนาด border
+        
+    Returns:
+        PIL.Image: QR Code image (object ใหม่ทุกครั้ง แก้ไขได้)
+    """
+    img = Image.open(BytesIO(get_qr_png(data, tuple(size), border)))
+    img.load()
     return img
 
 
-def generate_qr_code_base64(data, size=(200, 200)):
+def generate_qr_code_base64(data, size=(200, 200), persist=False):
     """
     สร้าง QR Code เป็น base64 string สำหรับแสดงใน HTML
     
     Args:
         data (str): ข้อมูลที่จะใส่ใน QR Code
         size (tuple): ขนาดของภาพ QR Code
+        persist (bool): เก็บ PNG ลงดิสก์ด้วย (ดู get_qr_png)
         
     Returns:
         str: Base64 encoded image string
     """
-    img = generate_qr_code_image(data, size)
-    
-    # แปลงเป็น base64
-    buffer = BytesIO()
-    img.save(buffer, format='PNG')
-    img_str = base64.b64encode(buffer.getvalue()).decode()
-    
+    img_str = base64.b64encode(get_qr_png(data, tuple(size), persist=persist)).decode()
     return f"data:image/png;base64,{img_str}"
 
 
@@ -79,7 +209,8 @@ def create_verification_qr_for_receipt(receipt):
     # ใช้ URL เป็นข้อมูลหลักใน QR Code
     verification_url = receipt.get_verification_url()
     
-    return generate_qr_code_base64(verification_url, size=(150, 150))
+    # ใบที่เสร็จสิ้นแล้ว URL ไม่เปลี่ยนอีก → เก็บ PNG ลงดิสก์ไว้ใช้ข้าม worker
+    return generate_qr_code_base64(verification_url, size=(150, 150), persist=receipt.status == 'completed')
 
 
 def create_qr_with_logo(data, logo_path=None, size=(200, 200)):
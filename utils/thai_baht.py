@@ -0,0 +1,97 @@
+"""
+แปลงจำนวนเงินเป็นตัวหนังสือไทย (บาท/สตางค์) แบบใช้ตาราง + LRU cache
+
+ให้ผลตรงกับ Receipt.convert_amount_to_thai_text เดิมทุกตัวอักษร (ตรวจด้วย
+python manage.py check_thai_baht_text) รวมถึงรูปแบบเดิมที่ไม่ใช้ "เอ็ด" เช่น 11 = สิบหนึ่ง
+เพราะข้อความนี้ถูกบันทึกลงใบสำคัญที่ออกไปแล้ว ถ้าเปลี่ยนใบเก่ากับใบใหม่จะเขียนไม่เหมือนกัน
+
+ต่างจากเดิมเฉพาะจำนวนตั้งแต่ 1,000 ล้านขึ้นไป ซึ่งของเดิม error (IndexError)
+
+    >>> baht_text(Decimal('1250.50'))
+    'หนึ่งพันสองร้อยห้าสิบบาทห้าสิบสตางค์'
+    >>> baht_text_many([100, 100, Decimal('0.25')])
+    ['หนึ่งร้อยบาทถ้วน', 'หนึ่งร้อยบาทถ้วน', 'บาทยี่สิบห้าสตางค์']
+"""
+import functools
+
+
+ONES = ('', 'หนึ่ง', 'สอง', 'สาม', 'สี่', 'ห้า', 'หก', 'เจ็ด', 'แปด', 'เก้า')
+
+BAHT_TEXT_CACHE_SIZE = 4096
+
+
+def _build_below_thousand():
+    """ตัวหนังสือของ 0-999 (ตำแหน่งร้อย สิบ หน่วย) คำนวณครั้งเดียวตอน import"""
+    table = []
+    for n in range(1000):
+        hundreds, tens, units = n // 100, n // 10 % 10, n % 10
+        text = ONES[hundreds] + 'ร้อย' if hundreds else ''
+        if tens == 1:
+            text += 'สิบ'
+        elif tens == 2:
+            text += 'ยี่สิบ'
+        elif tens:
+            text += ONES[tens] + 'สิบ'
+        table.append(text + ONES[units])
+    return tuple(table)
+
+
+BELOW_THOUSAND = _build_below_thousand()
+
+
+def integer_text(number):
+    """ตัวหนังสือของจำนวนเต็ม (ไม่มีหน่วย) — 0 และจำนวนติดลบได้ค่าว่างเหมือนของเดิม"""
+    if number <= 0:
+        return ''
+    if number < 1000:
+        return BELOW_THOUSAND[number]
+
+    millions, rest = divmod(number, 1000000)
+    text = integer_text(millions) + 'ล้าน' if millions else ''
+    hundred_thousands, rest = divmod(rest, 100000)
+    ten_thousands, rest = divmod(rest, 10000)
+    thousands, rest = divmod(rest, 1000)
+    if hundred_thousands:
+        text += ONES[hundred_thousands] + 'แสน'
+    if ten_thousands:
+        text += ONES[ten_thousands] + 'หมื่น'
+    if thousands:
+        text += ONES[thousands] + 'พัน'
+    return text + BELOW_THOUSAND[rest]
+
+
+@functools.lru_cache(maxsize=BAHT_TEXT_CACHE_SIZE, typed=True)
+def baht_text(amount):
+    """
+    แปลงจำนวนเงินเป็นตัวหนังสือไทย
+
+    Args:
+        amount (Decimal | int | float): จำนวนเงิน (สตางค์ปัดตามวิธีเดิม: round((amount - ส่วนเต็ม) * 100))
+
+    Returns:
+        str: เช่น 'หนึ่งหมื่นบาทถ้วน', 'สิบบาทห้าสิบสตางค์'
+    """
+    if amount == 0:
+        return 'ศูนย์บาทถ้วน'
+
+    integer_part = int(amount)
+    satang = round((amount - integer_part) * 100)
+
+    if satang > 0:
+        return integer_text(integer_part) + 'บาท' + integer_text(satang) + 'สตางค์'
+    return integer_text(integer_part) + 'บาทถ้วน'
+
+
+def baht_text_many(amounts):
+    """
+    แปลงหลายจำนวนพร้อมกัน (สำหรับ export/รายงานที่มีหลายพันแถว)
+
+    จำนวนที่ซ้ำกันแปลงครั้งเดียว — ผลเรียงตามลำดับ amounts
+    """
+    amounts = list(amounts)
+    texts = {}
+    for amount in amounts:
+        key = (type(amount), amount)
+        if key not in texts:
+            texts[key] = baht_text(amount)
+    return [texts[(type(amount), amount)] for amount in amounts]